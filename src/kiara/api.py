@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 __all__ = [
+    "AsyncKiaraAPI",
     "Kiara",
     "KiaraAPI",
     "KiaraConfig",
@@ -18,6 +19,7 @@ __all__ = [
 
 from .context import Kiara
 from .context.config import KiaraConfig
+from .interfaces.python_api.async_api import AsyncKiaraAPI
 from .interfaces.python_api.kiara_api import KiaraAPI
 from .interfaces.python_api.models.archive import KiArchive
 from .interfaces.python_api.models.job import JobDesc, RunSpec
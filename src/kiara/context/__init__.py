@@ -130,6 +130,17 @@ class Kiara(object):
         self._config: KiaraContextConfig = config
         self._runtime_config: KiaraRuntimeConfig = runtime_config
 
+        if runtime_config.tracing_export:
+            from kiara.utils.tracing import enable_tracing
+
+            enable_tracing(runtime_config.tracing_export)
+
+        if runtime_config.file_hash_cache and config.file_hash_cache_path:
+            from kiara.utils.hashing import enable_process_file_hash_cache
+
+            # file hashes are cached process-wide, so this replaces the cache of other contexts in this process
+            enable_process_file_hash_cache(config.file_hash_cache_path)
+
         self._env_mgmt: EnvironmentRegistry = EnvironmentRegistry()
 
         self._event_registry: EventRegistry = EventRegistry(kiara=self)
@@ -312,6 +312,10 @@ class KiaraContextConfig(BaseModel):
         description="Paths to local folders that contain kiara pipelines.",
         default_factory=list,
     )
+    file_hash_cache_path: Union[str, None] = Field(
+        description="The path to the database file that is used to cache the hashes of imported files (there is only one file hash cache per process, the one of the most recently created context).",
+        default=None,
+    )
     _context_config_path: Union[Path, None] = PrivateAttr(default=None)
 
     def add_pipelines(self, *pipelines: str):
@@ -755,16 +759,37 @@ class KiaraConfig(BaseSettings):
             changed = True
 
         if DEFAULT_WORKFLOW_STORE_MARKER not in context_config.archives.keys():
-            # TODO: impolement sqlite type, or remove workflows entirely
+            if workflow_store_type == "sqlite":
+                if default_sqlite_config is None:
+                    default_sqlite_config = create_default_sqlite_archive_config(
+                        use_wal_mode=use_wal_mode
+                    )
+
+                workflow_store = KiaraArchiveConfig(
+                    archive_type="sqlite_workflow_store", config=default_sqlite_config
+                )
+            elif workflow_store_type == "filesystem":
+                workflow_store_type = "filesystem_workflow_store"
+                workflow_store = create_default_store_config(
+                    store_type=workflow_store_type,
+                    stores_base_path=os.path.join(filesystem_base_path, "workflows"),
+                )
+            else:
+                raise Exception(
+                    f"Can't create default workflow store: invalid default store type '{workflow_store_type}'."
+                )
 
-            workflow_store_type = "filesystem_workflow_store"
-            # workflow_store_type = "sqlite_workflow_store"
+            context_config.archives[DEFAULT_WORKFLOW_STORE_MARKER] = workflow_store
+            changed = True
 
-            workflow_store = create_default_store_config(
-                store_type=workflow_store_type,
-                stores_base_path=os.path.join(filesystem_base_path, "workflows"),
+        if not context_config.file_hash_cache_path:
+            context_config.file_hash_cache_path = os.path.abspath(
+                os.path.join(
+                    self.stores_base_path,
+                    "file_hash_caches",
+                    f"{context_config.context_id}.db",
+                )
             )
-            context_config.archives[DEFAULT_WORKFLOW_STORE_MARKER] = workflow_store
             changed = True
 
         return changed
@@ -944,6 +969,10 @@ class KiaraConfig(BaseSettings):
             log_message("delete.context.error", context_name=context_name, error=e)
 
         if not dry_run:
+            if context_config.file_hash_cache_path:
+                from kiara.utils.hashing import delete_file_hash_cache
+
+                delete_file_hash_cache(context_config.file_hash_cache_path)
             if context_config._context_config_path is not None:
                 os.unlink(context_config._context_config_path)
 
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 from enum import Enum
-from typing import Literal
+from typing import Literal, Union
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from kiara.defaults import DEFAULT_RENDER_CACHE_SIZE, DEFAULT_VALUE_CACHE_SIZE
+
 
 class JobCacheStrategy(Enum):
     no_cache = "no_cache"
@@ -36,6 +38,28 @@ class KiaraRuntimeConfig(BaseSettings):
         description="The runtime profile to use, this determines for example whether comments need to be provided when running a job.",
         default="dharpa",
     )
+    render_cache_size: int = Field(
+        description="The maximum number of rendered items to keep in memory, '0' disables the render cache.",
+        default=DEFAULT_RENDER_CACHE_SIZE,
+        ge=0,
+    )
+    value_cache_size: int = Field(
+        description="The maximum number of (otherwise unreferenced) value objects per cache to keep in memory, '0' only keeps values that are referenced elsewhere.",
+        default=DEFAULT_VALUE_CACHE_SIZE,
+        ge=0,
+    )
+    file_hash_cache: bool = Field(
+        description="Whether to persist the hashes of imported files (keyed on path, inode, size and modification time), so unchanged files don't have to be re-hashed. The cache is process-wide, creating a context with this enabled makes its cache database the one used by all contexts of the process.",
+        default=True,
+    )
+    content_defined_chunking: bool = Field(
+        description="Whether to split (larger) file and bytes data into content-defined chunks when storing it, so unchanged regions of different versions of the data are only stored once.",
+        default=False,
+    )
+    tracing_export: Union[str, None] = Field(
+        description="If set, record tracing spans (api calls, jobs, store writes) and export them to this target: either a file path (json lines), or the http(s) url of an OTLP collector.",
+        default=None,
+    )
 
     # ignore_errors: bool = Field(
     #     description="If set, kiara will try to ignore most errors (that can be ignored).",
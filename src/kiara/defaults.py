@@ -144,6 +144,20 @@ CHUNK_CACHE_BASE_DIR = Path(kiara_app_dirs.user_cache_dir) / "data" / "chunks"
 CHUNK_CACHE_DIR_DEPTH = 2
 CHUNK_CACHE_DIR_WIDTH = 1
 
+JINJA_BYTECODE_CACHE_DIR = (
+    Path(kiara_app_dirs.user_cache_dir) / "templates" / "bytecode"
+)
+JOB_PROFILES_DIR = Path(kiara_app_dirs.user_cache_dir) / "job_profiles"
+"""The default folder for job profiler dumps (if enabled in the develop configuration)."""
+
+# the version suffix needs to be bumped whenever the stage extraction logic changes
+PIPELINE_STAGES_CACHE_DIR = (
+    Path(kiara_app_dirs.user_cache_dir) / "pipelines" / "stages_v1"
+)
+DEFAULT_RENDER_CACHE_SIZE = 256
+DEFAULT_PIPELINE_STRUCTURE_CACHE_SIZE = 128
+DEFAULT_VALUE_CACHE_SIZE = 2048
+
 
 class SpecialValue(Enum):
     NOT_SET = "__not_set__"
@@ -308,6 +322,11 @@ class CHUNK_COMPRESSION_TYPE(Enum):
 DEFAULT_CHUNK_COMPRESSION = CHUNK_COMPRESSION_TYPE.ZSTD
 
 ARCHIVE_NAME_MARKER = "archive_name"
+SQLITE_MAX_VARIABLES_PER_QUERY = 500
+"""The maximum number of bound parameters kiara uses in a single sqlite 'IN (...)' query, larger lists are split into batches."""
+SQLITE_PERFORMANCE_PROFILE_MARKER = "sqlite_performance_profile"
+SQLITE_READ_POOL_SIZE = 8
+"""The number of pooled connections for read-only sqlite archives (twice as many can be open at peak load)."""
 DATA_ARCHIVE_DEFAULT_VALUE_MARKER = "default_value"
 TABLE_NAME_ARCHIVE_METADATA = "archive_metadata"
 TABLE_NAME_DATA_METADATA = "data_value_metadata"
@@ -331,6 +350,7 @@ REQUIRED_TABLES_ALIAS_ARCHIVE = {
 }
 
 TABLE_NAME_JOB_RECORDS = "job_records"
+TABLE_NAME_JOB_LINEAGE = "job_lineage"
 REQUIRED_TABLES_JOB_ARCHIVE = {
     TABLE_NAME_ARCHIVE_METADATA,
     TABLE_NAME_JOB_RECORDS,
@@ -346,6 +366,20 @@ REQUIRED_TABLES_METADATA = {
     TABLE_NAME_METADATA_REFERENCES,
 }
 
+TABLE_NAME_WORKFLOWS = "workflows"
+TABLE_NAME_WORKFLOW_ALIASES = "workflow_aliases"
+TABLE_NAME_WORKFLOW_STATES = "workflow_states"
+TABLE_NAME_WORKFLOW_HISTORY = "workflow_history"
+REQUIRED_TABLES_WORKFLOW_ARCHIVE = {
+    TABLE_NAME_ARCHIVE_METADATA,
+    TABLE_NAME_WORKFLOWS,
+    TABLE_NAME_WORKFLOW_STATES,
+}
+WORKFLOW_STATE_CHECKPOINT_INTERVAL = 32
+"""The maximum number of workflow states that are stored as deltas in a row, before a full state (checkpoint) is stored."""
+WORKFLOW_LAST_STATES_CACHE_SIZE = 64
+"""The maximum number of workflows a sqlite workflow store keeps the last stored state in memory for."""
+
 
 ALL_REQUIRED_TABLES = set(REQUIRED_TABLES_DATA_ARCHIVE)
 ALL_REQUIRED_TABLES.update(REQUIRED_TABLES_ALIAS_ARCHIVE)
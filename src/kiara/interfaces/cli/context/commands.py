@@ -625,6 +625,48 @@ def request(
         zmq_client.close()
 
 
+@service.command("subscribe")
+@click.option(
+    "--context", "-c", help="The context to use.", required=False, default=None
+)
+@click.option(
+    "--topic",
+    "-t",
+    help="The event topic(s) to subscribe to ('job_status', 'pipeline_step'), defaults to all.",
+    multiple=True,
+    required=False,
+)
+@click.pass_context
+def subscribe(ctx, topic: Tuple[str], context: Union[None, str] = None):
+    """Print job and pipeline step events published by a kiara zmq service."""
+
+    from kiara.zmq import get_context_details
+    from kiara.zmq.client import KiaraZmqClient
+
+    if not context:
+        context = ctx.obj.kiara_context_name
+
+    context_details = get_context_details(context_name=context)  # type: ignore
+    if not context_details:
+        terminal_print()
+        terminal_print(f"No service running for context '{context}'. Doing nothing...")
+        sys.exit(1)
+
+    zmq_client = KiaraZmqClient(
+        host=context_details["host"], port=context_details["port"]
+    )
+
+    try:
+        for _topic, event in zmq_client.subscribe(
+            topics=topic, publish_port=context_details.get("publish_port", None)
+        ):
+            print(f"{_topic}: {event}")  # noqa
+    except KeyboardInterrupt:
+        terminal_print("\nInterrupted by user, closing connection to service...")
+    finally:
+        zmq_client.close()
+
+
 CLI_CLIENT_CLICK_CONTEXT_SETTINGS = {
     "help_option_names": [],
     "ignore_unknown_options": True,
@@ -126,6 +126,13 @@ def data(ctx):
     multiple=True,
     required=False,
 )
+@click.option(
+    "--sort-by",
+    help="The value attribute to sort the list by.",
+    type=click.Choice(["value_id", "created", "size", "data_type"]),
+    default="value_id",
+    show_default=True,
+)
 @output_format_option()
 @click.pass_context
 @handle_exception()
@@ -145,10 +152,18 @@ def list_values(
     properties,
     data_type,
     lineage,
+    *,
+    sort_by,
 ) -> None:
     """List all data items that are stored in kiara."""
 
-    from kiara.interfaces.python_api.models.info import RENDER_FIELDS, ValuesInfo
+    from kiara.interfaces.python_api.models.info import (
+        RENDER_FIELDS,
+        SUMMARY_RENDER_FIELDS,
+        ValuesInfo,
+        create_value_summaries_renderable,
+    )
+    from kiara.models.values.matchers import ValueMatcher
 
     kiara_api: BaseAPI = ctx.obj.base_api
 
@@ -162,7 +177,8 @@ def list_values(
     if filter:
         matcher_config["alias_matchers"] = filter
 
-    values = kiara_api.list_values(**matcher_config)
+    # values used to always be listed by id, so that is the default
+    matcher_config["sort_by"] = sort_by
 
     list_by_alias = True
 
@@ -191,9 +207,37 @@ def list_values(
     if serialized:
         render_fields.append("serialize_details")
 
+    if not all_values:
+        title = "Available aliases"
+    else:
+        title = "Available values"
+
+    if format in (None, "terminal") and set(SUMMARY_RENDER_FIELDS.keys()).issuperset(
+        render_fields
+    ):
+        # no need to load full values, summaries are enough
+        summaries = kiara_api.list_value_summaries(**matcher_config)
+        table = create_value_summaries_renderable(
+            summaries, render_fields=render_fields, list_by_alias=list_by_alias
+        )
+        terminal_print(table, in_panel=title, empty_line_before=True)
+        return
+
+    values = kiara_api.list_values(**matcher_config)
     values_info_model = ValuesInfo.create_from_instances(
         kiara=kiara_api.context, instances={str(k): v for k, v in values.items()}
     )
+    if sort_by != "value_id":
+        # info groups are ordered by id, so we need to restore the requested order
+        matcher = ValueMatcher.create_matcher(**matcher_config)
+        values_info_model = values_info_model.model_copy(
+            update={
+                "item_infos": {
+                    str(v.value_id): values_info_model.item_infos[str(v.value_id)]
+                    for v in matcher.sort_and_page(values.values())
+                }
+            }
+        )
 
     render_config = {
         "render_type": "terminal",
@@ -202,11 +246,6 @@ def list_values(
         "render_fields": render_fields,
     }
 
-    if not all_values:
-        title = "Available aliases"
-    else:
-        title = "Available values"
-
     terminal_print_model(
         values_info_model, format=format, in_panel=title, **render_config
     )
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from kiara.models.module.jobs import JobStatus
+from kiara.utils.concurrency import ReadWriteLock
+
+if TYPE_CHECKING:
+    from kiara.context import KiaraConfig
+    from kiara.interfaces.python_api.base_api import BaseAPI
+    from kiara.interfaces.python_api.kiara_api import KiaraAPI
+    from kiara.interfaces.python_api.models.info import (
+        JobInfo,
+        OperationInfo,
+        ValueInfo,
+    )
+    from kiara.interfaces.python_api.models.job import JobDesc
+    from kiara.interfaces.python_api.value import StoreValueResult, StoreValuesResult
+    from kiara.models.module.jobs import ActiveJob, JobRecord
+    from kiara.models.module.manifest import Manifest
+    from kiara.models.module.operation import Operation
+    from kiara.models.values.value import Value, ValueMapReadOnly
+
+RESULT_TYPE = TypeVar("RESULT_TYPE")
+
+FINISHED_JOB_STATES = (JobStatus.SUCCESS, JobStatus.FAILED)
+
+
+class _JobWaiters(object):
+    """A job status listener that resolves asyncio futures once the jobs they wait for are finished."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Dict[
+            uuid.UUID, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]
+        ] = {}
+
+    def add(self, job_id: uuid.UUID, loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.setdefault(job_id, set()).add((loop, future))
+        return future
+
+    def remove(self, job_id: uuid.UUID, future: asyncio.Future):
+        with self._lock:
+            waiters = self._waiters.get(job_id, None)
+            if waiters is None:
+                return
+            for waiter in [w for w in waiters if w[1] is future]:
+                waiters.discard(waiter)
+            if not waiters:
+                self._waiters.pop(job_id)
+
+    def job_status_changed(
+        self,
+        job_id: uuid.UUID,
+        old_status: Union[JobStatus, None],
+        new_status: JobStatus,
+    ):
+        if new_status not in FINISHED_JOB_STATES:
+            return
+
+        with self._lock:
+            waiters = self._waiters.pop(job_id, None)
+        if not waiters:
+            return
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_set_future_result, future, new_status)
+
+
+def _set_future_result(future: asyncio.Future, result: Any):
+    if not future.done():
+        future.set_result(result)
+
+
+class AsyncKiaraAPI(object):
+    """An asyncio facade for the [KiaraAPI][kiara.interfaces.python_api.kiara_api.KiaraAPI].
+
+    All (blocking) calls are run in a thread pool that is managed by this class, so they don't block the event loop.
+    Calls are divided into three groups, which are coordinated via a read/write lock:
+
+    - reads (get_*, list_*, retrieve_*): run concurrently with each other and with jobs
+    - jobs (run_job, queue_job, run_job_batch): run concurrently with each other and with reads, since they only ever
+      add new values and job records to the context, unless the runtime profile auto-saves job results, in which case
+      they are run exclusively, like writes
+    - writes (store_value, store_values, import_values, export_values): run exclusively, so reads never see partially
+      stored values, aliases or metadata
+
+    Job completion is awaited via a job status listener, without polling.
+
+    Use an instance as async context manager, or call 'close' when it is not needed anymore, to shut down the
+    thread pool.
+    """
+
+    def __init__(
+        self,
+        kiara_api: Union["KiaraAPI", None] = None,
+        kiara_config: Union["KiaraConfig", None] = None,
+        max_workers: Union[int, None] = None,
+    ):
+        if kiara_api is None:
+            from kiara.interfaces.python_api.kiara_api import KiaraAPI
+
+            kiara_api = KiaraAPI(kiara_config=kiara_config)
+        elif kiara_config is not None:
+            raise ValueError(
+                "Can't create async api: only one of 'kiara_api' and 'kiara_config' can be provided."
+            )
+
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+        self._kiara_api: KiaraAPI = kiara_api
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="kiara_async_api"
+        )
+        self._lock: ReadWriteLock = ReadWriteLock()
+        self._job_waiters: _JobWaiters = _JobWaiters()
+        self._init_lock = threading.Lock()
+        self._initialized: bool = False
+
+    @property
+    def kiara_api(self) -> "KiaraAPI":
+        """The (synchronous) api this facade wraps."""
+        return self._kiara_api
+
+    @property
+    def _base_api(self) -> "BaseAPI":
+        return self._kiara_api._api
+
+    async def __aenter__(self) -> "AsyncKiaraAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Wait for all running calls to finish, then shut down the thread pool."""
+
+        if self._initialized:
+            self._base_api.context.job_registry.unregister_job_status_listener(
+                self._job_waiters
+            )
+            self._initialized = False
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+
+    async def _run(
+        self, lock: Any, func: Callable[..., RESULT_TYPE], *args, **kwargs
+    ) -> RESULT_TYPE:
+        def _locked():
+            self._ensure_initialized()
+            with lock():
+                return func(*args, **kwargs)
+
+        # copy the context, so tracing spans of the call are children of the current span
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, context.run, _locked
+        )
+
+    async def _read(
+        self, func: Callable[..., RESULT_TYPE], *args, **kwargs
+    ) -> RESULT_TYPE:
+        return await self._run(self._lock.read_lock, func, *args, **kwargs)
+
+    async def _write(
+        self, func: Callable[..., RESULT_TYPE], *args, **kwargs
+    ) -> RESULT_TYPE:
+        return await self._run(self._lock.write_lock, func, *args, **kwargs)
+
+    async def _job(
+        self, func: Callable[..., RESULT_TYPE], *args, **kwargs
+    ) -> RESULT_TYPE:
+        return await self._run(self._job_lock, func, *args, **kwargs)
+
+    def _job_lock(self) -> ContextManager:
+        # the 'dharpa' runtime profile auto-saves job results, which means jobs write to the data stores
+        if self._base_api.context.runtime_config.runtime_profile == "dharpa":
+            return self._lock.write_lock()
+        return self._lock.read_lock()
+
+    def _ensure_initialized(self):
+        """Create the kiara context (which is not thread-safe), and register the job status listener."""
+
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._base_api.context.job_registry.register_job_status_listener(
+                self._job_waiters
+            )
+            self._initialized = True
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # job-related methods
+
+    async def queue_job(
+        self,
+        operation: Union[str, Path, "Manifest", "OperationInfo", "JobDesc"],
+        inputs: Mapping[str, Any],
+        comment: Union[str, None] = None,
+        operation_config: Union[None, Mapping[str, Any]] = None,
+    ) -> uuid.UUID:
+        """Queue a job, and return its id (use 'wait_for_job' to wait for it to finish).
+
+        For the arguments, check the documentation of [KiaraAPI.queue_job][kiara.interfaces.python_api.kiara_api.KiaraAPI.queue_job].
+        """
+
+        return await self._job(
+            self._base_api.queue_job,
+            operation=operation,
+            inputs=inputs,
+            operation_config=operation_config,
+            comment=comment,
+        )
+
+    async def wait_for_job(self, job_id: Union[str, uuid.UUID]) -> JobStatus:
+        """Wait for the job with the provided id to finish, and return its final status."""
+
+        if isinstance(job_id, str):
+            job_id = uuid.UUID(job_id)
+
+        await self._read(self._ensure_initialized)
+        job_registry = self._base_api.context.job_registry
+
+        # register first, so a status change between the check and the registration can't be missed
+        future = self._job_waiters.add(job_id, asyncio.get_running_loop())
+        try:
+            status = await self._read(job_registry.get_job_status, job_id=job_id)
+            if status in FINISHED_JOB_STATES:
+                return status
+            return await future
+        finally:
+            self._job_waiters.remove(job_id, future)
+
+    async def run_job(
+        self,
+        operation: Union[str, Path, "Manifest", "OperationInfo", "JobDesc"],
+        inputs: Union[Mapping[str, Any], None] = None,
+        comment: Union[str, None] = None,
+        operation_config: Union[None, Mapping[str, Any]] = None,
+    ) -> "ValueMapReadOnly":
+        """Run a job, wait for it to finish and return its result.
+
+        For the arguments, check the documentation of [KiaraAPI.run_job][kiara.interfaces.python_api.kiara_api.KiaraAPI.run_job].
+        """
+
+        if inputs is None:
+            inputs = {}
+
+        job_id = await self.queue_job(
+            operation=operation,
+            inputs=inputs,
+            comment=comment,
+            operation_config=operation_config,
+        )
+        await self.wait_for_job(job_id)
+        return await self.get_job_result(job_id)
+
+    async def run_job_batch(
+        self,
+        operation: Union[str, Path, "Manifest", "OperationInfo", "JobDesc"],
+        inputs: Iterable[Mapping[str, Any]],
+        comment: Union[str, None] = None,
+        operation_config: Union[None, Mapping[str, Any]] = None,
+        max_workers: Union[int, None] = None,
+    ) -> AsyncIterator["ValueMapReadOnly"]:
+        """Run the same operation over many input sets, and yield the results in the order of the input sets.
+
+        For the arguments, check the documentation of [BaseAPI.run_job_batch][kiara.interfaces.python_api.base_api.BaseAPI.run_job_batch].
+        """
+
+        job_metadata = {} if comment is None else {"comment": comment}
+        results = await self._job(
+            self._base_api.run_job_batch,
+            operation=operation,
+            inputs=inputs,
+            operation_config=operation_config,
+            max_workers=max_workers,
+            **job_metadata,
+        )
+
+        _done = object()
+        try:
+            while True:
+                result = await self._job(next, results, _done)
+                if result is _done:
+                    return
+                yield result
+        finally:
+            # also shuts down the worker threads of the batch, if the iteration is stopped early
+            await self._job(results.close)
+
+    async def get_job(self, job_id: Union[str, uuid.UUID]) -> "ActiveJob":
+        """Retrieve the status of the job with the provided id."""
+        return await self._read(self._kiara_api.get_job, job_id)
+
+    async def get_job_result(self, job_id: Union[str, uuid.UUID]) -> "ValueMapReadOnly":
+        """Retrieve the result(s) of the specified job."""
+        return await self._read(self._kiara_api.get_job_result, job_id)
+
+    async def get_job_record(
+        self, job_id: Union[str, uuid.UUID]
+    ) -> Union["JobRecord", None]:
+        """Retrieve the detailed job record for a job with the specified id."""
+        return await self._read(self._kiara_api.get_job_record, job_id)
+
+    async def retrieve_job_info(
+        self, job_id: Union[str, uuid.UUID]
+    ) -> Union["JobInfo", None]:
+        """Retrieve the job info for the specified job id."""
+        return await self._read(self._kiara_api.retrieve_job_info, job_id)
+
+    async def list_job_record_ids(self, **matcher_params: Any) -> List[uuid.UUID]:
+        """List all available job ids in this kiara context, ordered from newest to oldest."""
+        return await self._read(self._kiara_api.list_job_record_ids, **matcher_params)
+
+    async def list_job_records(
+        self, **matcher_params: Any
+    ) -> Mapping[uuid.UUID, "JobRecord"]:
+        """List all available job records in this kiara context, ordered from newest to oldest."""
+        return await self._read(self._kiara_api.list_job_records, **matcher_params)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # operation-related methods
+
+    async def get_operation(
+        self,
+        operation: Union[Mapping[str, Any], str, Path],
+        allow_external: Union[bool, None] = None,
+    ) -> "Operation":
+        """Return the operation instance with the specified id."""
+        return await self._read(
+            self._kiara_api.get_operation,
+            operation=operation,
+            allow_external=allow_external,
+        )
+
+    async def list_operation_ids(self, **kwargs: Any) -> List[str]:
+        """List all available operation ids, check 'KiaraAPI.list_operation_ids' for the supported filter arguments."""
+        return await self._read(self._kiara_api.list_operation_ids, **kwargs)
+
+    async def retrieve_operation_info(
+        self, operation: str, allow_external: bool = False
+    ) -> "OperationInfo":
+        """Return the full information for the specified operation id."""
+        return await self._read(
+            self._kiara_api.retrieve_operation_info,
+            operation=operation,
+            allow_external=allow_external,
+        )
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # value-related methods
+
+    async def get_value(self, value: Union[str, "Value", uuid.UUID, Path]) -> "Value":
+        """Retrieve a value instance with the specified id or alias."""
+        return await self._read(self._kiara_api.get_value, value)
+
+    async def get_values(
+        self, **values: Union[str, "Value", uuid.UUID]
+    ) -> "ValueMapReadOnly":
+        """Retrieve value instances with the specified ids or aliases."""
+        return await self._read(self._kiara_api.get_values, **values)
+
+    async def retrieve_value_info(
+        self, value: Union[str, uuid.UUID, "Value", Path]
+    ) -> "ValueInfo":
+        """Retrieve an info object for a value."""
+        return await self._read(self._kiara_api.retrieve_value_info, value)
+
+    async def list_value_ids(self, **matcher_params: Any) -> List[uuid.UUID]:
+        """List all value ids in the current context, incl. matching filters."""
+        return await self._read(self._kiara_api.list_value_ids, **matcher_params)
+
+    async def list_values(self, **matcher_params: Any) -> "ValueMapReadOnly":
+        """List all values in the current context, incl. matching filters."""
+        return await self._read(self._kiara_api.list_values, **matcher_params)
+
+    async def list_alias_names(self, **matcher_params: Any) -> List[str]:
+        """List all available alias keys."""
+        return await self._read(self._kiara_api.list_alias_names, **matcher_params)
+
+    async def list_aliases(self, **matcher_params: Any) -> "ValueMapReadOnly":
+        """List all available values that have an alias assigned."""
+        return await self._read(self._kiara_api.list_aliases, **matcher_params)
+
+    async def store_value(
+        self,
+        value: Union[str, uuid.UUID, "Value"],
+        alias: Union[str, Iterable[str], None],
+        *,
+        allow_overwrite: bool = True,
+        store: Union[str, None] = None,
+        store_related_metadata: bool = True,
+        set_as_store_default: bool = False,
+    ) -> "StoreValueResult":
+        """Store the specified value in a value store, check 'KiaraAPI.store_value' for details."""
+        return await self._write(
+            self._kiara_api.store_value,
+            value=value,
+            alias=alias,
+            allow_overwrite=allow_overwrite,
+            store=store,
+            store_related_metadata=store_related_metadata,
+            set_as_store_default=set_as_store_default,
+        )
+
+    async def store_values(self, values: Any, **kwargs: Any) -> "StoreValuesResult":
+        """Store multiple values in a value store, check 'KiaraAPI.store_values' for the supported arguments."""
+        return await self._write(self._kiara_api.store_values, values, **kwargs)
+
+    async def import_values(
+        self, source_archive: Union[str, Path], values: Any, **kwargs: Any
+    ) -> "StoreValuesResult":
+        """Import values from an archive, check 'KiaraAPI.import_values' for the supported arguments."""
+        return await self._write(
+            self._kiara_api.import_values, source_archive, values, **kwargs
+        )
+
+    async def export_values(
+        self, target_archive: Union[str, Path], values: Any, **kwargs: Any
+    ) -> "StoreValuesResult":
+        """Export values to an archive, check 'KiaraAPI.export_values' for the supported arguments."""
+        return await self._write(
+            self._kiara_api.export_values, target_archive, values, **kwargs
+        )
@@ -14,11 +14,13 @@ from typing import (
     Any,
     Dict,
     Iterable,
+    Iterator,
     List,
     Literal,
     Mapping,
     MutableMapping,
     Set,
+    Tuple,
     Type,
     Union,
 )
@@ -59,6 +61,7 @@ from kiara.interfaces.python_api.models.info import (
 )
 from kiara.interfaces.python_api.models.job import JobDesc
 from kiara.interfaces.python_api.value import StoreValueResult, StoreValuesResult
+from kiara.models import KiaraModel
 from kiara.models.context import ContextInfo, ContextInfos
 from kiara.models.module.manifest import Manifest
 from kiara.models.module.operation import Operation
@@ -70,6 +73,7 @@ from kiara.models.values.value import (
     Value,
     ValueMapReadOnly,
     ValueSchema,
+    ValueSummary,
 )
 from kiara.models.workflow import WorkflowGroupInfo, WorkflowInfo, WorkflowMetadata
 from kiara.operations import OperationType
@@ -85,10 +89,12 @@ from kiara.registries.environment import EnvironmentRegistry
 from kiara.registries.ids import ID_REGISTRY
 from kiara.renderers import KiaraRenderer
 from kiara.utils import log_exception, log_message
+from kiara.utils.caching import LRUCache
 from kiara.utils.downloads import get_data_from_url
 from kiara.utils.files import get_data_from_file
 from kiara.utils.operations import create_operation
 from kiara.utils.string_vars import replace_var_names_in_obj
+from kiara.utils.tracing import traced
 
 if TYPE_CHECKING:
     from kiara.context import Kiara, KiaraConfig, KiaraRuntimeConfig
@@ -100,7 +106,8 @@ if TYPE_CHECKING:
     )
     from kiara.interfaces.python_api.workflow import Workflow
     from kiara.models.archives import KiArchiveInfo
-    from kiara.models.module.jobs import ActiveJob, JobRecord
+    from kiara.models.metadata import KiaraMetadata
+    from kiara.models.module.jobs import ActiveJob, JobRecord, LineageEdge
     from kiara.models.module.pipeline import PipelineConfig, PipelineStructure
     from kiara.models.module.pipeline.pipeline import PipelineGroupInfo, PipelineInfo
     from kiara.registries import KiaraArchive
@@ -112,6 +119,8 @@ yaml = YAML(typ="safe")
 
 def tag(*tags: str):
     def decorator(func):
+        if "kiara_api" in tags:
+            func = traced(f"api.{func.__name__}")(func)
         func._tags = tags
         return func
 
@@ -156,6 +165,9 @@ class BaseAPI(object):
         self._kiara_config: KiaraConfig = kiara_config
         self._contexts: Dict[str, Kiara] = {}
         self._workflow_cache: Dict[uuid.UUID, Workflow] = {}
+        self._info_cache: LRUCache[Tuple[uuid.UUID, str, str], KiaraModel] = LRUCache(
+            max_size=kiara_config.runtime_config.render_cache_size
+        )
 
         self._current_context: Union[None, Kiara] = None
         self._current_context_alias: Union[None, str] = None
@@ -1026,7 +1038,16 @@ class BaseAPI(object):
             op = self.context.operation_registry.get_operation(operation_id=operation)
         else:
             op = create_operation(module_or_operation=operation)
-        op_info = OperationInfo.create_from_operation(kiara=self.context, operation=op)
+            return OperationInfo.create_from_operation(kiara=self.context, operation=op)
+
+        # registered operations don't change within a context, so their info can be cached
+        cache_key = (self.context.id, OperationInfo._kiara_model_id, op.operation_id)
+        op_info: OperationInfo = self._info_cache.get_or_create(  # type: ignore
+            cache_key,
+            lambda: OperationInfo.create_from_operation(
+                kiara=self.context, operation=op
+            ),
+        )
         return op_info
 
     @tag("kiara_api")
@@ -1208,6 +1229,12 @@ class BaseAPI(object):
 
         from kiara.models.module.pipeline.pipeline import Pipeline, PipelineInfo
 
+        cache_key = (self.context.id, PipelineInfo._kiara_model_id, op.operation_id)
+        if not allow_external:
+            cached = self._info_cache.get(cache_key)
+            if cached is not None:
+                return cached  # type: ignore
+
         details: PipelineOperationDetails = op.operation_details  # type: ignore
         config: "PipelineConfig" = details.pipeline_config
         pipeline_instance = Pipeline(structure=config.structure, kiara=self.context)
@@ -1215,6 +1242,8 @@ class BaseAPI(object):
         p_info: PipelineInfo = PipelineInfo.create_from_instance(
             kiara=self.context, instance=pipeline_instance
         )
+        if not allow_external:
+            self._info_cache.put(cache_key, p_info)
         return p_info
 
     def retrieve_pipelines_info(
@@ -1414,6 +1443,25 @@ class BaseAPI(object):
         )
         return result
 
+    @tag("kiara_api")
+    def list_value_summaries(self, **matcher_params: Any) -> Iterator[ValueSummary]:
+        """
+        List lightweight summaries (id, data type, size, hash, creation date and aliases) of all matching values.
+
+        Other than [list_values][kiara.interfaces.python_api.KiaraAPI.list_values], this does not create full value
+        instances, and results are streamed, which makes it suitable for listing a large number of values. Use the
+        'limit', 'offset' and 'sort_by' matcher parameters for paging.
+
+        Arguments:
+            matcher_params: the (optional) filter parameters, check the [ValueMatcher][kiara.models.values.matchers.ValueMatcher] class for available parameters
+
+        Returns:
+            an iterator of value summaries
+        """
+
+        matcher = ValueMatcher.create_matcher(**matcher_params)
+        return self.context.data_registry.find_value_summaries(matcher=matcher)
+
     @tag("kiara_api")
     def get_value(self, value: Union[str, Value, uuid.UUID, Path]) -> Value:
         """
@@ -1820,19 +1868,7 @@ class BaseAPI(object):
                 )
 
             if store_related_metadata:
-                from kiara.registries.metadata import MetadataMatcher
-
-                matcher = MetadataMatcher.create_matcher(
-                    reference_item_ids=[value_obj.job_id, value_obj.value_id]
-                )
-
-                target_store: MetadataStore = (
-                    self.context.metadata_registry.get_archive(store)  # type: ignore
-                )  # type: ignore
-                matching_metadata = self.context.metadata_registry.find_metadata_items(
-                    matcher=matcher
-                )
-                target_store.store_metadata_and_ref_items(matching_metadata)
+                self._store_related_metadata(values=[value_obj], store=store)
 
             if set_as_store_default:
                 store_instance = self.context.data_registry.get_archive(store)
@@ -1860,6 +1896,29 @@ class BaseAPI(object):
 
         return result
 
+    def _store_related_metadata(
+        self, values: Iterable[Value], store: Union[str, None] = None
+    ):
+        """Copy the metadata items (comments, etc.) referenced by the values and the jobs that produced them into the specified store."""
+
+        from kiara.registries.metadata import MetadataMatcher
+
+        reference_ids = set()
+        for value in values:
+            reference_ids.add(value.value_id)
+            if value.job_id is not None:
+                reference_ids.add(value.job_id)
+        if not reference_ids:
+            return
+
+        matcher = MetadataMatcher.create_matcher(reference_item_ids=reference_ids)
+
+        target_store: MetadataStore = self.context.metadata_registry.get_archive(store)  # type: ignore
+        matching_metadata = self.context.metadata_registry.find_metadata_items(
+            matcher=matcher
+        )
+        target_store.store_metadata_and_ref_items(matching_metadata)
+
     @tag("kiara_api")
     def store_values(
         self,
@@ -1988,7 +2047,7 @@ class BaseAPI(object):
                     alias=aliases,
                     allow_overwrite=allow_alias_overwrite,
                     store=store,
-                    store_related_metadata=store_related_metadata,
+                    store_related_metadata=False,
                 )
                 result[str(value_obj.value_id)] = store_result
         else:
@@ -2013,10 +2072,26 @@ class BaseAPI(object):
                     alias=aliases_map,
                     allow_overwrite=allow_alias_overwrite,
                     store=store,
-                    store_related_metadata=store_related_metadata,
+                    store_related_metadata=False,
                 )
                 result[field_name] = store_result
 
+        if store_related_metadata:
+            # related metadata is copied in one go for all values, instead of once per value
+            stored = [x for x in result.values() if x.error is None]
+            try:
+                self._store_related_metadata(
+                    values=(x.value for x in stored), store=store
+                )
+            except Exception as e:
+                log_exception(e)
+                error = (
+                    str(e) if str(e) else f"Unknown error (type '{type(e).__name__}')."
+                )
+                for x in stored:
+                    x.error = f"Failed to store related metadata: {error}"
+
+        self.context.data_registry.flush_value_id_filters()
         return StoreValuesResult(root=result)
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -2724,6 +2799,29 @@ class BaseAPI(object):
 
         return self.context.metadata_registry.find_metadata_items(matcher=matcher)
 
+    def retrieve_referenced_metadata_items(
+        self,
+        reference_item_ids: Iterable[Union[str, uuid.UUID]],
+        reference_item_type: Union[str, None] = None,
+        key: Union[str, None] = None,
+    ) -> Dict[str, Dict[str, "KiaraMetadata"]]:
+        """Retrieve the metadata items (comments, etc.) attached to a batch of values or jobs.
+
+        Arguments:
+            reference_item_ids: the ids of the values/jobs
+            reference_item_type: if set, only include metadata items referenced from items of this type (e.g. 'job')
+            key: if set, only include metadata items with this key
+
+        Returns:
+            a map with the (stringified) id as key, and a map of metadata item key to metadata item as value
+        """
+
+        return self.context.metadata_registry.retrieve_referenced_metadata_items(
+            reference_item_ids=reference_item_ids,
+            reference_item_type=reference_item_type,
+            key=key,
+        )
+
     # ------------------------------------------------------------------------------------------------------------------
     # render-related methods
 
@@ -2901,6 +2999,25 @@ class BaseAPI(object):
 
     # ------------------------------------------------------------------------------------------------------------------
     # job-related methods
+    def _check_job_metadata(self, job_metadata: Dict[str, Any]) -> bool:
+        """Validate the job metadata for the current runtime profile, returns whether job results should be saved."""
+
+        if self.context.runtime_config.runtime_profile == "dharpa":
+            if not job_metadata:
+                raise Exception(
+                    "No job metadata provided. You need to provide a 'comment' argument when running your job."
+                )
+
+            if "comment" not in job_metadata.keys():
+                raise KiaraException(msg="You need to provide a 'comment' for the job.")
+
+            return True
+        else:
+            if "comment" in job_metadata.keys() and job_metadata["comment"] is None:
+                del job_metadata["comment"]
+            return False
+
+    @traced("api.queue_manifest")
     def queue_manifest(
         self,
         manifest: Manifest,
@@ -2920,31 +3037,24 @@ class BaseAPI(object):
             a result value map instance
         """
 
-        if self.context.runtime_config.runtime_profile == "dharpa":
-            if not job_metadata:
-                raise Exception(
-                    "No job metadata provided. You need to provide a 'comment' argument when running your job."
-                )
-
-            if "comment" not in job_metadata.keys():
-                raise KiaraException(msg="You need to provide a 'comment' for the job.")
-
-            save_values = True
-        else:
-            save_values = False
-            if "comment" in job_metadata.keys() and job_metadata["comment"] is None:
-                del job_metadata["comment"]
+        save_values = self._check_job_metadata(job_metadata)
 
         if inputs is None:
             inputs = {}
 
-        job_config = self.context.job_registry.prepare_job_config(
+        job_registry = self.context.job_registry
+        cached_record = job_registry.find_cached_job_record(
             manifest=manifest, inputs=inputs
         )
-
-        job_id = self.context.job_registry.execute_job(
-            job_config=job_config, wait=False, auto_save_result=save_values
-        )
+        if cached_record is not None:
+            job_id = cached_record.job_id
+        else:
+            job_config = job_registry.prepare_job_config(
+                manifest=manifest, inputs=inputs
+            )
+            job_id = job_registry.execute_job(
+                job_config=job_config, wait=False, auto_save_result=save_values
+            )
 
         if job_metadata:
             self.context.metadata_registry.register_job_metadata_items(
@@ -2953,6 +3063,7 @@ class BaseAPI(object):
 
         return job_id
 
+    @traced("api.run_manifest")
     def run_manifest(
         self,
         manifest: Manifest,
@@ -2975,34 +3086,14 @@ class BaseAPI(object):
         job_id = self.queue_manifest(manifest=manifest, inputs=inputs, **job_metadata)
         return self.context.job_registry.retrieve_result(job_id=job_id)
 
-    def queue_job(
+    def _resolve_job_operation(
         self,
         operation: Union[str, Path, Manifest, OperationInfo, JobDesc],
-        inputs: Union[Mapping[str, Any], None],
         operation_config: Union[None, Mapping[str, Any]] = None,
-        **job_metadata: Any,
-    ) -> uuid.UUID:
-        """
-        Queue a job from a operation id, module_name (and config), or pipeline file, wait for the job to finish and retrieve the result.
-
-        This is a convenience method that auto-detects what is meant by the 'operation' string input argument.
-
-        If the 'operation' is a JobDesc instance, and that JobDesc instance has the 'save' attribute
-        set, it will be ignored, so you'll have to store any results manually.
-
-        Arguments:
-            operation: a module name, operation id, or a path to a pipeline file (resolved in this order, until a match is found)..
-            inputs: the operation inputs
-            operation_config: the (optional) module config in case 'operation' is a module name
-            job_metadata: additional metadata to store with the job
-
-        Returns:
-            the queued job id
-        """
-
-        if inputs is None:
-            inputs = {}
+    ) -> Tuple[Manifest, Mapping[str, Any]]:
+        """Resolve the 'operation' argument of the job methods, returns the manifest and the inputs (if any) of a job description."""
 
+        default_inputs: Mapping[str, Any] = {}
         if isinstance(operation, str):
             if os.path.isfile(operation):
                 job_path = Path(operation)
@@ -3026,9 +3117,7 @@ class BaseAPI(object):
                             kiara_api=self
                         )
                         if job_desc.inputs:
-                            _inputs = dict(job_desc.inputs)
-                            _inputs.update(inputs)
-                            inputs = _inputs
+                            default_inputs = job_desc.inputs
                     except Exception as e:
                         raise KiaraException(
                             f"Failed to parse job description file: {operation}",
@@ -3053,9 +3142,7 @@ class BaseAPI(object):
                 )
             _operation = operation.get_operation(kiara_api=self)
             if operation.inputs:
-                _inputs = dict(operation.inputs)
-                _inputs.update(inputs)
-                inputs = _inputs
+                default_inputs = operation.inputs
         else:
             _operation = operation
 
@@ -3068,10 +3155,50 @@ class BaseAPI(object):
         else:
             manifest = _operation
 
+        return manifest, default_inputs
+
+    @traced("api.queue_job")
+    def queue_job(
+        self,
+        operation: Union[str, Path, Manifest, OperationInfo, JobDesc],
+        inputs: Union[Mapping[str, Any], None],
+        operation_config: Union[None, Mapping[str, Any]] = None,
+        **job_metadata: Any,
+    ) -> uuid.UUID:
+        """
+        Queue a job from a operation id, module_name (and config), or pipeline file, wait for the job to finish and retrieve the result.
+
+        This is a convenience method that auto-detects what is meant by the 'operation' string input argument.
+
+        If the 'operation' is a JobDesc instance, and that JobDesc instance has the 'save' attribute
+        set, it will be ignored, so you'll have to store any results manually.
+
+        Arguments:
+            operation: a module name, operation id, or a path to a pipeline file (resolved in this order, until a match is found)..
+            inputs: the operation inputs
+            operation_config: the (optional) module config in case 'operation' is a module name
+            job_metadata: additional metadata to store with the job
+
+        Returns:
+            the queued job id
+        """
+
+        if inputs is None:
+            inputs = {}
+
+        manifest, default_inputs = self._resolve_job_operation(
+            operation=operation, operation_config=operation_config
+        )
+        if default_inputs:
+            _inputs = dict(default_inputs)
+            _inputs.update(inputs)
+            inputs = _inputs
+
         job_id = self.queue_manifest(manifest=manifest, inputs=inputs, **job_metadata)
 
         return job_id
 
+    @traced("api.run_job")
     def run_job(
         self,
         operation: Union[str, Path, Manifest, OperationInfo, JobDesc],
@@ -3111,6 +3238,70 @@ class BaseAPI(object):
         )
         return self.context.job_registry.retrieve_result(job_id=job_id)
 
+    @tag("kiara_api")
+    def run_job_batch(
+        self,
+        operation: Union[str, Path, Manifest, OperationInfo, JobDesc],
+        inputs: Iterable[Mapping[str, Any]],
+        operation_config: Union[None, Mapping[str, Any]] = None,
+        max_workers: Union[int, None] = None,
+        **job_metadata: Any,
+    ) -> Iterator[ValueMapReadOnly]:
+        """
+        Run the same operation over many input sets, and yield the job results in the order of the input sets.
+
+        This is considerably faster than calling 'run_job' in a loop: the operation is only resolved once, the job
+        cache is checked for a whole batch of input sets at once, identical input sets are only run once (for
+        idempotent modules), and jobs that are not cached run in parallel.
+
+        The input sets are consumed lazily (in batches), and results are yielded as soon as their batch is finished. If
+        a job fails, the exception is raised when its result would be yielded. Invalid job metadata or an
+        operation that can't be resolved raise an exception right away.
+
+        Arguments:
+            operation: a module name, operation id, or a path to a pipeline file (resolved in this order, until a match is found)..
+            inputs: the input sets, one per job
+            operation_config: the (optional) module config in case 'operation' is a module name
+            max_workers: the maximum number of jobs to run in parallel, defaults to the number of cpus (but at most 32)
+            **job_metadata: additional metadata to store with each job
+
+        Returns:
+            the job result value maps
+        """
+
+        save_values = self._check_job_metadata(job_metadata)
+
+        manifest, default_inputs = self._resolve_job_operation(
+            operation=operation, operation_config=operation_config
+        )
+
+        def _merge_inputs() -> Iterator[Mapping[str, Any]]:
+            for input_set in inputs:
+                if default_inputs:
+                    _inputs = dict(default_inputs)
+                    _inputs.update(input_set)
+                    yield _inputs
+                else:
+                    yield input_set
+
+        # the metadata and operation are validated above, so errors are raised when this method is called,
+        # not when the first result is requested
+        def _run_jobs() -> Iterator[ValueMapReadOnly]:
+            job_registry = self.context.job_registry
+            for job_id in job_registry.execute_job_batch(
+                manifest=manifest,
+                inputs=_merge_inputs(),
+                auto_save_result=save_values,
+                max_workers=max_workers,
+            ):
+                if job_metadata:
+                    self.context.metadata_registry.register_job_metadata_items(
+                        job_id=job_id, items=job_metadata
+                    )
+                yield job_registry.retrieve_result(job_id=job_id)
+
+        return _run_jobs()
+
     @tag("kiara_api")
     def get_job(self, job_id: Union[str, uuid.UUID]) -> "ActiveJob":
         """Retrieve the status of the job with the provided id."""
@@ -3231,6 +3422,93 @@ class BaseAPI(object):
         )  # type: ignore
         return infos
 
+    def list_lineage_edges(
+        self,
+        value: Union[str, uuid.UUID, Value],
+        downstream: bool = True,
+        max_depth: Union[int, None] = None,
+        allow_internal: bool = False,
+    ) -> Dict["LineageEdge", int]:
+        """List the lineage edges (input value, job, output value) that connect a value with its derived values or sources.
+
+        This uses the lineage index of the job stores, so it also works for (reverse) queries
+        that would be prohibitively expensive via the value pedigrees.
+
+        Arguments:
+            value: the value (or value id, or alias)
+            downstream: if 'True', follow the edges towards values that were derived from this value, otherwise towards its sources
+            max_depth: the maximum number of jobs to traverse, 'None' means no limit
+            allow_internal: whether to include edges of internal jobs (e.g. metadata extraction)
+
+        Returns:
+            a map of edges, along with their distance (starting at 1) to the value
+        """
+
+        _value = self.get_value(value)
+        edges = self.context.job_registry.find_lineage_edges(
+            value_ids=[_value.value_id],
+            downstream=downstream,
+            max_depth=max_depth,
+            allow_internal=allow_internal,
+        )
+        return edges
+
+    def list_derived_value_ids(
+        self,
+        value: Union[str, uuid.UUID, Value],
+        max_depth: Union[int, None] = None,
+        allow_internal: bool = False,
+    ) -> Dict[uuid.UUID, int]:
+        """List the ids of all values that were (directly or indirectly) derived from a value.
+
+        Arguments:
+            value: the value (or value id, or alias)
+            max_depth: the maximum number of jobs to traverse, 'None' means no limit
+            allow_internal: whether to include values created by internal jobs (e.g. metadata extraction)
+
+        Returns:
+            a map of value ids, along with their distance (starting at 1) to the value
+        """
+
+        edges = self.list_lineage_edges(
+            value=value,
+            downstream=True,
+            max_depth=max_depth,
+            allow_internal=allow_internal,
+        )
+        result: Dict[uuid.UUID, int] = {}
+        for edge, depth in edges.items():
+            result.setdefault(edge.output_value_id, depth)
+        return result
+
+    def list_source_value_ids(
+        self,
+        value: Union[str, uuid.UUID, Value],
+        max_depth: Union[int, None] = None,
+        allow_internal: bool = False,
+    ) -> Dict[uuid.UUID, int]:
+        """List the ids of all values that were (directly or indirectly) used to create a value.
+
+        Arguments:
+            value: the value (or value id, or alias)
+            max_depth: the maximum number of jobs to traverse, 'None' means no limit
+            allow_internal: whether to include values created by internal jobs (e.g. metadata extraction)
+
+        Returns:
+            a map of value ids, along with their distance (starting at 1) to the value
+        """
+
+        edges = self.list_lineage_edges(
+            value=value,
+            downstream=False,
+            max_depth=max_depth,
+            allow_internal=allow_internal,
+        )
+        result: Dict[uuid.UUID, int] = {}
+        for edge, depth in edges.items():
+            result.setdefault(edge.input_value_id, depth)
+        return result
+
     def render_value(
         self,
         value: Union[str, uuid.UUID, Value],
@@ -3377,6 +3655,8 @@ class BaseAPI(object):
 
         NOTE: this is a provisional endpoint, don't use in anger yet
         """
+        from kiara.interfaces.python_api.workflow import Workflow
+
         no_such_alias: bool = False
         workflow_id: Union[uuid.UUID, None] = None
         workflow_alias: Union[str, None] = None
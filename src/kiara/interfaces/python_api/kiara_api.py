@@ -3,7 +3,17 @@ import uuid
 from pathlib import Path
 
 # BEGIN AUTO-GENERATED-IMPORTS
-from typing import TYPE_CHECKING, Any, ClassVar, Dict, Iterable, List, Mapping, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Union,
+)
 from uuid import UUID
 
 from rich import box
@@ -26,7 +36,7 @@ if TYPE_CHECKING:
     from kiara.interfaces.python_api.value import StoreValueResult, StoreValuesResult
     from kiara.models.context import ContextInfo, ContextInfos
     from kiara.models.module.operation import Operation
-    from kiara.models.values.value import Value, ValueMapReadOnly
+    from kiara.models.values.value import Value, ValueMapReadOnly, ValueSummary
 
 # END AUTO-GENERATED-IMPORTS
 
@@ -183,6 +193,41 @@ class KiaraAPI(object):
             comment=comment,
         )
 
+    def run_job_batch(
+        self,
+        operation: Union[str, Path, "Manifest", "OperationInfo", "JobDesc"],
+        inputs: Iterable[Mapping[str, Any]],
+        comment: Union[str, None] = None,
+        operation_config: Union[None, Mapping[str, Any]] = None,
+        max_workers: Union[int, None] = None,
+    ) -> Iterator["ValueMapReadOnly"]:
+        """
+        Run the same operation over many input sets, and yield the job results in the order of the input sets.
+
+        This is considerably faster than calling 'run_job' in a loop: the operation is only resolved once, the job
+        cache is checked for a whole batch of input sets at once, and jobs that are not cached run in parallel.
+
+        Arguments:
+            operation: a module name, operation id, or a path to a pipeline file (resolved in this order, until a match is found)..
+            inputs: the input sets, one per job
+            comment: a comment to attach to each job
+            operation_config: the (optional) module config in case 'operation' is a module name
+            max_workers: the maximum number of jobs to run in parallel, defaults to the number of cpus (but at most 32)
+
+        Returns:
+            an iterator of the job result value maps
+        """
+
+        job_metadata = {} if comment is None else {"comment": comment}
+        result: Iterator["ValueMapReadOnly"] = self._api.run_job_batch(
+            operation=operation,
+            inputs=inputs,
+            operation_config=operation_config,
+            max_workers=max_workers,
+            **job_metadata,
+        )
+        return result
+
     def set_job_comment(
         self, job_id: Union[str, uuid.UUID], comment: str, force: bool = True
     ):
@@ -890,6 +935,25 @@ class KiaraAPI(object):
         result: "ValueMapReadOnly" = self._api.list_values(**matcher_params)
         return result
 
+    def list_value_summaries(self, **matcher_params: Any) -> Iterator["ValueSummary"]:
+        """List lightweight summaries (id, data type, size, hash, creation date and aliases) of all matching values.
+
+        Other than [list_values][kiara.interfaces.python_api.KiaraAPI.list_values], this does not create full value
+        instances, and results are streamed, which makes it suitable for listing a large number of values. Use the
+        'limit', 'offset' and 'sort_by' matcher parameters for paging.
+
+        Arguments:
+            matcher_params: the (optional) filter parameters, check the [ValueMatcher][kiara.models.values.matchers.ValueMatcher] class for available parameters
+
+        Returns:
+            an iterator of value summaries
+        """
+
+        result: Iterator["ValueSummary"] = self._api.list_value_summaries(
+            **matcher_params
+        )
+        return result
+
     def get_value(self, value: Union[str, "Value", "UUID", "Path"]) -> "Value":
         """Retrieve a value instance with the specified id or alias.
 
@@ -62,6 +62,7 @@ from kiara.models.values.value import (
     Value,
     ValueMap,
     ValuePedigree,
+    ValueSummary,
 )
 from kiara.models.values.value_schema import ValueSchema
 from kiara.modules import KiaraModule
@@ -124,7 +125,9 @@ RENDER_FIELDS: Dict[str, Dict[str, Any]] = {
     "value_created": {
         "show_default": False,
         "render": {
-            "terminal": lambda v: f"{to_human_readable_date_string(v.value_created)} ago"
+            "terminal": lambda v: (
+                f"{to_human_readable_date_string(v.value_created)} ago"
+            )
         },
     },
     "is_persisted": {
@@ -735,6 +738,58 @@ class ValuesInfo(InfoItemGroup[ValueInfo]):
         return table
 
 
+SUMMARY_RENDER_FIELDS: Dict[str, Callable[[ValueSummary], str]] = {
+    "value_id": lambda v: str(v.value_id),
+    "aliases": lambda v: ", ".join(v.aliases),
+    "type": lambda v: v.data_type_name,
+    "value_created": lambda v: f"{to_human_readable_date_string(v.value_created)} ago",
+    "hash": lambda v: v.value_hash,
+    "size": lambda v: humanfriendly.format_size(v.value_size),
+}
+
+
+def create_value_summaries_renderable(
+    summaries: Iterable[ValueSummary],
+    render_fields: Union[None, Iterable[str]] = None,
+    list_by_alias: bool = True,
+) -> Table:
+    """Create a table from value summaries, similar to the one 'ValuesInfo' renders, but without loading full values.
+
+    Only the fields in 'SUMMARY_RENDER_FIELDS' are supported.
+    """
+
+    if render_fields is None:
+        _render_fields = [k for k, v in RENDER_FIELDS.items() if v["show_default"]]
+    else:
+        _render_fields = list(render_fields)
+    if list_by_alias and "aliases" in _render_fields:
+        _render_fields.remove("aliases")
+        _render_fields.insert(0, "alias")
+
+    table = Table(box=box.SIMPLE)
+    for field in _render_fields:
+        if field == "size":
+            table.add_column("size", justify="right")
+        else:
+            table.add_column(field)
+
+    for summary in summaries:
+        row = {
+            field: SUMMARY_RENDER_FIELDS[field](summary)
+            for field in _render_fields
+            if field != "alias"
+        }
+        if not list_by_alias:
+            table.add_row(*(row[field] for field in _render_fields))
+            continue
+
+        for alias in summary.aliases or ("",):
+            row["alias"] = alias
+            table.add_row(*(row[field] for field in _render_fields))
+
+    return table
+
+
 class KiaraModuleConfigMetadata(KiaraModel):
     _kiara_model_id: ClassVar = "metadata.module_config"
 
@@ -589,6 +589,7 @@ class Workflow(object):
 
         pipeline_config = PipelineConfig.from_config(
             pipeline_name="__workflow__",
+            kiara=self._kiara,
             data={
                 "steps": steps,
                 "doc": self.workflow_metadata.documentation,
@@ -8,8 +8,22 @@ import atexit
 import os
 import shutil
 import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, ClassVar, Dict, List, Mapping, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Deque,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    Tuple,
+    Union,
+)
 
 import structlog
 from deepdiff import DeepHash
@@ -29,8 +43,14 @@ from kiara.utils import log_message
 from kiara.utils.files import unpack_archive
 from kiara.utils.hashing import KIARA_HASH_FUNCTION, compute_cid_from_file
 
+if TYPE_CHECKING:
+    from kiara.models.module.jobs import JobLog
+
 logger = structlog.getLogger()
 
+FOLDER_IMPORT_PROGRESS_INTERVAL = 10000
+"""The number of files after which a folder import reports its progress."""
+
 FILE_BUNDLE_IMPORT_AVAILABLE_COLUMNS = [
     "id",
     "rel_path",
@@ -299,12 +319,153 @@ class KiaraFileBundle(KiaraModel):
         bundle.metadata_schemas = archive_file.metadata_schemas
         return bundle
 
+    @classmethod
+    def _parse_import_config(
+        cls, import_config: Union[None, Mapping[str, Any], FolderImportConfig]
+    ) -> FolderImportConfig:
+        if import_config is None:
+            return FolderImportConfig()
+        elif isinstance(import_config, Mapping):
+            return FolderImportConfig(**import_config)
+        elif isinstance(import_config, FolderImportConfig):
+            return import_config
+        else:
+            raise TypeError(
+                f"Invalid type for folder import config: {type(import_config)}."
+            )
+
+    @classmethod
+    def _scan_folder(
+        cls, base_path: str, import_config: FolderImportConfig
+    ) -> Generator[Tuple[str, str], None, None]:
+        """Yield the (relative and full) paths of all files to import, in the same order as 'os.walk' would."""
+
+        exclude_dirs = import_config.exclude_dirs
+        invalid_extensions = import_config.exclude_files
+        valid_extensions = import_config.include_files
+
+        def include_file(filename: str) -> bool:
+            if invalid_extensions and any(
+                filename.endswith(ext) for ext in invalid_extensions
+            ):
+                return False
+            if not valid_extensions:
+                return True
+            else:
+                return any(filename.endswith(ext) for ext in valid_extensions)
+
+        stack: List[str] = [base_path]
+        while stack:
+            root = stack.pop()
+            sub_dirs: List[str] = []
+            try:
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            # like 'os.walk', don't follow symlinked folders
+                            if not entry.is_symlink() and (
+                                not exclude_dirs or entry.name not in exclude_dirs
+                            ):
+                                sub_dirs.append(entry.path)
+                        elif entry.is_file() and include_file(entry.name):
+                            yield os.path.relpath(entry.path, base_path), entry.path
+            except OSError as e:
+                log_message(
+                    "ignore.folder_import",
+                    reason="can't scan folder",
+                    path=root,
+                    error=e,
+                )
+                continue
+            stack.extend(reversed(sub_dirs))
+
+    @classmethod
+    def iter_folder(
+        cls,
+        source: str,
+        import_config: Union[None, Mapping[str, Any], FolderImportConfig] = None,
+        max_workers: Union[int, None] = None,
+        compute_hashes: bool = True,
+        job_log: Union["JobLog", None] = None,
+    ) -> Generator[Tuple[str, KiaraFile], None, None]:
+        """Load the models of all files in a folder, yielding (relative path, file model) tuples in a stable order.
+
+        File metadata is read (and, if 'compute_hashes' is set, file content is hashed) in a thread pool. Only a
+        bounded number of files is in flight at any time, so callers that process the files as they are yielded don't
+        need to keep all of them in memory.
+
+        Arguments:
+        ---------
+            source: the path to the folder
+            import_config: the (optional) import config, to include/exclude files and sub-folders
+            max_workers: the number of worker threads, defaults to the number of cpus (but at most 32)
+            compute_hashes: whether to compute the hashes of the files (which is required to create a value from them later on)
+            job_log: if provided, progress is reported to this job log
+        """
+
+        if not source:
+            raise ValueError("No source path provided.")
+
+        if not os.path.isdir(os.path.realpath(source)):
+            raise ValueError(f"Path is not a folder: {source}")
+
+        _import_config = cls._parse_import_config(import_config)
+
+        abs_path = os.path.abspath(source)
+        if _import_config.sub_path:
+            abs_path = os.path.join(abs_path, _import_config.sub_path)
+
+        if max_workers is None:
+            max_workers = min(32, os.cpu_count() or 1)
+
+        def load_file(full_path: str) -> KiaraFile:
+            file_model = KiaraFile.load_file(full_path)
+            if compute_hashes:
+                # hashing is cached on the model, so it doesn't need to happen (serially) later on
+                file_model.file_cid
+            return file_model
+
+        no_files = 0
+        sum_size = 0
+
+        def report_progress():
+            if job_log is not None:
+                job_log.add_log(f"imported {no_files} files ({sum_size} bytes)")
+
+        in_flight: Deque[Tuple[str, Future]] = deque()
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="kiara_folder_import"
+        ) as executor:
+            for rel_path, full_path in cls._scan_folder(abs_path, _import_config):
+                in_flight.append((rel_path, executor.submit(load_file, full_path)))
+                if len(in_flight) < max_workers * 4:
+                    continue
+
+                done_rel_path, future = in_flight.popleft()
+                file_model = future.result()
+                no_files += 1
+                sum_size += file_model.size
+                if no_files % FOLDER_IMPORT_PROGRESS_INTERVAL == 0:
+                    report_progress()
+                yield done_rel_path, file_model
+
+            while in_flight:
+                done_rel_path, future = in_flight.popleft()
+                file_model = future.result()
+                no_files += 1
+                sum_size += file_model.size
+                yield done_rel_path, file_model
+
+        report_progress()
+
     @classmethod
     def import_folder(
         cls,
         source: str,
         bundle_name: Union[str, None] = None,
         import_config: Union[None, Mapping[str, Any], FolderImportConfig] = None,
+        max_workers: Union[int, None] = None,
+        job_log: Union["JobLog", None] = None,
         # import_time: Optional[datetime.datetime] = None,
     ) -> "KiaraFileBundle":
         if not source:
@@ -319,59 +480,31 @@ class KiaraFileBundle(KiaraModel):
         if source.endswith(os.path.sep):
             source = source[0:-1]
 
-        if import_config is None:
-            _import_config = FolderImportConfig()
-        elif isinstance(import_config, Mapping):
-            _import_config = FolderImportConfig(**import_config)
-        elif isinstance(import_config, FolderImportConfig):
-            _import_config = import_config
-        else:
-            raise TypeError(
-                f"Invalid type for folder import config: {type(import_config)}."
-            )
+        _import_config = cls._parse_import_config(import_config)
 
         abs_path = os.path.abspath(source)
         if _import_config.sub_path:
             abs_path = os.path.join(abs_path, _import_config.sub_path)
 
         included_files: Dict[str, KiaraFile] = {}
-        exclude_dirs = _import_config.exclude_dirs
-        invalid_extensions = _import_config.exclude_files
-
-        valid_extensions = _import_config.include_files
-
         sum_size = 0
 
-        def include_file(filename: str) -> bool:
-            if invalid_extensions and any(
-                filename.endswith(ext) for ext in invalid_extensions
-            ):
-                return False
-            if not valid_extensions:
-                return True
-            else:
-                return any(filename.endswith(ext) for ext in valid_extensions)
-
         if os.path.isfile(abs_path):
             file_model = KiaraFile.load_file(abs_path)
             sum_size = file_model.size
             included_files[file_model.file_name] = file_model
         else:
-            for root, dirnames, filenames in os.walk(abs_path, topdown=True):
-                if exclude_dirs:
-                    dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
-
-                for filename in [
-                    f
-                    for f in filenames
-                    if os.path.isfile(os.path.join(root, f)) and include_file(f)
-                ]:
-                    full_path = os.path.join(root, filename)
-                    rel_path = os.path.relpath(full_path, abs_path)
-
-                    file_model = KiaraFile.load_file(full_path)
-                    sum_size = sum_size + file_model.size
-                    included_files[rel_path] = file_model
+            for rel_path, file_model in cls.iter_folder(
+                source,
+                import_config=_import_config,
+                max_workers=max_workers,
+                job_log=job_log,
+            ):
+                sum_size = sum_size + file_model.size
+                included_files[rel_path] = file_model
+
+        if job_log is not None:
+            job_log.percent_finished = 100
 
         if bundle_name is None:
             bundle_name = os.path.basename(source)
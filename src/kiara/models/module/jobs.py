@@ -10,7 +10,16 @@ import os
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import TYPE_CHECKING, Any, ClassVar, Dict, List, Mapping, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Union,
+)
 
 from pydantic import field_validator
 from pydantic.fields import Field, PrivateAttr
@@ -170,6 +179,118 @@ class ActiveJob(KiaraModel):
         return runtime.total_seconds()
 
 
+def _add_optional(a: Union[int, None], b: Union[int, None]) -> Union[int, None]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a + b
+
+
+class JobPhaseProfile(BaseModel):
+    """Resource usage of a single processing phase of a job."""
+
+    wall_time: float = Field(
+        description="The wall-clock time spent in this phase (in seconds).",
+        default=0.0,
+    )
+    cpu_time: float = Field(
+        description="The CPU time spent in this phase by the thread that ran it (in seconds), other (concurrent) threads are not included.",
+        default=0.0,
+    )
+    peak_rss_delta: Union[int, None] = Field(
+        description="How much the peak resident memory size of the process grew during this phase (in bytes), 'None' if not supported on this platform, or if other jobs ran at the same time (this is measured process-wide).",
+        default=None,
+    )
+    bytes_read: Union[int, None] = Field(
+        description="The number of bytes read by the process during this phase, 'None' if not supported on this platform, or if other jobs ran at the same time (this is measured process-wide).",
+        default=None,
+    )
+    bytes_written: Union[int, None] = Field(
+        description="The number of bytes written by the process during this phase, 'None' if not supported on this platform, or if other jobs ran at the same time (this is measured process-wide).",
+        default=None,
+    )
+    cache_hits: Union[int, None] = Field(
+        description="The number of lookups that were served from the in-memory value caches, 'None' if other jobs ran at the same time (this is measured process-wide).",
+        default=0,
+    )
+    cache_misses: Union[int, None] = Field(
+        description="The number of failed lookups in the in-memory value caches, 'None' if other jobs ran at the same time (this is measured process-wide).",
+        default=0,
+    )
+
+    def add(self, other: "JobPhaseProfile"):
+        """Add the numbers of another phase profile to this one (memory growth is not additive, so the maximum is used)."""
+
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        if other.peak_rss_delta is not None:
+            self.peak_rss_delta = max(self.peak_rss_delta or 0, other.peak_rss_delta)
+        self.bytes_read = _add_optional(self.bytes_read, other.bytes_read)
+        self.bytes_written = _add_optional(self.bytes_written, other.bytes_written)
+        self.cache_hits = _add_optional(self.cache_hits, other.cache_hits)
+        self.cache_misses = _add_optional(self.cache_misses, other.cache_misses)
+
+
+class JobProfile(BaseModel):
+    """Resource usage of a job, broken down into processing phases.
+
+    The default phases are 'load_inputs', 'process', 'sync_outputs' and (if applicable) 'auto_save'. The time spent
+    running other jobs within one of those (e.g. metadata extraction, or the steps of a pipeline) is not included in
+    their numbers, but recorded under 'extract_metadata', or 'nested_jobs'.
+    """
+
+    phases: Dict[str, JobPhaseProfile] = Field(
+        description="The resource usage per phase.", default_factory=dict
+    )
+    profile_file: Union[str, None] = Field(
+        description="The path to a profiler dump of this job (only created if enabled in the develop configuration).",
+        default=None,
+    )
+
+    def get_totals(self) -> JobPhaseProfile:
+        """Return the resource usage of all phases combined."""
+
+        result = JobPhaseProfile()
+        for phase in self.phases.values():
+            result.add(phase)
+        return result
+
+    def create_renderable(self, **config: Any) -> RenderableType:
+        from humanfriendly import format_size
+
+        def _format_size(size: Union[int, None]) -> str:
+            return "-- n/a --" if size is None else format_size(size)
+
+        table = Table(box=box.SIMPLE)
+        for column in (
+            "phase",
+            "wall time",
+            "cpu time",
+            "peak rss delta",
+            "read",
+            "written",
+            "cache hits/misses",
+        ):
+            table.add_column(column)
+
+        for phase_name, phase in self.phases.items():
+            table.add_row(
+                phase_name,
+                f"{phase.wall_time:.4f}s",
+                f"{phase.cpu_time:.4f}s",
+                _format_size(phase.peak_rss_delta),
+                _format_size(phase.bytes_read),
+                _format_size(phase.bytes_written),
+                (
+                    "-- n/a --"
+                    if phase.cache_hits is None
+                    else f"{phase.cache_hits}/{phase.cache_misses}"
+                ),
+            )
+        return table
+
+
 class JobRuntimeDetails(BaseModel):
     # @classmethod
     # def from_manifest(
@@ -191,6 +312,10 @@ class JobRuntimeDetails(BaseModel):
     started: datetime = Field(description="When the job was started.")
     finished: datetime = Field(description="When the job was finished.")
     runtime: float = Field(description="The duration of the job (in seconds).")
+    profile: Union[JobProfile, None] = Field(
+        description="The resource usage of the job, per processing phase.",
+        default=None,
+    )
 
     def create_renderable(self, **config: Any) -> RenderableType:
         table = Table(show_header=False, box=box.SIMPLE)
@@ -201,6 +326,8 @@ class JobRuntimeDetails(BaseModel):
         table.add_row("started", str(self.started))
         table.add_row("finished", str(self.finished))
         table.add_row("runtime", f"{self.runtime} seconds")
+        if self.profile is not None:
+            table.add_row("profile", self.profile.create_renderable())
 
         job_log_table = Table(show_header=False, box=box.SIMPLE)
         job_log_table.add_column("timestamp", style="i")
@@ -213,6 +340,14 @@ class JobRuntimeDetails(BaseModel):
         return table
 
 
+class LineageEdge(NamedTuple):
+    """A single lineage edge: a job consumed the input value, and produced the output value."""
+
+    input_value_id: uuid.UUID
+    job_id: uuid.UUID
+    output_value_id: uuid.UUID
+
+
 class JobRecord(JobConfig):
     _kiara_model_id: ClassVar = "instance.job_record"
 
@@ -308,6 +443,15 @@ class JobRecord(JobConfig):
             "outputs": {k: v.bytes for k, v in self.outputs.items()},
         }
 
+    @property
+    def lineage_edges(self) -> List[LineageEdge]:
+        """All (input value, job, output value) combinations of this job."""
+        return [
+            LineageEdge(input_id, self.job_id, output_id)
+            for input_id in self.inputs.values()
+            for output_id in self.outputs.values()
+        ]
+
     def create_renderable(self, **config: Any) -> RenderableType:
         from kiara.utils.output import extract_renderable
 
@@ -363,6 +507,9 @@ class JobMatcher(KiaraModel):
         description="A list of value ids, if specified, only jobs that produced one of them will be included.",
         default_factory=list,
     )
+    min_runtime: Union[None, float] = Field(
+        description="The minimum duration of the job (in seconds).", default=None
+    )
 
     @field_validator("job_ids", mode="before")
     @classmethod
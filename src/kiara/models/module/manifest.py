@@ -28,6 +28,23 @@ if TYPE_CHECKING:
     from kiara.registries.data import DataRegistry
 
 
+def compute_inputs_cid(inputs: Mapping[str, Union[uuid.UUID, None]]) -> CID:
+    """Compute the cid of a map of input field names and value ids (as used in job hashes)."""
+
+    _, cid = compute_cid(
+        data={k: (NONE_VALUE_ID if v is None else v).bytes for k, v in inputs.items()}
+    )
+    return cid
+
+
+def compute_job_cid(manifest_cid: CID, inputs_cid: CID) -> CID:
+    """Compute the cid of a job, from the cid of its manifest and the cid of its inputs (value ids)."""
+
+    obj: IPLDKind = {"manifest": manifest_cid, "inputs": inputs_cid}
+    _, cid = compute_cid(data=obj)
+    return cid
+
+
 class Manifest(KiaraModel):
     """A class to hold the type and configuration for a module instance."""
 
@@ -164,8 +181,9 @@ class InputsManifest(Manifest):
         if self._jobs_cid is not None:
             return self._jobs_cid
 
-        obj: IPLDKind = {"manifest": self.manifest_cid, "inputs": self.inputs_cid}
-        _, self._jobs_cid = compute_cid(data=obj)
+        self._jobs_cid = compute_job_cid(
+            manifest_cid=self.manifest_cid, inputs_cid=self.inputs_cid
+        )
         return self._jobs_cid
 
     @property
@@ -173,8 +191,7 @@ class InputsManifest(Manifest):
         if self._inputs_cid is not None:
             return self._inputs_cid
 
-        _, cid = compute_cid(data={k: v.bytes for k, v in self.inputs.items()})
-        self._inputs_cid = cid
+        self._inputs_cid = compute_inputs_cid(self.inputs)
         return self._inputs_cid
 
     @property
@@ -129,6 +129,13 @@ class SinglePipelineController(PipelineController):
 
         from kiara.models.module.jobs import PipelineMetadata
 
+        cached_record = self._job_registry.find_cached_job_record(
+            manifest=self.pipeline.get_step(step_id).module.manifest,
+            inputs=self.pipeline.get_current_step_inputs(step_id),
+        )
+        if cached_record is not None:
+            return cached_record.job_id
+
         job_config = self.pipeline.create_job_config_for_step(step_id)
 
         # pipeline_metadata = {
@@ -6,7 +6,9 @@
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 
 import abc
+import copy
 import uuid
+from collections import deque
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -15,11 +17,11 @@ from typing import (
     Iterable,
     List,
     Mapping,
+    Tuple,
     Type,
     Union,
 )
 
-import dpath
 import networkx as nx
 from pydantic import Field, PrivateAttr
 from rich import box
@@ -31,7 +33,6 @@ from rich.table import Table
 from kiara.defaults import NONE_VALUE_ID, NOT_SET_VALUE_ID, SpecialValue
 from kiara.exceptions import InvalidValuesException
 from kiara.interfaces.python_api.models.info import InfoItemGroup, ItemInfo
-from kiara.models.aliases import AliasValueMap
 from kiara.models.documentation import (
     AuthorsMetadataModel,
     ContextMetadataModel,
@@ -45,12 +46,13 @@ from kiara.models.events.pipeline import (
 )
 from kiara.models.module.jobs import JobConfig
 from kiara.models.module.pipeline import PipelineConfig, StepStatus
+from kiara.models.module.pipeline.slots import PIPELINE_SLOT_OWNER, PipelineValueSlots
 from kiara.models.module.pipeline.structure import PipelineStep, PipelineStructure
 from kiara.models.module.pipeline.value_refs import (
     PipelineInputRef,
     PipelineOutputRef,
-    ValueRef,
 )
+from kiara.models.values import ValueStatus
 from kiara.models.values.value import ORPHAN
 from kiara.models.values.value_schema import ValueSchema
 from kiara.registries.data import DataRegistry
@@ -140,7 +142,6 @@ class Pipeline(object):
 
         self._structure: PipelineStructure = structure
 
-        self._value_refs: Mapping[AliasValueMap, Iterable[ValueRef]] = None  # type: ignore
         # self._status: StepStatus = StepStatus.STALE
 
         self._steps_by_stage: Dict[int, Dict[str, PipelineStep]] = None  # type: ignore
@@ -150,7 +151,10 @@ class Pipeline(object):
         self._kiara: Kiara = kiara
         self._data_registry: DataRegistry = kiara.data_registry
 
-        self._all_values: AliasValueMap = None  # type: ignore
+        self._slots: PipelineValueSlots = None  # type: ignore
+        self._slot_values: List[Union[uuid.UUID, None]] = None  # type: ignore
+        # the value ids for the defaults of slots, those are registered lazily
+        self._slot_defaults: Dict[int, uuid.UUID] = None  # type: ignore
 
         self._listeners: List[PipelineListener] = []
 
@@ -174,42 +178,11 @@ class Pipeline(object):
         """
         Initialize this object. This should only be called once.
 
-        Basically, this goes through all the inputs and outputs of all steps, and 'allocates' a PipelineValueInfo object
-        for each of them. In case where output/input or pipeline-input/input points are connected, only one
-        value item is allocated, since those refer to the same value.
+        Basically, this allocates a slot for each of the inputs and outputs of all steps, as well as the pipeline inputs and outputs. The current value ids of all slots are kept in a flat list, connected slots (output/input or pipeline-input/input) always hold the same value id.
         """
-        values = AliasValueMap(
-            alias=str(self.id),
-            version=0,
-            assoc_value=None,
-            values_schema={},
-            assoc_schema=None,
-        )
-        values._data_registry = self._data_registry
-        inputs_schema = self._structure.pipeline_inputs_schema
-        outputs_schema = self._structure.pipeline_outputs_schema
-        if inputs_schema:
-            for field_name, schema in inputs_schema.items():
-                values.set_alias_schema(f"pipeline.inputs.{field_name}", schema=schema)
-        else:
-            values.set_alias_schema("pipeline.inputs", schema=ValueSchema(type="none"))
-        if outputs_schema:
-            for field_name, schema in outputs_schema.items():
-                values.set_alias_schema(f"pipeline.outputs.{field_name}", schema=schema)
-        else:
-            values.set_alias_schema("pipeline.outputs", schema=ValueSchema(type="none"))
-        for step_id in self.step_ids:
-            step = self.get_step(step_id)
-            for field_name, value_schema in step.module.inputs_schema.items():
-                values.set_alias_schema(
-                    f"steps.{step_id}.inputs.{field_name}", schema=value_schema
-                )
-            for field_name, value_schema in step.module.outputs_schema.items():
-                values.set_alias_schema(
-                    f"steps.{step_id}.outputs.{field_name}", schema=value_schema
-                )
-
-        self._all_values = values
+        self._slots = self._structure.value_slots
+        self._slot_values = [None] * self._slots.size
+        self._slot_defaults = {}
 
         initial_inputs = dict.fromkeys(
             self._structure.pipeline_inputs_schema, SpecialValue.NOT_SET
@@ -252,29 +225,32 @@ class Pipeline(object):
     def doc(self) -> DocumentationMetadataModel:
         return self.structure.pipeline_config.doc
 
+    def _get_slot_value_ids(self, owner: str, direction: str) -> Dict[str, uuid.UUID]:
+        result: Dict[str, uuid.UUID] = {}
+        for field_name, slot in self._slots.get_slots(owner, direction).items():
+            value_id = self._slot_values[slot]
+            result[field_name] = value_id if value_id is not None else NONE_VALUE_ID
+        return result
+
     def get_current_pipeline_inputs(self) -> Dict[str, uuid.UUID]:
         """All (pipeline) input values of this pipeline."""
         if not self._structure.steps:
             return {}
 
-        alias_map = self._all_values.get_alias("pipeline.inputs")
-        return alias_map.get_all_value_ids()  # type: ignore
+        return self._get_slot_value_ids(PIPELINE_SLOT_OWNER, "inputs")
 
     def get_current_pipeline_outputs(self) -> Dict[str, uuid.UUID]:
         """All (pipeline) output values of this pipeline."""
         if not self._structure.steps:
             return {}
 
-        alias_map = self._all_values.get_alias("pipeline.outputs")
-        return alias_map.get_all_value_ids()  # type: ignore
+        return self._get_slot_value_ids(PIPELINE_SLOT_OWNER, "outputs")
 
     def get_current_step_inputs(self, step_id) -> Dict[str, uuid.UUID]:
-        alias_map = self._all_values.get_alias(f"steps.{step_id}.inputs")
-        return alias_map.get_all_value_ids()  # type: ignore
+        return self._get_slot_value_ids(step_id, "inputs")
 
     def get_current_step_outputs(self, step_id) -> Dict[str, uuid.UUID]:
-        alias_map = self._all_values.get_alias(f"steps.{step_id}.outputs")
-        return alias_map.get_all_value_ids()  # type: ignore
+        return self._get_slot_value_ids(step_id, "outputs")
 
     def get_inputs_for_steps(self, *step_ids: str) -> Dict[str, Dict[str, uuid.UUID]]:
         """Retrieve value ids for the inputs of the specified steps (or all steps, if no argument provided."""
@@ -300,32 +276,44 @@ class Pipeline(object):
         for listener in self._listeners:
             listener._pipeline_event_occurred(event=event)
 
-    def get_pipeline_details(self) -> PipelineState:
-        pipeline_inputs = self._all_values.get_alias("pipeline.inputs")
-        pipeline_outputs = self._all_values.get_alias("pipeline.outputs")
+    def _check_invalid(self, owner: str, direction: str) -> Dict[str, str]:
+        """Check whether the values of a set of slots are invalid, if they are, return a description of what's wrong."""
+        invalid: Dict[str, str] = {}
+        for field_name, slot in self._slots.get_slots(owner, direction).items():
+            field_schema = self._slots.get_schema(slot)
+            if field_schema.optional or not field_schema.is_required():
+                continue
+
+            value_id = self._slot_values[slot]
+            item = self._data_registry.get_value(
+                value_id if value_id is not None else NONE_VALUE_ID
+            )
+            if item.value_status == ValueStatus.SET:
+                continue
+            if not item.is_set:
+                invalid[field_name] = "not set"
+            elif item.value_status == ValueStatus.NONE:
+                invalid[field_name] = "no value"
+
+        return invalid
 
-        if pipeline_inputs:
-            invalid = pipeline_inputs.check_invalid()
+    def get_pipeline_details(self) -> PipelineState:
+        invalid: Dict[str, str] = {}
+        if self._slots.get_slots(PIPELINE_SLOT_OWNER, "inputs"):
+            invalid = self._check_invalid(PIPELINE_SLOT_OWNER, "inputs")
             if not invalid:
                 status = StepStatus.INPUTS_READY
-                step_outputs = self._all_values.get_alias("pipeline.outputs")
-                assert step_outputs is not None
-                invalid_outputs = step_outputs.check_invalid()
+                invalid_outputs = self._check_invalid(PIPELINE_SLOT_OWNER, "outputs")
                 # TODO: also check that all the pedigrees match up with current inputs
                 if not invalid_outputs:
                     status = StepStatus.RESULTS_READY
             else:
                 status = StepStatus.INPUTS_INVALID
-            _pipeline_inputs = pipeline_inputs.get_all_value_ids()
         else:
-            _pipeline_inputs = {}
-            invalid = {}
             status = StepStatus.INPUTS_READY
 
-        if pipeline_outputs:
-            _pipeline_outputs = pipeline_outputs.get_all_value_ids()
-        else:
-            _pipeline_outputs = {}
+        _pipeline_inputs = self._get_slot_value_ids(PIPELINE_SLOT_OWNER, "inputs")
+        _pipeline_outputs = self._get_slot_value_ids(PIPELINE_SLOT_OWNER, "outputs")
 
         step_states = {}
         for step_id in self._structure.step_ids:
@@ -348,18 +336,13 @@ class Pipeline(object):
     def get_step_details(self, step_id: str) -> StepDetails:
         step_input_ids = self.get_current_step_inputs(step_id=step_id)
         step_output_ids = self.get_current_step_outputs(step_id=step_id)
-        step_inputs = self._all_values.get_alias(f"steps.{step_id}.inputs")
-
-        assert step_inputs is not None
-        invalid = step_inputs.check_invalid()
+        invalid = self._check_invalid(step_id, "inputs")
 
         processing_stage = self._structure.get_processing_stage(step_id)
 
         if not invalid:
             status = StepStatus.INPUTS_READY
-            step_outputs = self._all_values.get_alias(f"steps.{step_id}.outputs")
-            assert step_outputs is not None
-            invalid_outputs = step_outputs.check_invalid()
+            invalid_outputs = self._check_invalid(step_id, "outputs")
             # TODO: also check that all the pedigrees match up with current inputs
             if not invalid_outputs:
                 status = StepStatus.RESULTS_READY
@@ -412,6 +395,7 @@ class Pipeline(object):
 
         """
 
+        input_slots = self._slots.get_slots(PIPELINE_SLOT_OWNER, "inputs")
         values_to_set: Dict[str, uuid.UUID] = {}
 
         for k, v in inputs.items():
@@ -420,29 +404,32 @@ class Pipeline(object):
             elif v in [None, SpecialValue.NO_VALUE]:
                 values_to_set[k] = NONE_VALUE_ID
             else:
-                alias_map = self._all_values.get_alias("pipeline.inputs")
-                assert alias_map is not None
-                # dbg(alias_map.__dict__)
-                schema = alias_map.values_schema.get(k, None)
-                if schema is None:
+                slot = input_slots.get(k, None)
+                if slot is None:
                     raise Exception(
-                        f"Can't set pipeline input for input '{k}': no such input field. Available fields: {', '.join(alias_map.values_schema.keys())}"
+                        f"Can't set pipeline input for input '{k}': no such input field. Available fields: {', '.join(input_slots.keys())}"
                     )
                 value = self._data_registry.register_data(
-                    data=v, schema=schema, pedigree=ORPHAN, reuse_existing=True
+                    data=v,
+                    schema=self._slots.get_schema(slot),
+                    pedigree=ORPHAN,
+                    reuse_existing=True,
                 )
                 values_to_set[k] = value.value_id
 
         if not values_to_set:
             return {}
 
-        changed_pipeline_inputs = self._set_values("pipeline.inputs", **values_to_set)
-
-        changed_results = {"__pipeline__": {"inputs": changed_pipeline_inputs}}
-
+        changed: Dict[int, Union[uuid.UUID, None]] = {}
+        self._update_slots(
+            self._get_slot_updates(PIPELINE_SLOT_OWNER, "inputs", values_to_set),
+            changed=changed,
+        )
         if sync_to_step_inputs:
-            changed = self.sync_pipeline_inputs(notify_listeners=False)
-            dpath.merge(changed_results, changed)  # type: ignore
+            self._update_slots(self._get_sync_updates(), changed=changed)
+
+        changed_results = self._create_change_set(changed)
+        changed_results.setdefault(PIPELINE_SLOT_OWNER, {}).setdefault("inputs", {})
 
         if notify_listeners:
             event = PipelineEvent.create_event(pipeline=self, changed=changed_results)
@@ -456,24 +443,9 @@ class Pipeline(object):
     ) -> Mapping[str, Mapping[str, Mapping[str, ChangedValue]]]:
         """Sync all pipeline input."""
 
-        pipeline_inputs = self.get_current_pipeline_inputs()
-
-        values_to_sync: Dict[str, Dict[str, Union[uuid.UUID, None]]] = {}
-
-        for field_name, ref in self._structure.pipeline_input_refs.items():
-            for step_input in ref.connected_inputs:
-                step_inputs = self.get_current_step_inputs(step_input.step_id)
-
-                if step_inputs[step_input.value_name] != pipeline_inputs[field_name]:
-                    values_to_sync.setdefault(step_input.step_id, {})[
-                        step_input.value_name
-                    ] = pipeline_inputs[field_name]
-
-        results: Dict[str, Mapping[str, Mapping[str, ChangedValue]]] = {}
-        for step_id in values_to_sync.keys():
-            values = values_to_sync[step_id]
-            step_changed = self._set_step_inputs(step_id=step_id, inputs=values)
-            dpath.merge(results, step_changed)  # type: ignore
+        changed: Dict[int, Union[uuid.UUID, None]] = {}
+        self._update_slots(self._get_sync_updates(), changed=changed)
+        results = self._create_change_set(changed)
 
         if notify_listeners:
             event = PipelineEvent.create_event(pipeline=self, changed=results)
@@ -482,41 +454,18 @@ class Pipeline(object):
 
         return results
 
-    def _set_step_inputs(
-        self, step_id: str, inputs: Mapping[str, Union[uuid.UUID, None]]
-    ) -> Mapping[str, Mapping[str, Mapping[str, ChangedValue]]]:
-        changed_step_inputs = self._set_values(f"steps.{step_id}.inputs", **inputs)
-        if not changed_step_inputs:
-            return {}
-
-        result: Dict[str, Dict[str, Dict[str, ChangedValue]]] = {
-            step_id: {"inputs": changed_step_inputs}
-        }
-
-        step_outputs = self._structure.get_step_output_refs(step_id=step_id)
-        # null_outputs = {k: NOT_SET_VALUE_ID for k in step_outputs.keys()}
-        null_outputs = dict.fromkeys(step_outputs, NOT_SET_VALUE_ID)
-
-        changed_outputs = self.set_step_outputs(
-            step_id=step_id, outputs=null_outputs, notify_listeners=False
-        )
-        # assert step_id in changed_outputs.keys()
-
-        result.update(changed_outputs)  # type: ignore
-
-        return result
-
     def set_multiple_step_outputs(
         self,
         changed_outputs: Mapping[str, Mapping[str, Union[uuid.UUID, None]]],
         notify_listeners: bool = True,
     ) -> Mapping[str, Mapping[str, Mapping[str, ChangedValue]]]:
-        results: Dict[str, Dict[str, Dict[str, ChangedValue]]] = {}
+        changed: Dict[int, Union[uuid.UUID, None]] = {}
         for step_id, outputs in changed_outputs.items():
-            step_results = self.set_step_outputs(
-                step_id=step_id, outputs=outputs, notify_listeners=False
+            # every step is propagated on its own, so a step that is set after one of its upstream steps keeps its outputs
+            self._update_slots(
+                self._get_slot_updates(step_id, "outputs", outputs), changed=changed
             )
-            dpath.merge(results, step_results)  # type: ignore
+        results = self._create_change_set(changed)
 
         if notify_listeners:
             event = PipelineEvent.create_event(pipeline=self, changed=results)
@@ -533,40 +482,11 @@ class Pipeline(object):
     ) -> Mapping[str, Mapping[str, Mapping[str, ChangedValue]]]:
         # make sure pedigrees match with respective inputs?
 
-        changed_step_outputs = self._set_values(f"steps.{step_id}.outputs", **outputs)
-        if not changed_step_outputs:
-            return {}
-
-        result: Dict[str, Dict[str, Dict[str, ChangedValue]]] = {
-            step_id: {"outputs": changed_step_outputs}
-        }
-
-        output_refs = self._structure.get_step_output_refs(step_id=step_id)
-
-        pipeline_outputs: Dict[str, Union[uuid.UUID, None]] = {}
-
-        inputs_to_set: Dict[str, Dict[str, Union[uuid.UUID, None]]] = {}
-
-        for field_name, ref in output_refs.items():
-            if ref.pipeline_output:
-                assert ref.pipeline_output not in pipeline_outputs.keys()
-                pipeline_outputs[ref.pipeline_output] = outputs[field_name]
-            for input_ref in ref.connected_inputs:
-                inputs_to_set.setdefault(input_ref.step_id, {})[
-                    input_ref.value_name
-                ] = outputs[field_name]
-
-        for _step_id, step_inputs in inputs_to_set.items():
-            changed_step_fields = self._set_step_inputs(
-                step_id=_step_id, inputs=step_inputs
-            )
-            dpath.merge(result, changed_step_fields)  # type: ignore
-
-        if pipeline_outputs:
-            changed_pipeline_outputs = self._set_pipeline_outputs(**pipeline_outputs)
-            dpath.merge(  # type: ignore
-                result, {"__pipeline__": {"outputs": changed_pipeline_outputs}}
-            )
+        changed: Dict[int, Union[uuid.UUID, None]] = {}
+        self._update_slots(
+            self._get_slot_updates(step_id, "outputs", outputs), changed=changed
+        )
+        result = self._create_change_set(changed)
 
         if notify_listeners:
             event = PipelineEvent.create_event(pipeline=self, changed=result)
@@ -575,52 +495,102 @@ class Pipeline(object):
 
         return result
 
-    def _set_pipeline_outputs(
-        self, **outputs: Union[uuid.UUID, None]
-    ) -> Mapping[str, ChangedValue]:
-        changed_pipeline_outputs = self._set_values("pipeline.outputs", **outputs)
-        return changed_pipeline_outputs
-
-    def _set_values(
-        self, alias: str, **values: Union[uuid.UUID, None]
-    ) -> Dict[str, ChangedValue]:
-        """Set values (value-ids) for the sub-alias-map with the specified alias path."""
+    def _get_slot_updates(
+        self, owner: str, direction: str, values: Mapping[str, Union[uuid.UUID, None]]
+    ) -> List[Tuple[int, Union[uuid.UUID, None]]]:
+        """Translate a set of field values into a list of slot updates."""
+        slots = self._slots.get_slots(owner, direction)
         invalid = {}
-        for k in values.keys():
-            _alias = self._all_values.get_alias(alias)
-            assert _alias is not None
-            if k not in _alias.values_schema.keys():
-                invalid[k] = (
-                    f"Invalid field '{k}'. Available fields: {', '.join(self.get_current_pipeline_inputs().keys())}"
+        updates: List[Tuple[int, Union[uuid.UUID, None]]] = []
+        for field_name, value_id in values.items():
+            slot = slots.get(field_name, None)
+            if slot is None:
+                invalid[field_name] = (
+                    f"Invalid field '{field_name}'. Available fields: {', '.join(slots.keys())}"
                 )
+            else:
+                updates.append((slot, value_id))
 
         if invalid:
             raise InvalidValuesException(invalid_values=invalid)
 
-        alias_map: Union[AliasValueMap, None] = self._all_values.get_alias(alias)
-        assert alias_map is not None
-
-        values_to_set: Dict[str, Union[uuid.UUID, None]] = {}
-        current: Dict[str, Union[uuid.UUID, None]] = {}
-        changed: Dict[str, ChangedValue] = {}
+        return updates
 
-        for field_name, new_value in values.items():
-            current_value = self._all_values.get_alias(f"{alias}.{field_name}")
-            if current_value is not None:
-                current_value_id = current_value.assoc_value
-            else:
-                current_value_id = None
-            current[field_name] = current_value_id
+    def _get_sync_updates(self) -> List[Tuple[int, Union[uuid.UUID, None]]]:
+        """Return the slot updates that are necessary to sync all step inputs to their connected pipeline inputs."""
+        updates: List[Tuple[int, Union[uuid.UUID, None]]] = []
+        for input_slot, targets in self._slots.input_connections.items():
+            value_id = self._slot_values[input_slot]
+            updates.extend((target, value_id) for target in targets)
+        return updates
 
-            if current_value_id != new_value:
-                values_to_set[field_name] = new_value
-                changed[field_name] = ChangedValue(old=current_value_id, new=new_value)
+    def _update_slots(
+        self,
+        updates: Iterable[Tuple[int, Union[uuid.UUID, None]]],
+        changed: Dict[int, Union[uuid.UUID, None]],
+    ):
+        """Set the value ids of a list of slots, and propagate all changes downstream.
 
-        _alias = self._all_values.get_alias(alias)
-        assert _alias is not None
-        _alias._set_aliases(**values_to_set)
+        A changed step output is forwarded to all its connected step inputs (and pipeline output), a changed step input resets all outputs of its step. The previous value id of every slot that was changed is recorded in 'changed'.
+        """
+        slots = self._slots
+        slot_values = self._slot_values
+        pending = deque(updates)
+        while pending:
+            slot, value_id = pending.popleft()
+            new_value_id = value_id
+            if value_id is None or value_id == NOT_SET_VALUE_ID:
+                new_value_id = self._get_unset_slot_value(slot, value_id)
+
+            old_value_id = slot_values[slot]
+            if old_value_id == new_value_id:
+                continue
 
-        return changed
+            slot_values[slot] = new_value_id
+            if slot not in changed:
+                changed[slot] = old_value_id
+
+            for target in slots.get_targets(slot):
+                pending.append((target, value_id))
+            for target in slots.get_invalidated(slot):
+                pending.append((target, NOT_SET_VALUE_ID))
+
+    def _get_unset_slot_value(
+        self, slot: int, value_id: Union[uuid.UUID, None]
+    ) -> uuid.UUID:
+        """Return the value id to use for a slot that is not set, which is the id of its default value if there is one."""
+        if not self._slots.has_default(slot):
+            return NOT_SET_VALUE_ID if value_id is not None else NONE_VALUE_ID
+
+        default_value_id = self._slot_defaults.get(slot, None)
+        if default_value_id is None:
+            schema = self._slots.get_schema(slot)
+            if callable(schema.default):
+                data = schema.default()
+            else:
+                data = copy.deepcopy(schema.default)
+            value = self._data_registry.register_data(
+                data=data, schema=schema, reuse_existing=False
+            )
+            default_value_id = value.value_id
+            self._slot_defaults[slot] = default_value_id
+
+        return default_value_id
+
+    def _create_change_set(
+        self, changed: Mapping[int, Union[uuid.UUID, None]]
+    ) -> Dict[str, Dict[str, Dict[str, ChangedValue]]]:
+        """Create the (nested) change details for a set of changed slots."""
+        result: Dict[str, Dict[str, Dict[str, ChangedValue]]] = {}
+        for slot, old_value_id in changed.items():
+            new_value_id = self._slot_values[slot]
+            if new_value_id == old_value_id:
+                continue
+            owner, direction, field_name = self._slots.get_address(slot)
+            result.setdefault(owner, {}).setdefault(direction, {})[field_name] = (
+                ChangedValue(old=old_value_id, new=new_value_id)
+            )
+        return result
 
     @property
     def step_ids(self) -> Iterable[str]:
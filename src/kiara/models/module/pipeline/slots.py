@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+from typing import TYPE_CHECKING, Dict, List, Mapping, Tuple
+
+from kiara.defaults import SpecialValue
+from kiara.models.values.value_schema import ValueSchema
+
+if TYPE_CHECKING:
+    from kiara.models.module.pipeline.structure import PipelineStructure
+
+PIPELINE_SLOT_OWNER = "__pipeline__"
+"""The 'owner' name that is used for the slots of the pipeline inputs and outputs."""
+
+SlotAddress = Tuple[str, str, str]
+"""A tuple of owner (step id, or '__pipeline__'), direction ('inputs' or 'outputs') and field name."""
+
+
+class PipelineValueSlots(object):
+    """The value slot layout of a pipeline structure.
+
+    Every pipeline input/output and every step input/output gets an integer index ('slot'), which allows a pipeline
+    to keep its current state in a flat list of value ids. Connections between slots are pre-computed as adjacency
+    lists, so changes can be propagated without having to look up (or walk) any of the structure's graphs.
+    """
+
+    def __init__(self, structure: "PipelineStructure"):
+        self._addresses: List[SlotAddress] = []
+        self._schemas: List[ValueSchema] = []
+        self._fields: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+        for field_name, schema in structure.pipeline_inputs_schema.items():
+            self._add_slot(PIPELINE_SLOT_OWNER, "inputs", field_name, schema)
+        for field_name, schema in structure.pipeline_outputs_schema.items():
+            self._add_slot(PIPELINE_SLOT_OWNER, "outputs", field_name, schema)
+        for step_id in structure.step_ids:
+            module = structure.get_step(step_id).module
+            for field_name, schema in module.inputs_schema.items():
+                self._add_slot(step_id, "inputs", field_name, schema)
+            for field_name, schema in module.outputs_schema.items():
+                self._add_slot(step_id, "outputs", field_name, schema)
+
+        self._has_default: List[bool] = [
+            schema.default not in (SpecialValue.NOT_SET, SpecialValue.NO_VALUE, None)
+            for schema in self._schemas
+        ]
+
+        targets: List[List[int]] = [[] for _ in self._addresses]
+        invalidates: List[List[int]] = [[] for _ in self._addresses]
+        input_connections: Dict[int, List[int]] = {}
+
+        for field_name, input_ref in structure.pipeline_input_refs.items():
+            input_slot = self.get_slot(PIPELINE_SLOT_OWNER, "inputs", field_name)
+            input_connections[input_slot] = [
+                self.get_slot(addr.step_id, "inputs", addr.value_name)
+                for addr in input_ref.connected_inputs
+            ]
+
+        for step_id in structure.step_ids:
+            output_slots = self.get_slots(step_id, "outputs")
+            for input_slot in self.get_slots(step_id, "inputs").values():
+                invalidates[input_slot].extend(output_slots.values())
+
+            for field_name, output_ref in structure.get_step_output_refs(
+                step_id
+            ).items():
+                output_slot = output_slots[field_name]
+                for addr in output_ref.connected_inputs:
+                    targets[output_slot].append(
+                        self.get_slot(addr.step_id, "inputs", addr.value_name)
+                    )
+                if output_ref.pipeline_output:
+                    targets[output_slot].append(
+                        self.get_slot(
+                            PIPELINE_SLOT_OWNER, "outputs", output_ref.pipeline_output
+                        )
+                    )
+
+        self._targets: List[Tuple[int, ...]] = [tuple(x) for x in targets]
+        self._invalidates: List[Tuple[int, ...]] = [tuple(x) for x in invalidates]
+        self._input_connections: Dict[int, Tuple[int, ...]] = {
+            k: tuple(v) for k, v in input_connections.items()
+        }
+
+    def _add_slot(
+        self, owner: str, direction: str, field_name: str, schema: ValueSchema
+    ):
+        slot = len(self._addresses)
+        self._addresses.append((owner, direction, field_name))
+        self._schemas.append(schema)
+        self._fields.setdefault((owner, direction), {})[field_name] = slot
+
+    @property
+    def size(self) -> int:
+        return len(self._addresses)
+
+    def get_slots(self, owner: str, direction: str) -> Mapping[str, int]:
+        """Return the slots (by field name) of the inputs or outputs of a step (or the pipeline itself)."""
+        return self._fields.get((owner, direction), {})
+
+    def get_slot(self, owner: str, direction: str, field_name: str) -> int:
+        return self._fields[(owner, direction)][field_name]
+
+    def get_address(self, slot: int) -> SlotAddress:
+        return self._addresses[slot]
+
+    def get_schema(self, slot: int) -> ValueSchema:
+        return self._schemas[slot]
+
+    def has_default(self, slot: int) -> bool:
+        return self._has_default[slot]
+
+    def get_targets(self, slot: int) -> Tuple[int, ...]:
+        """Return the slots that receive the value of a step output slot (connected step inputs and pipeline output)."""
+        return self._targets[slot]
+
+    def get_invalidated(self, slot: int) -> Tuple[int, ...]:
+        """Return the slots that need to be reset if the value of a step input slot changes (the outputs of the step)."""
+        return self._invalidates[slot]
+
+    @property
+    def input_connections(self) -> Mapping[int, Tuple[int, ...]]:
+        """The step input slots that are connected to each of the pipeline input slots."""
+        return self._input_connections
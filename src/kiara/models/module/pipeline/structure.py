@@ -4,19 +4,25 @@
 #
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 
-from functools import lru_cache
+import os
 from typing import Any, ClassVar, Dict, Iterable, List, Mapping, Set, Union
 
 import networkx as nx
+import orjson
 from pydantic import Field, PrivateAttr, model_validator
 from rich.console import RenderableType
 from rich.tree import Tree
 
-from kiara.defaults import KIARA_DEFAULT_STAGES_EXTRACTION_TYPE
+from kiara.defaults import (
+    DEFAULT_PIPELINE_STRUCTURE_CACHE_SIZE,
+    KIARA_DEFAULT_STAGES_EXTRACTION_TYPE,
+    PIPELINE_STAGES_CACHE_DIR,
+)
 from kiara.exceptions import InvalidPipelineConfig
 from kiara.models import KiaraModel
 from kiara.models.documentation import DocumentationMetadataModel
 from kiara.models.module.pipeline import PipelineConfig, PipelineStep
+from kiara.models.module.pipeline.slots import PipelineValueSlots
 from kiara.models.module.pipeline.stages import PipelineStage
 from kiara.models.module.pipeline.value_refs import (
     PipelineInputRef,
@@ -27,12 +33,74 @@ from kiara.models.module.pipeline.value_refs import (
     generate_step_alias,
 )
 from kiara.models.values.value_schema import ValueSchema
+from kiara.utils import log_message
+from kiara.utils.caching import LRUCache
 
 
 def generate_pipeline_endpoint_name(step_id: str, value_name: str):
     return f"{step_id}__{value_name}"
 
 
+class DerivedStructureData(object):
+    """Holds the data that is derived from a pipeline structure.
+
+    All of this only depends on the structure itself, so it is shared between all structure instances with the same 'instance_cid'.
+    """
+
+    def __init__(self):
+        self.steps_details: Union[None, Dict[str, StepInfo]] = None
+        self.constants: Union[None, Dict[str, Any]] = None
+        self.defaults: Union[None, Dict[str, Any]] = None
+        self.execution_graph: Union[None, nx.DiGraph] = None
+        self.data_flow_graph: Union[None, nx.DiGraph] = None
+        self.data_flow_graph_simple: Union[None, nx.DiGraph] = None
+        self.nodes_by_type: Dict[str, List[Any]] = {}
+        self.processing_stages: Dict[str, List[List[str]]] = {}
+        self.stage_indexes: Union[None, Dict[str, int]] = None
+        self.value_slots: Union[None, PipelineValueSlots] = None
+
+
+DERIVED_STRUCTURE_DATA_CACHE: LRUCache[str, DerivedStructureData] = LRUCache(
+    max_size=DEFAULT_PIPELINE_STRUCTURE_CACHE_SIZE
+)
+"""Process-wide cache for derived structure data, keyed by the structures 'instance_cid'."""
+
+
+def load_persisted_stages(structure_cid: str) -> Dict[str, List[List[str]]]:
+    """Load the stage plans for a pipeline structure from the (persistent) stages cache, if available."""
+    path = PIPELINE_STAGES_CACHE_DIR / f"{structure_cid}.json"
+    if not path.is_file():
+        return {}
+
+    try:
+        return orjson.loads(path.read_bytes())
+    except Exception as e:
+        log_message(
+            "ignore.pipeline_stages_cache",
+            reason="can't read cache file",
+            path=path.as_posix(),
+            error=e,
+        )
+        return {}
+
+
+def persist_stages(structure_cid: str, stages: Mapping[str, List[List[str]]]):
+    """Write the stage plans for a pipeline structure to the (persistent) stages cache."""
+    path = PIPELINE_STAGES_CACHE_DIR / f"{structure_cid}.json"
+    try:
+        PIPELINE_STAGES_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_bytes(orjson.dumps(stages))
+        os.replace(temp_path, path)
+    except Exception as e:
+        log_message(
+            "ignore.pipeline_stages_cache",
+            reason="can't write cache file",
+            path=path.as_posix(),
+            error=e,
+        )
+
+
 class StepInfo(KiaraModel):
     _kiara_model_id: ClassVar = "info.pipeline_step"
 
@@ -183,53 +251,79 @@ class PipelineStructure(KiaraModel):
 
     # this is hardcoded for now
     _add_all_workflow_outputs: bool = PrivateAttr(default=False)
-    _constants: Dict[str, Any] = PrivateAttr(default=None)  # type: ignore
-    _defaults: Dict[str, Any] = PrivateAttr(None)  # type: ignore
-
-    _execution_graph: nx.DiGraph = PrivateAttr(None)  # type: ignore
-    _data_flow_graph: nx.DiGraph = PrivateAttr(None)  # type: ignore
-    _data_flow_graph_simple: nx.DiGraph = PrivateAttr(None)  # type: ignore
 
-    _processing_stages: List[List[str]] = PrivateAttr(None)  # type: ignore
+    # holds everything that is derived from the structure (graphs, step details, stage plans, ...)
+    _derived: Union[None, "DerivedStructureData"] = PrivateAttr(default=None)
+    # the (shared) step details, bound to this structure
+    _steps_details: Union[None, Dict[str, StepInfo]] = PrivateAttr(default=None)
     # _stages_info: Mapping[int, PipelineStage] = PrivateAttr(None)  # type: ignore
-
-    # holds details about the (current) processing steps contained in this workflow
-    _steps_details: Dict[str, StepInfo] = PrivateAttr(None)  # type: ignore
     # _info: "PipelineStructureInfo" = PrivateAttr(None)  # type: ignore
 
     def _retrieve_data_to_hash(self) -> Any:
+        # the hash is used to share derived data between structures, so it needs to include everything that influences that
         return {
-            "steps": [step.instance_cid for step in self.steps],
+            "steps": [
+                {
+                    "step_id": step.step_id,
+                    "manifest": step.instance_cid,
+                    "input_links": {
+                        field_name: [link.model_dump() for link in links]
+                        for field_name, links in step.input_links.items()
+                    },
+                    "doc": step.doc.instance_cid,
+                }
+                for step in self.steps
+            ],
             "input_aliases": self.input_aliases,
             "output_aliases": self.output_aliases,
         }
 
+    @property
+    def derived_data(self) -> "DerivedStructureData":
+        """The data that is derived from this structure, shared with all other structures that have the same 'instance_cid'."""
+        if self._derived is None:
+            self._derived = DERIVED_STRUCTURE_DATA_CACHE.get_or_create(
+                str(self.instance_cid), DerivedStructureData
+            )
+        return self._derived
+
     def _retrieve_id(self) -> str:
         return self.pipeline_config.instance_id
 
     @property
     def steps_details(self) -> Mapping[str, StepInfo]:
-        if self._steps_details is None:
+        if self._steps_details is not None:
+            return self._steps_details
+
+        derived = self.derived_data
+        if derived.steps_details is None:
             self._process_steps()
-        return self._steps_details  # type: ignore
+
+        steps_details = {}
+        for step_id, step_info in derived.steps_details.items():  # type: ignore
+            _step_info = step_info.model_copy()
+            _step_info._structure = self
+            steps_details[step_id] = _step_info
+        self._steps_details = steps_details
+        return self._steps_details
 
     @property
     def step_ids(self) -> Iterable[str]:
-        if self._steps_details is None:
-            self._process_steps()
-        return self._steps_details.keys()  # type: ignore
+        return self.steps_details.keys()
 
     @property
     def constants(self) -> Mapping[str, Any]:
-        if self._constants is None:
+        derived = self.derived_data
+        if derived.constants is None:
             self._process_steps()
-        return self._constants  # type: ignore
+        return derived.constants  # type: ignore
 
     @property
     def defaults(self) -> Mapping[str, Any]:
-        if self._defaults is None:
+        derived = self.derived_data
+        if derived.defaults is None:
             self._process_steps()
-        return self._defaults  # type: ignore
+        return derived.defaults  # type: ignore
 
     def get_step(self, step_id: str) -> PipelineStep:
         d = self.steps_details.get(step_id, None)
@@ -261,38 +355,39 @@ class PipelineStructure(KiaraModel):
 
     @property
     def execution_graph(self) -> nx.DiGraph:
-        if self._execution_graph is None:
+        derived = self.derived_data
+        if derived.execution_graph is None:
             self._process_steps()
-        return self._execution_graph
+        return derived.execution_graph  # type: ignore
 
     @property
     def data_flow_graph(self) -> nx.DiGraph:
-        if self._data_flow_graph is None:
+        derived = self.derived_data
+        if derived.data_flow_graph is None:
             self._process_steps()
-        return self._data_flow_graph
+        return derived.data_flow_graph  # type: ignore
 
     @property
     def data_flow_graph_simple(self) -> nx.DiGraph:
-        if self._data_flow_graph_simple is None:
+        derived = self.derived_data
+        if derived.data_flow_graph_simple is None:
             self._process_steps()
-        return self._data_flow_graph_simple
+        return derived.data_flow_graph_simple  # type: ignore
 
     @property
-    def processing_stages(self) -> List[List[str]]:
-        if self._processing_stages is not None:
-            return self._processing_stages
-
-        # calculate execution order
-        # process_late = self.pipeline_config.pipeline_name == "topic_modeling"
-        processing_stages = []
+    def value_slots(self) -> PipelineValueSlots:
+        """The (integer) slot layout for all pipeline and step inputs/outputs of this structure."""
+        derived = self.derived_data
+        if derived.value_slots is None:
+            derived.value_slots = PipelineValueSlots(structure=self)
+        return derived.value_slots
 
-        processing_stages = PipelineStage.extract_stages(
-            self, stages_extraction_type=KIARA_DEFAULT_STAGES_EXTRACTION_TYPE
+    @property
+    def processing_stages(self) -> List[List[str]]:
+        return self.extract_processing_stages(
+            stages_extraction_type=KIARA_DEFAULT_STAGES_EXTRACTION_TYPE
         )
 
-        self._processing_stages = processing_stages
-        return self._processing_stages
-
     def extract_processing_stages(
         self, stages_extraction_type: str = KIARA_DEFAULT_STAGES_EXTRACTION_TYPE
     ) -> List[List[str]]:
@@ -303,10 +398,26 @@ class PipelineStructure(KiaraModel):
         'late' will be appropriate. Currently available:
         - 'late': process steps as late in the process as possible
         - 'early': process steps as early in the process as possible
+
+        Stage plans are cached (in memory, and on disk), keyed by the 'instance_cid' of this structure.
         """
-        return PipelineStage.extract_stages(
-            self, stages_extraction_type=stages_extraction_type
-        )
+        derived = self.derived_data
+        stages = derived.processing_stages.get(stages_extraction_type, None)
+        if stages is not None:
+            return stages
+
+        structure_cid = str(self.instance_cid)
+        stages = load_persisted_stages(structure_cid).get(stages_extraction_type, None)
+        if stages is None:
+            stages = PipelineStage.extract_stages(
+                self, stages_extraction_type=stages_extraction_type
+            )
+            derived.processing_stages[stages_extraction_type] = stages
+            persist_stages(structure_cid, derived.processing_stages)
+        else:
+            derived.processing_stages[stages_extraction_type] = stages
+
+        return stages
 
     def extract_processing_stages_info(
         self, stages_extraction_type: str = KIARA_DEFAULT_STAGES_EXTRACTION_TYPE
@@ -364,16 +475,17 @@ class PipelineStructure(KiaraModel):
 
         return graph
 
-    @lru_cache()
-    def _get_node_of_type(self, node_type: str):
-        if self._steps_details is None:
-            self._process_steps()
-
-        return [
-            node
-            for node, attr in self._data_flow_graph.nodes(data=True)
-            if attr["type"] == node_type
-        ]
+    def _get_node_of_type(self, node_type: str) -> List[Any]:
+        derived = self.derived_data
+        nodes = derived.nodes_by_type.get(node_type, None)
+        if nodes is None:
+            nodes = [
+                node
+                for node, attr in self.data_flow_graph.nodes(data=True)
+                if attr["type"] == node_type
+            ]
+            derived.nodes_by_type[node_type] = nodes
+        return nodes
 
     @property
     def steps_input_refs(self) -> Dict[str, StepInputRef]:
@@ -445,11 +557,18 @@ class PipelineStructure(KiaraModel):
 
         Returns the stage nr (starting with '1').
         """
-        for index, stage in enumerate(self.processing_stages, start=1):
-            if step_id in stage:
-                return index
+        derived = self.derived_data
+        if derived.stage_indexes is None:
+            derived.stage_indexes = {
+                _step_id: index
+                for index, stage in enumerate(self.processing_stages, start=1)
+                for _step_id in stage
+            }
 
-        raise Exception(f"Invalid step id '{step_id}'.")
+        index = derived.stage_indexes.get(step_id, None)
+        if index is None:
+            raise Exception(f"Invalid step id '{step_id}'.")
+        return index
 
     def step_is_required(self, step_id: str) -> bool:
         """Check if the specified step is required, or can be omitted."""
@@ -690,20 +809,18 @@ class PipelineStructure(KiaraModel):
             else:
                 execution_graph.add_edge("__root__", step.step_id)
 
-        self._constants = constants
-        self._defaults = structure_defaults
-        self._steps_details = {}
-        for step_id, data in steps_details.items():
-            _step = StepInfo(**data)
-            _step._structure = self
-            self._steps_details[step_id] = _step
-
-        self._execution_graph = execution_graph
-        self._data_flow_graph = data_flow_graph
-        self._data_flow_graph_simple = data_flow_graph_simple
-        self._processing_stages = None  # type: ignore
+        derived = self.derived_data
+        derived.constants = constants
+        derived.defaults = structure_defaults
+        # shared with other structures, so those are not bound to this one
+        derived.steps_details = {
+            step_id: StepInfo(**data) for step_id, data in steps_details.items()
+        }
 
-        self._get_node_of_type.cache_clear()
+        derived.execution_graph = execution_graph
+        derived.data_flow_graph = data_flow_graph
+        derived.data_flow_graph_simple = data_flow_graph_simple
+        derived.nodes_by_type.clear()
 
     def export_stages(self):
         # TODO: implement different processing stages possibilities
@@ -731,8 +848,8 @@ class PipelineStructure(KiaraModel):
             inputs.add(f"[i]{field_name}[i] (type: {schema.type})")
 
         steps = tree.add("steps")
-        processing_stages = PipelineStage.extract_stages(
-            structure=self, stages_extraction_type=stages_extraction_type
+        processing_stages = self.extract_processing_stages(
+            stages_extraction_type=stages_extraction_type
         )
         for idx, stage in enumerate(processing_stages, start=1):
             stage_node = steps.add(f"stage {idx}")
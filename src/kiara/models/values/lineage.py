@@ -1,5 +1,17 @@
 # -*- coding: utf-8 -*-
-from typing import TYPE_CHECKING, Any, Dict, Union
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Set,
+    Tuple,
+    Union,
+)
 
 import orjson
 from networkx import DiGraph
@@ -26,13 +38,89 @@ COLOR_LIST = [
 ]
 
 
+class LineageItem(NamedTuple):
+    """The subset of value details that is needed to assemble a lineage graph."""
+
+    value_id: uuid.UUID
+    data_type_name: str
+    data_type_config: Mapping[str, Any]
+    pedigree_output_name: str
+    pedigree: ValuePedigree
+
+    @classmethod
+    def from_value(cls, value: Value) -> "LineageItem":
+        return cls(
+            value_id=value.value_id,
+            data_type_name=value.data_type_name,
+            data_type_config=value.data_type_config,
+            pedigree_output_name=value.pedigree_output_name,
+            pedigree=value.pedigree,
+        )
+
+    @property
+    def is_orphan(self) -> bool:
+        return self.pedigree.module_type == ORPHAN.module_type
+
+
+class LineageItemResolver(object):
+    """Retrieves (and caches) lineage items, level by level.
+
+    Items of ancestor values are fetched in batches from the data registry, so a lineage of depth N costs roughly
+    N store queries (per archive), and shared ancestors are only ever retrieved once.
+    """
+
+    def __init__(self, kiara: "Kiara"):
+        self._kiara: Kiara = kiara
+        self._items: Dict[uuid.UUID, LineageItem] = {}
+
+    def add_value(self, value: Value) -> LineageItem:
+        item = LineageItem.from_value(value)
+        self._items[value.value_id] = item
+        return item
+
+    def get_item(self, value_id: uuid.UUID) -> LineageItem:
+        item = self._items.get(value_id, None)
+        if item is None:
+            self.resolve_items([value_id])
+            item = self._items[value_id]
+        return item
+
+    def resolve_items(self, value_ids: Iterable[uuid.UUID]) -> None:
+        missing = [x for x in value_ids if x not in self._items.keys()]
+        if not missing:
+            return
+
+        items = self._kiara.data_registry.retrieve_lineage_items(missing)
+        self._items.update(items)
+
+    def resolve_inputs(self, value_ids: Iterable[uuid.UUID]) -> None:
+        """Make sure the items for all inputs of the specified values are available."""
+        input_ids: List[uuid.UUID] = []
+        for value_id in value_ids:
+            input_ids.extend(self._items[value_id].pedigree.inputs.values())
+        self.resolve_items(input_ids)
+
+
+def _depth_limit_reached(level: int, max_depth: Union[int, None]) -> bool:
+    return max_depth is not None and level >= max_depth
+
+
 def fill_renderable_lineage_tree(
     kiara: "Kiara",
     pedigree: ValuePedigree,
     node: Union[Tree, None] = None,
     include_ids: bool = False,
     level: int = 0,
+    *,
+    max_depth: Union[int, None] = None,
 ) -> Tree:
+    """Add the lineage of a value to a rich tree.
+
+    The tree is assembled depth-first. The lineage of a value that has more than one path to the root is only
+    expanded the first time it appears, every further occurrence is rendered as a reference to it.
+    """
+    resolver = LineageItemResolver(kiara=kiara)
+
     color = COLOR_LIST[level % len(COLOR_LIST)]
     title = f"[b {color}]{pedigree.module_type}[/b {color}]"
     if node is None:
@@ -40,27 +128,49 @@ def fill_renderable_lineage_tree(
     else:
         main = node.add(title)
 
-    for input_name in sorted(pedigree.inputs.keys()):
-        child_value_id = pedigree.inputs[input_name]
+    # the items of inputs, together with the tree node of the input, or the root pedigree (without item)
+    stack: List[Tuple[Union[LineageItem, None], ValuePedigree, Tree, int]] = [
+        (None, pedigree, main, level)
+    ]
+    expanded: Set[uuid.UUID] = set()
+    while stack:
+        item, current_pedigree, current_node, current_level = stack.pop()
+        color = COLOR_LIST[current_level % len(COLOR_LIST)]
+
+        if item is not None:
+            title = f"[b {color}]{current_pedigree.module_type}[/b {color}]"
+            if item.value_id in expanded:
+                current_node.add(
+                    f"{title} [i](see lineage of value {item.value_id} above)[/i]"
+                )
+                continue
+            expanded.add(item.value_id)
+            current_node = current_node.add(title)
+
+        input_names = sorted(current_pedigree.inputs.keys())
+        resolver.resolve_items(current_pedigree.inputs[x] for x in input_names)
+
+        children = []
+        for input_name in input_names:
+            child = resolver.get_item(current_pedigree.inputs[input_name])
+
+            if include_ids:
+                v_id_str = f" = {child.value_id}"
+            else:
+                v_id_str = ""
+            input_node = current_node.add(
+                f"input: [i {color}]{input_name} ({child.data_type_name})[/i {color}]{v_id_str}"
+            )
+            if child.is_orphan or _depth_limit_reached(
+                current_level + 1 - level, max_depth
+            ):
+                continue
 
-        child_value = kiara.data_registry.get_value(child_value_id)
+            children.append((child, child.pedigree, input_node, current_level + 1))
 
-        value_type = child_value.data_type_name
-        if include_ids:
-            v_id_str = f" = {child_value.value_id}"
-        else:
-            v_id_str = ""
-        input_node = main.add(
-            f"input: [i {color}]{input_name} ({value_type})[/i {color}]{v_id_str}"
-        )
-        if child_value.pedigree != ORPHAN:
-            fill_renderable_lineage_tree(
-                kiara=kiara,
-                pedigree=child_value.pedigree,
-                node=input_node,
-                level=level + 1,
-                include_ids=include_ids,
-            )
+        # reversed, so the first input is processed (and rendered) first, which means the first occurrence of a value
+        # in the tree is the one that gets expanded
+        stack.extend(reversed(children))
 
     return main
 
@@ -72,64 +182,81 @@ def fill_dict_with_lineage(
     include_preview: bool = False,
     include_module_info: bool = False,
     level: int = 0,
+    *,
+    max_depth: Union[int, None] = None,
 ) -> Dict[str, Any]:
+    """Add the lineage of a value to a (json-serializable) dictionary.
+
+    The pedigree of a value that has more than one path to the root value is only added once, every further
+    occurrence only contains a reference to its value id ('{"ref": <value_id>}').
+    """
+    resolver = LineageItemResolver(kiara=kiara)
+    root_item = resolver.add_value(value)
+
+    def render_preview(value_id: uuid.UUID) -> Any:
+        return kiara.render_registry.render(
+            source_type="value",
+            item=kiara.data_registry.get_value(value_id),
+            target_type="string",
+            render_config={},
+        )
+
     pedigree = value.pedigree
-    title = pedigree.module_type
     if node is None:
         root: Dict[str, Any] = {
             "pedigree": {
-                "module": {"name": title, "module_config": pedigree.module_config},
                 "output_name": value.pedigree_output_name,
-                "inputs": {},
             },
             "type": value.data_type_name,
             "id": str(value.value_id),
         }
         if include_preview:
-            preview = kiara.render_registry.render(
-                source_type="value",
-                item=value,
-                target_type="string",
-                render_config={},
-            )
-            root["preview"] = preview
+            root["preview"] = render_preview(value.value_id)
         main: Dict[str, Any] = root["pedigree"]
     else:
-        node["inputs"] = {}
-        node["module"] = {"name": title, "module_config": pedigree.module_config}
         main = node
 
-    if include_module_info:
-        info = kiara.module_registry.get_module_type_metadata(title)
-        main["module"]["info"] = info.model_dump()
-
-    for input_name in sorted(pedigree.inputs.keys()):
-        child_value_id = pedigree.inputs[input_name]
-        child_value = kiara.data_registry.get_value(child_value_id)
-
-        value_type = child_value.data_type_name
-        main["inputs"][input_name] = {
-            "type": value_type,
-            "id": str(child_value.value_id),
-        }
-        if include_preview:
-            preview = kiara.render_registry.render(
-                source_type="value",
-                item=child_value,
-                target_type="string",
-                render_config={},
-            )
-            main["inputs"][input_name]["preview"] = preview
-
-        if child_value.pedigree != ORPHAN:
-            main["inputs"][input_name]["pedigree"] = {}
-            fill_dict_with_lineage(
-                kiara=kiara,
-                value=child_value,
-                node=main["inputs"][input_name]["pedigree"],
-                level=level + 1,
-                include_preview=include_preview,
-                include_module_info=include_module_info,
+    stack: List[Tuple[LineageItem, Dict[str, Any], int]] = [(root_item, main, level)]
+    expanded: Set[uuid.UUID] = {root_item.value_id}
+    while stack:
+        item, current, current_level = stack.pop()
+        pedigree = item.pedigree
+        title = pedigree.module_type
+
+        current["module"] = {"name": title, "module_config": pedigree.module_config}
+        current["inputs"] = {}
+        if include_module_info:
+            info = kiara.module_registry.get_module_type_metadata(title)
+            current["module"]["info"] = info.model_dump()
+
+        input_names = sorted(pedigree.inputs.keys())
+        resolver.resolve_items(pedigree.inputs[x] for x in input_names)
+
+        for input_name in input_names:
+            child = resolver.get_item(pedigree.inputs[input_name])
+
+            current["inputs"][input_name] = {
+                "type": child.data_type_name,
+                "id": str(child.value_id),
+            }
+            if include_preview:
+                current["inputs"][input_name]["preview"] = render_preview(
+                    child.value_id
+                )
+
+            if child.is_orphan or _depth_limit_reached(
+                current_level + 1 - level, max_depth
+            ):
+                continue
+
+            if child.value_id in expanded:
+                current["inputs"][input_name]["pedigree"] = {"ref": str(child.value_id)}
+                continue
+            expanded.add(child.value_id)
+
+            current["inputs"][input_name]["pedigree"] = {}
+            stack.append(
+                (child, current["inputs"][input_name]["pedigree"], current_level + 1)
             )
 
     if node is None:
@@ -144,7 +271,15 @@ def create_lineage_graph(
     graph: Union[DiGraph, None] = None,
     parent: Union[None, str] = None,
     level: int = 1,
+    *,
+    max_depth: Union[int, None] = None,
 ) -> DiGraph:
+    """Create a graph that contains all values and modules that were involved in creating the provided value.
+
+    The graph is assembled breadth-first: every ancestor value is only visited once, no matter how many paths lead
+    to it, and the details of all values of one level are retrieved in a single batch. If 'max_depth' is set, only
+    that many module levels are included.
+    """
     if graph is None:
         graph = DiGraph()
         graph.add_node(
@@ -157,55 +292,71 @@ def create_lineage_graph(
         )
         parent = f"value:{value.value_id}"
 
-    module_id = f"module:{value.pedigree.job_hash}"
-    module_label = f"module:{value.pedigree.module_type}"
-    graph.add_node(
-        module_id,
-        module_type=value.pedigree.module_type,
-        module_config=value.pedigree.module_config,
-        label=module_label,
-        node_type="operation",
-        level=(level * 2) + 1,
-    )
-    graph.add_edge(
-        parent,
-        module_id,
-        id=f"{parent}:{module_id}",
-        field_name=value.pedigree_output_name,
-        label=value.pedigree_output_name,
-    )
-
-    for input_name in sorted(value.pedigree.inputs.keys()):
-        child_value_id = value.pedigree.inputs[input_name]
-        child_value = kiara.data_registry.get_value(child_value_id)
-
-        input_id = f"value:{child_value.value_id}"
-        input_label = f"{input_name}:{input_name}"
+    assert parent is not None
 
-        graph.add_node(
-            input_id,
-            label=input_label,
-            node_type="value",
-            data_type=child_value.data_type_name,
-            data_type_config=child_value.data_type_config,
-            level=(level * 2) + 2,
-        )
-        graph.add_edge(
-            module_id,
-            input_id,
-            id=f"{module_id}:{input_id}",
-            field_name=input_name,
-            label=input_name,
-        )
+    resolver = LineageItemResolver(kiara=kiara)
+    root_item = resolver.add_value(value)
+
+    visited: Set[uuid.UUID] = {value.value_id}
+    frontier: List[Tuple[LineageItem, str]] = [(root_item, parent)]
+    current_level = level
 
-        if child_value.pedigree != ORPHAN:
-            create_lineage_graph(
-                kiara=kiara,
-                value=child_value,
-                graph=graph,
-                parent=input_id,
-                level=level + 1,
+    while frontier:
+        resolver.resolve_inputs(item.value_id for item, _ in frontier)
+        next_frontier: List[Tuple[LineageItem, str]] = []
+
+        for item, item_node_id in frontier:
+            pedigree = item.pedigree
+            module_id = f"module:{pedigree.job_hash}"
+            graph.add_node(
+                module_id,
+                module_type=pedigree.module_type,
+                module_config=pedigree.module_config,
+                label=f"module:{pedigree.module_type}",
+                node_type="operation",
+                level=(current_level * 2) + 1,
             )
+            graph.add_edge(
+                item_node_id,
+                module_id,
+                id=f"{item_node_id}:{module_id}",
+                field_name=item.pedigree_output_name,
+                label=item.pedigree_output_name,
+            )
+
+            for input_name in sorted(pedigree.inputs.keys()):
+                child = resolver.get_item(pedigree.inputs[input_name])
+                input_id = f"value:{child.value_id}"
+
+                if input_id not in graph.nodes:
+                    graph.add_node(
+                        input_id,
+                        label=f"{input_name}:{input_name}",
+                        node_type="value",
+                        data_type=child.data_type_name,
+                        data_type_config=child.data_type_config,
+                        level=(current_level * 2) + 2,
+                    )
+                graph.add_edge(
+                    module_id,
+                    input_id,
+                    id=f"{module_id}:{input_id}",
+                    field_name=input_name,
+                    label=input_name,
+                )
+
+                if (
+                    child.value_id in visited
+                    or child.is_orphan
+                    or _depth_limit_reached(current_level + 1 - level, max_depth)
+                ):
+                    continue
+                visited.add(child.value_id)
+                next_frontier.append((child, input_id))
+
+        frontier = next_frontier
+        current_level += 1
+
     return graph
 
 
@@ -216,7 +367,13 @@ def create_lineage_graph_modules(
     parent: Union[None, str] = None,
     input_field: Union[None, str] = None,
     level: int = 1,
+    *,
+    max_depth: Union[int, None] = None,
 ) -> DiGraph:
+    """Create a graph that only contains the modules that were involved in creating the provided value (as well as the value itself, and the orphan input values).
+
+    Like 'create_lineage_graph', the graph is assembled breadth-first, with every ancestor value only visited once.
+    """
     if graph is None:
         graph = DiGraph()
         graph.add_node(
@@ -228,76 +385,102 @@ def create_lineage_graph_modules(
             level=1,
         )
 
-    module_id = f"module:{value.pedigree.job_hash}"
-    module_label = value.pedigree.module_type
-    graph.add_node(
-        module_id,
-        module_type=value.pedigree.module_type,
-        module_config=value.pedigree.module_config,
-        label=module_label,
-        node_type="operation",
-        level=(level * 2) + 1,
-    )
+    resolver = LineageItemResolver(kiara=kiara)
+    root_item = resolver.add_value(value)
 
     if parent is None:
-        parent = f"value:{value.value_id}"
-        graph.add_edge(
-            parent,
-            module_id,
-            id=f"{parent}:{module_id}",
-            field_name=value.pedigree_output_name,
-            label=f"{value.pedigree_output_name} ({value.data_type_name})",
-        )
+        root_edge_parent = f"value:{value.value_id}"
+        root_edge_id = None
+        root_field = value.pedigree_output_name
     else:
         assert input_field is not None
-        graph.add_edge(
-            parent,
-            module_id,
-            id=f"{parent}:{input_field}",
-            field_name=input_field,
-            label=f"{input_field} ({value.data_type_name})",
-        )
-
-    for input_name in sorted(value.pedigree.inputs.keys()):
-        child_value_id = value.pedigree.inputs[input_name]
-        child_value = kiara.data_registry.get_value(child_value_id)
-
-        if child_value.pedigree != ORPHAN:
-            create_lineage_graph_modules(
-                kiara=kiara,
-                value=child_value,
-                graph=graph,
-                parent=module_id,
-                input_field=input_name,
-                level=level + 1,
-            )
-        else:
-            input_id = f"value:{child_value.value_id}"
-            input_label = f"{input_name} ({child_value.data_type_name})"
-
+        root_edge_parent = parent
+        root_edge_id = f"{parent}:{input_field}"
+        root_field = input_field
+
+    visited: Set[uuid.UUID] = {value.value_id}
+    # (item, parent node id, edge id, field name), the edge id defaults to '<parent>:<module_id>'
+    frontier: List[Tuple[LineageItem, str, Union[str, None], str]] = [
+        (root_item, root_edge_parent, root_edge_id, root_field)
+    ]
+    current_level = level
+
+    while frontier:
+        resolver.resolve_inputs(x[0].value_id for x in frontier)
+        next_frontier: List[Tuple[LineageItem, str, Union[str, None], str]] = []
+
+        for item, edge_parent, edge_id, field_name in frontier:
+            pedigree = item.pedigree
+            module_id = f"module:{pedigree.job_hash}"
             graph.add_node(
-                input_id,
-                label=input_label,
-                node_type="value",
-                data_type=child_value.data_type_name,
-                data_type_config=child_value.data_type_config,
-                level=(level * 2) + 2,
+                module_id,
+                module_type=pedigree.module_type,
+                module_config=pedigree.module_config,
+                label=pedigree.module_type,
+                node_type="operation",
+                level=(current_level * 2) + 1,
             )
+            if edge_id is None:
+                edge_id = f"{edge_parent}:{module_id}"
             graph.add_edge(
+                edge_parent,
                 module_id,
-                input_id,
-                id=f"{module_id}:{input_id}",
-                field_name=input_name,
-                label=f"{input_name} ({child_value.data_type_name})",
+                id=edge_id,
+                field_name=field_name,
+                label=f"{field_name} ({item.data_type_name})",
             )
 
+            for input_name in sorted(pedigree.inputs.keys()):
+                child = resolver.get_item(pedigree.inputs[input_name])
+
+                if child.value_id in visited:
+                    # the module that produced the child is already part of the graph, only link it
+                    graph.add_edge(
+                        module_id,
+                        f"module:{child.pedigree.job_hash}",
+                        id=f"{module_id}:{input_name}",
+                        field_name=input_name,
+                        label=f"{input_name} ({child.data_type_name})",
+                    )
+                elif not child.is_orphan and not _depth_limit_reached(
+                    current_level + 1 - level, max_depth
+                ):
+                    visited.add(child.value_id)
+                    next_frontier.append(
+                        (child, module_id, f"{module_id}:{input_name}", input_name)
+                    )
+                else:
+                    input_id = f"value:{child.value_id}"
+
+                    graph.add_node(
+                        input_id,
+                        label=f"{input_name} ({child.data_type_name})",
+                        node_type="value",
+                        data_type=child.data_type_name,
+                        data_type_config=child.data_type_config,
+                        level=(current_level * 2) + 2,
+                    )
+                    graph.add_edge(
+                        module_id,
+                        input_id,
+                        id=f"{module_id}:{input_id}",
+                        field_name=input_name,
+                        label=f"{input_name} ({child.data_type_name})",
+                    )
+
+        frontier = next_frontier
+        current_level += 1
+
     return graph
 
 
 class ValueLineage(JupyterMixin):
-    def __init__(self, kiara: "Kiara", value: Value) -> None:
+    def __init__(
+        self, kiara: "Kiara", value: Value, max_depth: Union[int, None] = None
+    ) -> None:
         self._value: Value = value
         self._kiara: Kiara = kiara
+        self._max_depth: Union[int, None] = max_depth
         self._full_graph: Union[None, DiGraph] = None
         self._module_graph: Union[None, DiGraph] = None
 
@@ -310,7 +493,9 @@ class ValueLineage(JupyterMixin):
         if self._full_graph is not None:
             return self._full_graph
 
-        self._full_graph = create_lineage_graph(kiara=self._kiara, value=self._value)
+        self._full_graph = create_lineage_graph(
+            kiara=self._kiara, value=self._value, max_depth=self._max_depth
+        )
         return self._full_graph
 
     @property
@@ -319,7 +504,7 @@ class ValueLineage(JupyterMixin):
             return self._module_graph
 
         self._module_graph = create_lineage_graph_modules(
-            kiara=self._kiara, value=self._value
+            kiara=self._kiara, value=self._value, max_depth=self._max_depth
         ).reverse()
         return self._module_graph
 
@@ -334,6 +519,7 @@ class ValueLineage(JupyterMixin):
             value=self._value,
             include_preview=include_preview,
             include_module_info=include_module_info,
+            max_depth=self._max_depth,
         )
 
         if ensure_json_serializable:
@@ -344,7 +530,10 @@ class ValueLineage(JupyterMixin):
     def create_renderable(self, **config: Any) -> RenderableType:
         include_ids: bool = config.get("include_ids", True)
         tree = fill_renderable_lineage_tree(
-            kiara=self._kiara, pedigree=self._value.pedigree, include_ids=include_ids
+            kiara=self._kiara,
+            pedigree=self._value.pedigree,
+            include_ids=include_ids,
+            max_depth=config.get("max_depth", self._max_depth),
         )
         return tree
 
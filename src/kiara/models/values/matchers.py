@@ -1,5 +1,15 @@
 # -*- coding: utf-8 -*-
-from typing import TYPE_CHECKING, Any, List, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    List,
+    Literal,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from pydantic import Field, field_validator
 
@@ -10,6 +20,15 @@ from kiara.models.values.value import Value
 if TYPE_CHECKING:
     from kiara.context import Kiara
 
+VALUE_ITEM_TYPE = TypeVar("VALUE_ITEM_TYPE")
+
+VALUE_SORT_KEYS = {
+    "value_id": lambda v: str(v.value_id),
+    "created": lambda v: v.value_created,
+    "size": lambda v: v.value_size,
+    "data_type": lambda v: v.data_type_name,
+}
+
 
 class ValueMatcher(KiaraModel):
     """An object describing requirements values should satisfy in order to be included in a query result."""
@@ -39,6 +58,19 @@ class ValueMatcher(KiaraModel):
         description="A list of registered names of archives the value must be in. If 'None', all archives will be used.",
         default=None,
     )
+    sort_by: Union[None, Literal["value_id", "created", "size", "data_type"]] = Field(
+        description="The value attribute to sort the result by. If 'None' and paging is used, values are sorted by id.",
+        default=None,
+    )
+    sort_descending: bool = Field(
+        description="Whether to sort in descending order.", default=False
+    )
+    limit: Union[None, int] = Field(
+        description="The maximum number of values to return.", default=None, ge=0
+    )
+    offset: int = Field(
+        description="The number of (sorted) values to skip.", default=0, ge=0
+    )
 
     @field_validator("in_data_archives", mode="before")
     @classmethod
@@ -66,6 +98,57 @@ class ValueMatcher(KiaraModel):
         else:
             return list(v)
 
+    @property
+    def is_sorted(self) -> bool:
+        return self.sort_by is not None or self.limit is not None or self.offset > 0
+
+    def resolve_data_type_filter(
+        self, kiara: "Kiara"
+    ) -> Tuple[Union[None, Set[str]], Set[str]]:
+        """Resolve the data type related filters into sets of data type names, so they can be used in queries.
+
+        Returns:
+            a tuple of the data type names a value must have ('None' if not restricted), and the names of the data types it must not have
+        """
+
+        include: Union[None, Set[str]] = None
+        if self.data_types:
+            if not self.allow_sub_types:
+                include = set(self.data_types)
+            else:
+                include = set()
+                for data_type_name in kiara.type_registry.get_data_type_names(
+                    include_profiles=True
+                ):
+                    lineage = kiara.type_registry.get_type_lineage(data_type_name)
+                    if any(data_type in lineage for data_type in self.data_types):
+                        include.add(data_type_name)
+
+        exclude: Set[str] = set()
+        if not self.allow_internal:
+            exclude = {
+                data_type_name
+                for data_type_name in kiara.type_registry.get_data_type_names(
+                    include_profiles=True
+                )
+                if kiara.type_registry.is_internal_type(data_type_name=data_type_name)
+            }
+
+        return include, exclude
+
+    def sort_and_page(self, values: Iterable[VALUE_ITEM_TYPE]) -> List[VALUE_ITEM_TYPE]:
+        """Sort the provided values (or value summaries), and apply the 'limit'/'offset' options of this matcher."""
+
+        sort_key = VALUE_SORT_KEYS[self.sort_by or "value_id"]
+        result = sorted(
+            values,
+            key=lambda v: (sort_key(v), str(v.value_id)),
+            reverse=self.sort_descending,
+        )
+        if self.limit is None:
+            return result[self.offset :]
+        return result[self.offset : self.offset + self.limit]
+
     def is_match(self, value: Value, kiara: "Kiara") -> bool:
         has_alias = self.has_alias or self.alias_matchers
 
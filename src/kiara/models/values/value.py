@@ -24,8 +24,10 @@ from typing import (
     Literal,
     Mapping,
     MutableMapping,
+    NamedTuple,
     Sequence,
     Set,
+    Tuple,
     Union,
 )
 
@@ -57,7 +59,11 @@ from kiara.models.values import DataTypeCharacteristics, ValueStatus
 from kiara.models.values.value_schema import ValueSchema
 from kiara.utils import is_jupyter, log_exception
 from kiara.utils.dates import get_current_time_incl_timezone
-from kiara.utils.hashing import create_cid_digest
+from kiara.utils.hashing import (
+    FILE_HASH_BUFFER_SIZE,
+    compute_cid_from_file,
+    create_cid_digest,
+)
 from kiara.utils.json import orjson_dumps
 from kiara.utils.yaml import StringYAML
 
@@ -154,20 +160,7 @@ class SerializedPreStoreChunks(SerializedChunks):
         return create_cid_digest(digest=hash, codec=self.codec)
 
     def _create_cid_from_file(self, file: str, hash_codec: str) -> CID:
-        assert hash_codec == "sha2-256"
-
-        hash_func = hashlib.sha256
-        file_hash = hash_func()
-
-        CHUNK_SIZE = 65536
-        with open(file, "rb") as f:
-            fb = f.read(CHUNK_SIZE)
-            while len(fb) > 0:
-                file_hash.update(fb)
-                fb = f.read(CHUNK_SIZE)
-
-        wrapped = multihash.wrap(file_hash.digest(), "sha2-256")
-        return create_cid_digest(digest=wrapped, codec=self.codec)
+        return compute_cid_from_file(file=file, codec=self.codec, hash_codec=hash_codec)
 
 
 class SerializedBytes(SerializedPreStoreChunks):
@@ -347,6 +340,10 @@ class SerializedChunkIDs(SerializedChunks):
         None, description="The preferred data archive to get the chunks from."
     )
     size: int = Field(description="The size of all chunks combined.")
+    chunk_parts: Dict[str, List[str]] = Field(
+        description="The ids of the (content-defined) parts of chunks that were stored split up, by chunk id.",
+        default_factory=dict,
+    )
     _data_registry: Union["DataRegistry", None] = PrivateAttr(default=None)
 
     def get_chunks(
@@ -367,6 +364,7 @@ class SerializedChunkIDs(SerializedChunks):
             as_files=as_files,
             symlink_ok=symlink_ok,
             archive_id=self.archive_id,
+            chunk_parts=self.chunk_parts,
         )
 
         # return (
@@ -1265,6 +1263,31 @@ class Value(ValueDetails):
         return table
 
 
+class ValueSummary(NamedTuple):
+    """A lightweight projection of the most commonly displayed value attributes.
+
+    Can be read directly from indexed store columns, without creating a full 'Value' instance.
+    """
+
+    value_id: uuid.UUID
+    data_type_name: str
+    value_size: int
+    value_hash: str
+    value_created: datetime
+    aliases: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_value(cls, value: Value, aliases: Iterable[str] = ()) -> "ValueSummary":
+        return cls(
+            value_id=value.value_id,
+            data_type_name=value.data_type_name,
+            value_size=value.value_size,
+            value_hash=value.value_hash,
+            value_created=value.value_created,
+            aliases=tuple(aliases),
+        )
+
+
 class UnloadableData(KiaraModel):
     """
     A special 'marker' model, indicating that the data of value can't be loaded.
@@ -1521,6 +1544,7 @@ class ValueMapWritable(ValueMap):  # type: ignore
     )
 
     _values_uncommitted: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _open_writers: Dict[str, "ValueDataWriter"] = PrivateAttr(default_factory=dict)
     _kiara: Union["Kiara", None] = PrivateAttr(default=None)
     _data_registry: Union["DataRegistry", None] = PrivateAttr(default=None)
     _auto_commit: bool = PrivateAttr(default=True)
@@ -1567,6 +1591,11 @@ class ValueMapWritable(ValueMap):  # type: ignore
         return self.value_items[field_name]
 
     def sync_values(self):
+        if self._open_writers:
+            raise Exception(
+                f"Can't sync values: writer(s) for field(s) '{', '.join(self._open_writers.keys())}' not closed."
+            )
+
         for field_name in self.field_names:
             self.get_value_obj(field_name)
 
@@ -1599,6 +1628,164 @@ class ValueMapWritable(ValueMap):  # type: ignore
         if self._auto_commit:
             self.get_value_obj(field_name=field_name)
 
+    def open_writer(
+        self, field_name: str, file_name: Union[str, None] = None
+    ) -> "ValueDataWriter":
+        """Open a writer to set the data for the specified ('file' or 'bytes') field incrementally.
+
+        Chunks that are written are spooled to a temporary file and hashed as they arrive, so the data of a 'file'
+        output never has to be held in memory as a whole. The value is set once the writer is closed (which happens
+        automatically if it is used as a context manager).
+
+        Arguments:
+            field_name: the name of the output field
+            file_name: the file name to use for 'file' outputs (defaults to the field name)
+        """
+        if field_name not in self.field_names:
+            raise Exception(
+                f"Can't open writer for field '{field_name}': field not valid, valid field names: {', '.join(self.field_names)}."
+            )
+        if (
+            self.value_items.get(field_name, False)
+            or self._values_uncommitted.get(field_name, None) is not None
+        ):
+            raise Exception(
+                f"Can't open writer for field '{field_name}': field already set."
+            )
+        if field_name in self._open_writers.keys():
+            raise Exception(
+                f"Can't open writer for field '{field_name}': writer already open."
+            )
+
+        data_type = self.values_schema[field_name].type
+        if data_type not in VALUE_WRITER_DATA_TYPES:
+            raise Exception(
+                f"Can't open writer for field '{field_name}': data type '{data_type}' not supported, supported types: {', '.join(VALUE_WRITER_DATA_TYPES)}."
+            )
+
+        writer = ValueDataWriter(
+            value_map=self,
+            field_name=field_name,
+            data_type=data_type,
+            file_name=file_name,
+        )
+        self._open_writers[field_name] = writer
+        return writer
+
+
+VALUE_WRITER_DATA_TYPES = ("file", "bytes")
+
+
+class ValueDataWriter(object):
+    """Incrementally writes the data for a field of a 'ValueMapWritable', see 'ValueMapWritable.open_writer'."""
+
+    def __init__(
+        self,
+        value_map: ValueMapWritable,
+        field_name: str,
+        data_type: str,
+        file_name: Union[str, None] = None,
+    ):
+        self._value_map: ValueMapWritable = value_map
+        self._field_name: str = field_name
+        self._data_type: str = data_type
+        self._file_name: str = file_name if file_name else field_name
+
+        file_desc, self._path = tempfile.mkstemp()
+        self._file = os.fdopen(file_desc, "wb")
+        self._hash = hashlib.sha256()
+        self._size: int = 0
+        self._closed: bool = False
+
+    @property
+    def field_name(self) -> str:
+        return self._field_name
+
+    @property
+    def size(self) -> int:
+        """The number of bytes written so far."""
+        return self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, chunk: BytesLike) -> int:
+        """Append a chunk of bytes, returns the number of bytes written."""
+        if self._closed:
+            raise Exception(
+                f"Can't write to field '{self._field_name}': writer already closed."
+            )
+
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        size = len(chunk)
+        self._size = self._size + size
+        return size
+
+    def write_file(self, path: str) -> int:
+        """Append the content of a file (without reading it into memory as a whole), returns the number of bytes written."""
+        size = 0
+        buffer = bytearray(FILE_HASH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        with open(path, "rb") as f:
+            while read := f.readinto(buffer):
+                size = size + self.write(view[:read])
+        return size
+
+    def close(self) -> Value:
+        """Finish writing, and set the (spooled) data as value for the field."""
+        if self._closed:
+            raise Exception(
+                f"Can't close writer for field '{self._field_name}': writer already closed."
+            )
+
+        self._file.close()
+        self._closed = True
+        self._value_map._open_writers.pop(self._field_name)
+
+        data: Any
+        if self._data_type == "file":
+            from kiara.models.filesystem import KiaraFile
+
+            data = KiaraFile.load_file(self._path, file_name=self._file_name)
+            # the content was hashed while writing, no need to read the file again
+            data._file_cid = create_cid_digest(
+                digest=multihash.wrap(self._hash.digest(), "sha2-256"), codec="raw"
+            )
+            atexit.register(_remove_file, self._path)
+        else:
+            with open(self._path, "rb") as f:
+                data = f.read()
+            _remove_file(self._path)
+
+        self._value_map.set_value(self._field_name, data)
+        return self._value_map.get_value_obj(self._field_name)
+
+    def abort(self) -> None:
+        """Discard all data that was written, without setting the field value."""
+        if self._closed:
+            return
+
+        self._file.close()
+        self._closed = True
+        self._value_map._open_writers.pop(self._field_name)
+        _remove_file(self._path)
+
+    def __enter__(self) -> "ValueDataWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        elif not self._closed:
+            self.close()
+
+
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
 
 ValuePedigree.model_rebuild()
 ORPHAN = ValuePedigree(
@@ -14,6 +14,7 @@ from pydantic import Field
 from kiara.api import KiaraModuleConfig
 from kiara.exceptions import KiaraProcessingException
 from kiara.models.filesystem import FolderImportConfig, KiaraFile, KiaraFileBundle
+from kiara.models.module.jobs import JobLog
 from kiara.models.values.value import SerializedData, ValueMap
 from kiara.modules import (
     DEFAULT_NO_IDEMPOTENT_MODULE_CHARACTERISTICS,
@@ -167,7 +168,7 @@ class ImportLocalFileBundleModule(KiaraModule):
     def _retrieve_module_characteristics(self) -> ModuleCharacteristics:
         return DEFAULT_NO_IDEMPOTENT_MODULE_CHARACTERISTICS
 
-    def process(self, inputs: ValueMap, outputs: ValueMap):
+    def process(self, inputs: ValueMap, outputs: ValueMap, job_log: JobLog):
         path = inputs.get_value_data("path")
 
         include = self.get_config_value("include_file_types")
@@ -175,7 +176,9 @@ class ImportLocalFileBundleModule(KiaraModule):
 
         config = FolderImportConfig(include_files=include, exclude_files=exclude)
 
-        file_bundle = KiaraFileBundle.import_folder(source=path, import_config=config)
+        file_bundle = KiaraFileBundle.import_folder(
+            source=path, import_config=config, job_log=job_log
+        )
         outputs.set_value("file_bundle", file_bundle)
 
 
@@ -27,6 +27,7 @@ from kiara.models.values.value import (
     ValuePedigree,
 )
 from kiara.modules import KiaraModule
+from kiara.processing.profiling import JobProfiler
 from kiara.registries.ids import ID_REGISTRY
 from kiara.utils import get_dev_config, is_develop, log_exception
 from kiara.utils.dates import get_current_time_incl_timezone
@@ -62,6 +63,7 @@ class ModuleProcessor(abc.ABC):
         self._output_refs: Dict[uuid.UUID, ValueMapWritable] = {}
         self._job_records: Dict[uuid.UUID, JobRecord] = {}
         self._auto_save_jobs: Set[uuid.UUID] = set()
+        self._job_profilers: Dict[uuid.UUID, JobProfiler] = {}
 
         self._listeners: List[JobStatusListener] = []
 
@@ -79,6 +81,10 @@ class ModuleProcessor(abc.ABC):
     def register_job_status_listener(self, listener: JobStatusListener):
         self._listeners.append(listener)
 
+    def unregister_job_status_listener(self, listener: JobStatusListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
     def get_job(self, job_id: uuid.UUID) -> ActiveJob:
         if job_id in self._active_jobs.keys():
             return self._active_jobs[job_id]
@@ -86,6 +92,8 @@ class ModuleProcessor(abc.ABC):
             return self._finished_jobs[job_id]
         elif job_id in self._failed_jobs.keys():
             return self._failed_jobs[job_id]
+        elif job_id in self._created_jobs.keys():
+            return self._created_jobs[job_id]["job"]
         else:
             raise Exception(f"No job with id '{job_id}' registered.")
 
@@ -196,12 +204,16 @@ class ModuleProcessor(abc.ABC):
         self._active_jobs[job_id] = job  # type: ignore
         self._output_refs[job_id] = outputs  # type: ignore
 
-        input_values = self._kiara.data_registry.load_values(job_config.inputs)
-
-        if module.is_pipeline():
-            module._set_job_registry(self._kiara.job_registry)  # type: ignore
+        profiler = JobProfiler(kiara=self._kiara, job_id=job_id, module=module)
+        self._job_profilers[job_id] = profiler
 
         try:
+            with profiler.phase("load_inputs"):
+                input_values = self._kiara.data_registry.load_values(job_config.inputs)
+
+            if module.is_pipeline():
+                module._set_job_registry(self._kiara.job_registry)  # type: ignore
+
             self._add_processing_task(
                 job_id=job_id,
                 module=module,
@@ -212,6 +224,7 @@ class ModuleProcessor(abc.ABC):
             return job
 
         except Exception as e:
+            self._finish_profiler(job_id)
             msg = str(e)
             if not msg:
                 msg = repr(e)
@@ -256,8 +269,13 @@ class ModuleProcessor(abc.ABC):
             job.status = JobStatus.SUCCESS
             job.finished = get_current_time_incl_timezone()
             result_values = self._output_refs[job_id]
+            profiler = self._job_profilers.get(job_id, None)
             try:
-                result_values.sync_values()
+                if profiler is None:
+                    result_values.sync_values()
+                else:
+                    with profiler.phase("sync_outputs"):
+                        result_values.sync_values()
                 for field, val in result_values.items():
                     val.job_id = job_id
 
@@ -267,6 +285,8 @@ class ModuleProcessor(abc.ABC):
                 job_record = JobRecord.from_active_job(
                     active_job=job, kiara=self._kiara
                 )
+                if profiler is not None:
+                    job_record.runtime_details.profile = profiler.profile  # type: ignore
                 self._job_records[job_id] = job_record
                 self._finished_jobs[job_id] = job
             except Exception as e:
@@ -364,18 +384,49 @@ class ModuleProcessor(abc.ABC):
             job_id=job_id, old_status=old_status, new_status=job.status
         )
 
-        if status is JobStatus.SUCCESS:
-            if job_id in self._auto_save_jobs:
+        try:
+            if status is JobStatus.SUCCESS and job_id in self._auto_save_jobs:
                 assert result_values is not None
+                profiler = self._job_profilers.get(job_id, None)
                 try:
-                    for val in result_values.values():
-                        self._kiara.data_registry.store_value(val)
+                    if profiler is None:
+                        for val in result_values.values():
+                            self._kiara.data_registry.store_value(val)
+                    else:
+                        with profiler.phase("auto_save"):
+                            for val in result_values.values():
+                                self._kiara.data_registry.store_value(val)
                 except Exception as e:
                     log_exception(e)
                     raise KiaraException(
                         msg=f"Failed to auto-save job results for job: {job_id}",
                         parent=e,
                     )
+        finally:
+            if status in [JobStatus.SUCCESS, JobStatus.FAILED]:
+                self._finish_profiler(job_id)
+
+    def _finish_profiler(self, job_id: uuid.UUID):
+        profiler = self._job_profilers.pop(job_id, None)
+        if profiler is not None:
+            profiler.finish()
+
+    def _run_process_step(
+        self,
+        job_id: uuid.UUID,
+        module: "KiaraModule",
+        inputs: ValueMap,
+        outputs: ValueMapWritable,
+        job_log: JobLog,
+    ):
+        """Run the 'process' method of the module, profiling it if a profiler for the job exists."""
+
+        profiler = self._job_profilers.get(job_id, None)
+        if profiler is None:
+            module.process_step(inputs=inputs, outputs=outputs, job_log=job_log)
+        else:
+            with profiler.phase("process"):
+                module.process_step(inputs=inputs, outputs=outputs, job_log=job_log)
 
     def wait_for(self, *job_ids: uuid.UUID):
         """Wait for the jobs with the specified ids, also optionally sync their outputs with the pipeline value state."""
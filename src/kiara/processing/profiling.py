@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import sys
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generator,
+    List,
+    NamedTuple,
+    Tuple,
+    Union,
+)
+
+from kiara.models.module.jobs import JobPhaseProfile, JobProfile
+from kiara.utils import get_dev_config, is_develop, log_message
+from kiara.utils.tracing import span
+
+if TYPE_CHECKING:
+    from kiara.context import Kiara
+    from kiara.modules import KiaraModule
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None  # type: ignore
+
+_ACTIVE = threading.local()
+
+# the profilers of the (outermost) jobs that are currently running, in any thread
+_RUNNING_LOCK = threading.Lock()
+_RUNNING: "weakref.WeakSet[JobProfiler]" = weakref.WeakSet()
+
+
+def _get_active_profilers() -> List["JobProfiler"]:
+    profilers = getattr(_ACTIVE, "profilers", None)
+    if profilers is None:
+        profilers = []
+        _ACTIVE.profilers = profilers
+    return profilers
+
+
+def _read_max_rss() -> Union[int, None]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _read_io_counters() -> Tuple[Union[int, None], Union[int, None]]:
+    try:
+        with open("/proc/self/io", "rb") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None, None
+
+    read = written = None
+    for line in lines:
+        if line.startswith(b"rchar:"):
+            read = int(line[6:])
+        elif line.startswith(b"wchar:"):
+            written = int(line[6:])
+    return read, written
+
+
+class _Sample(NamedTuple):
+    wall_time: float
+    cpu_time: float
+    max_rss: Union[int, None]
+    bytes_read: Union[int, None]
+    bytes_written: Union[int, None]
+    cache_hits: int
+    cache_misses: int
+
+
+def _delta(end: Union[int, None], start: Union[int, None]) -> Union[int, None]:
+    if end is None or start is None:
+        return None
+    return end - start
+
+
+class JobProfiler(object):
+    """Collects the resource usage of a job, per processing phase.
+
+    Each phase is also recorded as tracing span (if tracing is enabled).
+
+    Profilers of jobs that are run while another job is processed (e.g. metadata extraction jobs, or pipeline steps)
+    report their totals to the profiler of the outer job, which records them as a separate phase and excludes them from
+    the numbers of its own phase.
+
+    Only wall and cpu time are measured per job (thread), memory, I/O and cache numbers are process-wide, so they are
+    not recorded for phases during which other jobs ran (e.g. in a job batch, or via the async api).
+
+    If enabled in the develop configuration, a cProfile/pyinstrument dump is written for the job as well.
+    """
+
+    def __init__(self, kiara: "Kiara", job_id: uuid.UUID, module: "KiaraModule"):
+        self._kiara: Kiara = kiara
+        self._job_id: uuid.UUID = job_id
+        self._module_type: str = module.module_type_name
+        self._nested_phase_name: str = (
+            "extract_metadata"
+            if module.module_type_name == "value.extract_metadata"
+            else "nested_jobs"
+        )
+        self._profile: JobProfile = JobProfile()
+        self._nested: Union[JobPhaseProfile, None] = None
+        self._finished: bool = False
+
+        active = _get_active_profilers()
+        self._parent: Union[JobProfiler, None] = active[-1] if active else None
+        active.append(self)
+
+        # incremented whenever another job starts while this one is running
+        self._no_overlapping_jobs: int = 0
+        if self._parent is None:
+            with _RUNNING_LOCK:
+                for other in _RUNNING:
+                    other._no_overlapping_jobs += 1
+                    self._no_overlapping_jobs += 1
+                _RUNNING.add(self)
+
+        self._dump_profiler: Any = None
+        self._dump_file: Union[Path, None] = None
+        if is_develop():
+            settings = get_dev_config().job_profile
+            if settings.enabled and (
+                not module.characteristics.is_internal or settings.internal_modules
+            ):
+                self._start_dump_profiler(
+                    profiler=settings.profiler, output_folder=settings.output_folder
+                )
+
+    @property
+    def profile(self) -> JobProfile:
+        return self._profile
+
+    @property
+    def _root(self) -> "JobProfiler":
+        root = self
+        while root._parent is not None:
+            root = root._parent
+        return root
+
+    def _start_dump_profiler(self, profiler: str, output_folder: Union[str, None]):
+        if getattr(_ACTIVE, "dump_profiler_active", False):
+            # the outer job is already profiled, and its dump includes this job
+            return
+
+        if output_folder:
+            folder = Path(output_folder)
+        else:
+            from kiara.defaults import JOB_PROFILES_DIR
+
+            folder = JOB_PROFILES_DIR
+        folder.mkdir(parents=True, exist_ok=True)
+
+        if profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ImportError(
+                    "Can't profile job, pyinstrument is not installed. Please add the 'pyinstrument' package to your environment, or use the 'cprofile' profiler."
+                )
+            self._dump_profiler = Profiler()
+            self._dump_profiler.start()
+            self._dump_file = folder / f"{self._job_id}.html"
+        else:
+            import cProfile
+
+            self._dump_profiler = cProfile.Profile()
+            self._dump_profiler.enable()
+            self._dump_file = folder / f"{self._job_id}.prof"
+
+        _ACTIVE.dump_profiler_active = True
+
+    def _stop_dump_profiler(self):
+        if self._dump_profiler is None:
+            return
+
+        assert self._dump_file is not None
+        _ACTIVE.dump_profiler_active = False
+        try:
+            if self._dump_file.suffix == ".html":
+                self._dump_profiler.stop()
+                self._dump_file.write_text(self._dump_profiler.output_html())
+            else:
+                self._dump_profiler.disable()
+                self._dump_profiler.dump_stats(self._dump_file.as_posix())
+            self._profile.profile_file = self._dump_file.as_posix()
+        except Exception as e:
+            log_message(
+                "ignore.job_profile_dump",
+                reason="failed to write profiler dump",
+                job_id=str(self._job_id),
+                error=e,
+            )
+        self._dump_profiler = None
+
+    def _sample(self) -> _Sample:
+        hits = misses = 0
+        for stats in self._kiara.data_registry.cache_stats.values():
+            hits += stats.hits + getattr(stats, "weak_hits", 0)
+            misses += stats.misses
+
+        bytes_read, bytes_written = _read_io_counters()
+        return _Sample(
+            wall_time=time.perf_counter(),
+            cpu_time=time.thread_time(),
+            max_rss=_read_max_rss(),
+            bytes_read=bytes_read,
+            bytes_written=bytes_written,
+            cache_hits=hits,
+            cache_misses=misses,
+        )
+
+    @contextmanager
+    def phase(self, phase_name: str) -> Generator[None, None, None]:
+        """Record the resource usage of the wrapped code as (part of) the specified phase."""
+
+        nested = JobPhaseProfile()
+        self._nested = nested
+        root = self._root
+        with _RUNNING_LOCK:
+            concurrent = len(_RUNNING) > 1
+            overlapping_at_start = root._no_overlapping_jobs
+        start = self._sample()
+        try:
+            with span(
+                f"job.{phase_name}",
+                job_id=str(self._job_id),
+                module_type=self._module_type,
+            ):
+                yield
+        finally:
+            end = self._sample()
+            self._nested = None
+
+            with _RUNNING_LOCK:
+                concurrent = (
+                    concurrent
+                    or len(_RUNNING) > 1
+                    or root._no_overlapping_jobs != overlapping_at_start
+                )
+
+            phase = JobPhaseProfile(
+                wall_time=max(0.0, end.wall_time - start.wall_time - nested.wall_time),
+                cpu_time=max(0.0, end.cpu_time - start.cpu_time - nested.cpu_time),
+            )
+            if concurrent:
+                # process-wide numbers would include those of the other jobs
+                phase.cache_hits = None
+                phase.cache_misses = None
+            else:
+                bytes_read = _delta(end.bytes_read, start.bytes_read)
+                bytes_written = _delta(end.bytes_written, start.bytes_written)
+                phase.peak_rss_delta = _delta(end.max_rss, start.max_rss)
+                if bytes_read is not None:
+                    phase.bytes_read = bytes_read - (nested.bytes_read or 0)
+                if bytes_written is not None:
+                    phase.bytes_written = bytes_written - (nested.bytes_written or 0)
+                phase.cache_hits = (
+                    end.cache_hits - start.cache_hits - (nested.cache_hits or 0)
+                )
+                phase.cache_misses = (
+                    end.cache_misses - start.cache_misses - (nested.cache_misses or 0)
+                )
+            self._add_phase(phase_name, phase)
+
+    def _add_phase(self, phase_name: str, phase: JobPhaseProfile):
+        existing = self._profile.phases.get(phase_name, None)
+        if existing is None:
+            self._profile.phases[phase_name] = phase
+        else:
+            existing.add(phase)
+
+    def _add_nested_job(self, phase_name: str, totals: JobPhaseProfile):
+        if self._nested is not None:
+            self._nested.add(totals)
+        self._add_phase(phase_name, totals.model_copy())
+
+    def finish(self):
+        """Stop profiling, and report the totals of this job to the profiler of the outer job (if there is one)."""
+
+        if self._finished:
+            return
+        self._finished = True
+
+        self._stop_dump_profiler()
+
+        active = _get_active_profilers()
+        if self in active:
+            active.remove(self)
+        if self._parent is None:
+            with _RUNNING_LOCK:
+                _RUNNING.discard(self)
+
+        if self._parent is not None and not self._parent._finished:
+            self._parent._add_nested_job(
+                self._nested_phase_name, self._profile.get_totals()
+            )
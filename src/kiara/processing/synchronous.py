@@ -32,7 +32,13 @@ class SynchronousProcessor(ModuleProcessor):
     ):
         self.job_status_updated(job_id=job_id, status=JobStatus.STARTED)
         try:
-            module.process_step(inputs=inputs, outputs=outputs, job_log=job_log)
+            self._run_process_step(
+                job_id=job_id,
+                module=module,
+                inputs=inputs,
+                outputs=outputs,
+                job_log=job_log,
+            )
             # output_wrap._sync()
             self.job_status_updated(job_id=job_id, status=JobStatus.SUCCESS)
         except Exception as e:
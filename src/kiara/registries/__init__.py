@@ -406,9 +406,12 @@ class SqliteArchiveConfig(ArchiveConfig):
         conn.close()
 
         use_wal_mode = kwargs.get("wal_mode", False)
+        performance_profile = kwargs.get("performance_profile", "default")
 
         return SqliteArchiveConfig(
-            sqlite_db_path=archive_path, use_wal_mode=use_wal_mode
+            sqlite_db_path=archive_path,
+            use_wal_mode=use_wal_mode,
+            performance_profile=performance_profile,
         )
 
     sqlite_db_path: str = Field(
@@ -417,6 +420,12 @@ class SqliteArchiveConfig(ArchiveConfig):
     use_wal_mode: bool = Field(
         description="Whether to use WAL mode for the SQLite database.", default=False
     )
+    performance_profile: Literal[  # type: ignore
+        "default", "durable", "fast-bulk-load", "read-mostly"
+    ] = Field(
+        description="The performance profile, determines the PRAGMAs that are set on every connection to the database (e.g. 'synchronous', 'cache_size', 'mmap_size').",
+        default="default",
+    )
 
 
 class SqliteDataStoreConfig(SqliteArchiveConfig):
@@ -466,11 +475,13 @@ class SqliteDataStoreConfig(SqliteArchiveConfig):
         conn.close()
 
         use_wal_mode = kwargs.get("wal_mode", False)
+        performance_profile = kwargs.get("performance_profile", "default")
 
         return SqliteDataStoreConfig(
             sqlite_db_path=archive_path,
             default_chunk_compression=default_chunk_compression,
             use_wal_mode=use_wal_mode,
+            performance_profile=performance_profile,
         )
 
     default_chunk_compression: Literal["none", "lz4", "zstd", "lzma"] = Field(  # type: ignore
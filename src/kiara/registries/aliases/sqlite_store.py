@@ -62,6 +62,7 @@ class SqliteAliasArchive(AliasArchive):
         self._db_path: Union[Path, None] = None
         self._cached_engine: Union[Engine, None] = None
         self._use_wal_mode: bool = archive_config.use_wal_mode
+        self._performance_profile: str = archive_config.performance_profile
         # self._lock: bool = True
 
     def _retrieve_archive_metadata(self) -> Mapping[str, Any]:
@@ -99,6 +100,8 @@ class SqliteAliasArchive(AliasArchive):
             db_path=self.sqlite_path,
             force_read_only=self.is_force_read_only(),
             use_wal_mode=self._use_wal_mode,
+            performance_profile=self._performance_profile,
+            record_profile=self.is_writeable(),
         )
 
         create_table_sql = f"""
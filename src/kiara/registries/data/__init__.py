@@ -73,11 +73,13 @@ from kiara.models.values.value import (
     ValueMap,
     ValueMapReadOnly,
     ValuePedigree,
+    ValueSummary,
 )
 from kiara.models.values.value_schema import ValueSchema
 from kiara.registries.data.data_store import DataArchive, DataStore
 from kiara.registries.ids import ID_REGISTRY
 from kiara.utils import log_exception, log_message
+from kiara.utils.caching import CacheStats, LRUCache, TieredCache
 from kiara.utils.data import pretty_print_data
 from kiara.utils.hashing import NONE_CID
 from kiara.utils.stores import check_external_archive
@@ -88,6 +90,7 @@ if TYPE_CHECKING:
     from kiara.context import Kiara
     from kiara.models.module.destiny import Destiny
     from kiara.models.module.manifest import Manifest
+    from kiara.models.values.lineage import LineageItem
 
 
 logger = structlog.getLogger()
@@ -216,15 +219,30 @@ class DataRegistry(object):
         self._data_archives: Dict[str, DataArchive] = {}
 
         self._default_data_store: Union[str, None] = None
-        self._registered_values: Dict[uuid.UUID, Value] = {}
 
-        self._value_archive_lookup_map: Dict[uuid.UUID, str] = {}
-        """A cached dict that stores which archives which value ids belong to."""
+        cache_size = self._kiara.runtime_config.value_cache_size
+        self._registered_values: TieredCache[uuid.UUID, Value] = TieredCache(
+            max_size=cache_size
+        )
+        """All values of this session, values that only exist in memory are pinned, stored ones can be evicted and re-loaded."""
+
+        self._value_archive_lookup_map: LRUCache[uuid.UUID, str] = LRUCache(
+            max_size=cache_size
+        )
+        """A cache that stores which archives which value ids belong to."""
 
-        self._values_by_hash: Dict[str, Set[uuid.UUID]] = {}
+        self._values_by_hash: TieredCache[str, Set[uuid.UUID]] = TieredCache(
+            max_size=cache_size
+        )
+        """Value ids by hash, entries that contain ids of values that only exist in memory are pinned."""
 
-        self._cached_data: Dict[uuid.UUID, Any] = {}
-        self._persisted_value_descs: Dict[uuid.UUID, Union[PersistedData, None]] = {}
+        self._cached_data: TieredCache[uuid.UUID, Any] = TieredCache(
+            max_size=cache_size
+        )
+        """The (deserialized) payloads of values, in-memory values also hold on to their own data, so only the special values are pinned."""
+        self._persisted_value_descs: TieredCache[uuid.UUID, PersistedData] = (
+            TieredCache(max_size=cache_size)
+        )
 
         self._alias_resolver: AliasResolver = DefaultAliasResolver(kiara=self._kiara)
 
@@ -253,9 +271,11 @@ class DataRegistry(object):
             data_type_info=data_type_info,
         )
         self._not_set_value._data_registry = self
-        self._cached_data[NOT_SET_VALUE_ID] = SpecialValue.NOT_SET
-        self._registered_values[NOT_SET_VALUE_ID] = self._not_set_value
-        self._persisted_value_descs[NOT_SET_VALUE_ID] = NONE_PERSISTED_DATA
+        self._cached_data.put(NOT_SET_VALUE_ID, SpecialValue.NOT_SET, pinned=True)
+        self._registered_values.put(NOT_SET_VALUE_ID, self._not_set_value, pinned=True)
+        self._persisted_value_descs.put(
+            NOT_SET_VALUE_ID, NONE_PERSISTED_DATA, pinned=True
+        )
         # self._env_cache: Dict[str, Dict[str, RuntimeEnvironment]] = {}
 
         self._none_value: Value = Value(
@@ -276,9 +296,9 @@ class DataRegistry(object):
             data_type_info=data_type_info,
         )
         self._none_value._data_registry = self
-        self._cached_data[NONE_VALUE_ID] = SpecialValue.NO_VALUE
-        self._registered_values[NONE_VALUE_ID] = self._none_value
-        self._persisted_value_descs[NONE_VALUE_ID] = NONE_PERSISTED_DATA
+        self._cached_data.put(NONE_VALUE_ID, SpecialValue.NO_VALUE, pinned=True)
+        self._registered_values.put(NONE_VALUE_ID, self._none_value, pinned=True)
+        self._persisted_value_descs.put(NONE_VALUE_ID, NONE_PERSISTED_DATA, pinned=True)
 
         self._cached_value_aliases: Dict[
             uuid.UUID, Dict[str, Union[Destiny, None]]
@@ -308,6 +328,13 @@ class DataRegistry(object):
 
         return result
 
+    def flush_value_id_filters(self):
+        """Persist the value id filters of all data stores that were written to since they were last persisted."""
+
+        for archive in self._data_archives.values():
+            if isinstance(archive, DataStore):
+                archive.flush_value_id_filter()
+
     def register_data_archive(
         self,
         archive: DataArchive,
@@ -400,16 +427,54 @@ class DataRegistry(object):
             f"Can't retrieve archive with id '{archive_id_or_alias}': no archive with that id registered."
         )
 
-    def find_store_id_for_value(self, value_id: uuid.UUID) -> Union[str, None]:
-        if value_id in self._value_archive_lookup_map.keys():
-            return self._value_archive_lookup_map[value_id]
+    @property
+    def cache_stats(self) -> Dict[str, CacheStats]:
+        """Usage statistics of the in-memory value caches of this registry, and of all registered data archives."""
+
+        result: Dict[str, CacheStats] = {
+            "registered_values": self._registered_values.stats,
+            "value_archive_lookup": self._value_archive_lookup_map.stats,
+            "values_by_hash": self._values_by_hash.stats,
+            "value_data": self._cached_data.stats,
+            "persisted_value_details": self._persisted_value_descs.stats,
+        }
+        for archive_id, archive in self._data_archives.items():
+            for cache_name, stats in archive.cache_stats.items():
+                result[f"{archive_id}.{cache_name}"] = stats
+        return result
+
+    def _find_archive_ids_for_value(self, value_id: uuid.UUID) -> List[str]:
+        """Find the ids of all archives that contain the specified value.
+
+        Only archives whose value id filter matches are queried. If none of those contains the value, the (skipped)
+        writeable archives are queried as well, since their filters might be out of date if values were added to
+        them from elsewhere.
+        """
 
         matches = []
+        skipped: List[Tuple[str, DataArchive]] = []
         for store_id, store in self.data_archives.items():
-            match = store.has_value(value_id=value_id)
-            if match:
+            if not store.might_contain_value(value_id):
+                if store.is_writeable():
+                    skipped.append((store_id, store))
+                continue
+            if store.has_value(value_id=value_id):
                 matches.append(store_id)
 
+        if not matches:
+            for store_id, store in skipped:
+                if store.has_value(value_id=value_id):
+                    store.invalidate_value_id_filter()
+                    matches.append(store_id)
+
+        return matches
+
+    def find_store_id_for_value(self, value_id: uuid.UUID) -> Union[str, None]:
+        cached = self._value_archive_lookup_map.get(value_id, None)
+        if cached is not None:
+            return cached
+
+        matches = self._find_archive_ids_for_value(value_id)
         if len(matches) == 0:
             return None
         elif len(matches) > 1:
@@ -417,7 +482,7 @@ class DataRegistry(object):
                 f"Found value with id '{value_id}' in multiple archives, this is not supported (yet): {matches}"
             )
 
-        self._value_archive_lookup_map[value_id] = matches[0]
+        self._value_archive_lookup_map.put(value_id, matches[0])
         return matches[0]
 
     def get_value(self, value: Union[uuid.UUID, ValueLink, str, Path]) -> Value:
@@ -454,20 +519,18 @@ class DataRegistry(object):
 
         assert _value_id is not None
 
-        if _value_id in self._registered_values.keys():
-            _value = self._registered_values[_value_id]
+        _value = self._registered_values.get(_value_id, None)
+        if _value is not None:
             return _value
 
         default_store: DataArchive = self.get_archive(
             archive_id_or_alias=self.default_data_store
         )
-        if not default_store.has_value(value_id=_value_id):
-            matches = []
-            for store_id, store in self.data_archives.items():
-                match = store.has_value(value_id=_value_id)
-                if match:
-                    matches.append(store_id)
-
+        if not (
+            default_store.might_contain_value(_value_id)
+            and default_store.has_value(value_id=_value_id)
+        ):
+            matches = self._find_archive_ids_for_value(_value_id)
             if len(matches) == 0:
                 raise NoSuchValueIdException(
                     value_id=_value_id, msg=f"No value registered with id: {value}"
@@ -481,7 +544,7 @@ class DataRegistry(object):
         else:
             store_that_has_it = self.default_data_store
 
-        self._value_archive_lookup_map[_value_id] = store_that_has_it
+        self._value_archive_lookup_map.put(_value_id, store_that_has_it)
 
         stored_value = self.get_archive(store_that_has_it).retrieve_value(
             value_id=_value_id
@@ -489,8 +552,51 @@ class DataRegistry(object):
         stored_value._set_registry(self)
         stored_value._is_stored = True
 
-        self._registered_values[_value_id] = stored_value
-        return self._registered_values[_value_id]
+        self._registered_values.put(_value_id, stored_value)
+        return stored_value
+
+    def retrieve_lineage_items(
+        self, value_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, "LineageItem"]:
+        """Retrieve the details needed to assemble lineage graphs for the specified values.
+
+        Values that are already registered are used directly, all others are queried in batches from the registered
+        archives (starting with the default store), without registering or creating full 'Value' instances.
+        """
+        from kiara.models.values.lineage import LineageItem
+
+        result: Dict[uuid.UUID, LineageItem] = {}
+        missing: Set[uuid.UUID] = set()
+        for value_id in value_ids:
+            value = self._registered_values.get(value_id, None)
+            if value is not None:
+                result[value_id] = LineageItem.from_value(value)
+            else:
+                missing.add(value_id)
+
+        if not missing:
+            return result
+
+        archive_ids = [self.default_data_store] + [
+            x for x in self._data_archives.keys() if x != self.default_data_store
+        ]
+        for archive_id in archive_ids:
+            items = self._data_archives[archive_id].retrieve_lineage_items(missing)
+            for value_id, item in items.items():
+                if value_id not in self._value_archive_lookup_map:
+                    self._value_archive_lookup_map.put(value_id, archive_id)
+                result[value_id] = item
+                missing.discard(value_id)
+            if not missing:
+                break
+
+        if missing:
+            value_id = next(iter(missing))
+            raise NoSuchValueIdException(
+                value_id=value_id, msg=f"No value registered with id: {value_id}"
+            )
+
+        return result
 
     def _persist_environment(self, env_hash: str, store: Union[str, None]):
         # cached = self._env_cache.get(env_type, {}).get(env_hash, None)
@@ -550,8 +656,11 @@ class DataRegistry(object):
                 persisted_value = store.store_value(_value)
                 _value._is_stored = True
 
-                self._value_archive_lookup_map[_value.value_id] = _data_store
-                self._persisted_value_descs[_value.value_id] = persisted_value
+                self._value_archive_lookup_map.put(_value.value_id, _data_store)
+                self._persisted_value_descs.put(_value.value_id, persisted_value)
+                # the value can be re-loaded from the store now, so it doesn't need to be pinned anymore
+                self._registered_values.put(_value.value_id, _value)
+                self._unpin_value_hash(_value.value_hash)
                 property_values = _value.property_values
 
                 for property, property_value in property_values.items():
@@ -595,26 +704,35 @@ class DataRegistry(object):
         return value_info
 
     def find_values(self, matcher: ValueMatcher) -> Dict[uuid.UUID, Value]:
+        # archives sort and page their own results, but since we might have to merge results from several ones,
+        # the final paging happens here
+        store_matcher = matcher
+        if matcher.offset:
+            limit = None if matcher.limit is None else matcher.offset + matcher.limit
+            store_matcher = matcher.model_copy(update={"offset": 0, "limit": limit})
+
         matches: Dict[uuid.UUID, Value] = {}
         for store_id, store in self.data_archives.items():
             if matcher.in_data_archives and store_id not in matcher.in_data_archives:
                 continue
 
             try:
-                _matches = store.find_values(matcher=matcher)
+                _matches = store.find_values(matcher=store_matcher)
                 for value in _matches:
                     if value.value_id in matches.keys():
                         raise Exception(
                             f"Found value '{value.value_id}' multiple times, this is not supported yet."
                         )
-                    self._value_archive_lookup_map[value.value_id] = store_id
+                    self._value_archive_lookup_map.put(value.value_id, store_id)
                     value._set_registry(self)
                     value._is_stored = True
-                    self._registered_values[value.value_id] = value
+                    self._registered_values.put(value.value_id, value)
                     matches[value.value_id] = value
-                    self._values_by_hash.setdefault(value.value_hash, set()).add(
-                        value.value_id
-                    )
+                    hash_ids = self._values_by_hash.get(value.value_hash, None)
+                    if hash_ids is None:
+                        self._values_by_hash.put(value.value_hash, {value.value_id})
+                    else:
+                        hash_ids.add(value.value_id)
             except NotImplementedError:
                 log_message(
                     "store.feature.missing",
@@ -631,7 +749,7 @@ class DataRegistry(object):
                     value._set_registry(self)
                     value._is_stored = True
 
-                    self._registered_values[value.value_id] = value
+                    self._registered_values.put(value.value_id, value)
 
                     match = matcher.is_match(value, kiara=self._kiara)
                     if match:
@@ -641,8 +759,75 @@ class DataRegistry(object):
                             )
                         matches[value.value_id] = value
 
+        if matcher.is_sorted:
+            matches = {v.value_id: v for v in matcher.sort_and_page(matches.values())}
+
         return matches
 
+    def find_value_summaries(
+        self, matcher: ValueMatcher
+    ) -> Generator[ValueSummary, None, None]:
+        """Find summaries of all matching values, including their aliases.
+
+        If only a single archive needs to be queried, or no sorting/paging is requested, results are streamed
+        directly from the archive(s), otherwise they are merged and paged here.
+        """
+
+        aliases_by_id = self._kiara.alias_registry.aliases_by_id
+
+        def add_aliases(summary: ValueSummary) -> ValueSummary:
+            alias_items = aliases_by_id.get(summary.value_id, None)
+            if not alias_items:
+                return summary
+            return summary._replace(
+                aliases=tuple(sorted(a.full_alias for a in alias_items))
+            )
+
+        archives = [
+            (store_id, store)
+            for store_id, store in self.data_archives.items()
+            if not matcher.in_data_archives or store_id in matcher.in_data_archives
+        ]
+
+        store_matcher = matcher
+        merge_required = matcher.is_sorted and len(archives) > 1
+        if merge_required and matcher.offset:
+            limit = None if matcher.limit is None else matcher.offset + matcher.limit
+            store_matcher = matcher.model_copy(update={"offset": 0, "limit": limit})
+
+        summaries: List[ValueSummary] = []
+        for store_id, store in archives:
+            _summaries = iter(store.find_value_summaries(matcher=store_matcher))
+            try:
+                first = next(_summaries, None)
+            except NotImplementedError:
+                # fall back to checking every value of this archive individually
+                _matcher = store_matcher.model_copy(
+                    update={"in_data_archives": [store_id]}
+                )
+                _summaries = iter(
+                    [
+                        ValueSummary.from_value(v)
+                        for v in self.find_values(matcher=_matcher).values()
+                    ]
+                )
+                first = next(_summaries, None)
+
+            if first is None:
+                continue
+
+            if merge_required:
+                summaries.append(first)
+                summaries.extend(_summaries)
+            else:
+                yield add_aliases(first)
+                for summary in _summaries:
+                    yield add_aliases(summary)
+
+        if merge_required:
+            for summary in matcher.sort_and_page(summaries):
+                yield add_aliases(summary)
+
     def find_values_with_aliases(self, matcher: ValueMatcher) -> Dict[str, Value]:
         matcher = matcher.model_copy(update={"has_aliases": True})
         all_values = self.find_values(matcher)
@@ -657,6 +842,20 @@ class DataRegistry(object):
 
         return result
 
+    def _unpin_value_hash(self, value_hash: str) -> None:
+        """Unpin the hash index entry for a hash, once all values with that hash are persisted."""
+
+        hash_ids = self._values_by_hash.get(value_hash, None)
+        if hash_ids is None:
+            return
+
+        for value_id in hash_ids:
+            value = self._registered_values.get(value_id, None)
+            if value is not None and not value.is_stored:
+                return
+
+        self._values_by_hash.put(value_hash, hash_ids)
+
     def find_values_for_hash(
         self, value_hash: str, data_type_name: Union[str, None] = None
     ) -> Set[Value]:
@@ -679,11 +878,11 @@ class DataRegistry(object):
                     raise Exception(
                         f"Found multiple stores for value id '{v_id}', this is not supported (yet)."
                     )
-                self._value_archive_lookup_map[v_id] = store_ids[0]
+                self._value_archive_lookup_map.put(v_id, store_ids[0])
                 stored.add(v_id)
 
             if stored:
-                self._values_by_hash[value_hash] = stored
+                self._values_by_hash.put(value_hash, stored)
 
         return {self.get_value(value=v_id) for v_id in stored}
 
@@ -836,9 +1035,14 @@ class DataRegistry(object):
         )
 
         if newly_created:
-            self._values_by_hash.setdefault(value.value_hash, set()).add(value.value_id)
-            self._registered_values[value.value_id] = value
-            self._cached_data[value.value_id] = data
+            # the value only exists in memory for now, so neither it nor its hash index entry can be evicted
+            hash_ids = self._values_by_hash.get(value.value_hash, None)
+            if hash_ids is None:
+                hash_ids = set()
+            hash_ids.add(value.value_id)
+            self._values_by_hash.put(value.value_hash, hash_ids, pinned=True)
+            self._registered_values.put(value.value_id, value, pinned=True)
+            self._cached_data.put(value.value_id, data)
 
             event = ValueRegisteredEvent(kiara_id=self._kiara.id, value=value)
             self._event_callback(event)
@@ -860,7 +1064,7 @@ class DataRegistry(object):
             raise NotImplementedError()
 
         if isinstance(data, Value):
-            if data.value_id in self._registered_values.keys():
+            if data.value_id in self._registered_values:
                 if data.is_set and data.is_serializable:
                     serialized: Union[str, SerializedData] = data.serialized_data
                 else:
@@ -934,7 +1138,7 @@ class DataRegistry(object):
                             existing_value = orphans[0]
 
         if existing_value is not None:
-            self._persisted_value_descs[existing_value.value_id] = None
+            self._persisted_value_descs.pop(existing_value.value_id)
             return (
                 existing_value,
                 data_type,
@@ -1076,13 +1280,8 @@ class DataRegistry(object):
         return (value, True)
 
     def retrieve_persisted_value_details(self, value_id: uuid.UUID) -> PersistedData:
-        if (
-            value_id in self._persisted_value_descs.keys()
-            and self._persisted_value_descs[value_id] is not None
-        ):
-            persisted_details = self._persisted_value_descs[value_id]
-            assert persisted_details is not None
-        else:
+        persisted_details = self._persisted_value_descs.get(value_id, None)
+        if persisted_details is None:
             # now, the value_store map should contain this value_id
             store_id = self.find_store_id_for_value(value_id=value_id)
             if store_id is None:
@@ -1091,12 +1290,10 @@ class DataRegistry(object):
                 )
 
             store = self.get_archive(store_id)
-            assert value_id in self._registered_values.keys()
-            # self.get_value(value_id=value_id)
             persisted_details = store.retrieve_serialized_value(value=value_id)
             for c in persisted_details.chunk_id_map.values():
                 c._data_registry = self._kiara.data_registry
-            self._persisted_value_descs[value_id] = persisted_details
+            self._persisted_value_descs.put(value_id, persisted_details)
 
         return persisted_details
 
@@ -1139,12 +1336,15 @@ class DataRegistry(object):
         as_files: bool = True,
         symlink_ok: bool = True,
         archive_id: Union[uuid.UUID, None] = None,
+        chunk_parts: Union[Mapping[str, Sequence[str]], None] = None,
     ) -> Generator[Union[str, "BytesLike"], None, None]:
         """Return the chunk content in the same order as the 'chunk_ids' argument.
 
         If 'as_files' is 'True', it will return strings representing paths to files containing the chunk data. If symlink_ok is also set to 'True', the returning Path could potentially be a symlink, which means the underlying function might not need to copy the file. In this case, you are responsible to not change the contents of the path, ever.
 
         If 'as_files' is 'False', BytesLike objects will be returned, containing the chunk data bytes directly.
+
+        Chunks that are listed in 'chunk_parts' were stored as several (content-defined) parts, and are re-assembled.
         """
 
         if archive_id is None:
@@ -1154,6 +1354,14 @@ class DataRegistry(object):
 
         archive = self.get_archive(archive_id)
 
+        if chunk_parts:
+            return archive.retrieve_assembled_chunks(
+                chunk_ids,
+                chunk_parts=chunk_parts,
+                as_files=as_files,
+                symlink_ok=symlink_ok,
+            )
+
         chunks = archive.retrieve_chunks(
             chunk_ids, as_files=as_files, symlink_ok=symlink_ok
         )
@@ -1168,8 +1376,13 @@ class DataRegistry(object):
         if isinstance(value, uuid.UUID):
             value = self.get_value(value=value)
 
-        if value.value_id in self._cached_data.keys():
-            return self._cached_data[value.value_id]
+        cached = self._cached_data.get(value.value_id, None)
+        if cached is not None:
+            return cached
+
+        if value._value_data is not SpecialValue.NOT_SET:
+            # values that only exist in memory always hold on to their data
+            return value._value_data
 
         if value._serialized_data is None:
             serialized_data: Union[str, SerializedData] = (
@@ -1241,7 +1454,7 @@ class DataRegistry(object):
         parsed = value.data_type.parse_python_obj(python_object)
         value.data_type._validate(parsed)
 
-        self._cached_data[value.value_id] = parsed
+        self._cached_data.put(value.value_id, parsed)
 
         return parsed
 
@@ -1380,7 +1593,11 @@ class DataRegistry(object):
         """Create a renderable for this module configuration."""
         from kiara.utils.output import create_renderable_from_values
 
-        all_values = {str(i): v for i, v in self._registered_values.items()}
+        all_values = {}
+        for value_id in self._registered_values:
+            value = self._registered_values.get(value_id, None)
+            if value is not None:
+                all_values[str(value_id)] = value
 
         table = create_renderable_from_values(values=all_values, config=config)
         return table
@@ -6,15 +6,21 @@
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 
 import abc
+import atexit
+import hashlib
+import os
 import typing
 import uuid
+import weakref
 from io import BytesIO
+from pathlib import Path
 from typing import (
     TYPE_CHECKING,
     Any,
     Dict,
     Generator,
     Iterable,
+    List,
     Mapping,
     Sequence,
     Set,
@@ -22,8 +28,15 @@ from typing import (
 )
 
 import structlog
+from multiformats import multihash
 from rich.console import RenderableType
 
+from kiara.defaults import (
+    CHUNK_CACHE_BASE_DIR,
+    CHUNK_CACHE_DIR_DEPTH,
+    CHUNK_CACHE_DIR_WIDTH,
+    DEFAULT_VALUE_CACHE_SIZE,
+)
 from kiara.models.values.matchers import ValueMatcher
 from kiara.models.values.value import (
     SERIALIZE_TYPES,
@@ -32,17 +45,46 @@ from kiara.models.values.value import (
     SerializedData,
     Value,
     ValuePedigree,
+    ValueSummary,
 )
 from kiara.models.values.value_schema import ValueSchema
 from kiara.registries import ARCHIVE_CONFIG_CLS, BaseArchive
+from kiara.utils import log_message
+from kiara.utils.bloom import BloomFilter
+from kiara.utils.caching import CacheStats, LRUCache, TieredCache
+from kiara.utils.chunking import CDC_AVG_SIZE, chunk_bytes, chunk_file
 from kiara.utils.dates import get_earliest_time_incl_timezone
+from kiara.utils.hashfs import shard
+from kiara.utils.hashing import create_cid_digest
+from kiara.utils.tracing import current_span, traced
 
 if TYPE_CHECKING:
     from multiformats import CID
     from multiformats.varint import BytesLike
 
+    from kiara.context import Kiara
+    from kiara.models.values.lineage import LineageItem
+
 logger = structlog.getLogger()
 
+VALUE_ID_FILTER_METADATA_KEY = "value_id_filter"
+"""The archive metadata key under which archives persist the bloom filter over their value ids."""
+VALUE_ID_FILTER_MIN_CAPACITY = 1024
+"""The minimum capacity of the bloom filter over the value ids of an archive."""
+VALUE_ID_FILTER_PERSIST_INTERVAL = 128
+"""The minimum number of value ids that are added to the filter of a store before the filter is persisted again."""
+
+_STORES_WITH_UNPERSISTED_FILTERS: "weakref.WeakSet[DataStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_value_id_filters():
+    for store in list(_STORES_WITH_UNPERSISTED_FILTERS):
+        try:
+            store.flush_value_id_filter()
+        except Exception as e:
+            log_message("ignore.flush_value_id_filter", reason=str(e))
+
 
 class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG_CLS]):
     """Base class for data archiv implementationss."""
@@ -66,9 +108,36 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
         )
 
         self._env_cache: Dict[str, Dict[str, Mapping[str, Any]]] = {}
-        self._value_cache: Dict[uuid.UUID, Value] = {}
-        self._persisted_value_cache: Dict[uuid.UUID, PersistedData] = {}
-        self._value_hash_index: Dict[str, Set[uuid.UUID]] = {}
+        self._value_cache: TieredCache[uuid.UUID, Value] = TieredCache(
+            max_size=DEFAULT_VALUE_CACHE_SIZE
+        )
+        self._persisted_value_cache: TieredCache[uuid.UUID, PersistedData] = (
+            TieredCache(max_size=DEFAULT_VALUE_CACHE_SIZE)
+        )
+        self._value_hash_index: LRUCache[str, Set[uuid.UUID]] = LRUCache(
+            max_size=DEFAULT_VALUE_CACHE_SIZE
+        )
+        self._value_id_filter: Union[BloomFilter, None] = None
+        self._value_id_filter_loaded: bool = False
+        self._unpersisted_value_id_filter_adds: int = 0
+
+    def register_archive(self, kiara: "Kiara"):
+        super().register_archive(kiara=kiara)
+
+        cache_size = kiara.runtime_config.value_cache_size
+        self._value_cache.max_size = cache_size
+        self._persisted_value_cache.max_size = cache_size
+        self._value_hash_index.max_size = cache_size
+
+    @property
+    def cache_stats(self) -> Dict[str, CacheStats]:
+        """Usage statistics of the in-memory caches of this archive."""
+
+        return {
+            "values": self._value_cache.stats,
+            "persisted_values": self._persisted_value_cache.stats,
+            "value_hashes": self._value_hash_index.stats,
+        }
 
     def retrieve_serialized_value(
         self, value: Union[uuid.UUID, Value]
@@ -82,8 +151,9 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
             value_id = value
             _value = None
 
-        if value_id in self._persisted_value_cache.keys():
-            return self._persisted_value_cache[value_id]
+        cached = self._persisted_value_cache.get(value_id, None)
+        if cached is not None:
+            return cached
 
         if _value is None:
             _value = self.retrieve_value(value_id)
@@ -91,7 +161,7 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
         assert _value is not None
 
         persisted_value = self._retrieve_serialized_value(value=_value)
-        self._persisted_value_cache[_value.value_id] = persisted_value
+        self._persisted_value_cache.put(_value.value_id, persisted_value)
         return persisted_value
 
     @abc.abstractmethod
@@ -116,6 +186,16 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
             return cached
 
         value_data = self._retrieve_value_details(value_id=value_id)
+        return self._create_value_from_details(value_id=value_id, value_data=value_data)
+
+    def _create_value_from_details(
+        self, value_id: uuid.UUID, value_data: Mapping[str, Any]
+    ) -> Value:
+        """Create (and cache) a value instance from the value details, as returned by '_retrieve_value_details'."""
+
+        cached = self._value_cache.get(value_id, None)
+        if cached is not None:
+            return cached
 
         value_schema = ValueSchema(**value_data["value_schema"])
         # data_type = self._kiara.get_value_type(
@@ -152,8 +232,8 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
             destiny_backlinks=value_data["destiny_backlinks"],
         )
 
-        self._value_cache[value_id] = value
-        return self._value_cache[value_id]
+        self._value_cache.put(value_id, value)
+        return value
 
     @abc.abstractmethod
     def _retrieve_value_details(self, value_id: uuid.UUID) -> Mapping[str, Any]:
@@ -163,6 +243,24 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
 
         """
 
+    def retrieve_lineage_items(
+        self, value_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, "LineageItem"]:
+        """Retrieve the details needed to assemble lineage graphs for all of the specified values that are stored in this archive.
+
+        Value ids that are not part of this archive are ignored. This default implementation retrieves every value
+        individually, archive types that can query multiple values at once are encouraged to override it.
+        """
+        from kiara.models.values.lineage import LineageItem
+
+        result: Dict[uuid.UUID, LineageItem] = {}
+        for value_id in value_ids:
+            if not self.has_value(value_id):
+                continue
+            value = self.retrieve_value(value_id)
+            result[value_id] = LineageItem.from_value(value)
+        return result
+
     @property
     def value_ids(self) -> Union[None, Iterable[uuid.UUID]]:
         return self._retrieve_all_value_ids()
@@ -197,6 +295,54 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
             return False
         return value_id in all_value_ids
 
+    @property
+    def value_id_filter(self) -> Union[BloomFilter, None]:
+        """A bloom filter over the ids of all values in this archive, or 'None' if the archive type doesn't support it."""
+
+        if not self._value_id_filter_loaded:
+            self._value_id_filter = self._load_value_id_filter()
+            self._value_id_filter_loaded = True
+        return self._value_id_filter
+
+    def _load_value_id_filter(self) -> Union[BloomFilter, None]:
+        """Load (or create) the bloom filter over the value ids of this archive.
+
+        This default implementation creates the filter in memory from all value ids, archive types that can persist
+        the filter are encouraged to override this method.
+        """
+
+        value_ids = self._retrieve_all_value_ids()
+        if value_ids is None:
+            return None
+        return self._create_value_id_filter(value_ids)
+
+    def _create_value_id_filter(self, value_ids: Iterable[uuid.UUID]) -> BloomFilter:
+        _value_ids = [str(x) for x in value_ids]
+        return BloomFilter.from_items(
+            _value_ids,
+            capacity=max(VALUE_ID_FILTER_MIN_CAPACITY, len(_value_ids) * 2),
+        )
+
+    def invalidate_value_id_filter(self):
+        """Discard the value id filter, it will be re-loaded (and re-created, if out of date) on next use."""
+
+        self._value_id_filter = None
+        self._value_id_filter_loaded = False
+        # the persisted filter is out of date, and will be re-created when it's loaded next
+        self._unpersisted_value_id_filter_adds = 0
+
+    def might_contain_value(self, value_id: uuid.UUID) -> bool:
+        """Check (without querying the archive) whether the value with the specified id could be part of this archive.
+
+        A result of 'False' means the value is definitely not in the archive (as of the time the filter was loaded),
+        'True' means 'has_value' needs to be used to find out for sure.
+        """
+
+        value_id_filter = self.value_id_filter
+        if value_id_filter is None:
+            return True
+        return str(value_id) in value_id_filter
+
     # def retrieve_environment_details(
     #     self, env_type: str, env_hash: str
     # ) -> Mapping[str, Any]:
@@ -224,8 +370,22 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
     #     """
 
     def find_values(self, matcher: ValueMatcher) -> Iterable[Value]:
+        """Find all values in this archive that match the provided matcher.
+
+        Archives that implement this are expected to apply the matchers sort and paging options. Raise a
+        'NotImplementedError' if not supported, in which case the data registry will check each value individually.
+        """
         raise NotImplementedError()
 
+    def find_value_summaries(self, matcher: ValueMatcher) -> Iterable[ValueSummary]:
+        """Find summaries of all values in this archive that match the provided matcher.
+
+        Archives that can read the summary attributes without loading the full value details are encouraged to
+        override this, the default implementation uses 'find_values'.
+        """
+        for value in self.find_values(matcher=matcher):
+            yield ValueSummary.from_value(value)
+
     def find_values_with_hash(
         self,
         value_hash: str,
@@ -243,15 +403,16 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
         # if value_size is not None:
         #     raise NotImplementedError()
 
-        if value_hash in self._value_hash_index.keys():
-            value_ids: Union[Set[uuid.UUID], None] = self._value_hash_index[value_hash]
-        else:
+        value_ids: Union[Set[uuid.UUID], None] = self._value_hash_index.get(
+            value_hash, None
+        )
+        if value_ids is None:
             value_ids = self._find_values_with_hash(
                 value_hash=value_hash, data_type_name=data_type_name
             )
             if value_ids is None:
                 value_ids = set()
-            self._value_hash_index[value_hash] = value_ids
+            self._value_hash_index.put(value_hash, value_ids)
 
         assert value_ids is not None
 
@@ -321,6 +482,55 @@ class DataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], typing.Generic[ARCHIVE_CONFIG
         If 'as_files' is specified, the chunks are written to a file, and the file path is returned. Otherwise, the chunk is returned as 'bytes'.
         """
 
+    def retrieve_assembled_chunks(
+        self,
+        chunk_ids: Sequence[str],
+        chunk_parts: Mapping[str, Sequence[str]],
+        as_files: bool = True,
+        symlink_ok: bool = True,
+    ) -> Generator[Union["BytesLike", str], None, None]:
+        """Retrieve a generator with all the specified chunks, like 'retrieve_chunks'.
+
+        Chunks that are listed in 'chunk_parts' were stored as several (content-defined) parts, those are re-assembled
+        (and cached, if 'as_files' is set).
+        """
+
+        batch: List[str] = []
+        for chunk_id in chunk_ids:
+            part_ids = chunk_parts.get(chunk_id, None)
+            if part_ids is None:
+                batch.append(chunk_id)
+                continue
+
+            if batch:
+                yield from self.retrieve_chunks(
+                    batch, as_files=as_files, symlink_ok=symlink_ok
+                )
+                batch = []
+
+            if not as_files:
+                yield b"".join(self.retrieve_chunks(part_ids, as_files=False))  # type: ignore
+                continue
+
+            chunk_path = self._get_assembled_chunk_path(chunk_id)
+            if not chunk_path.exists():
+                chunk_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+                tmp_path = chunk_path.with_name(f"{chunk_path.name}.{uuid.uuid4()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    for part in self.retrieve_chunks(part_ids, as_files=False):
+                        f.write(part)  # type: ignore
+                os.replace(tmp_path, chunk_path)
+            yield chunk_path.as_posix()
+
+        if batch:
+            yield from self.retrieve_chunks(
+                batch, as_files=as_files, symlink_ok=symlink_ok
+            )
+
+    def _get_assembled_chunk_path(self, chunk_id: str) -> Path:
+        paths = shard(chunk_id, CHUNK_CACHE_DIR_DEPTH, CHUNK_CACHE_DIR_WIDTH)
+        return Path(os.path.join(CHUNK_CACHE_BASE_DIR, "assembled", *paths))
+
 
 class DataStore(DataArchive):
     @classmethod
@@ -384,6 +594,7 @@ class BaseDataStore(DataStore):
     def _persist_destiny_backlinks(self, value: Value):
         """Persist the destiny backlinks."""
 
+    @traced("store.value")
     def store_value(self, value: Value) -> PersistedData:
         logger.debug(
             "store.value",
@@ -391,6 +602,7 @@ class BaseDataStore(DataStore):
             value_id=value.value_id,
             value_hash=value.value_hash,
         )
+        current_span().set_attribute("value_id", str(value.value_id))
 
         # # first, persist environment information
         # for env_type, env_hash in value.pedigree.environments.items():
@@ -405,9 +617,13 @@ class BaseDataStore(DataStore):
 
         # save the value data and metadata
         persisted_value = self._persist_value(value)
-        self._persisted_value_cache[value.value_id] = persisted_value
-        self._value_cache[value.value_id] = value
-        self._value_hash_index.setdefault(value.value_hash, set()).add(value.value_id)
+        self._persisted_value_cache.put(value.value_id, persisted_value)
+        self._add_to_value_id_filter(value.value_id)
+        self._value_cache.put(value.value_id, value)
+        # only update an existing index entry, otherwise the next lookup queries the store
+        hash_index = self._value_hash_index.get(value.value_hash, None)
+        if hash_index is not None:
+            hash_index.add(value.value_id)
 
         # now link the output values to the manifest
         # then, make sure the manifest is persisted
@@ -415,6 +631,45 @@ class BaseDataStore(DataStore):
 
         return persisted_value
 
+    def _add_to_value_id_filter(self, value_id: uuid.UUID):
+        if not self._value_id_filter_loaded or self._value_id_filter is None:
+            # nothing to update, the filter will include the value once it is loaded
+            return
+
+        self._value_id_filter.add(str(value_id))
+        if self._value_id_filter.is_saturated:
+            # re-create it with a larger capacity next time, to keep the false positive rate low
+            self.invalidate_value_id_filter()
+            return
+
+        # persisting the filter is linear in the size of the archive, so it's only done once the number of
+        # new value ids is proportional to that size, or when the filter is flushed explicitly
+        self._unpersisted_value_id_filter_adds += 1
+        persist_interval = max(
+            VALUE_ID_FILTER_PERSIST_INTERVAL, self._value_id_filter.count // 8
+        )
+        if self._unpersisted_value_id_filter_adds >= persist_interval:
+            self.flush_value_id_filter()
+        else:
+            _STORES_WITH_UNPERSISTED_FILTERS.add(self)
+
+    def flush_value_id_filter(self):
+        """Persist the value id filter, if values were added to it since it was last persisted.
+
+        A persisted filter that misses values is detected (and re-created) when it is loaded, so not flushing is safe,
+        but expensive for large archives.
+        """
+
+        if self._unpersisted_value_id_filter_adds == 0:
+            return
+        self._unpersisted_value_id_filter_adds = 0
+        _STORES_WITH_UNPERSISTED_FILTERS.discard(self)
+        if self._value_id_filter_loaded and self._value_id_filter is not None:
+            self._persist_value_id_filter(self._value_id_filter)
+
+    def _persist_value_id_filter(self, value_id_filter: BloomFilter):
+        """Persist the (updated) value id filter, archive types that can't persist it can ignore this."""
+
     @abc.abstractmethod
     def _persist_chunks(self, chunks: Mapping["CID", BytesIO]):
         """Persist the specified chunk, and return the chunk id.
@@ -429,13 +684,66 @@ class BaseDataStore(DataStore):
 
         SIZE_LIMIT = 100000000
 
+        content_defined_chunking = (
+            self.kiara_context.runtime_config.content_defined_chunking
+        )
+
         chunk_id_map = {}
         chunks_to_persist: Dict[CID, BytesIO] = {}
         chunks_persisted: Set[CID] = set()
         current_size = 0
+
+        def persist_pending_chunks():
+            self._persist_chunks(
+                chunks={
+                    k: v
+                    for k, v in chunks_to_persist.items()
+                    if k not in chunks_persisted
+                }
+            )
+            chunks_persisted.update(chunks_to_persist.keys())
+            chunks_to_persist.clear()
+
         for key in serialized_value.get_keys():
             data_model = serialized_value.get_serialized_data(key)
 
+            if (
+                content_defined_chunking
+                and data_model.type in ("chunk", "file")  # type: ignore
+                and data_model.get_size() > CDC_AVG_SIZE
+            ):
+                # store the data as content-defined parts, so (unchanged) regions shared with other data are only stored once
+                (cid,) = serialized_value.get_cids_for_key(key)
+                if data_model.type == "file":  # type: ignore
+                    parts = chunk_file(data_model.file)  # type: ignore
+                else:
+                    parts = chunk_bytes(data_model.chunk)  # type: ignore
+
+                part_ids = []
+                for part in parts:
+                    part_cid = create_cid_digest(
+                        digest=multihash.wrap(
+                            hashlib.sha256(part).digest(), "sha2-256"
+                        ),
+                        codec="raw",
+                    )
+                    chunks_to_persist[part_cid] = BytesIO(part)
+                    part_ids.append(str(part_cid))
+                    current_size += len(part)
+                    if current_size > SIZE_LIMIT:
+                        persist_pending_chunks()
+                        current_size = 0
+
+                scids = SerializedChunkIDs(
+                    chunk_id_list=[str(cid)],
+                    archive_id=self.archive_id,
+                    size=data_model.get_size(),
+                    chunk_parts={str(cid): part_ids},
+                )
+                scids._data_registry = self.kiara_context.data_registry
+                chunk_id_map[key] = scids
+                continue
+
             if data_model.type == "chunk":  # type: ignore
                 chunks: Iterable[BytesIO] = [BytesIO(data_model.chunk)]  # type: ignore
             elif data_model.type == "chunks":  # type: ignore
@@ -477,25 +785,11 @@ class BaseDataStore(DataStore):
             # this is not super-exact, because the actual size of all chunks to be persisted is not known
             # since some of them might be filtered out, should be good enough to not let the memory blow up too much
             if current_size > SIZE_LIMIT:
-                self._persist_chunks(
-                    chunks={
-                        k: v
-                        for k, v in chunks_to_persist.items()
-                        if k not in chunks_persisted
-                    }
-                )
-                chunks_persisted.update(chunks_to_persist.keys())
-                chunks_to_persist = {}
+                persist_pending_chunks()
                 current_size = 0
 
         if chunks_to_persist:
-            self._persist_chunks(
-                chunks={
-                    k: v
-                    for k, v in chunks_to_persist.items()
-                    if k not in chunks_persisted
-                }
-            )
+            persist_pending_chunks()
 
         pers_value = PersistedData(
             archive_id=self.archive_id,
@@ -445,7 +445,10 @@ class FilesystemDataStore(FileSystemDataArchive, BaseDataStore):
 
     def _persist_chunks(self, chunks: Mapping["CID", Union[str, BytesIO]]):
         for cid, chunk in chunks.items():
-            self._persist_chunk(str(cid), chunk)
+            chunk_id = str(cid)
+            if self.hashfs.exists_id(chunk_id):
+                continue
+            self._persist_chunk(chunk_id, chunk)
 
     def _persist_chunk(self, chunk_id: str, chunk: Union[str, BytesIO]):
         addr: HashAddress = self.hashfs.put_with_precomputed_hash(chunk, chunk_id)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
+import base64
 import os
 import uuid
+from datetime import datetime
 from io import BytesIO
 from pathlib import Path
 from typing import (
@@ -14,11 +16,12 @@ from typing import (
     Mapping,
     Sequence,
     Set,
+    Tuple,
     Union,
 )
 
 import orjson
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Connection, Engine
 
 from kiara.defaults import (
@@ -27,6 +30,8 @@ from kiara.defaults import (
     CHUNK_CACHE_DIR_WIDTH,
     CHUNK_COMPRESSION_TYPE,
     REQUIRED_TABLES_DATA_ARCHIVE,
+    SQLITE_MAX_VARIABLES_PER_QUERY,
+    TABLE_NAME_ALIASES,
     TABLE_NAME_ARCHIVE_METADATA,
     TABLE_NAME_DATA_CHUNKS,
     TABLE_NAME_DATA_DESTINIES,
@@ -34,7 +39,8 @@ from kiara.defaults import (
     TABLE_NAME_DATA_PEDIGREE,
     TABLE_NAME_DATA_SERIALIZATION_METADATA,
 )
-from kiara.models.values.value import PersistedData, Value
+from kiara.models.values.matchers import ValueMatcher
+from kiara.models.values.value import PersistedData, Value, ValueSummary
 from kiara.registries import (
     ARCHIVE_CONFIG_CLS,
     ArchiveDetails,
@@ -42,7 +48,12 @@ from kiara.registries import (
     SqliteDataStoreConfig,
 )
 from kiara.registries.data import DataArchive
-from kiara.registries.data.data_store import BaseDataStore
+from kiara.registries.data.data_store import (
+    VALUE_ID_FILTER_METADATA_KEY,
+    BaseDataStore,
+)
+from kiara.utils import log_message
+from kiara.utils.bloom import BloomFilter
 from kiara.utils.db import create_archive_engine, delete_archive_db
 from kiara.utils.hashfs import shard
 
@@ -50,6 +61,18 @@ if TYPE_CHECKING:
     from multiformats import CID
     from multiformats.varint import BytesLike
 
+    from kiara.models.values.lineage import LineageItem
+
+VALUE_SORT_COLUMNS = {
+    "value_id": "value_id",
+    "created": "value_created",
+    "size": "value_size",
+    "data_type": "data_type_name",
+}
+
+CHUNK_FILTER_MIN_CAPACITY = 100_000
+"""The minimum capacity of the (in-memory) bloom filter over the chunk ids of a store."""
+
 
 class SqliteDataArchive(DataArchive[SqliteArchiveConfig], Generic[ARCHIVE_CONFIG_CLS]):
     _archive_type_name = "sqlite_data_archive"
@@ -101,14 +124,21 @@ class SqliteDataArchive(DataArchive[SqliteArchiveConfig], Generic[ARCHIVE_CONFIG
         self._cache_dir_depth = CHUNK_CACHE_DIR_DEPTH
         self._cache_dir_width = CHUNK_CACHE_DIR_WIDTH
         self._value_id_cache: Union[Iterable[uuid.UUID], None] = None
+        self._chunk_filter: Union[BloomFilter, None] = None
         self._use_wal_mode: bool = archive_config.use_wal_mode
+        self._performance_profile: str = archive_config.performance_profile
         # self._lock: bool = True
 
     def _retrieve_archive_metadata(self) -> Mapping[str, Any]:
-        sql = text(f"SELECT key, value FROM {TABLE_NAME_ARCHIVE_METADATA}")
+        # the value id filter is internal, and loaded separately
+        sql = text(
+            f"SELECT key, value FROM {TABLE_NAME_ARCHIVE_METADATA} WHERE key != :filter_key"
+        )
 
         with self.sqlite_engine.connect() as connection:
-            result = connection.execute(sql)
+            result = connection.execute(
+                sql, {"filter_key": VALUE_ID_FILTER_METADATA_KEY}
+            )
             return {row[0]: row[1] for row in result}
 
     # def _retrieve_archive_id(self) -> uuid.UUID:
@@ -161,6 +191,8 @@ class SqliteDataArchive(DataArchive[SqliteArchiveConfig], Generic[ARCHIVE_CONFIG
             db_path=self.sqlite_path,
             force_read_only=self.is_force_read_only(),
             use_wal_mode=self._use_wal_mode,
+            performance_profile=self._performance_profile,
+            record_profile=self.is_writeable(),
         )
 
         create_table_sql = f"""
@@ -237,8 +269,148 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_DATA_DESTINIES} (
     #         result = cursor.fetchone()
     #         return result[0]  # type: ignore
 
-    # def find_values(self, matcher: ValueMatcher) -> Iterable[Value]:
-    #     raise NotImplementedError()
+    def _create_find_values_query(
+        self, matcher: ValueMatcher, columns: str
+    ) -> Union[None, Tuple[str, Dict[str, Any]]]:
+        """Create the SQL query (and parameters) for a value matcher, or return 'None' if no value can match."""
+
+        include_types, exclude_types = matcher.resolve_data_type_filter(
+            kiara=self.kiara_context
+        )
+        if include_types is not None and not include_types:
+            return None
+
+        query_conditions: List[str] = []
+        params: Dict[str, Any] = {}
+        if include_types is not None:
+            query_conditions.append(
+                "data_type_name IN (SELECT value FROM json_each(:include_types))"
+            )
+            params["include_types"] = orjson.dumps(sorted(include_types)).decode()
+        if exclude_types:
+            query_conditions.append(
+                "data_type_name NOT IN (SELECT value FROM json_each(:exclude_types))"
+            )
+            params["exclude_types"] = orjson.dumps(sorted(exclude_types)).decode()
+
+        if matcher.min_size:
+            query_conditions.append("value_size >= :min_size")
+            params["min_size"] = matcher.min_size
+        if matcher.max_size:
+            query_conditions.append("value_size <= :max_size")
+            params["max_size"] = matcher.max_size
+
+        if matcher.has_alias or matcher.alias_matchers:
+            alias_condition = self._create_alias_condition(
+                matcher=matcher, params=params
+            )
+            if alias_condition is None:
+                return None
+            query_conditions.append(alias_condition)
+
+        sql_query = f"SELECT {columns} FROM {TABLE_NAME_DATA_METADATA}"
+        if query_conditions:
+            sql_query += " WHERE " + " AND ".join(f"( {c} )" for c in query_conditions)
+
+        if matcher.is_sorted:
+            column = VALUE_SORT_COLUMNS[matcher.sort_by or "value_id"]
+            direction = "DESC" if matcher.sort_descending else "ASC"
+            sql_query += f" ORDER BY {column} {direction}, value_id {direction}"
+            if matcher.limit is not None or matcher.offset:
+                sql_query += " LIMIT :limit OFFSET :offset"
+                params["limit"] = -1 if matcher.limit is None else matcher.limit
+                params["offset"] = matcher.offset
+
+        return sql_query, params
+
+    def find_values(self, matcher: ValueMatcher) -> Iterable[Value]:
+        """Find all matching values, with filters, sorting and paging applied in SQL, so only matches are loaded."""
+
+        query = self._create_find_values_query(
+            matcher=matcher, columns="value_id, value_metadata"
+        )
+        if query is None:
+            return []
+
+        result: List[Value] = []
+        with self.sqlite_engine.connect() as conn:
+            for row in conn.execute(text(query[0]), query[1]):
+                value_id = uuid.UUID(row[0])
+                value = self._value_cache.get(value_id, None)
+                if value is None:
+                    value = self._create_value_from_details(
+                        value_id=value_id, value_data=orjson.loads(row[1])
+                    )
+                result.append(value)
+
+        return result
+
+    def find_value_summaries(
+        self, matcher: ValueMatcher
+    ) -> Generator[ValueSummary, None, None]:
+        """Stream summaries of all matching values, read from the indexed columns of the value metadata table."""
+
+        query = self._create_find_values_query(
+            matcher=matcher,
+            columns="value_id, data_type_name, value_size, value_hash, value_created",
+        )
+        if query is None:
+            return
+
+        with self.sqlite_engine.connect() as conn:
+            for row in conn.execute(text(query[0]), query[1]):
+                yield ValueSummary(
+                    value_id=uuid.UUID(row[0]),
+                    data_type_name=row[1],
+                    value_size=row[2],
+                    value_hash=row[3],
+                    value_created=datetime.fromisoformat(row[4]),
+                )
+
+    def _create_alias_condition(
+        self, matcher: ValueMatcher, params: Dict[str, Any]
+    ) -> Union[str, None]:
+        """Create the SQL condition for the alias filters of a matcher.
+
+        If this archives database also contains the (only) alias store of the context, the alias table is queried directly,
+        otherwise the value ids are resolved via the alias registry. Returns 'None' if no value can match.
+        """
+
+        from kiara.registries.aliases.sqlite_store import SqliteAliasArchive
+
+        alias_registry = self.kiara_context.alias_registry
+        alias_archives = list(alias_registry.alias_archives.items())
+
+        if (
+            len(alias_archives) == 1
+            and alias_archives[0][0] == alias_registry.default_alias_store
+            and isinstance(alias_archives[0][1], SqliteAliasArchive)
+            and alias_archives[0][1].sqlite_path == self.sqlite_path
+        ):
+            cond = f"EXISTS (SELECT 1 FROM {TABLE_NAME_ALIASES} WHERE {TABLE_NAME_ALIASES}.value_id = {TABLE_NAME_DATA_METADATA}.value_id"
+            if matcher.alias_matchers:
+                token_conds = []
+                for idx, token in enumerate(matcher.alias_matchers):
+                    token_conds.append(
+                        f"instr({TABLE_NAME_ALIASES}.alias, :alias_token_{idx}) > 0"
+                    )
+                    params[f"alias_token_{idx}"] = token
+                cond += " AND ( " + " OR ".join(token_conds) + " )"
+            return cond + ")"
+
+        value_ids = set()
+        for alias, alias_item in alias_registry.aliases.items():
+            if matcher.alias_matchers and not any(
+                token in alias for token in matcher.alias_matchers
+            ):
+                continue
+            value_ids.add(str(alias_item.value_id))
+
+        if not value_ids:
+            return None
+
+        params["alias_value_ids"] = orjson.dumps(sorted(value_ids)).decode()
+        return "value_id IN (SELECT value FROM json_each(:alias_value_ids))"
 
     def has_value(self, value_id: uuid.UUID) -> bool:
         """
@@ -264,6 +436,76 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_DATA_DESTINIES} (
             result = conn.execute(sql_text, {"value_id": str(value_id)}).scalar()
             return bool(result)
 
+    def _load_value_id_filter(self) -> Union[BloomFilter, None]:
+        """Load the value id filter from the archive metadata, and re-create it if it is missing or out of date."""
+
+        filter_sql = text(
+            f"SELECT value FROM {TABLE_NAME_ARCHIVE_METADATA} WHERE key = :key"
+        )
+        count_sql = text(f"SELECT COUNT(*) FROM {TABLE_NAME_DATA_METADATA}")
+        with self.sqlite_engine.connect() as conn:
+            encoded = conn.execute(
+                filter_sql, {"key": VALUE_ID_FILTER_METADATA_KEY}
+            ).scalar()
+            no_values = conn.execute(count_sql).scalar() or 0
+
+        if encoded:
+            try:
+                value_id_filter = BloomFilter.from_bytes(base64.b64decode(encoded))
+                # values are only ever added, so a matching count means the filter is up to date
+                if value_id_filter.count == no_values:
+                    return value_id_filter
+            except Exception as e:
+                log_message(
+                    "ignore.value_id_filter",
+                    reason="invalid value id filter in archive metadata",
+                    archive_id=str(self.archive_id),
+                    error=e,
+                )
+
+        value_ids = self._retrieve_all_value_ids()
+        assert value_ids is not None
+        value_id_filter = self._create_value_id_filter(value_ids)
+        if self.is_writeable():
+            self._persist_value_id_filter(value_id_filter)
+        return value_id_filter
+
+    def retrieve_lineage_items(
+        self, value_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, "LineageItem"]:
+        """Retrieve lineage details for many values at once, without creating 'Value' instances.
+
+        Only the required fields are extracted from the stored value metadata, using batched 'IN' queries.
+        """
+        from kiara.models.values.lineage import LineageItem
+        from kiara.models.values.value import ValuePedigree
+
+        value_id_strs = [str(x) for x in value_ids]
+        result: Dict[uuid.UUID, LineageItem] = {}
+
+        with self.sqlite_engine.connect() as conn:
+            for i in range(0, len(value_id_strs), SQLITE_MAX_VARIABLES_PER_QUERY):
+                batch = value_id_strs[i : i + SQLITE_MAX_VARIABLES_PER_QUERY]
+                sql = text(
+                    f"""SELECT value_id, data_type_name,
+                        json_extract(value_metadata, '$.value_schema.type_config'),
+                        json_extract(value_metadata, '$.pedigree_output_name'),
+                        json_extract(value_metadata, '$.pedigree')
+                    FROM {TABLE_NAME_DATA_METADATA} WHERE value_id IN :value_ids"""
+                ).bindparams(bindparam("value_ids", expanding=True))
+                for row in conn.execute(sql, {"value_ids": batch}):
+                    value_id = uuid.UUID(row[0])
+                    type_config = orjson.loads(row[2]) if row[2] else {}
+                    result[value_id] = LineageItem(
+                        value_id=value_id,
+                        data_type_name=row[1],
+                        data_type_config=type_config,
+                        pedigree_output_name=row[3],
+                        pedigree=ValuePedigree(**orjson.loads(row[4])),
+                    )
+
+        return result
+
     def _retrieve_all_value_ids(
         self, data_type_name: Union[str, None] = None
     ) -> Union[None, Iterable[uuid.UUID]]:
@@ -489,6 +731,12 @@ class SqliteDataStore(SqliteDataArchive[SqliteDataStoreConfig], BaseDataStore):
             conn.execute(sql, params)
             conn.commit()
 
+    def _persist_value_id_filter(self, value_id_filter: BloomFilter):
+        self._set_archive_metadata_value(
+            VALUE_ID_FILTER_METADATA_KEY,
+            base64.b64encode(value_id_filter.to_bytes()).decode(),
+        )
+
     # def _persist_environment_details(
     #     self, env_type: str, env_hash: str, env_data: Mapping[str, Any]
     # ):
@@ -518,18 +766,57 @@ class SqliteDataStore(SqliteDataArchive[SqliteDataStoreConfig], BaseDataStore):
     #
     #     raise NotImplementedError()
 
+    def _get_chunk_filter(self, conn: Connection) -> BloomFilter:
+        """Return a bloom filter over all chunk ids in this store, it is created (by streaming all ids) on first use."""
+
+        if self._chunk_filter is not None:
+            return self._chunk_filter
+
+        count_sql = text(f"SELECT COUNT(*) FROM {TABLE_NAME_DATA_CHUNKS}")
+        no_chunks = conn.execute(count_sql).scalar() or 0
+        chunk_filter = BloomFilter(
+            capacity=max(CHUNK_FILTER_MIN_CAPACITY, no_chunks * 2)
+        )
+
+        sql = text(f"SELECT chunk_id FROM {TABLE_NAME_DATA_CHUNKS}")
+        result = conn.execute(sql)
+        for partition in result.partitions(10000):
+            chunk_filter.update(row[0] for row in partition)
+
+        self._chunk_filter = chunk_filter
+        return chunk_filter
+
+    def _find_existing_chunk_ids(
+        self, conn: Connection, chunk_ids: Iterable[str]
+    ) -> Set[str]:
+        sql = text(
+            f"SELECT chunk_id FROM {TABLE_NAME_DATA_CHUNKS} WHERE chunk_id IN (SELECT value FROM json_each(:chunk_ids))"
+        )
+        params = {"chunk_ids": orjson.dumps(list(chunk_ids)).decode()}
+        return {row[0] for row in conn.execute(sql, params)}
+
     def _persist_chunks(self, chunks: Mapping["CID", Union[str, BytesIO]]):
-        all_chunk_ids = self.retrieve_all_chunk_ids()
+        chunks_to_persist = {str(chunk_id): chunk for chunk_id, chunk in chunks.items()}
 
         with self.sqlite_engine.connect() as conn:
-            for chunk_id, chunk in chunks.items():
-                cid_str = str(chunk_id)
-                if cid_str in all_chunk_ids:
+            chunk_filter = self._get_chunk_filter(conn)
+            # only the ids the filter matches can exist already, and need to be checked
+            candidates = [c for c in chunks_to_persist.keys() if c in chunk_filter]
+            existing = (
+                self._find_existing_chunk_ids(conn, candidates) if candidates else set()
+            )
+
+            for cid_str, chunk in chunks_to_persist.items():
+                if cid_str in existing:
                     continue
                 self._persist_chunk(conn, cid_str, chunk)
 
             conn.commit()
 
+        if chunk_filter.is_saturated:
+            # re-create it with a larger capacity next time, to keep the false positive rate low
+            self._chunk_filter = None
+
     def _persist_chunk(
         self, conn: Connection, chunk_id: str, chunk: Union[str, BytesIO]
     ):
@@ -587,8 +874,9 @@ class SqliteDataStore(SqliteDataArchive[SqliteDataStoreConfig], BaseDataStore):
             if compression_type is not CHUNK_COMPRESSION_TYPE.NONE
             else None
         )
+        # another process might have added the same chunk in the meantime
         sql = text(
-            f"INSERT INTO {TABLE_NAME_DATA_CHUNKS} (chunk_id, chunk_data, compression_type) VALUES (:chunk_id, :chunk_data, :compression_type)"
+            f"INSERT OR IGNORE INTO {TABLE_NAME_DATA_CHUNKS} (chunk_id, chunk_data, compression_type) VALUES (:chunk_id, :chunk_data, :compression_type)"
         )
         params = {
             "chunk_id": chunk_id,
@@ -597,6 +885,8 @@ class SqliteDataStore(SqliteDataArchive[SqliteDataStoreConfig], BaseDataStore):
         }
 
         conn.execute(sql, params)
+        if self._chunk_filter is not None:
+            self._chunk_filter.add(chunk_id)
         # conn.commit()
 
     def _persist_stored_value_info(self, value: Value, persisted_value: PersistedData):
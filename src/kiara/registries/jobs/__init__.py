@@ -6,12 +6,29 @@
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 
 import abc
+import contextvars
+import os
+import threading
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Mapping,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import structlog
 from bidict import bidict
+from multiformats import CID
 from rich.console import Group
 
 from kiara.defaults import (
@@ -33,22 +50,35 @@ from kiara.models.module.jobs import (
     JobMatcher,
     JobRecord,
     JobStatus,
+    LineageEdge,
+)
+from kiara.models.module.manifest import (
+    InputsManifest,
+    Manifest,
+    compute_inputs_cid,
+    compute_job_cid,
 )
-from kiara.models.module.manifest import InputsManifest, Manifest
-from kiara.models.values.value import ValueMap, ValueMapReadOnly
-from kiara.processing import ModuleProcessor
+from kiara.models.values.value import Value, ValueMap, ValueMapReadOnly
+from kiara.modules import ModuleCharacteristics
+from kiara.processing import JobStatusListener, ModuleProcessor
 from kiara.processing.synchronous import SynchronousProcessor
 from kiara.registries.jobs.job_store import JobArchive, JobStore
-from kiara.utils import get_dev_config, is_develop
+from kiara.utils import get_dev_config, is_develop, log_exception
+from kiara.utils.caching import LRUCache
+from kiara.utils.tracing import current_span, span, traced
 
 if TYPE_CHECKING:
     from kiara.context import Kiara
     from kiara.context.runtime_config import JobCacheStrategy
     from kiara.models.runtime_environment import RuntimeEnvironment
+    from kiara.modules import KiaraModule
 
 logger = structlog.getLogger()
 
 MANIFEST_SUB_PATH = "manifests"
+JOB_HASH_CACHE_SIZE = 4096
+JOB_BATCH_SIZE = 256
+"""The number of input sets 'execute_job_batch' resolves (and looks up in the job cache) at once."""
 
 
 class ExistingJobMatcher(abc.ABC):
@@ -61,24 +91,43 @@ class ExistingJobMatcher(abc.ABC):
     ) -> Union[JobRecord, None]:
         pass
 
+    def find_existing_jobs(
+        self, inputs_manifests: Iterable[InputsManifest]
+    ) -> Dict[str, JobRecord]:
+        """Find existing jobs for many inputs manifests at once, the result is keyed on the job hashes of the manifests.
 
-class NoneExistingJobMatcher(ExistingJobMatcher):
-    def find_existing_job(
-        self, inputs_manifest: InputsManifest
-    ) -> Union[JobRecord, None]:
-        return None
+        By default, this looks up all job hashes in a single query per archive.
+        """
 
+        return self.find_records_for_job_hashes(
+            job_hashes={x.job_hash for x in inputs_manifests}
+        )
 
-class ValueIdExistingJobMatcher(ExistingJobMatcher):
-    def find_existing_job(
-        self, inputs_manifest: InputsManifest
-    ) -> Union[JobRecord, None]:
-        matches = []
+    def find_records_for_job_hashes(
+        self, job_hashes: Iterable[str]
+    ) -> Dict[str, JobRecord]:
+        """Find the stored records of all jobs with one of the provided job hashes, keyed on job hash."""
+
+        _job_hashes = list(job_hashes)
+        result: Dict[str, JobRecord] = {}
+        for archive in self._kiara.job_registry.job_archives.values():
+            matches = archive.retrieve_records_for_job_hashes(job_hashes=_job_hashes)
+            for job_hash, job_record in matches.items():
+                if job_hash in result.keys():
+                    raise Exception(
+                        f"Multiple stores have a record for job hash '{job_hash}', this is not supported (yet)."
+                    )
+                job_record._is_stored = True
+                result[job_hash] = job_record
 
-        for store_id, archive in self._kiara.job_registry.job_archives.items():
-            match = archive.retrieve_record_for_job_hash(
-                job_hash=inputs_manifest.job_hash
-            )
+        return result
+
+    def find_record_for_job_hash(self, job_hash: str) -> Union[JobRecord, None]:
+        """Find the stored record of a job with the exact same job hash (manifest and input value ids)."""
+
+        matches = []
+        for archive in self._kiara.job_registry.job_archives.values():
+            match = archive.retrieve_record_for_job_hash(job_hash=job_hash)
             if match:
                 matches.append(match)
 
@@ -86,44 +135,78 @@ class ValueIdExistingJobMatcher(ExistingJobMatcher):
             return None
         elif len(matches) > 1:
             raise Exception(
-                f"Multiple stores have a record for inputs manifest '{inputs_manifest}', this is not supported (yet)."
+                f"Multiple stores have a record for job hash '{job_hash}', this is not supported (yet)."
             )
 
         job_record = matches[0]
         job_record._is_stored = True
-
         return job_record
 
 
-class DataHashExistingJobMatcher(ExistingJobMatcher):
+class NoneExistingJobMatcher(ExistingJobMatcher):
     def find_existing_job(
         self, inputs_manifest: InputsManifest
     ) -> Union[JobRecord, None]:
-        matches = []
+        return None
+
+    def find_existing_jobs(
+        self, inputs_manifests: Iterable[InputsManifest]
+    ) -> Dict[str, JobRecord]:
+        return {}
+
+
+class ValueIdExistingJobMatcher(ExistingJobMatcher):
+    def find_existing_job(
+        self, inputs_manifest: InputsManifest
+    ) -> Union[JobRecord, None]:
+        return self.find_record_for_job_hash(job_hash=inputs_manifest.job_hash)
+
 
+class DataHashExistingJobMatcher(ExistingJobMatcher):
+    def find_existing_job(
+        self, inputs_manifest: InputsManifest
+    ) -> Union[JobRecord, None]:
         ignore_internal = True
         if ignore_internal:
             module = self._kiara.module_registry.create_module(inputs_manifest)
             if module.characteristics.is_internal:
                 return None
 
-        for store_id, archive in self._kiara.job_registry.job_archives.items():
-            match = archive.retrieve_record_for_job_hash(
-                job_hash=inputs_manifest.job_hash
-            )
-            if match:
-                matches.append(match)
+        job_record = self.find_record_for_job_hash(job_hash=inputs_manifest.job_hash)
+        if job_record is not None:
+            return job_record
 
-        if len(matches) > 1:
-            raise Exception(
-                f"Multiple stores have a record for inputs manifest '{inputs_manifest}', this is not supported (yet)."
+        return self._find_record_for_inputs_data_hash(inputs_manifest=inputs_manifest)
+
+    def find_existing_jobs(
+        self, inputs_manifests: Iterable[InputsManifest]
+    ) -> Dict[str, JobRecord]:
+        _inputs_manifests = list(inputs_manifests)
+        if not _inputs_manifests:
+            return {}
+
+        module = self._kiara.module_registry.create_module(_inputs_manifests[0])
+        if module.characteristics.is_internal:
+            return {}
+
+        result = self.find_records_for_job_hashes(
+            job_hashes={x.job_hash for x in _inputs_manifests}
+        )
+        for inputs_manifest in _inputs_manifests:
+            if inputs_manifest.job_hash in result.keys():
+                continue
+            job_record = self._find_record_for_inputs_data_hash(
+                inputs_manifest=inputs_manifest
             )
+            if job_record is not None:
+                result[inputs_manifest.job_hash] = job_record
 
-        elif len(matches) == 1:
-            job_record = matches[0]
-            job_record._is_stored = True
+        return result
 
-            return job_record
+    def _find_record_for_inputs_data_hash(
+        self, inputs_manifest: InputsManifest
+    ) -> Union[JobRecord, None]:
+        matches = []
 
         inputs_data_cid, contains_invalid = inputs_manifest.calculate_inputs_data_cid(
             data_registry=self._kiara.data_registry
@@ -152,6 +235,24 @@ class DataHashExistingJobMatcher(ExistingJobMatcher):
             return matching_records[0]
 
 
+def _get_inputs_key(
+    inputs: Mapping[str, Any],
+) -> Union[Tuple[Tuple[str, str, Any], ...], None]:
+    """Return a hashable key for a set of job inputs, or 'None' if they contain anything other than values and scalars."""
+
+    result = []
+    for field_name, value in inputs.items():
+        if isinstance(value, Value):
+            value = value.value_id
+        elif value is not None and not isinstance(
+            value, (uuid.UUID, str, int, float, bool)
+        ):
+            return None
+        # 'True == 1', so the type needs to be part of the key
+        result.append((field_name, type(value).__name__, value))
+    return tuple(sorted(result))
+
+
 class JobRegistry(object):
     def __init__(self, kiara: "Kiara"):
         self._kiara: Kiara = kiara
@@ -163,6 +264,19 @@ class JobRegistry(object):
         self._finished_jobs: Dict[str, uuid.UUID] = {}
         self._archived_records: Dict[uuid.UUID, JobRecord] = {}
 
+        # for the cache-hit fast path: job hashes by manifest hash & (un-augmented) input ids cid, resolved manifest
+        # hashes by unresolved manifest data, and module characteristics by manifest hash
+        self._job_hashes: LRUCache[Tuple[str, str], str] = LRUCache(
+            max_size=JOB_HASH_CACHE_SIZE
+        )
+        self._resolved_manifest_hashes: LRUCache[str, str] = LRUCache(
+            max_size=JOB_HASH_CACHE_SIZE
+        )
+        self._module_characteristics: Dict[str, ModuleCharacteristics] = {}
+
+        # jobs of a batch finish in worker threads
+        self._job_status_lock = threading.Lock()
+
         self._processor: ModuleProcessor = SynchronousProcessor(kiara=self._kiara)
         self._processor.register_job_status_listener(self)
         self._job_archives: Dict[str, JobArchive] = {}
@@ -272,6 +386,13 @@ class JobRegistry(object):
     def job_archives(self) -> Mapping[str, JobArchive]:
         return self._job_archives
 
+    def register_job_status_listener(self, listener: JobStatusListener):
+        """Register a listener that gets notified whenever the status of a job managed by this registry changes."""
+        self._processor.register_job_status_listener(listener)
+
+    def unregister_job_status_listener(self, listener: JobStatusListener):
+        self._processor.unregister_job_status_listener(listener)
+
     def job_status_changed(
         self,
         job_id: uuid.UUID,
@@ -279,16 +400,19 @@ class JobRegistry(object):
         new_status: JobStatus,
     ):
         # print(f"JOB STATUS CHANGED: {job_id} - {old_status} - {new_status.value}")
-        if job_id in self._active_jobs.values() and new_status is JobStatus.FAILED:
-            job_hash = self._active_jobs.inverse.pop(job_id)
-            self._failed_jobs[job_hash] = job_id
-        elif job_id in self._active_jobs.values() and new_status is JobStatus.SUCCESS:
-            job_hash = self._active_jobs.inverse.pop(job_id)
+        with self._job_status_lock:
+            if job_id in self._active_jobs.values() and new_status is JobStatus.FAILED:
+                job_hash = self._active_jobs.inverse.pop(job_id)
+                self._failed_jobs[job_hash] = job_id
+            elif (
+                job_id in self._active_jobs.values() and new_status is JobStatus.SUCCESS
+            ):
+                job_hash = self._active_jobs.inverse.pop(job_id)
 
-            job_record = self._processor.get_job_record(job_id)
+                job_record = self._processor.get_job_record(job_id)
 
-            self._finished_jobs[job_hash] = job_id
-            self._archived_records[job_id] = job_record
+                self._finished_jobs[job_hash] = job_id
+                self._archived_records[job_id] = job_record
 
     def _persist_environment(self, env_type: str, env_hash: str):
         cached = self._env_cache.get(env_type, {}).get(env_hash, None)
@@ -307,6 +431,7 @@ class JobRegistry(object):
         )
         self._env_cache.setdefault(env_type, {})[env_hash] = environment
 
+    @traced("store.job_record")
     def store_job_record(self, job_id: uuid.UUID, store: Union[str, None] = None):
         # TODO: allow to store job record to external store
 
@@ -393,6 +518,76 @@ class JobRegistry(object):
 
         return all_jobs_sorted
 
+    def retrieve_lineage_edges(
+        self,
+        value_ids: Iterable[uuid.UUID],
+        downstream: bool = True,
+        allow_internal: bool = True,
+    ) -> Set[LineageEdge]:
+        """Retrieve all lineage edges that start (downstream) or end (upstream) at one of the provided values.
+
+        This includes edges of jobs that ran in this session, but were not stored (yet).
+        """
+
+        value_ids = set(value_ids)
+        edges: Set[LineageEdge] = set()
+        for archive in self.job_archives.values():
+            edges.update(
+                archive.retrieve_lineage_edges(
+                    value_ids=value_ids,
+                    downstream=downstream,
+                    allow_internal=allow_internal,
+                )
+            )
+
+        for job_record in self._archived_records.values():
+            if job_record.is_internal and not allow_internal:
+                continue
+            for edge in job_record.lineage_edges:
+                if downstream and edge.input_value_id in value_ids:
+                    edges.add(edge)
+                elif not downstream and edge.output_value_id in value_ids:
+                    edges.add(edge)
+
+        return edges
+
+    def find_lineage_edges(
+        self,
+        value_ids: Iterable[uuid.UUID],
+        downstream: bool = True,
+        max_depth: Union[int, None] = None,
+        allow_internal: bool = True,
+    ) -> Dict[LineageEdge, int]:
+        """Traverse the lineage of the provided values, either towards derived values (downstream) or their sources (upstream).
+
+        Each level of the traversal is resolved with a single (indexed) lookup per job archive.
+
+        Returns:
+            a map of all edges that were found, along with their distance (starting at 1) to the provided values
+        """
+
+        visited: Set[uuid.UUID] = set(value_ids)
+        frontier: Set[uuid.UUID] = set(visited)
+        result: Dict[LineageEdge, int] = {}
+
+        depth = 1
+        while frontier and (max_depth is None or depth <= max_depth):
+            edges = self.retrieve_lineage_edges(
+                value_ids=frontier,
+                downstream=downstream,
+                allow_internal=allow_internal,
+            )
+            frontier = set()
+            for edge in edges:
+                result.setdefault(edge, depth)
+                next_id = edge.output_value_id if downstream else edge.input_value_id
+                if next_id not in visited:
+                    visited.add(next_id)
+                    frontier.add(next_id)
+            depth += 1
+
+        return result
+
     def retrieve_all_job_record_ids(self) -> List[uuid.UUID]:
         """Retrieve a list of all available job record ids, sorted from latest to earliest."""
 
@@ -454,15 +649,20 @@ class JobRegistry(object):
             'None' if no such job exists, a (uuid) job-id if the job is currently running or has run in the past
         """
         log = logger.bind(module_type=inputs_manifest.module_type)
-        if inputs_manifest.job_hash in self._active_jobs.keys():
+        with self._job_status_lock:
+            active_job_id = self._active_jobs.get(inputs_manifest.job_hash, None)
+        if active_job_id is not None:
             log.debug("job.use_running")
-            return self._active_jobs[inputs_manifest.job_hash]
+            return active_job_id
 
         if inputs_manifest.job_hash in self._finished_jobs.keys():
             job_id = self._finished_jobs[inputs_manifest.job_hash]
             return job_id
 
         module = self._kiara.module_registry.create_module(manifest=inputs_manifest)
+        self._module_characteristics[inputs_manifest.manifest_hash] = (
+            module.characteristics
+        )
         if not module.characteristics.is_idempotent:
             log.debug(
                 "skip.job_matching",
@@ -501,8 +701,107 @@ class JobRegistry(object):
             data_registry=self._kiara.data_registry, module=module, inputs=inputs
         )
 
+        input_ids = self._get_input_value_ids(inputs)
+        if input_ids is not None:
+            # remember the (augmented) job hash, so 'find_cached_job_record' can skip all this next time
+            manifest_hash = module.manifest.manifest_hash
+            if not manifest.is_resolved:
+                self._resolved_manifest_hashes.put(
+                    manifest.manifest_data_as_json(), manifest_hash
+                )
+            self._module_characteristics[manifest_hash] = module.characteristics
+            self._job_hashes.put(
+                (manifest_hash, str(compute_inputs_cid(input_ids))),
+                job_config.job_hash,
+            )
+
         return job_config
 
+    def _get_input_value_ids(
+        self, inputs: Mapping[str, Any]
+    ) -> Union[Dict[str, uuid.UUID], None]:
+        """Return the value ids of the inputs, or 'None' if not all of them are value (id)s."""
+
+        result: Dict[str, uuid.UUID] = {}
+        for field_name, value in inputs.items():
+            if isinstance(value, uuid.UUID):
+                result[field_name] = value
+            elif isinstance(value, Value):
+                result[field_name] = value.value_id
+            else:
+                return None
+        return result
+
+    def find_cached_job_record(
+        self, manifest: Union[Manifest, str], inputs: Mapping[str, Any]
+    ) -> Union[JobRecord, None]:
+        """Find the record of a finished job, using only the manifest hash and the input value ids.
+
+        This is a fast path for cache hits: it neither creates the module, nor loads (or registers) any input values.
+        The manifest can be provided as the hash of the resolved manifest. Unresolved manifests are only supported if
+        a job config for them was prepared before in this context (otherwise resolving them would be needed). All
+        inputs need to be value objects or value ids. If any of those conditions is not met, or if no (known) job
+        matches, 'None' is returned, in which case the job config needs to be prepared (and the job executed) as usual.
+
+        Stored job records are only considered if the job cache strategy allows it, and the characteristics of the
+        module are already known in this context (which is the case after the first lookup via the regular path).
+        """
+
+        input_ids = self._get_input_value_ids(inputs)
+        if input_ids is None:
+            return None
+
+        if isinstance(manifest, str):
+            manifest_hash: Union[str, None] = manifest
+        elif manifest.is_resolved:
+            manifest_hash = manifest.manifest_hash
+        else:
+            manifest_hash = self._resolved_manifest_hashes.get(
+                manifest.manifest_data_as_json()
+            )
+        if manifest_hash is None:
+            return None
+
+        inputs_cid = compute_inputs_cid(input_ids)
+        job_hash = self._job_hashes.get((manifest_hash, str(inputs_cid)))
+        if job_hash is None:
+            job_hash = str(
+                compute_job_cid(
+                    manifest_cid=CID.decode(manifest_hash), inputs_cid=inputs_cid
+                )
+            )
+
+        job_id = self._finished_jobs.get(job_hash, None)
+        if job_id is not None:
+            return self.get_job_record(job_id=job_id)
+
+        characteristics = self._module_characteristics.get(manifest_hash, None)
+        if characteristics is None or not characteristics.is_idempotent:
+            return None
+
+        job_matcher = self.job_matcher
+        if isinstance(job_matcher, NoneExistingJobMatcher):
+            return None
+        if (
+            isinstance(job_matcher, DataHashExistingJobMatcher)
+            and characteristics.is_internal
+        ):
+            return None
+
+        job_record = job_matcher.find_record_for_job_hash(job_hash=job_hash)
+        if job_record is None:
+            return None
+
+        self._finished_jobs[job_hash] = job_record.job_id
+        self._archived_records[job_record.job_id] = job_record
+        logger.debug(
+            "job.found_cached_record",
+            job_id=str(job_record.job_id),
+            job_hash=job_hash,
+            fast_path=True,
+        )
+        return job_record
+
     def execute(
         self,
         manifest: Manifest,
@@ -525,6 +824,16 @@ class JobRegistry(object):
             auto_save_result: whether to automatically save the job's outputs to the data registry once the job finished successfully
         """
 
+        with span("job.execute", module_type=job_config.module_type) as job_span:
+            job_id = self._execute_job(
+                job_config=job_config, wait=wait, auto_save_result=auto_save_result
+            )
+            job_span.set_attribute("job_id", str(job_id))
+            return job_id
+
+    def _execute_job(
+        self, job_config: JobConfig, wait: bool, auto_save_result: bool
+    ) -> uuid.UUID:
         # from kiara.models.metadata import CommentMetadata
         # if "comment" not in job_metadata.keys():
         #     raise KiaraException("You need to provide a 'comment' for the job.")
@@ -567,6 +876,7 @@ class JobRegistry(object):
             pipeline_id = None
 
         if stored_job is not None:
+            current_span().set_attribute("cached", True)
             log.debug(
                 "job.use_cached",
                 job_id=str(stored_job),
@@ -616,7 +926,8 @@ class JobRegistry(object):
         job_id = self._processor.create_job(
             job_config=job_config, auto_save_result=auto_save_result
         )
-        self._active_jobs[job_config.job_hash] = job_id
+        with self._job_status_lock:
+            self._active_jobs[job_config.job_hash] = job_id
 
         try:
             self._processor.queue_job(job_id=job_id)
@@ -629,8 +940,176 @@ class JobRegistry(object):
 
         return job_id
 
+    def execute_job_batch(
+        self,
+        manifest: Manifest,
+        inputs: Iterable[Mapping[str, Any]],
+        auto_save_result: bool = False,
+        max_workers: Union[int, None] = None,
+    ) -> Generator[uuid.UUID, None, None]:
+        """Execute the same manifest for many input sets, and yield the (finished) job ids in the order of the input sets.
+
+        Compared to executing the jobs one by one, the module is only created once, the job cache is checked for a
+        whole batch of input sets at once, identical input sets are only executed once, and jobs that need to run are
+        executed in parallel.
+
+        Arguments:
+            manifest: the manifest
+            inputs: the input sets, this can be a (lazy) iterable, which is consumed in batches
+            auto_save_result: whether to automatically save the outputs of the jobs once they finished successfully
+            max_workers: the maximum number of jobs to run in parallel, defaults to the number of cpus (but at most 32)
+        """
+
+        module = self._kiara.module_registry.create_module(manifest=manifest)
+        self._module_characteristics[module.manifest.manifest_hash] = (
+            module.characteristics
+        )
+
+        if max_workers is None:
+            max_workers = min(32, os.cpu_count() or 1)
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="kiara_job_batch"
+        ) as executor:
+            batch: List[Mapping[str, Any]] = []
+            for input_set in inputs:
+                batch.append(input_set)
+                if len(batch) >= JOB_BATCH_SIZE:
+                    yield from self._execute_job_batch(
+                        module=module,
+                        inputs=batch,
+                        executor=executor,
+                        auto_save_result=auto_save_result,
+                    )
+                    batch = []
+            if batch:
+                yield from self._execute_job_batch(
+                    module=module,
+                    inputs=batch,
+                    executor=executor,
+                    auto_save_result=auto_save_result,
+                )
+
+    def _execute_job_batch(
+        self,
+        module: "KiaraModule",
+        inputs: List[Mapping[str, Any]],
+        executor: ThreadPoolExecutor,
+        auto_save_result: bool,
+    ) -> List[uuid.UUID]:
+        with span(
+            "job.execute_batch",
+            module_type=module.module_type_name,
+            no_input_sets=len(inputs),
+        ) as batch_span:
+            # raw inputs are registered as new values for every job config, so identical input sets would end up with
+            # different job hashes if they were not de-duplicated beforehand (only for idempotent modules, like the
+            # job cache, other modules run once per input set)
+            is_idempotent = module.characteristics.is_idempotent
+            job_configs: List[JobConfig] = []
+            configs_by_inputs: Dict[Tuple[Tuple[str, str, Any], ...], JobConfig] = {}
+            for input_set in inputs:
+                inputs_key = _get_inputs_key(input_set) if is_idempotent else None
+                job_config = (
+                    None if inputs_key is None else configs_by_inputs.get(inputs_key)
+                )
+                if job_config is None:
+                    job_config = JobConfig.create_from_module(
+                        data_registry=self._kiara.data_registry,
+                        module=module,
+                        inputs=input_set,
+                    )
+                    if inputs_key is not None:
+                        configs_by_inputs[inputs_key] = job_config
+                job_configs.append(job_config)
+
+            job_ids: Dict[str, uuid.UUID] = {}
+            misses: Dict[str, JobConfig] = {}
+            for job_config in job_configs:
+                job_hash = job_config.job_hash
+                if job_hash in job_ids.keys() or job_hash in misses.keys():
+                    continue
+                with self._job_status_lock:
+                    job_id = self._active_jobs.get(job_hash, None)
+                    if job_id is None:
+                        job_id = self._finished_jobs.get(job_hash, None)
+                if job_id is None:
+                    misses[job_hash] = job_config
+                else:
+                    job_ids[job_hash] = job_id
+
+            if misses and is_idempotent:
+                job_records = self.job_matcher.find_existing_jobs(
+                    inputs_manifests=misses.values()
+                )
+                for job_hash, job_record in job_records.items():
+                    self._finished_jobs[job_hash] = job_record.job_id
+                    self._archived_records[job_record.job_id] = job_record
+                    job_ids[job_hash] = job_record.job_id
+                    misses.pop(job_hash)
+
+            futures: List[Future] = []
+            for job_hash, job_config in misses.items():
+                # results are saved once all jobs of the batch are finished, see below
+                job_id = self._processor.create_job(
+                    job_config=job_config, auto_save_result=False
+                )
+                with self._job_status_lock:
+                    self._active_jobs[job_hash] = job_id
+                job_ids[job_hash] = job_id
+                # run the job in the current (tracing) context, so its spans are children of this one
+                futures.append(
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self._processor.queue_job,
+                        job_id,
+                    )
+                )
+
+            for future in futures:
+                future.result()
+
+            if auto_save_result and misses:
+                # jobs of a batch usually share (input) values, so results are saved here, in the calling thread,
+                # instead of concurrently by the processor in the worker threads
+                self._save_job_results(job_ids[job_hash] for job_hash in misses.keys())
+
+            batch_span.set_attribute("no_jobs", len(job_ids))
+            batch_span.set_attribute("no_executed", len(futures))
+            logger.debug(
+                "job.execute_batch",
+                module_type=module.module_type_name,
+                no_input_sets=len(inputs),
+                no_jobs=len(job_ids),
+                no_executed=len(futures),
+            )
+
+            return [job_ids[job_config.job_hash] for job_config in job_configs]
+
+    def _save_job_results(self, job_ids: Iterable[uuid.UUID]):
+        """Store the outputs of all successful jobs with the specified ids, failed jobs are ignored."""
+
+        data_registry = self._kiara.data_registry
+        for job_id in job_ids:
+            with self._job_status_lock:
+                job_record = self._archived_records.get(job_id, None)
+            if job_record is None:
+                continue
+            try:
+                for value_id in job_record.outputs.values():
+                    data_registry.store_value(value_id)
+            except Exception as e:
+                log_exception(e)
+                raise KiaraException(
+                    msg=f"Failed to auto-save job results for job: {job_id}",
+                    parent=e,
+                )
+        data_registry.flush_value_id_filters()
+
     def get_active_job(self, job_id: uuid.UUID) -> ActiveJob:
-        if job_id in self._active_jobs.keys() or job_id in self._failed_jobs.keys():
+        with self._job_status_lock:
+            is_active = job_id in self._active_jobs.keys()
+        if is_active or job_id in self._failed_jobs.keys():
             return self._processor.get_job(job_id)
         else:
             if job_id in self._archived_records.keys():
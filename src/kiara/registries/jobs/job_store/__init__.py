@@ -2,9 +2,9 @@
 import abc
 import uuid
 from datetime import datetime
-from typing import Generator, Iterable, Mapping, Union
+from typing import Dict, Generator, Iterable, Mapping, Union
 
-from kiara.models.module.jobs import JobMatcher, JobRecord
+from kiara.models.module.jobs import JobMatcher, JobRecord, LineageEdge
 from kiara.registries import BaseArchive
 
 
@@ -60,6 +60,23 @@ class JobArchive(BaseArchive):
         job_record = self._retrieve_record_for_job_hash(job_hash=job_hash)
         return job_record
 
+    def _retrieve_records_for_job_hashes(
+        self, job_hashes: Iterable[str]
+    ) -> Mapping[str, JobRecord]:
+        result: Dict[str, JobRecord] = {}
+        for job_hash in job_hashes:
+            job_record = self._retrieve_record_for_job_hash(job_hash=job_hash)
+            if job_record is not None:
+                result[job_hash] = job_record
+        return result
+
+    def retrieve_records_for_job_hashes(
+        self, job_hashes: Iterable[str]
+    ) -> Mapping[str, JobRecord]:
+        """Retrieve the records for all of the provided job hashes that exist in this archive, keyed on job hash."""
+
+        return self._retrieve_records_for_job_hashes(job_hashes=job_hashes)
+
     def retrieve_matching_job_records(
         self, matcher: JobMatcher
     ) -> Generator[JobRecord, None, None]:
@@ -71,6 +88,31 @@ class JobArchive(BaseArchive):
     ) -> Generator[JobRecord, None, None]:
         pass
 
+    def retrieve_lineage_edges(
+        self,
+        value_ids: Iterable[uuid.UUID],
+        downstream: bool = True,
+        allow_internal: bool = True,
+    ) -> Iterable[LineageEdge]:
+        """Retrieve all lineage edges that start (downstream) or end (upstream) at one of the provided values.
+
+        This default implementation iterates over all job records, archives that maintain an index
+        should override it.
+        """
+
+        value_ids = set(value_ids)
+        for job_id in self.retrieve_all_job_ids().keys():
+            job_record = self.retrieve_record_for_job_id(job_id)
+            if job_record is None:
+                continue
+            if job_record.is_internal and not allow_internal:
+                continue
+            for edge in job_record.lineage_edges:
+                if downstream and edge.input_value_id in value_ids:
+                    yield edge
+                elif not downstream and edge.output_value_id in value_ids:
+                    yield edge
+
 
 class JobStore(JobArchive):
     @classmethod
@@ -2,18 +2,20 @@
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Generator, Iterable, Mapping, Union
+from typing import Any, Dict, Generator, Iterable, List, Mapping, Union
 
 import orjson
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Engine
 
 from kiara.defaults import (
     REQUIRED_TABLES_JOB_ARCHIVE,
+    SQLITE_MAX_VARIABLES_PER_QUERY,
     TABLE_NAME_ARCHIVE_METADATA,
+    TABLE_NAME_JOB_LINEAGE,
     TABLE_NAME_JOB_RECORDS,
 )
-from kiara.models.module.jobs import JobMatcher, JobRecord
+from kiara.models.module.jobs import JobMatcher, JobRecord, LineageEdge
 from kiara.registries import ArchiveDetails, SqliteArchiveConfig
 from kiara.registries.jobs import JobArchive, JobStore
 from kiara.utils.db import create_archive_engine, delete_archive_db
@@ -64,6 +66,9 @@ class SqliteJobArchive(JobArchive):
         self._db_path: Union[Path, None] = None
         self._cached_engine: Union[Engine, None] = None
         self._use_wal_mode: bool = archive_config.use_wal_mode
+        self._performance_profile: str = archive_config.performance_profile
+        self._has_lineage_index: bool = False
+        self._has_internal_column: bool = False
         # self._lock: bool = True
 
     # def _retrieve_archive_id(self) -> uuid.UUID:
@@ -111,6 +116,8 @@ class SqliteJobArchive(JobArchive):
             db_path=self.sqlite_path,
             force_read_only=self.is_force_read_only(),
             use_wal_mode=self._use_wal_mode,
+            performance_profile=self._performance_profile,
+            record_profile=self.is_writeable(),
         )
 
         create_table_sql = f"""
@@ -121,6 +128,7 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
     manifest_hash TEXT NOT NULL,
     input_ids_hash TEXT NOT NULL,
     inputs_data_hash TEXT NOT NULL,
+    is_internal INTEGER,
     job_metadata TEXT NOT NULL
 );
 """
@@ -130,10 +138,101 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
                 if statement.strip():
                     connection.execute(text(statement))
 
+        self._has_internal_column = self._ensure_job_record_indexes()
+        self._has_lineage_index = self._ensure_lineage_index()
+
         # if self._lock:
         #     event.listen(self._cached_engine, "connect", _pragma_on_connect)
         return self._cached_engine
 
+    def _ensure_job_record_indexes(self) -> bool:
+        """Make sure the 'is_internal' column and the query indexes of the job records table exist.
+
+        Returns 'False' if the column does not exist and can't be added because the archive is not writeable.
+        """
+
+        assert self._cached_engine is not None
+
+        with self._cached_engine.connect() as connection:
+            columns = {
+                row[1]
+                for row in connection.execute(
+                    text(f"PRAGMA table_info({TABLE_NAME_JOB_RECORDS})")
+                )
+            }
+
+        if not self.is_writeable():
+            return "is_internal" in columns
+
+        index_sql = f"""
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_JOB_RECORDS}_job_hash ON {TABLE_NAME_JOB_RECORDS} (job_hash);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_JOB_RECORDS}_manifest_hash ON {TABLE_NAME_JOB_RECORDS} (manifest_hash, input_ids_hash);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_JOB_RECORDS}_submitted ON {TABLE_NAME_JOB_RECORDS} (job_submitted);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_JOB_RECORDS}_is_internal ON {TABLE_NAME_JOB_RECORDS} (is_internal, job_submitted);
+"""
+        if "is_internal" not in columns:
+            # archive created with an older version of kiara
+            index_sql = (
+                f"""
+ALTER TABLE {TABLE_NAME_JOB_RECORDS} ADD COLUMN is_internal INTEGER;
+UPDATE {TABLE_NAME_JOB_RECORDS} SET is_internal = json_extract(job_metadata, '$.is_internal');
+"""
+                + index_sql
+            )
+
+        with self._cached_engine.begin() as connection:
+            for statement in index_sql.split(";"):
+                if statement.strip():
+                    connection.execute(text(statement))
+
+        return True
+
+    def _ensure_lineage_index(self) -> bool:
+        """Make sure the lineage table exists, and populate it from existing job records if it was just created.
+
+        Returns 'False' if the table does not exist and can't be created because the archive is not writeable.
+        """
+
+        assert self._cached_engine is not None
+
+        check_sql = text(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=:table_name"
+        )
+        with self._cached_engine.connect() as connection:
+            exists = (
+                connection.execute(
+                    check_sql, {"table_name": TABLE_NAME_JOB_LINEAGE}
+                ).fetchone()
+                is not None
+            )
+
+        if exists:
+            return True
+        if not self.is_writeable():
+            return False
+
+        create_table_sql = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_LINEAGE} (
+    job_id TEXT NOT NULL,
+    is_output INTEGER NOT NULL,
+    field_name TEXT NOT NULL,
+    value_id TEXT NOT NULL,
+    PRIMARY KEY (job_id, is_output, field_name)
+);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_JOB_LINEAGE}_value_id ON {TABLE_NAME_JOB_LINEAGE} (value_id, is_output);
+INSERT OR IGNORE INTO {TABLE_NAME_JOB_LINEAGE} (job_id, is_output, field_name, value_id)
+    SELECT job_id, 0, field.key, field.value FROM {TABLE_NAME_JOB_RECORDS}, json_each({TABLE_NAME_JOB_RECORDS}.job_metadata, '$.inputs') AS field;
+INSERT OR IGNORE INTO {TABLE_NAME_JOB_LINEAGE} (job_id, is_output, field_name, value_id)
+    SELECT job_id, 1, field.key, field.value FROM {TABLE_NAME_JOB_RECORDS}, json_each({TABLE_NAME_JOB_RECORDS}.job_metadata, '$.outputs') AS field;
+"""
+
+        with self._cached_engine.begin() as connection:
+            for statement in create_table_sql.split(";"):
+                if statement.strip():
+                    connection.execute(text(statement))
+
+        return True
+
     def _retrieve_record_for_job_hash(self, job_hash: str) -> Union[JobRecord, None]:
         sql = text(
             f"SELECT job_metadata FROM {TABLE_NAME_JOB_RECORDS} WHERE job_hash = :job_hash"
@@ -151,6 +250,22 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
             job_record = JobRecord(**job_record_data)
             return job_record
 
+    def _retrieve_records_for_job_hashes(
+        self, job_hashes: Iterable[str]
+    ) -> Mapping[str, JobRecord]:
+        sql = text(
+            f"SELECT job_hash, job_metadata FROM {TABLE_NAME_JOB_RECORDS} WHERE job_hash IN :job_hashes"
+        ).bindparams(bindparam("job_hashes", expanding=True))
+
+        _job_hashes = list(job_hashes)
+        result: Dict[str, JobRecord] = {}
+        with self.sqlite_engine.connect() as connection:
+            for i in range(0, len(_job_hashes), SQLITE_MAX_VARIABLES_PER_QUERY):
+                batch = _job_hashes[i : i + SQLITE_MAX_VARIABLES_PER_QUERY]
+                for row in connection.execute(sql, {"job_hashes": batch}):
+                    result[row[0]] = JobRecord(**orjson.loads(row[1]))
+        return result
+
     def _retrieve_all_job_ids(self) -> Mapping[uuid.UUID, datetime]:
         """
         Retrieve a list of all job record ids in the archive.
@@ -185,14 +300,20 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
     def _retrieve_matching_job_records(
         self, matcher: JobMatcher
     ) -> Generator[JobRecord, None, None]:
+        # make sure the engine is initialized, and we know which indexes are available
+        engine = self.sqlite_engine
+
         query_conditions = []
         params: Dict[str, Any] = {}
         if matcher.job_ids:
             query_conditions.append("job_id IN :job_ids")
-            params["job_ids"] = (str(x) for x in matcher.job_ids)
+            params["job_ids"] = [str(x) for x in matcher.job_ids]
 
         if not matcher.allow_internal:
-            cond = "json_extract(job_metadata, '$.is_internal') = 0"
+            if self._has_internal_column:
+                cond = "is_internal = 0"
+            else:
+                cond = "json_extract(job_metadata, '$.is_internal') = 0"
             query_conditions.append(cond)
 
         if matcher.earliest:
@@ -205,15 +326,23 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
             query_conditions.append(cond)
             params["latest"] = matcher.latest.isoformat()
 
-        if matcher.operation_inputs:
-            raise NotImplementedError(
-                "Job matcher 'operation_inputs' not implemented yet"
-            )
-
-        if matcher.produced_outputs:
-            raise NotImplementedError(
-                "Job matcher 'produced_outputs' not implemented yet"
-            )
+        if matcher.min_runtime is not None:
+            cond = "json_extract(job_metadata, '$.runtime_details.runtime') >= :min_runtime"
+            query_conditions.append(cond)
+            params["min_runtime"] = matcher.min_runtime
+
+        for param_name, value_ids, is_output, json_path in (
+            ("operation_inputs", matcher.operation_inputs, 0, "$.inputs"),
+            ("produced_outputs", matcher.produced_outputs, 1, "$.outputs"),
+        ):
+            if not value_ids:
+                continue
+            if self._has_lineage_index:
+                cond = f"job_id IN (SELECT job_id FROM {TABLE_NAME_JOB_LINEAGE} WHERE is_output = {is_output} AND value_id IN :{param_name})"
+            else:
+                cond = f"EXISTS (SELECT 1 FROM json_each(job_metadata, '{json_path}') WHERE value IN :{param_name})"
+            query_conditions.append(cond)
+            params[param_name] = [str(x) for x in value_ids]
 
         sql_query = f"SELECT job_id, job_metadata FROM {TABLE_NAME_JOB_RECORDS}"
         if query_conditions:
@@ -222,11 +351,16 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
             for query_cond in query_conditions:
                 sql_query += "( " + query_cond + " ) AND "
 
-            sql_query = sql_query[:-5] + ";"
+            sql_query = sql_query[:-5]
+
+        sql_query += " ORDER BY job_submitted DESC;"
 
         sql = text(sql_query)
+        for param_name in ("job_ids", "operation_inputs", "produced_outputs"):
+            if param_name in params.keys():
+                sql = sql.bindparams(bindparam(param_name, expanding=True))
 
-        with self.sqlite_engine.connect() as connection:
+        with engine.connect() as connection:
             result = connection.execute(sql, params)
             for row in result:
                 # job_id = uuid.UUID(row[0])
@@ -236,6 +370,53 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
 
         return
 
+    def retrieve_lineage_edges(
+        self,
+        value_ids: Iterable[uuid.UUID],
+        downstream: bool = True,
+        allow_internal: bool = True,
+    ) -> Iterable[LineageEdge]:
+        engine = self.sqlite_engine
+        if not self._has_lineage_index:
+            return super().retrieve_lineage_edges(
+                value_ids=value_ids,
+                downstream=downstream,
+                allow_internal=allow_internal,
+            )
+
+        match_column = "source.value_id" if downstream else "target.value_id"
+        sql_query = f"""
+SELECT source.value_id, source.job_id, target.value_id
+FROM {TABLE_NAME_JOB_LINEAGE} AS source
+JOIN {TABLE_NAME_JOB_LINEAGE} AS target
+    ON target.job_id = source.job_id AND target.is_output = 1
+"""
+        if not allow_internal:
+            internal_col = (
+                "jobs.is_internal"
+                if self._has_internal_column
+                else "json_extract(jobs.job_metadata, '$.is_internal')"
+            )
+            sql_query += f"""JOIN {TABLE_NAME_JOB_RECORDS} AS jobs
+    ON jobs.job_id = source.job_id AND {internal_col} = 0
+"""
+        sql_query += f"WHERE source.is_output = 0 AND {match_column} IN :value_ids"
+
+        sql = text(sql_query).bindparams(bindparam("value_ids", expanding=True))
+
+        _value_ids = [str(x) for x in value_ids]
+        edges: List[LineageEdge] = []
+        with engine.connect() as connection:
+            for i in range(0, len(_value_ids), SQLITE_MAX_VARIABLES_PER_QUERY):
+                batch = _value_ids[i : i + SQLITE_MAX_VARIABLES_PER_QUERY]
+                result = connection.execute(sql, {"value_ids": batch})
+                edges.extend(
+                    LineageEdge(uuid.UUID(row[0]), uuid.UUID(row[1]), uuid.UUID(row[2]))
+                    for row in result
+                )
+
+        return edges
+
     def retrieve_all_job_hashes(
         self,
         manifest_hash: Union[str, None] = None,
@@ -248,7 +429,7 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
                 params = {}
             else:
                 sql = text(
-                    f"SELECT job_hash FROM {TABLE_NAME_JOB_RECORDS} WHERE inputs_hash = :inputs_hash"
+                    f"SELECT job_hash FROM {TABLE_NAME_JOB_RECORDS} WHERE input_ids_hash = :inputs_hash"
                 )
                 params = {"inputs_hash": inputs_id_hash}
         else:
@@ -259,7 +440,7 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_JOB_RECORDS} (
                 params = {"manifest_hash": manifest_hash}
             else:
                 sql = text(
-                    f"SELECT job_hash FROM {TABLE_NAME_JOB_RECORDS} WHERE manifest_hash = :manifest_hash AND inputs_hash = :inputs_hash"
+                    f"SELECT job_hash FROM {TABLE_NAME_JOB_RECORDS} WHERE manifest_hash = :manifest_hash AND input_ids_hash = :inputs_hash"
                 )
                 params = {"manifest_hash": manifest_hash, "inputs_hash": inputs_id_hash}
 
@@ -322,7 +503,7 @@ class SqliteJobStore(SqliteJobArchive, JobStore):
         job_submitted = job_record.job_submitted.isoformat()
 
         sql = text(
-            f"INSERT OR IGNORE INTO {TABLE_NAME_JOB_RECORDS}(job_id, job_submitted, job_hash, manifest_hash, input_ids_hash, inputs_data_hash, job_metadata) VALUES (:job_id, :job_submitted, :job_hash, :manifest_hash, :input_ids_hash, :inputs_data_hash, :job_metadata)"
+            f"INSERT OR IGNORE INTO {TABLE_NAME_JOB_RECORDS}(job_id, job_submitted, job_hash, manifest_hash, input_ids_hash, inputs_data_hash, is_internal, job_metadata) VALUES (:job_id, :job_submitted, :job_hash, :manifest_hash, :input_ids_hash, :inputs_data_hash, :is_internal, :job_metadata)"
         )
         params = {
             "job_id": str(job_record.job_id),
@@ -331,11 +512,36 @@ class SqliteJobStore(SqliteJobArchive, JobStore):
             "manifest_hash": manifest_hash,
             "input_ids_hash": input_ids_hash,
             "inputs_data_hash": inputs_data_hash,
+            "is_internal": 1 if job_record.is_internal else 0,
             "job_metadata": job_record_json,
         }
 
+        lineage_sql = text(
+            f"INSERT OR IGNORE INTO {TABLE_NAME_JOB_LINEAGE}(job_id, is_output, field_name, value_id) VALUES (:job_id, :is_output, :field_name, :value_id)"
+        )
+        lineage_params = [
+            {
+                "job_id": str(job_record.job_id),
+                "is_output": 0,
+                "field_name": field_name,
+                "value_id": str(value_id),
+            }
+            for field_name, value_id in job_record.inputs.items()
+        ]
+        lineage_params.extend(
+            {
+                "job_id": str(job_record.job_id),
+                "is_output": 1,
+                "field_name": field_name,
+                "value_id": str(value_id),
+            }
+            for field_name, value_id in job_record.outputs.items()
+        )
+
         with self.sqlite_engine.connect() as connection:
             connection.execute(sql, params)
+            if lineage_params:
+                connection.execute(lineage_sql, lineage_params)
 
             connection.commit()
 
@@ -6,10 +6,12 @@ from typing import (
     Callable,
     Dict,
     Generator,
+    Iterable,
     List,
     Literal,
     Mapping,
     Tuple,
+    Type,
     Union,
 )
 
@@ -366,8 +368,70 @@ class MetadataRegistry(object):
                 allow_multiple_references=allow_multiple_references,
             )
 
-    def retrieve_job_metadata_items(self, job_id: uuid.UUID):
-        raise NotImplementedError("Job metadata items retrieval is not yet implemented")
+    def retrieve_referenced_metadata_items(
+        self,
+        reference_item_ids: Iterable[Union[str, uuid.UUID]],
+        reference_item_type: Union[str, None] = None,
+        key: Union[str, None] = None,
+        store: Union[str, uuid.UUID, None] = None,
+    ) -> Dict[str, Dict[str, KiaraMetadata]]:
+        """Retrieve the metadata items for a batch of referenced items (e.g. values or jobs), with one query per archive.
+
+        If no store is specified, the default store is queried first, and all other archives are only queried for the
+        ids that were not found in the ones before.
+
+        Returns:
+            a map with the (stringified) reference id as key, and a map of metadata item key to metadata item as value
+        """
+
+        ids = {str(x) for x in reference_item_ids}
+
+        if store:
+            archives: Iterable[MetadataArchive] = [
+                self.get_archive(archive_id_or_alias=store)
+            ]
+        else:
+            default_archive = self.get_archive()
+            archives = [default_archive]
+            archives.extend(
+                (x for x in self.metadata_archives.values() if x is not default_archive)
+            )
+
+        result: Dict[str, Dict[str, KiaraMetadata]] = {}
+        model_classes: Dict[str, Type[KiaraMetadata]] = {}
+        for archive in archives:
+            missing = ids.difference(result.keys())
+            if not missing:
+                break
+
+            items = archive.retrieve_referenced_metadata_items(
+                reference_item_ids=missing,
+                reference_item_type=reference_item_type,
+                metadata_item_key=key,
+            )
+            for reference_id, metadata_items in items.items():
+                instances = result.setdefault(reference_id, {})
+                for item_key, (model_type_id, data) in metadata_items.items():
+                    model_cls = model_classes.get(model_type_id, None)
+                    if model_cls is None:
+                        model_cls = self._kiara.kiara_model_registry.get_model_cls(  # type: ignore
+                            kiara_model_id=model_type_id,
+                            required_subclass=KiaraMetadata,
+                        )
+                        model_classes[model_type_id] = model_cls  # type: ignore
+                    instances[item_key] = model_cls(**data)  # type: ignore
+
+        return result
+
+    def retrieve_job_metadata_items(
+        self, job_id: uuid.UUID, store: Union[str, uuid.UUID, None] = None
+    ) -> Dict[str, KiaraMetadata]:
+        """Retrieve all metadata items (comments, etc.) that are attached to a job."""
+
+        result = self.retrieve_referenced_metadata_items(
+            reference_item_ids=[job_id], reference_item_type="job", store=store
+        )
+        return result.get(str(job_id), {})
 
     def retrieve_job_metadata_item(
         self, job_id: uuid.UUID, key: str, store: Union[str, uuid.UUID, None] = None
@@ -121,6 +121,38 @@ class MetadataArchive(BaseArchive[ARCHIVE_CONFIG_CLS], Generic[ARCHIVE_CONFIG_CL
                 "Retrieving metadata item without reference not implemented yet."
             )
 
+    def retrieve_referenced_metadata_items(
+        self,
+        reference_item_ids: Iterable[str],
+        reference_item_type: Union[str, None] = None,
+        metadata_item_key: Union[str, None] = None,
+    ) -> Mapping[str, Mapping[str, Tuple[str, Mapping[str, Any]]]]:
+        """Return the model type and model data of all metadata items that are referenced from any of the specified ids.
+
+        The result is a map with the reference id as key, and a map of metadata item key to (model type, model data) tuple as value.
+        Ids that have no metadata items attached are not included in the result.
+
+        Arguments:
+            reference_item_ids: the ids of the referenced items (e.g. value or job ids)
+            reference_item_type: if set, only return items that are referenced from items of this type
+            metadata_item_key: if set, only return metadata items with this key
+        """
+
+        return self._retrieve_referenced_metadata_items(
+            reference_item_ids=reference_item_ids,
+            reference_item_type=reference_item_type,
+            metadata_item_key=metadata_item_key,
+        )
+
+    @abc.abstractmethod
+    def _retrieve_referenced_metadata_items(
+        self,
+        reference_item_ids: Iterable[str],
+        reference_item_type: Union[str, None] = None,
+        metadata_item_key: Union[str, None] = None,
+    ) -> Mapping[str, Mapping[str, Tuple[str, Mapping[str, Any]]]]:
+        pass
+
     @abc.abstractmethod
     def _retrieve_referenced_metadata_item_data(
         self, key: str, reference_type: str, reference_key: str, reference_id: str
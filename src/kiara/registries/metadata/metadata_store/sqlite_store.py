@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import uuid
+from collections import namedtuple
 from pathlib import Path
 from typing import (
     Any,
@@ -28,6 +29,23 @@ from kiara.registries.metadata import MetadataArchive, MetadataMatcher, Metadata
 from kiara.utils.dates import get_current_time_incl_timezone
 from kiara.utils.db import create_archive_engine, delete_archive_db
 
+METADATA_ITEM_FIELDS = (
+    "metadata_item_id",
+    "metadata_item_created",
+    "metadata_item_key",
+    "metadata_item_hash",
+    "model_type_id",
+    "model_schema_hash",
+    "metadata_value",
+)
+METADATA_REFERENCE_FIELDS = (
+    "reference_item_type",
+    "reference_item_key",
+    "reference_item_id",
+    "reference_created",
+    "metadata_item_id",
+)
+
 
 class SqliteMetadataArchive(MetadataArchive):
     _archive_type_name = "sqlite_metadata_archive"
@@ -72,6 +90,7 @@ class SqliteMetadataArchive(MetadataArchive):
         self._db_path: Union[Path, None] = None
         self._cached_engine: Union[Engine, None] = None
         self._use_wal_mode: bool = archive_config.use_wal_mode
+        self._performance_profile: str = archive_config.performance_profile
 
         # self._lock: bool = True
 
@@ -120,6 +139,8 @@ class SqliteMetadataArchive(MetadataArchive):
             db_path=self.sqlite_path,
             force_read_only=self.is_force_read_only(),
             use_wal_mode=self._use_wal_mode,
+            performance_profile=self._performance_profile,
+            record_profile=self.is_writeable(),
         )
 
         create_table_sql = f"""
@@ -155,10 +176,28 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_METADATA_REFERENCES} (
                 if statement.strip():
                     connection.execute(text(statement))
 
+        if self.is_writeable():
+            self._ensure_reference_indexes()
+
         # if self._lock:
         #     event.listen(self._cached_engine, "connect", _pragma_on_connect)
         return self._cached_engine
 
+    def _ensure_reference_indexes(self):
+        """Make sure the indexes used to look up metadata references exist (archives created with older versions of kiara don't have them)."""
+
+        assert self._cached_engine is not None
+
+        index_sql = f"""
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_METADATA_REFERENCES}_item_id ON {TABLE_NAME_METADATA_REFERENCES} (reference_item_id, reference_item_type, reference_item_key);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_METADATA_REFERENCES}_item_type ON {TABLE_NAME_METADATA_REFERENCES} (reference_item_type, reference_item_key);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_METADATA_REFERENCES}_metadata_item_id ON {TABLE_NAME_METADATA_REFERENCES} (metadata_item_id);
+"""
+        with self._cached_engine.begin() as connection:
+            for statement in index_sql.split(";"):
+                if statement.strip():
+                    connection.execute(text(statement))
+
     def _retrieve_metadata_item_with_hash(
         self, item_hash: str, key: Union[str, None] = None
     ) -> Union[Tuple[str, Mapping[str, Any]], None]:
@@ -208,132 +247,104 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME_METADATA_REFERENCES} (
         metadata_item_result_fields: Union[Iterable[str], None] = None,
         reference_item_result_fields: Union[Iterable[str], None] = None,
     ) -> Generator[Tuple[Any, ...], None, None]:
-        # find all metadata items first
+        # metadata items and references are retrieved with a single joined query, every metadata item is
+        # yielded once (the first time it is encountered), followed by the matching reference item(s)
 
         if not metadata_item_result_fields:
-            metadata_fields_str = "m.*"
-        else:
-            metadata_fields_str = ", ".join(
-                (f"m.{x}" for x in metadata_item_result_fields)
-            )
+            metadata_item_result_fields = METADATA_ITEM_FIELDS
+        if not reference_item_result_fields:
+            reference_item_result_fields = METADATA_REFERENCE_FIELDS
 
-        metadata_fields_str += ", :result_type as result_type"
+        metadata_fields = list(metadata_item_result_fields)
+        reference_fields = list(reference_item_result_fields)
 
-        sql_string = f"SELECT {metadata_fields_str} FROM {TABLE_NAME_METADATA} m "
-        conditions = []
-        params = {"result_type": "metadata_item"}
+        metadata_item_cls = namedtuple(  # type: ignore
+            "MetadataItem", metadata_fields + ["result_type"]
+        )
+        reference_item_cls = namedtuple(  # type: ignore
+            "MetadataReferenceItem", reference_fields + ["result_type"]
+        )
+
+        select_fields = ["m.metadata_item_id AS _item_id", "r.rowid AS _ref_rowid"]
+        select_fields.extend((f"m.{x} AS m__{x}" for x in metadata_fields))
+        select_fields.extend((f"r.{x} AS r__{x}" for x in reference_fields))
 
-        ref_query = False
-        if (
-            matcher.reference_item_types
-            or matcher.reference_item_keys
-            or matcher.reference_item_ids
+        conditions = []
+        params: Dict[str, Any] = {}
+        for field_name, column in (
+            ("reference_item_ids", "reference_item_id"),
+            ("reference_item_types", "reference_item_type"),
+            ("reference_item_keys", "reference_item_key"),
         ):
-            ref_query = True
-            sql_string += (
-                "JOIN metadata_references r ON m.metadata_item_id = r.metadata_item_id"
+            items = getattr(matcher, field_name)
+            if not items:
+                continue
+            conditions.append(
+                f"r.{column} IN (SELECT value FROM json_each(:{field_name}))"
             )
-
-        # if matcher.metadata_item_keys:
-        #     conditions.append("m.metadata_item_key in :metadata_item_keys")
-        #     params["metadata_item_key"] = matcher.metadata_item_keys
-
-        if matcher.reference_item_ids:
-            assert ref_query
-            in_clause = []
-            for idx, item_id in enumerate(matcher.reference_item_ids):
-                params[f"ri_id_{idx}"] = item_id
-                in_clause.append(f":ri_id_{idx}")
-            in_clause_str = ", ".join(in_clause)
-            conditions.append(f"r.reference_item_id IN ({in_clause_str})")
-            # params["reference_item_ids"] = tuple(matcher.reference_item_ids)
-
-        if matcher.reference_item_types:
-            assert ref_query
-            in_clause = []
-            for idx, item_type in enumerate(matcher.reference_item_types):
-                params[f"ri_type_{idx}"] = item_type
-                in_clause.append(f":ri_type_{idx}")
-            in_clause_str = ", ".join(in_clause)
-            conditions.append(f"r.reference_item_type IN ({in_clause_str})")
-            # params["reference_item_types"] = tuple(matcher.reference_item_types)
-
-        if matcher.reference_item_keys:
-            assert ref_query
-            in_clause = []
-            for idx, item_key in enumerate(matcher.reference_item_keys):
-                params[f"ri_key_{idx}"] = item_key
-                in_clause.append(f":ri_key_{idx}")
-            in_clause_str = ", ".join(in_clause)
-            conditions.append(f"r.reference_item_key IN ({in_clause_str})")
-            # params["reference_item_keys"] = tuple(matcher.reference_item_keys)
+            params[field_name] = orjson.dumps(items).decode()
 
         if conditions:
-            sql_string += " WHERE"
-            for cond in conditions:
-                sql_string += f" {cond} AND"
-
-            sql_string = sql_string[:-4]
-        sql = text(sql_string)
-
-        # ... now construct the query to find the reference items (if applicable)
-        if not reference_item_result_fields:
-            reference_fields_str = "r.*"
+            join = "JOIN"
+            where = " WHERE " + " AND ".join(conditions)
         else:
-            reference_fields_str = ", ".join(
-                (f"r.{x}" for x in reference_item_result_fields)
-            )
+            join = "LEFT JOIN"
+            where = ""
 
-        ref_sql_string = f"SELECT {reference_fields_str}, :result_type as result_type FROM metadata_references r"
-        ref_params = {"result_type": "metadata_ref_item"}
-        ref_conditions = []
-
-        if matcher.reference_item_ids:
-            assert ref_query
-            in_clause = []
-            for idx, item_id in enumerate(matcher.reference_item_ids):
-                ref_params[f"ri_id_{idx}"] = item_id
-                in_clause.append(f":ri_id_{idx}")
-            ref_conditions.append(f"r.reference_item_id IN ({in_clause_str})")
-            # ref_params["reference_item_ids"] = tuple(matcher.reference_item_ids)
-
-        if matcher.reference_item_types:
-            assert ref_query
-            in_clause = []
-            for idx, item_type in enumerate(matcher.reference_item_types):
-                ref_params[f"ri_type_{idx}"] = item_type
-                in_clause.append(f":ri_type_{idx}")
-            in_clause_str = ", ".join(in_clause)
-            ref_conditions.append(f"r.reference_item_type IN ({in_clause_str})")
-            # ref_params["reference_item_types"] = tuple(matcher.reference_item_types)
-
-        if matcher.reference_item_keys:
-            assert ref_query
-            in_clause = []
-            for idx, item_key in enumerate(matcher.reference_item_keys):
-                ref_params[f"ri_key_{idx}"] = item_key
-                in_clause.append(f":ri_key_{idx}")
-            in_clause_str = ", ".join(in_clause)
-            ref_conditions.append(f"r.reference_item_key IN ({in_clause_str})")
-            # ref_params["reference_item_keys"] = tuple(matcher.reference_item_keys)
-
-        if ref_conditions:
-            ref_sql_string += " WHERE"
-            for cond in ref_conditions:
-                ref_sql_string += f" {cond} AND"
-
-            ref_sql_string = ref_sql_string[:-4]
-
-        ref_sql = text(ref_sql_string)
+        sql = text(
+            f"SELECT {', '.join(select_fields)} FROM {TABLE_NAME_METADATA} m {join} {TABLE_NAME_METADATA_REFERENCES} r ON m.metadata_item_id = r.metadata_item_id{where}"
+        )
 
+        seen_metadata_items = set()
         with self.sqlite_engine.connect() as connection:
             result = connection.execute(sql, params)
             for row in result:
-                yield row
+                data = row._mapping
+                item_id = data["_item_id"]
+                if item_id not in seen_metadata_items:
+                    seen_metadata_items.add(item_id)
+                    yield metadata_item_cls(
+                        *(data[f"m__{x}"] for x in metadata_fields), "metadata_item"
+                    )
+                if data["_ref_rowid"] is not None:
+                    yield reference_item_cls(
+                        *(data[f"r__{x}"] for x in reference_fields),
+                        "metadata_ref_item",
+                    )
+
+    def _retrieve_referenced_metadata_items(
+        self,
+        reference_item_ids: Iterable[str],
+        reference_item_type: Union[str, None] = None,
+        metadata_item_key: Union[str, None] = None,
+    ) -> Mapping[str, Mapping[str, Tuple[str, Mapping[str, Any]]]]:
+        conditions = ["r.reference_item_id IN (SELECT value FROM json_each(:ids))"]
+        params: Dict[str, Any] = {}
+        if reference_item_type:
+            conditions.append("r.reference_item_type = :reference_item_type")
+            params["reference_item_type"] = reference_item_type
+        if metadata_item_key:
+            conditions.append("m.metadata_item_key = :metadata_item_key")
+            params["metadata_item_key"] = metadata_item_key
 
-            result = connection.execute(ref_sql, ref_params)
-            for row in result:
-                yield row
+        sql = text(
+            f"""
+            SELECT r.reference_item_id, m.metadata_item_key, m.model_type_id, m.metadata_value
+            FROM {TABLE_NAME_METADATA_REFERENCES} r
+            JOIN {TABLE_NAME_METADATA} m ON m.metadata_item_id = r.metadata_item_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY r.reference_created
+        """
+        )
+
+        params["ids"] = orjson.dumps([str(x) for x in reference_item_ids]).decode()
+
+        result: Dict[str, Dict[str, Tuple[str, Mapping[str, Any]]]] = {}
+        with self.sqlite_engine.connect() as connection:
+            for row in connection.execute(sql, params):
+                result.setdefault(row[0], {})[row[1]] = (row[2], orjson.loads(row[3]))
+
+        return result
 
     def _retrieve_referenced_metadata_item_data(
         self, key: str, reference_type: str, reference_key: str, reference_id: str
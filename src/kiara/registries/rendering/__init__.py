@@ -1,13 +1,28 @@
 # -*- coding: utf-8 -*-
+import copy
+import hashlib
 import os
 from functools import partial
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Tuple,
+    Type,
+    Union,
+)
 
 import mistune
 import structlog
 from jinja2 import (
     BaseLoader,
+    BytecodeCache,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     PackageLoader,
     PrefixLoader,
@@ -16,7 +31,7 @@ from jinja2 import (
     select_autoescape,
 )
 
-from kiara.defaults import SpecialValue
+from kiara.defaults import JINJA_BYTECODE_CACHE_DIR, SpecialValue
 from kiara.exceptions import KiaraException
 from kiara.operations.included_core_operations.render_value import (
     RenderValueOperationType,
@@ -24,6 +39,7 @@ from kiara.operations.included_core_operations.render_value import (
 from kiara.renderers import KiaraRenderer
 from kiara.renderers.jinja import BaseJinjaRenderer, JinjaEnv
 from kiara.utils import log_exception, log_message
+from kiara.utils.caching import CacheStats, LRUCache
 from kiara.utils.class_loading import find_all_kiara_renderers
 from kiara.utils.values import extract_raw_value
 
@@ -73,6 +89,11 @@ class RenderRegistry(object):
 
         self._template_loader: Union[None, PrefixLoader] = None
         self._default_jinja_env: Union[None, Environment] = None
+        self._bytecode_cache: Union[None, BytecodeCache] = None
+
+        self._render_cache: LRUCache[Tuple[str, str, str], Any] = LRUCache(
+            max_size=self._kiara.runtime_config.render_cache_size
+        )
 
     def register_renderer_cls(self, renderer_cls: Type[KiaraRenderer]):
         try:
@@ -174,6 +195,33 @@ class RenderRegistry(object):
     def default_jinja_environment(self) -> Environment:
         return self.retrieve_jinja_env()
 
+    @property
+    def bytecode_cache(self) -> Union[None, BytecodeCache]:
+        """The (persistent) cache for compiled templates, shared by all jinja environments of this registry."""
+        if self._bytecode_cache is not None:
+            return self._bytecode_cache
+
+        try:
+            JINJA_BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._bytecode_cache = FileSystemBytecodeCache(
+                directory=JINJA_BYTECODE_CACHE_DIR.as_posix()
+            )
+        except Exception as e:
+            log_message(
+                "ignore.jinja_bytecode_cache",
+                reason="can't create cache directory",
+                path=JINJA_BYTECODE_CACHE_DIR.as_posix(),
+                error=e,
+            )
+        return self._bytecode_cache
+
+    @property
+    def render_cache_stats(self) -> CacheStats:
+        return self._render_cache.stats
+
+    def clear_render_cache(self):
+        self._render_cache.clear()
+
     @property
     def template_loaders(self) -> Mapping[str, BaseLoader]:
         if self._template_pkg_loaders is not None:
@@ -229,7 +277,11 @@ class RenderRegistry(object):
                     f"No template base found for: {template_base}", details=msg
                 )
 
-        env = Environment(loader=loader, autoescape=select_autoescape())
+        env = Environment(
+            loader=loader,
+            autoescape=select_autoescape(),
+            bytecode_cache=self.bytecode_cache,
+        )
 
         env.filters["render_model"] = partial(render_model_filter, self)
         env.filters["render_bool"] = boolean_filter
@@ -300,7 +352,61 @@ class RenderRegistry(object):
             render_config = {}
         rc = renderer_instance.__class__._inputs_schema(**render_config)
 
-        return renderer_instance.render(item, render_config=rc)
+        cache_key = self._create_render_cache_key(
+            renderer=renderer_instance, item=item, render_config=rc
+        )
+        if cache_key is not None:
+            cached = self._render_cache.get(cache_key, None)
+            if cached is not None:
+                return _copy_render_result(cached)
+
+        result = renderer_instance.render(item, render_config=rc)
+        if cache_key is not None:
+            try:
+                # callers might modify the result, so the cache keeps its own copy
+                self._render_cache.put(cache_key, _copy_render_result(result))
+            except Exception as e:
+                log_message(
+                    "ignore.render_cache",
+                    reason="can't copy render result",
+                    result_type=type(result),
+                    error=e,
+                )
+        return result
+
+    def _create_render_cache_key(
+        self, renderer: KiaraRenderer, item: Any, render_config: "KiaraModel"
+    ) -> Union[None, Tuple[str, str, str]]:
+        """Create the key for the render cache, or return 'None' if the item can't be cached.
+
+        Only kiara models can be cached: values are identified by their id (their 'instance_cid' only covers the data,
+        not the value details that get rendered), all other models by a hash over their complete content. Anything
+        else (strings that refer to operations or files, for example) might resolve to a different item between calls.
+        """
+        if not self._render_cache.max_size:
+            return None
+
+        from kiara.models import KiaraModel
+        from kiara.models.values.value import Value
+
+        if not isinstance(item, KiaraModel):
+            return None
+
+        try:
+            if isinstance(item, Value):
+                item_key = f"value:{item.value_id}"
+            else:
+                item_key = hashlib.sha256(item.model_dump_json().encode()).hexdigest()
+            key: Hashable = (
+                renderer.get_renderer_alias(),
+                item_key,
+                str(render_config.instance_cid),
+            )
+        except Exception as e:
+            log_message("ignore.render_cache", reason=str(e), item_type=type(item))
+            return None
+
+        return key  # type: ignore
 
     @property
     def template_loader(self) -> PrefixLoader:
@@ -361,3 +467,9 @@ class RenderRegistry(object):
         env = self.retrieve_jinja_env(template_base=template_base)
         result: List[str] = env.list_templates()
         return result
+
+
+def _copy_render_result(result: Any) -> Any:
+    if result is None or isinstance(result, (str, bytes, int, float, bool)):
+        return result
+    return copy.deepcopy(result)
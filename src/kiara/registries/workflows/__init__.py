@@ -123,8 +123,19 @@ class WorkflowStore(WorkflowArchive):
         pass
 
     @abc.abstractmethod
-    def add_workflow_state(self, workflow_state: WorkflowState):
-        pass
+    def add_workflow_state(
+        self,
+        workflow_state: WorkflowState,
+        workflow_id: Union[uuid.UUID, None] = None,
+    ):
+        """
+        Store a workflow state.
+
+        Arguments:
+        ---------
+            workflow_state: the workflow state
+            workflow_id: the id of the workflow the state belongs to (if known), stores can use it to store the state more efficiently
+        """
 
     @abc.abstractmethod
     def register_alias(self, workflow_id: uuid.UUID, alias: str):
@@ -473,7 +484,9 @@ class WorkflowRegistry(object):
         store_name = self.default_alias_store
         store: WorkflowStore = self.get_archive(archive_id=store_name)  # type: ignore
 
-        store.add_workflow_state(workflow_state=workflow_state)
+        store.add_workflow_state(
+            workflow_state=workflow_state, workflow_id=workflow_details.workflow_id
+        )
         if set_current:
             workflow_details.current_state = workflow_state.instance_id
 
@@ -183,7 +183,7 @@ class FileSystemWorkflowStore(FileSystemWorkflowArchive, WorkflowStore):
                 f"Can't update workflow with id '{workflow_metadata.workflow_id}': id not registered."
             )
 
-        workflow_json = workflow_metadata.json(option=orjson.OPT_NON_STR_KEYS)
+        workflow_json = workflow_metadata.model_dump_json()
         workflow_path.write_text(workflow_json)
 
     def register_alias(self, workflow_id: uuid.UUID, alias: str, force: bool = False):
@@ -212,7 +212,11 @@ class FileSystemWorkflowStore(FileSystemWorkflowArchive, WorkflowStore):
         alias_path.unlink()
         return True
 
-    def add_workflow_state(self, workflow_state: WorkflowState):
+    def add_workflow_state(
+        self,
+        workflow_state: WorkflowState,
+        workflow_id: Union[uuid.UUID, None] = None,
+    ):
         self.workflow_states_path.mkdir(exist_ok=True, parents=True)
         workflow_state_path = (
             self.workflow_states_path / f"{workflow_state.instance_id}.state"
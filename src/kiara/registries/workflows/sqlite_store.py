@@ -1,21 +1,73 @@
 # -*- coding: utf-8 -*-
 import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Mapping, Union
+from typing import Any, Dict, Iterable, List, Mapping, Tuple, Union
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+import orjson
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
 
+from kiara.defaults import (
+    REQUIRED_TABLES_WORKFLOW_ARCHIVE,
+    SQLITE_MAX_VARIABLES_PER_QUERY,
+    TABLE_NAME_ARCHIVE_METADATA,
+    TABLE_NAME_WORKFLOW_ALIASES,
+    TABLE_NAME_WORKFLOW_HISTORY,
+    TABLE_NAME_WORKFLOW_STATES,
+    TABLE_NAME_WORKFLOWS,
+    WORKFLOW_LAST_STATES_CACHE_SIZE,
+    WORKFLOW_STATE_CHECKPOINT_INTERVAL,
+)
+from kiara.exceptions import NoSuchWorkflowException
 from kiara.models.workflow import WorkflowMetadata, WorkflowState
 from kiara.registries import SqliteArchiveConfig
 from kiara.registries.workflows import WorkflowArchive, WorkflowStore
-from kiara.utils.windows import fix_windows_longpath
+from kiara.utils.caching import LRUCache
+from kiara.utils.dates import get_current_time_incl_timezone
+from kiara.utils.db import create_archive_engine, delete_archive_db
+from kiara.utils.json import apply_json_delta, create_json_delta
+
+
+def _load_sqlite_workflow_archive_config(
+    archive_uri: str,
+) -> Union[Dict[str, Any], None]:
+    if not Path(archive_uri).is_file():
+        return None
+
+    import sqlite3
+
+    con = sqlite3.connect(archive_uri)
+    cursor = con.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+    tables = {x[0] for x in cursor.fetchall()}
+    con.close()
+
+    if not REQUIRED_TABLES_WORKFLOW_ARCHIVE.issubset(tables):
+        return None
+
+    return {"sqlite_db_path": archive_uri}
 
 
 class SqliteWorkflowArchive(WorkflowArchive[SqliteArchiveConfig]):
+    """A workflow archive that stores workflow states as deltas against the previous state of the same workflow.
+
+    Every 'WORKFLOW_STATE_CHECKPOINT_INTERVAL' states (or if a delta would not be smaller), the full state is stored
+    instead, so re-creating a single state never needs more than that many rows.
+    """
+
     _archive_type_name = "sqlite_workflow_archive"
     _config_cls = SqliteArchiveConfig
 
+    @classmethod
+    def _load_archive_config(
+        cls, archive_uri: str, allow_write_access: bool, **kwargs
+    ) -> Union[Dict[str, Any], None]:
+        if allow_write_access:
+            return None
+
+        return _load_sqlite_workflow_archive_config(archive_uri)
+
     def __init__(
         self,
         archive_name: str,
@@ -29,17 +81,15 @@ class SqliteWorkflowArchive(WorkflowArchive[SqliteArchiveConfig]):
         )
         self._db_path: Union[Path, None] = None
         self._cached_engine: Union[Engine, None] = None
-        # self._lock: bool = True
+        self._use_wal_mode: bool = archive_config.use_wal_mode
+        self._performance_profile: str = archive_config.performance_profile
 
-    def _retrieve_archive_id(self) -> uuid.UUID:
-        sql = text("SELECT value FROM archive_metadata WHERE key='archive_id'")
+    def _retrieve_archive_metadata(self) -> Mapping[str, Any]:
+        sql = text(f"SELECT key, value FROM {TABLE_NAME_ARCHIVE_METADATA}")
 
         with self.sqlite_engine.connect() as connection:
             result = connection.execute(sql)
-            row = result.fetchone()
-            if row is None:
-                raise Exception("No archive ID found in metadata")
-            return uuid.UUID(row[0])
+            return {row[0]: row[1] for row in result}
 
     @property
     def sqlite_path(self):
@@ -47,7 +97,7 @@ class SqliteWorkflowArchive(WorkflowArchive[SqliteArchiveConfig]):
             return self._db_path
 
         db_path = Path(self.config.sqlite_db_path).resolve()
-        self._db_path = fix_windows_longpath(db_path)
+        self._db_path = db_path
 
         if self._db_path.exists():
             return self._db_path
@@ -55,66 +105,403 @@ class SqliteWorkflowArchive(WorkflowArchive[SqliteArchiveConfig]):
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
         return self._db_path
 
-    @property
-    def db_url(self) -> str:
-        return f"sqlite:///{self.sqlite_path}"
-
     @property
     def sqlite_engine(self) -> "Engine":
         if self._cached_engine is not None:
             return self._cached_engine
 
-        # def _pragma_on_connect(dbapi_con, con_record):
-        #     dbapi_con.execute("PRAGMA query_only = ON")
+        self._cached_engine = create_archive_engine(
+            db_path=self.sqlite_path,
+            force_read_only=self.is_force_read_only(),
+            use_wal_mode=self._use_wal_mode,
+            performance_profile=self._performance_profile,
+            record_profile=self.is_writeable(),
+        )
 
-        self._cached_engine = create_engine(self.db_url, future=True)
-        create_table_sql = """
-CREATE TABLE IF NOT EXISTS job_records (
-    job_hash TEXT PRIMARY KEY,
-    manifest_hash TEXT NOT NULL,
-    inputs_hash TEXT NOT NULL,
-    job_metadata TEXT NOT NULL
+        create_table_sql = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME_WORKFLOWS} (
+    workflow_id TEXT PRIMARY KEY,
+    workflow_metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {TABLE_NAME_WORKFLOW_ALIASES} (
+    alias TEXT PRIMARY KEY,
+    workflow_id TEXT NOT NULL,
+    alias_created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {TABLE_NAME_WORKFLOW_STATES} (
+    workflow_state_id TEXT PRIMARY KEY,
+    workflow_id TEXT,
+    base_state_id TEXT,
+    delta_depth INTEGER NOT NULL,
+    state_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME_WORKFLOW_STATES}_workflow_id ON {TABLE_NAME_WORKFLOW_STATES}(workflow_id);
+CREATE TABLE IF NOT EXISTS {TABLE_NAME_WORKFLOW_HISTORY} (
+    workflow_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    workflow_state_id TEXT NOT NULL,
+    PRIMARY KEY (workflow_id, timestamp)
 );
 """
 
-        with self._cached_engine.begin() as connection:
-            for statement in create_table_sql.split(";"):
-                if statement.strip():
-                    connection.execute(text(statement))
+        if not self.is_force_read_only():
+            with self._cached_engine.begin() as connection:
+                for statement in create_table_sql.split(";"):
+                    if statement.strip():
+                        connection.execute(text(statement))
 
-        # if self._lock:
-        #     event.listen(self._cached_engine, "connect", _pragma_on_connect)
         return self._cached_engine
 
     def retrieve_all_workflow_aliases(self) -> Mapping[str, uuid.UUID]:
-        raise NotImplementedError()
+        sql = text(f"SELECT alias, workflow_id FROM {TABLE_NAME_WORKFLOW_ALIASES}")
+        with self.sqlite_engine.connect() as connection:
+            result = connection.execute(sql)
+            return {row[0]: uuid.UUID(row[1]) for row in result}
 
     def retrieve_all_workflow_ids(self) -> Iterable[uuid.UUID]:
-        raise NotImplementedError()
+        sql = text(f"SELECT workflow_id FROM {TABLE_NAME_WORKFLOWS}")
+        with self.sqlite_engine.connect() as connection:
+            result = connection.execute(sql)
+            return [uuid.UUID(row[0]) for row in result]
 
     def retrieve_workflow_metadata(self, workflow_id: uuid.UUID) -> WorkflowMetadata:
-        raise NotImplementedError()
+        sql = text(
+            f"SELECT workflow_metadata FROM {TABLE_NAME_WORKFLOWS} WHERE workflow_id = :workflow_id"
+        )
+        history_sql = text(
+            f"SELECT timestamp, workflow_state_id FROM {TABLE_NAME_WORKFLOW_HISTORY} WHERE workflow_id = :workflow_id ORDER BY timestamp"
+        )
+        params = {"workflow_id": str(workflow_id)}
+        with self.sqlite_engine.connect() as connection:
+            row = connection.execute(sql, params).fetchone()
+            if row is None:
+                raise NoSuchWorkflowException(
+                    workflow=workflow_id,
+                    msg=f"Can't retrieve workflow with id '{workflow_id}': id does not exist.",
+                )
+            history = {
+                datetime.fromisoformat(r[0]): r[1]
+                for r in connection.execute(history_sql, params)
+            }
+
+        workflow_data = orjson.loads(row[0])
+        workflow_data["workflow_history"] = history
+        workflow = WorkflowMetadata(**workflow_data)
+        workflow._kiara = self.kiara_context
+
+        return workflow
+
+    def _retrieve_state_data(
+        self, connection: Connection, workflow_state_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Re-create the (json) data of the specified states, by applying the chain of deltas to the last checkpoint.
+
+        The delta chains of all states are resolved with a single (recursive) query, rows that are needed by more than
+        one state (e.g. when retrieving all states of a workflow) are only read and decoded once.
+        """
+        rows: Dict[str, Tuple[Union[str, None], Any]] = {}
+
+        sql = text(
+            f"""
+            WITH RECURSIVE state_chain(workflow_state_id) AS (
+                SELECT workflow_state_id FROM {TABLE_NAME_WORKFLOW_STATES} WHERE workflow_state_id IN :state_ids
+                UNION
+                SELECT s.base_state_id FROM {TABLE_NAME_WORKFLOW_STATES} s
+                JOIN state_chain c ON s.workflow_state_id = c.workflow_state_id
+                WHERE s.base_state_id IS NOT NULL
+            )
+            SELECT s.workflow_state_id, s.base_state_id, s.state_data FROM {TABLE_NAME_WORKFLOW_STATES} s
+            JOIN state_chain c ON s.workflow_state_id = c.workflow_state_id
+            """
+        ).bindparams(bindparam("state_ids", expanding=True))
+
+        _state_ids = list(workflow_state_ids)
+        for i in range(0, len(_state_ids), SQLITE_MAX_VARIABLES_PER_QUERY):
+            batch = _state_ids[i : i + SQLITE_MAX_VARIABLES_PER_QUERY]
+            for row in connection.execute(sql, {"state_ids": batch}):
+                if row[0] not in rows.keys():
+                    rows[row[0]] = (row[1], orjson.loads(row[2]))
+
+        not_found = [x for x in _state_ids if x not in rows.keys()]
+        not_found.extend(
+            base for base, _ in rows.values() if base and base not in rows.keys()
+        )
+        if not_found:
+            raise Exception(
+                f"No workflow state with id '{not_found[0]}' exists in archive '{self.archive_name}'."
+            )
+
+        states: Dict[str, Dict[str, Any]] = {}
+        for workflow_state_id in _state_ids:
+            chain: List[str] = []
+            current: Union[str, None] = workflow_state_id
+            while current is not None and current not in states.keys():
+                chain.append(current)
+                current = rows[current][0]
+
+            for state_id in reversed(chain):
+                base_state_id, state_data = rows[state_id]
+                if base_state_id is None:
+                    states[state_id] = state_data
+                else:
+                    states[state_id] = apply_json_delta(
+                        states[base_state_id], state_data
+                    )
+
+        return states
+
+    def _create_workflow_state(self, state_data: Mapping[str, Any]) -> WorkflowState:
+        _state = WorkflowState(**state_data)
+        _state.pipeline_info._kiara = self.kiara_context
+        _state._kiara = self.kiara_context
+        return _state
 
     def retrieve_workflow_state(self, workflow_state_id: str) -> WorkflowState:
-        raise NotImplementedError()
+        with self.sqlite_engine.connect() as connection:
+            states = self._retrieve_state_data(
+                connection=connection, workflow_state_ids=[workflow_state_id]
+            )
+
+        return self._create_workflow_state(states[workflow_state_id])
 
     def retrieve_all_states_for_workflow(
         self, workflow_id: uuid.UUID
     ) -> Mapping[str, WorkflowState]:
-        raise NotImplementedError()
+        sql = text(
+            f"SELECT DISTINCT h.workflow_state_id FROM {TABLE_NAME_WORKFLOW_HISTORY} h JOIN {TABLE_NAME_WORKFLOW_STATES} s ON h.workflow_state_id = s.workflow_state_id WHERE h.workflow_id = :workflow_id"
+        )
+        with self.sqlite_engine.connect() as connection:
+            state_ids = [
+                row[0]
+                for row in connection.execute(sql, {"workflow_id": str(workflow_id)})
+            ]
+            states = self._retrieve_state_data(
+                connection=connection, workflow_state_ids=state_ids
+            )
+
+        return {
+            state_id: self._create_workflow_state(states[state_id])
+            for state_id in state_ids
+        }
+
+    def _delete_archive(self):
+        delete_archive_db(db_path=self.sqlite_path)
 
 
 class SqliteWorkflowStore(SqliteWorkflowArchive, WorkflowStore):
     _archive_type_name = "sqlite_workflow_store"
 
+    @classmethod
+    def _load_archive_config(
+        cls, archive_uri: str, allow_write_access: bool, **kwargs
+    ) -> Union[Dict[str, Any], None]:
+        if not allow_write_access:
+            return None
+
+        return _load_sqlite_workflow_archive_config(archive_uri)
+
+    def __init__(
+        self,
+        archive_name: str,
+        archive_config: SqliteArchiveConfig,
+        force_read_only: bool = False,
+    ):
+        super().__init__(
+            archive_name=archive_name,
+            archive_config=archive_config,
+            force_read_only=force_read_only,
+        )
+        self._last_states: LRUCache[uuid.UUID, Tuple[str, Dict[str, Any], int]] = (
+            LRUCache(max_size=WORKFLOW_LAST_STATES_CACHE_SIZE)
+        )
+        """The last state that was stored for recently changed workflows (id, data, delta depth), to create the next delta from."""
+
+    def _persist_workflow_history(
+        self, connection: Connection, workflow_metadata: WorkflowMetadata
+    ):
+        if not workflow_metadata.workflow_history:
+            return
+
+        sql = text(
+            f"INSERT OR IGNORE INTO {TABLE_NAME_WORKFLOW_HISTORY} (workflow_id, timestamp, workflow_state_id) VALUES (:workflow_id, :timestamp, :workflow_state_id)"
+        )
+        workflow_id = str(workflow_metadata.workflow_id)
+        params = [
+            {
+                "workflow_id": workflow_id,
+                "timestamp": timestamp.isoformat(),
+                "workflow_state_id": workflow_state_id,
+            }
+            for timestamp, workflow_state_id in workflow_metadata.workflow_history.items()
+        ]
+        connection.execute(sql, params)
+
     def _register_workflow_metadata(self, workflow_metadata: WorkflowMetadata) -> None:
-        raise NotImplementedError()
+        check_sql = text(
+            f"SELECT 1 FROM {TABLE_NAME_WORKFLOWS} WHERE workflow_id = :workflow_id"
+        )
+        sql = text(
+            f"INSERT INTO {TABLE_NAME_WORKFLOWS} (workflow_id, workflow_metadata) VALUES (:workflow_id, :workflow_metadata)"
+        )
+        params = {
+            "workflow_id": str(workflow_metadata.workflow_id),
+            "workflow_metadata": workflow_metadata.model_dump_json(
+                exclude={"workflow_history"}
+            ),
+        }
+        with self.sqlite_engine.begin() as connection:
+            if connection.execute(check_sql, params).fetchone() is not None:
+                raise Exception(
+                    f"Can't register workflow with id '{workflow_metadata.workflow_id}': id already registered."
+                )
+            connection.execute(sql, params)
+            self._persist_workflow_history(
+                connection=connection, workflow_metadata=workflow_metadata
+            )
 
     def _update_workflow_metadata(self, workflow_metadata: WorkflowMetadata):
-        raise NotImplementedError()
+        sql = text(
+            f"UPDATE {TABLE_NAME_WORKFLOWS} SET workflow_metadata = :workflow_metadata WHERE workflow_id = :workflow_id"
+        )
+        params = {
+            "workflow_id": str(workflow_metadata.workflow_id),
+            "workflow_metadata": workflow_metadata.model_dump_json(
+                exclude={"workflow_history"}
+            ),
+        }
+        with self.sqlite_engine.begin() as connection:
+            result = connection.execute(sql, params)
+            if result.rowcount == 0:
+                raise Exception(
+                    f"Can't update workflow with id '{workflow_metadata.workflow_id}': id not registered."
+                )
+            self._persist_workflow_history(
+                connection=connection, workflow_metadata=workflow_metadata
+            )
+
+    def _retrieve_last_state(
+        self, connection: Connection, workflow_id: uuid.UUID
+    ) -> Union[Tuple[str, Dict[str, Any], int], None]:
+        last_state = self._last_states.get(workflow_id, None)
+        if last_state is not None:
+            return last_state
 
-    def add_workflow_state(self, workflow_state: WorkflowState):
-        raise NotImplementedError()
+        sql = text(
+            f"SELECT workflow_state_id, delta_depth FROM {TABLE_NAME_WORKFLOW_STATES} WHERE workflow_id = :workflow_id ORDER BY rowid DESC LIMIT 1"
+        )
+        row = connection.execute(sql, {"workflow_id": str(workflow_id)}).fetchone()
+        if row is None:
+            return None
+
+        states = self._retrieve_state_data(
+            connection=connection, workflow_state_ids=[row[0]]
+        )
+        return (row[0], states[row[0]], row[1])
+
+    def add_workflow_state(
+        self,
+        workflow_state: WorkflowState,
+        workflow_id: Union[uuid.UUID, None] = None,
+    ):
+        """Store a workflow state, as delta against the last state that was stored for the same workflow (if possible).
+
+        If no workflow id is provided, the state is always stored in full.
+        """
+        workflow_state_id = workflow_state.instance_id
+
+        check_sql = text(
+            f"SELECT 1 FROM {TABLE_NAME_WORKFLOW_STATES} WHERE workflow_state_id = :workflow_state_id"
+        )
+        sql = text(
+            f"INSERT INTO {TABLE_NAME_WORKFLOW_STATES} (workflow_state_id, workflow_id, base_state_id, delta_depth, state_data) VALUES (:workflow_state_id, :workflow_id, :base_state_id, :delta_depth, :state_data)"
+        )
+
+        with self.sqlite_engine.begin() as connection:
+            exists = connection.execute(
+                check_sql, {"workflow_state_id": workflow_state_id}
+            ).fetchone()
+            if exists is not None:
+                return
+
+            state_data = orjson.loads(workflow_state.model_dump_json())
+            full_json = orjson.dumps(state_data)
+
+            base_state_id: Union[str, None] = None
+            delta_depth = 0
+            data_json = full_json
+
+            last_state = None
+            if workflow_id is not None:
+                last_state = self._retrieve_last_state(
+                    connection=connection, workflow_id=workflow_id
+                )
+
+            if (
+                last_state is not None
+                and last_state[2] + 1 < WORKFLOW_STATE_CHECKPOINT_INTERVAL
+            ):
+                delta = create_json_delta(last_state[1], state_data)
+                delta_json = orjson.dumps(delta)
+                if len(delta_json) < len(full_json):
+                    base_state_id = last_state[0]
+                    delta_depth = last_state[2] + 1
+                    data_json = delta_json
+
+            connection.execute(
+                sql,
+                {
+                    "workflow_state_id": workflow_state_id,
+                    "workflow_id": str(workflow_id) if workflow_id else None,
+                    "base_state_id": base_state_id,
+                    "delta_depth": delta_depth,
+                    "state_data": data_json.decode(),
+                },
+            )
+
+        if workflow_id is not None:
+            self._last_states.put(
+                workflow_id, (workflow_state_id, state_data, delta_depth)
+            )
+
+    def register_alias(self, workflow_id: uuid.UUID, alias: str, force: bool = False):
+        check_sql = text(
+            f"SELECT 1 FROM {TABLE_NAME_WORKFLOWS} WHERE workflow_id = :workflow_id"
+        )
+        alias_sql = text(
+            f"SELECT 1 FROM {TABLE_NAME_WORKFLOW_ALIASES} WHERE alias = :alias"
+        )
+        sql = text(
+            f"INSERT OR REPLACE INTO {TABLE_NAME_WORKFLOW_ALIASES} (alias, workflow_id, alias_created) VALUES (:alias, :workflow_id, :alias_created)"
+        )
+        with self.sqlite_engine.begin() as connection:
+            if (
+                not force
+                and connection.execute(alias_sql, {"alias": alias}).fetchone()
+                is not None
+            ):
+                raise Exception(
+                    f"Can't register workflow alias '{alias}': alias already registered."
+                )
+            if (
+                connection.execute(
+                    check_sql, {"workflow_id": str(workflow_id)}
+                ).fetchone()
+                is None
+            ):
+                raise Exception(
+                    f"Can't register workflow alias '{alias}': target id '{workflow_id}' not registered."
+                )
+            connection.execute(
+                sql,
+                {
+                    "alias": alias,
+                    "workflow_id": str(workflow_id),
+                    "alias_created": get_current_time_incl_timezone().isoformat(),
+                },
+            )
 
-    def register_alias(self, workflow_id: uuid.UUID, alias: str):
-        raise NotImplementedError()
+    def unregister_alias(self, alias: str) -> bool:
+        sql = text(f"DELETE FROM {TABLE_NAME_WORKFLOW_ALIASES} WHERE alias = :alias")
+        with self.sqlite_engine.begin() as connection:
+            result = connection.execute(sql, {"alias": alias})
+            return result.rowcount > 0
@@ -120,7 +120,8 @@ class ValueRenderer(
             result = rendered.rendered
         else:
             if not render_config.include_data:
-                rendered.rendered = None
+                # the render result is the data of a (possibly cached) value, so it must not be changed in place
+                rendered = rendered.model_copy(update={"rendered": None})
             result = rendered
 
         return result
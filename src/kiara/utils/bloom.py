@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import hashlib
+import math
+import struct
+from typing import Iterable, Tuple, Union
+
+_HEADER = struct.Struct(">BQQQB")
+_FORMAT_VERSION = 1
+
+
+def _to_bytes(item: Union[str, bytes]) -> bytes:
+    return item.encode() if isinstance(item, str) else item
+
+
+class BloomFilter(object):
+    """A compact, probabilistic set membership filter.
+
+    A lookup that returns 'False' means the item was definitely never added, 'True' means it was added, or (with a
+    probability of roughly 'error_rate', as long as no more than 'capacity' items were added) that it is a false
+    positive. Items can't be removed.
+    """
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01):
+        if capacity < 1:
+            raise ValueError(
+                f"Invalid bloom filter capacity '{capacity}': must be > 0."
+            )
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError(
+                f"Invalid bloom filter error rate '{error_rate}': must be between 0 and 1."
+            )
+
+        no_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self._no_bits: int = max(8, no_bits)
+        self._no_hashes: int = max(1, round(self._no_bits / capacity * math.log(2)))
+        self._capacity: int = capacity
+        self._bits: bytearray = bytearray((self._no_bits + 7) // 8)
+        self._count: int = 0
+
+    @classmethod
+    def from_items(
+        cls,
+        items: Iterable[Union[str, bytes]],
+        capacity: int = 1024,
+        error_rate: float = 0.01,
+    ) -> "BloomFilter":
+        bloom_filter = cls(capacity=capacity, error_rate=error_rate)
+        bloom_filter.update(items)
+        return bloom_filter
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Re-create a filter that was serialized with 'to_bytes'."""
+
+        version, no_bits, capacity, count, no_hashes = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported bloom filter format version: {version}")
+
+        bloom_filter = cls.__new__(cls)
+        bloom_filter._no_bits = no_bits
+        bloom_filter._no_hashes = no_hashes
+        bloom_filter._count = count
+        bloom_filter._bits = bytearray(data[_HEADER.size :])
+        bloom_filter._capacity = capacity
+        if len(bloom_filter._bits) != (no_bits + 7) // 8:
+            raise ValueError("Invalid bloom filter data: wrong size.")
+        return bloom_filter
+
+    def to_bytes(self) -> bytes:
+        return (
+            _HEADER.pack(
+                _FORMAT_VERSION,
+                self._no_bits,
+                self._capacity,
+                self._count,
+                self._no_hashes,
+            )
+            + self._bits
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def count(self) -> int:
+        """The number of items that were added (incl. items that were added more than once)."""
+        return self._count
+
+    @property
+    def is_saturated(self) -> bool:
+        """Whether more items were added than the filter was sized for (so the error rate is higher than requested)."""
+        return self._count > self._capacity
+
+    def _hashes(self, item: Union[str, bytes]) -> Tuple[int, int]:
+        digest = hashlib.blake2b(_to_bytes(item), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+
+    def add(self, item: Union[str, bytes]):
+        h1, h2 = self._hashes(item)
+        bits, no_bits = self._bits, self._no_bits
+        for i in range(self._no_hashes):
+            pos = (h1 + i * h2) % no_bits
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def update(self, items: Iterable[Union[str, bytes]]):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: Union[str, bytes]) -> bool:
+        h1, h2 = self._hashes(item)
+        bits, no_bits = self._bits, self._no_bits
+        for i in range(self._no_hashes):
+            pos = (h1 + i * h2) % no_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import weakref
+from collections import OrderedDict
+from threading import RLock
+from typing import Callable, Dict, Generic, Hashable, Iterator, TypeVar, Union
+
+from pydantic import BaseModel, Field
+
+KEY_TYPE = TypeVar("KEY_TYPE", bound=Hashable)
+VALUE_TYPE = TypeVar("VALUE_TYPE")
+
+_MISSING = object()
+
+
+class CacheStats(BaseModel):
+    """Usage statistics of a cache."""
+
+    max_size: int = Field(
+        description="The maximum number of items (0 means caching is disabled)."
+    )
+    size: int = Field(description="The current number of items.")
+    hits: int = Field(description="The number of successful lookups.", default=0)
+    misses: int = Field(description="The number of failed lookups.", default=0)
+    evictions: int = Field(
+        description="The number of items that were removed to make room for new ones.",
+        default=0,
+    )
+
+
+class LRUCache(Generic[KEY_TYPE, VALUE_TYPE]):
+    """A thread-safe, size-bounded cache that evicts the least recently used item first.
+
+    A 'max_size' of 0 disables the cache, in which case lookups always miss and nothing is stored.
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 0:
+            raise ValueError(
+                f"Invalid max cache size '{max_size}': must not be negative."
+            )
+        self._max_size: int = max_size
+        self._items: OrderedDict[KEY_TYPE, VALUE_TYPE] = OrderedDict()
+        self._lock = RLock()
+
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int):
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def _evict(self):
+        while len(self._items) > self._max_size:
+            key, value = self._items.popitem(last=False)
+            self._evictions += 1
+            self._on_evict(key, value)
+
+    def _on_evict(self, key: KEY_TYPE, value: VALUE_TYPE):
+        pass
+
+    def get(
+        self, key: KEY_TYPE, default: Union[VALUE_TYPE, None] = None
+    ) -> Union[VALUE_TYPE, None]:
+        with self._lock:
+            value = self._items.get(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value  # type: ignore
+
+    def put(self, key: KEY_TYPE, value: VALUE_TYPE):
+        if not self._max_size:
+            return
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._evict()
+
+    def get_or_create(
+        self, key: KEY_TYPE, factory: Callable[[], VALUE_TYPE]
+    ) -> VALUE_TYPE:
+        """Return the cached item for the key, or create (and cache) it using the provided factory."""
+        value = self.get(key, _MISSING)  # type: ignore
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)  # type: ignore
+        return value  # type: ignore
+
+    def pop(
+        self, key: KEY_TYPE, default: Union[VALUE_TYPE, None] = None
+    ) -> Union[VALUE_TYPE, None]:
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[KEY_TYPE]:
+        return iter(list(self._items.keys()))
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            max_size=self._max_size,
+            size=len(self._items),
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
+
+
+class TieredCacheStats(CacheStats):
+    """Usage statistics of a tiered cache."""
+
+    pinned: int = Field(
+        description="The number of items that are pinned (never evicted).", default=0
+    )
+    weak_size: int = Field(
+        description="The number of evicted items that are still referenced elsewhere.",
+        default=0,
+    )
+    weak_hits: int = Field(
+        description="The number of lookups that were served from the weak-reference tier.",
+        default=0,
+    )
+
+
+class TieredCache(LRUCache[KEY_TYPE, VALUE_TYPE]):
+    """A size-bounded LRU cache, backed by a pinned tier and a weak-reference tier.
+
+    - pinned items are never evicted, this is meant for items that can't be re-created (e.g. values that only exist in memory)
+    - items that are evicted from the LRU tier are kept as weak references, so lookups still succeed as long as the item is in use somewhere else; such a hit moves the item back into the LRU tier
+
+    Items that don't support weak references are dropped on eviction.
+    """
+
+    def __init__(self, max_size: int = 128):
+        super().__init__(max_size=max_size)
+        self._pinned: Dict[KEY_TYPE, VALUE_TYPE] = {}
+        self._weak: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._weak_hits: int = 0
+
+    def _on_evict(self, key: KEY_TYPE, value: VALUE_TYPE):
+        try:
+            self._weak[key] = value
+        except TypeError:
+            pass
+
+    def get(
+        self, key: KEY_TYPE, default: Union[VALUE_TYPE, None] = None
+    ) -> Union[VALUE_TYPE, None]:
+        with self._lock:
+            value = self._pinned.get(key, _MISSING)
+            if value is not _MISSING:
+                self._hits += 1
+                return value  # type: ignore
+
+            value = self._items.get(key, _MISSING)
+            if value is not _MISSING:
+                self._items.move_to_end(key)
+                self._hits += 1
+                return value  # type: ignore
+
+            value = self._weak.pop(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+
+            self._weak_hits += 1
+            self._put_unpinned(key, value)  # type: ignore
+            return value  # type: ignore
+
+    def _put_unpinned(self, key: KEY_TYPE, value: VALUE_TYPE):
+        if self._max_size:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._evict()
+        else:
+            self._on_evict(key, value)
+
+    def put(self, key: KEY_TYPE, value: VALUE_TYPE, pinned: bool = False):
+        """Add an item to the cache.
+
+        If 'pinned' is set, the item is never evicted (until it is either popped, or re-added without the flag).
+        """
+        with self._lock:
+            self._weak.pop(key, None)
+            if pinned:
+                self._items.pop(key, None)
+                self._pinned[key] = value
+            else:
+                self._pinned.pop(key, None)
+                self._put_unpinned(key, value)
+
+    def pop(
+        self, key: KEY_TYPE, default: Union[VALUE_TYPE, None] = None
+    ) -> Union[VALUE_TYPE, None]:
+        with self._lock:
+            result = default
+            for tier in (self._weak, self._items, self._pinned):
+                value = tier.pop(key, _MISSING)
+                if value is not _MISSING:
+                    result = value
+            return result
+
+    def clear(self):
+        """Remove all items that are not pinned."""
+        with self._lock:
+            self._items.clear()
+            self._weak.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pinned or key in self._items or key in self._weak
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._items) + len(self._weak)
+
+    def __iter__(self) -> Iterator[KEY_TYPE]:
+        with self._lock:
+            keys = list(self._pinned.keys())
+            keys.extend(self._items.keys())
+            keys.extend(self._weak.keys())
+        return iter(keys)
+
+    @property
+    def stats(self) -> TieredCacheStats:
+        return TieredCacheStats(
+            max_size=self._max_size,
+            size=len(self._items),
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            pinned=len(self._pinned),
+            weak_size=len(self._weak),
+            weak_hits=self._weak_hits,
+        )
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+"""Content-defined chunking, using a FastCDC-style gear hash with normalized chunk sizes.
+
+Chunk boundaries only depend on the (last 64 bytes of) content before them, so inserting or removing data only changes
+the chunks around the modification, all other chunks (and their ids) stay the same.
+
+Changing the gear table, the masks or the default sizes changes all chunk boundaries (and therefore disables
+de-duplication against data that was chunked before), so those must never change.
+"""
+
+import hashlib
+import math
+from typing import Generator, List, Union
+
+CDC_MIN_SIZE = 64 * 1024
+CDC_AVG_SIZE = 256 * 1024
+CDC_MAX_SIZE = 1024 * 1024
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+_GEAR: List[int] = [
+    int.from_bytes(hashlib.sha256(f"kiara_gear_{i}".encode()).digest()[:8], "big")
+    for i in range(256)
+]
+
+
+def _create_mask(no_bits: int) -> int:
+    # the high bits of the gear hash depend on more of the preceding bytes than the low ones
+    return ((1 << no_bits) - 1) << (64 - no_bits)
+
+
+def find_chunk_boundary(
+    data: Union[bytes, memoryview],
+    start: int = 0,
+    min_size: int = CDC_MIN_SIZE,
+    avg_size: int = CDC_AVG_SIZE,
+    max_size: int = CDC_MAX_SIZE,
+) -> int:
+    """Return the (exclusive) end of the chunk that starts at 'start'.
+
+    If no boundary is found before the end of 'data' (and the chunk would be smaller than 'max_size'), the length of
+    'data' is returned.
+    """
+
+    remaining = len(data) - start
+    if remaining <= min_size:
+        return len(data)
+
+    bits = round(math.log2(avg_size))
+    # harder to match before the average size, easier after, which narrows the chunk size distribution
+    mask_small = _create_mask(bits + 2)
+    mask_large = _create_mask(bits - 2)
+
+    end = start + min(remaining, max_size)
+    normal = min(start + avg_size, end)
+
+    gear = _GEAR
+    h = 0
+    first = start + min_size
+    for pos, byte in enumerate(data[first:normal], first):
+        h = ((h << 1) + gear[byte]) & _MASK_64
+        if not h & mask_small:
+            return pos + 1
+    for pos, byte in enumerate(data[normal:end], normal):
+        h = ((h << 1) + gear[byte]) & _MASK_64
+        if not h & mask_large:
+            return pos + 1
+
+    return end
+
+
+def chunk_bytes(
+    data: Union[bytes, memoryview],
+    min_size: int = CDC_MIN_SIZE,
+    avg_size: int = CDC_AVG_SIZE,
+    max_size: int = CDC_MAX_SIZE,
+) -> Generator[bytes, None, None]:
+    """Split the data into content-defined chunks."""
+
+    view = memoryview(data)
+    start = 0
+    while start < len(view):
+        end = find_chunk_boundary(
+            view, start=start, min_size=min_size, avg_size=avg_size, max_size=max_size
+        )
+        yield bytes(view[start:end])
+        start = end
+
+
+def chunk_file(
+    path: str,
+    min_size: int = CDC_MIN_SIZE,
+    avg_size: int = CDC_AVG_SIZE,
+    max_size: int = CDC_MAX_SIZE,
+) -> Generator[bytes, None, None]:
+    """Split the content of a file into content-defined chunks, without reading the whole file into memory.
+
+    The resulting chunks are the same as the ones 'chunk_bytes' would create for the file content.
+    """
+
+    buffer_size = max_size * 8
+    buffer = b""
+    eof = False
+    with open(path, "rb") as f:
+        while True:
+            if not eof and len(buffer) < buffer_size:
+                data = f.read(buffer_size)
+                if data:
+                    buffer = buffer + data if buffer else data
+                else:
+                    eof = True
+
+            if not buffer:
+                return
+
+            view = memoryview(buffer)
+            start = 0
+            # only cut chunks that can't be influenced by data that is not read yet
+            while start < len(view) and (eof or len(view) - start >= max_size):
+                end = find_chunk_boundary(
+                    view,
+                    start=start,
+                    min_size=min_size,
+                    avg_size=avg_size,
+                    max_size=max_size,
+                )
+                yield bytes(view[start:end])
+                start = end
+
+            buffer = bytes(view[start:])
+            view.release()
+            if eof and not buffer:
+                return
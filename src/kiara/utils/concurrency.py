@@ -5,6 +5,8 @@
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 
 import threading
+from contextlib import contextmanager
+from typing import Generator
 
 
 class ThreadSaveCounter(object):
@@ -30,3 +32,48 @@ class ThreadSaveCounter(object):
         with self._lock:
             self._current -= 1
             return self._current
+
+
+class ReadWriteLock(object):
+    """A lock that can be held by many readers at once, or by a single writer.
+
+    Waiting writers take precedence over new readers, so a steady stream of reads can't starve writes. Neither lock is
+    re-entrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read_lock(self) -> Generator[None, None, None]:
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write_lock(self) -> Generator[None, None, None]:
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
@@ -7,11 +7,16 @@
 
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Union
 
 import orjson
 
 from kiara import is_debug
+from kiara.defaults import (
+    SQLITE_PERFORMANCE_PROFILE_MARKER,
+    SQLITE_READ_POOL_SIZE,
+    TABLE_NAME_ARCHIVE_METADATA,
+)
 from kiara.utils import log_message
 
 if TYPE_CHECKING:
@@ -41,10 +46,55 @@ def orm_json_deserialize(obj: str) -> Any:
     return orjson.loads(obj)
 
 
+SQLITE_PERFORMANCE_PROFILES: Mapping[str, Mapping[str, Union[str, int]]] = {
+    "default": {},
+    # fsync on every commit, and wait for (instead of failing on) locks held by other processes
+    "durable": {"synchronous": "FULL", "busy_timeout": 10000},
+    # for large imports: no fsync (a crash can corrupt the database), and a large page cache
+    "fast-bulk-load": {
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    # memory-mapped reads, and a medium page cache
+    "read-mostly": {
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+"""The PRAGMAs that are applied to every new connection of a sqlite archive, per performance profile."""
+
+
+def get_sqlite_pragmas(performance_profile: str) -> Mapping[str, Union[str, int]]:
+    if performance_profile not in SQLITE_PERFORMANCE_PROFILES:
+        raise ValueError(
+            f"Invalid sqlite performance profile '{performance_profile}', available profiles: {', '.join(SQLITE_PERFORMANCE_PROFILES.keys())}"
+        )
+
+    return SQLITE_PERFORMANCE_PROFILES[performance_profile]
+
+
 def create_archive_engine(
-    db_path: Path, force_read_only: bool, use_wal_mode: bool
+    db_path: Path,
+    force_read_only: bool,
+    use_wal_mode: bool,
+    performance_profile: str = "default",
+    record_profile: bool = False,
 ) -> "Engine":
-    from sqlalchemy import create_engine, text
+    """Create the engine for a sqlite archive.
+
+    The PRAGMAs of the performance profile are applied to every new connection. Read-only archives get a larger
+    connection pool, so concurrent readers (threads, or requests to the zmq service) don't have to wait for each other.
+
+    If 'record_profile' is set (only for writable archives), the profile is recorded in the archive metadata.
+    """
+
+    from sqlalchemy import create_engine, event, text
+    from sqlalchemy.pool import QueuePool
 
     # if use_wal_mode:
     #     # TODO: not sure this does anything
@@ -54,23 +104,42 @@ def create_archive_engine(
 
     connect_args: Dict[str, Any] = {}
     execution_options: Dict[str, Any] = {}
+    pool_args: Dict[str, Any] = {}
 
-    # TODO: enable this for read-only mode?
-    # def _pragma_on_connect(dbapi_con, con_record):
-    #     dbapi_con.execute("PRAGMA query_only = ON")
+    pragmas = get_sqlite_pragmas(performance_profile)
 
-    db_url = f"sqlite+pysqlite:///{db_path.as_posix()}"
     if force_read_only:
-        db_url = db_url + "?mode=ro&uri=true"
+        # query parameters are only passed on to sqlite for 'file:' uris
+        db_url = f"sqlite+pysqlite:///file:{db_path.as_posix()}?mode=ro&uri=true"
+        # connections are only ever used by one thread at a time, but not always the one that created them
+        connect_args["check_same_thread"] = False
+        pool_args = {
+            "poolclass": QueuePool,
+            "pool_size": SQLITE_READ_POOL_SIZE,
+            "max_overflow": SQLITE_READ_POOL_SIZE,
+        }
+    else:
+        db_url = f"sqlite+pysqlite:///{db_path.as_posix()}"
 
     db_engine = create_engine(
         db_url,
         future=True,
         connect_args=connect_args,
         execution_options=execution_options,
+        **pool_args,
     )
 
-    if use_wal_mode:
+    if pragmas:
+
+        def _pragma_on_connect(dbapi_con, con_record):
+            cursor = dbapi_con.cursor()
+            for key, value in pragmas.items():
+                cursor.execute(f"PRAGMA {key}={value};")
+            cursor.close()
+
+        event.listen(db_engine, "connect", _pragma_on_connect)
+
+    if use_wal_mode and not force_read_only:
         with db_engine.connect() as conn:
             conn.execute(text("PRAGMA journal_mode=wal;"))
 
@@ -81,6 +150,23 @@ def create_archive_engine(
                 "detect.sqlite.journal_mode", result={wal_mode[0]}, db_url=db_url
             )
 
+    if record_profile and not force_read_only:
+        with db_engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {TABLE_NAME_ARCHIVE_METADATA} (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+            )
+            conn.execute(
+                text(
+                    f"INSERT OR REPLACE INTO {TABLE_NAME_ARCHIVE_METADATA} (key, value) VALUES (:key, :value)"
+                ),
+                {
+                    "key": SQLITE_PERFORMANCE_PROFILE_MARKER,
+                    "value": performance_profile,
+                },
+            )
+
     return db_engine
 
 
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from enum import Enum
-from typing import Any, ClassVar, Dict, Tuple, Type, Union
+from typing import Any, ClassVar, Dict, Literal, Tuple, Type, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import (
@@ -181,6 +181,29 @@ class KiaraDevLogSettings(BaseModel):
     )
 
 
+class KiaraDevJobProfileSettings(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid", validate_assignment=True, use_enum_values=True
+    )
+
+    enabled: bool = Field(
+        description="Whether to write a profiler dump for every job that is run.",
+        default=False,
+    )
+    profiler: Literal["cprofile", "pyinstrument"] = Field(
+        description="The profiler to use ('cprofile' dumps can be inspected with 'snakeviz' or 'pstats', 'pyinstrument' creates html reports).",
+        default="cprofile",
+    )
+    output_folder: Union[str, None] = Field(
+        description="The folder to write the profiler dumps into, defaults to the 'job_profiles' folder in the kiara cache directory.",
+        default=None,
+    )
+    internal_modules: bool = Field(
+        description="Whether to also profile runs of internal modules.",
+        default=False,
+    )
+
+
 class KiaraDevSettings(BaseSettings):
     # TODO[pydantic]: We couldn't refactor this class, please create the `model_config` manually.
     # Check https://docs.pydantic.dev/dev-v2/migration/#changes-to-config for more information.
@@ -237,6 +260,10 @@ class KiaraDevSettings(BaseSettings):
         description="Whether to always disable the job cache (ignores the runtime_job_cache setting in the kiara configuration).",
         default=True,
     )
+    job_profile: KiaraDevJobProfileSettings = Field(
+        description="Settings about (optionally) creating profiler dumps for jobs.",
+        default_factory=KiaraDevJobProfileSettings,
+    )
 
     def create_renderable(self, **render_config: Any):
         from kiara.utils.output import create_recursive_table_from_model_object
@@ -310,6 +310,10 @@ class HashFS(object):
         """Check whether a given file id or path exists on disk."""
         return bool(self.realpath(file))
 
+    def exists_id(self, id: str) -> bool:
+        """Check whether a file with the given hash id exists, without the path/extension lookups of 'exists'."""
+        return os.path.isfile(self.idpath(id))
+
     def haspath(self, path):
         """
         Return whether `path` is a subdirectory of the :attr:`root`
@@ -5,6 +5,11 @@
 #
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
 from typing import Tuple, Union
 
 import dag_cbor
@@ -15,8 +20,23 @@ from multiformats.multicodec import Multicodec
 from multiformats.multihash import Multihash
 from multiformats.varint import BytesLike
 
+from kiara.utils import log_message
+
 KIARA_HASH_FUNCTION = mmh3.hash
 
+FILE_HASH_BUFFER_SIZE = 1024 * 1024
+"""The buffer size used to read files for hashing (if 'hashlib.file_digest' is not available)."""
+FILE_HASH_RACY_WINDOW_NS = 2_000_000_000
+"""Files that were modified more recently than this are not cached, since a change within the same mtime tick would go unnoticed."""
+
+_PROCESS_FILE_HASH_CACHE: Union["FileHashCache", None] = None
+"""The file hash cache that is used for all file hashing in this process.
+
+Files are hashed by models that don't know about kiara contexts, so there is only one cache per process. Creating a
+context (with the 'file_hash_cache' runtime option enabled) makes the database of that context the process-wide cache,
+for all contexts. Cached digests are keyed on the file, not on a context, so they are valid for every context.
+"""
+
 
 def compute_cid(
     data: IPLDKind,
@@ -35,22 +55,182 @@ def compute_cid(
 _, NONE_CID = compute_cid(data=None)
 
 
-def compute_cid_from_file(
-    file: str, codec: Union[str, int, Multicodec] = "raw", hash_codec: str = "sha2-256"
-):
+class FileHashCache(object):
+    """A persistent cache of file digests, keyed on the resolved path, inode, size and modification time of a file.
+
+    A cached digest is only used if none of those changed since it was computed.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self._db_path: Path = Path(db_path)
+        self._conn: Union[sqlite3.Connection, None] = None
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self._db_path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT NOT NULL,
+                    hash_codec TEXT NOT NULL,
+                    inode INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest BLOB NOT NULL,
+                    PRIMARY KEY (path, hash_codec)
+                )"""
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(
+        self, path: str, stat: os.stat_result, hash_codec: str
+    ) -> Union[bytes, None]:
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT inode, size, mtime_ns, digest FROM file_hashes WHERE path = ? AND hash_codec = ?",
+                    (path, hash_codec),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        if (row[0], row[1], row[2]) != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            return None
+        return row[3]
+
+    def put(self, path: str, stat: os.stat_result, hash_codec: str, digest: bytes):
+        with self._lock:
+            self._get_connection().execute(
+                "INSERT OR REPLACE INTO file_hashes (path, hash_codec, inode, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    hash_codec,
+                    stat.st_ino,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    digest,
+                ),
+            )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def enable_process_file_hash_cache(db_path: Union[str, Path]) -> FileHashCache:
+    """Use the specified database file as the (process-wide) file hash cache, replacing the current one."""
+
+    global _PROCESS_FILE_HASH_CACHE
+
+    db_path = Path(db_path)
+    if _PROCESS_FILE_HASH_CACHE is not None:
+        if _PROCESS_FILE_HASH_CACHE.db_path == db_path:
+            return _PROCESS_FILE_HASH_CACHE
+        _PROCESS_FILE_HASH_CACHE.close()
+
+    _PROCESS_FILE_HASH_CACHE = FileHashCache(db_path=db_path)
+    return _PROCESS_FILE_HASH_CACHE
+
+
+def disable_process_file_hash_cache():
+    global _PROCESS_FILE_HASH_CACHE
+
+    cache = _PROCESS_FILE_HASH_CACHE
+    _PROCESS_FILE_HASH_CACHE = None
+    if cache is not None:
+        cache.close()
+
+
+def get_process_file_hash_cache() -> Union[FileHashCache, None]:
+    return _PROCESS_FILE_HASH_CACHE
+
+
+def delete_file_hash_cache(db_path: Union[str, Path]):
+    """Delete a file hash cache database, if it is the process-wide cache, the cache is disabled first."""
+
+    db_path = Path(db_path)
+    if (
+        _PROCESS_FILE_HASH_CACHE is not None
+        and _PROCESS_FILE_HASH_CACHE.db_path == db_path
+    ):
+        disable_process_file_hash_cache()
+
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+
+def _hash_file(file: str) -> bytes:
+    with open(file, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").digest()
+
+        file_hash = hashlib.sha256()
+        buffer = bytearray(FILE_HASH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while size := f.readinto(buffer):
+            file_hash.update(view[:size])
+        return file_hash.digest()
+
+
+def compute_file_digest(file: str, hash_codec: str = "sha2-256") -> bytes:
+    """Compute the digest of a files content, using the process-wide file hash cache (if enabled)."""
+
     assert hash_codec == "sha2-256"
 
-    hash_func = hashlib.sha256
-    file_hash = hash_func()
+    cache = _PROCESS_FILE_HASH_CACHE
+    if cache is None:
+        return _hash_file(file)
+
+    path = os.path.realpath(file)
+    stat = os.stat(path)
+    try:
+        cached = cache.get(path, stat, hash_codec)
+    except Exception as e:
+        log_message(
+            "ignore.file_hash_cache", reason="can't read file hash cache", error=e
+        )
+        cached = None
+    if cached is not None:
+        return cached
+
+    digest = _hash_file(path)
+
+    new_stat = os.stat(path)
+    unchanged = (new_stat.st_ino, new_stat.st_size, new_stat.st_mtime_ns) == (
+        stat.st_ino,
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+    if unchanged and time.time_ns() - stat.st_mtime_ns > FILE_HASH_RACY_WINDOW_NS:
+        try:
+            cache.put(path, stat, hash_codec, digest)
+        except Exception as e:
+            log_message(
+                "ignore.file_hash_cache",
+                reason="can't write file hash cache",
+                error=e,
+            )
+    return digest
 
-    CHUNK_SIZE = 65536
-    with open(file, "rb") as f:
-        fb = f.read(CHUNK_SIZE)
-        while len(fb) > 0:
-            file_hash.update(fb)
-            fb = f.read(CHUNK_SIZE)
 
-    wrapped = multihash.wrap(file_hash.digest(), "sha2-256")
+def compute_cid_from_file(
+    file: str, codec: Union[str, int, Multicodec] = "raw", hash_codec: str = "sha2-256"
+):
+    digest = compute_file_digest(file=file, hash_codec=hash_codec)
+    wrapped = multihash.wrap(digest, "sha2-256")
     return create_cid_digest(digest=wrapped, codec=codec)
 
 
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from typing import Any, Dict, Union
+
 import orjson
 
 from kiara.utils import is_debug
@@ -29,3 +31,86 @@ def orjson_dumps(v, *, default=None, **args) -> str:
             dbg(v)
 
         raise e
+
+
+def _json_equals(old: Any, new: Any) -> bool:
+    """Compare (json-compatible) data, unlike '==' this treats 'True', '1' and '1.0' as different."""
+    if type(old) is not type(new):
+        return False
+
+    if isinstance(old, dict):
+        return old.keys() == new.keys() and all(
+            _json_equals(v, new[k]) for k, v in old.items()
+        )
+    if isinstance(old, list):
+        return len(old) == len(new) and all(
+            _json_equals(o, n) for o, n in zip(old, new)
+        )
+    return old == new
+
+
+def create_json_delta(old: Any, new: Any) -> Union[Dict[str, Any], None]:
+    """Create a delta that turns the (json-compatible) 'old' data into 'new', or 'None' if both are equal.
+
+    Dicts are compared per key, lists per index (plus appended/removed items at the end), everything else is replaced
+    as a whole. Use 'apply_json_delta' to re-create 'new'.
+    """
+    if _json_equals(old, new):
+        return None
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        changed: Dict[str, Any] = {}
+        for k, v in new.items():
+            if k not in old.keys():
+                changed[k] = {"=": v}
+            else:
+                _delta = create_json_delta(old[k], v)
+                if _delta is not None:
+                    changed[k] = _delta
+        removed = [k for k in old.keys() if k not in new.keys()]
+
+        delta: Dict[str, Any] = {}
+        if changed:
+            delta["d"] = changed
+        if removed:
+            delta["r"] = removed
+        return delta
+
+    if isinstance(old, list) and isinstance(new, list):
+        items: Dict[str, Any] = {}
+        for idx, (o, n) in enumerate(zip(old, new)):
+            _delta = create_json_delta(o, n)
+            if _delta is not None:
+                items[str(idx)] = _delta
+
+        delta = {"l": items}
+        if len(new) != len(old):
+            delta["n"] = len(new)
+            delta["a"] = new[len(old) :]
+        return delta
+
+    return {"=": new}
+
+
+def apply_json_delta(old: Any, delta: Union[Dict[str, Any], None]) -> Any:
+    """Apply a delta that was created with 'create_json_delta', the 'old' data is not modified."""
+    if delta is None:
+        return old
+
+    if "=" in delta.keys():
+        return delta["="]
+
+    if "l" in delta.keys():
+        length = delta.get("n", len(old))
+        result = list(old[:length])
+        for idx, item_delta in delta["l"].items():
+            result[int(idx)] = apply_json_delta(result[int(idx)], item_delta)
+        result.extend(delta.get("a", []))
+        return result
+
+    result = dict(old)
+    for k in delta.get("r", []):
+        result.pop(k)
+    for k, v in delta.get("d", {}).items():
+        result[k] = apply_json_delta(result.get(k, None), v)
+    return result
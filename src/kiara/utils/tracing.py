@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#  Copyright (c) 2021, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+"""A minimal, dependency-free tracing layer, modelled after OpenTelemetry spans.
+
+Tracing is disabled by default, in which case 'span' returns a shared no-op context and 'traced' functions call the
+wrapped function directly, so instrumented code paths don't pay more than a global lookup.
+
+If enabled (via the 'tracing_export' runtime config option, or 'enable_tracing'), finished spans are exported either
+as json lines to a local file, or -- if the target is a http(s) url -- to an OTLP/HTTP (json) collector endpoint.
+"""
+
+import abc
+import atexit
+import functools
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Tuple, Union
+
+import orjson
+
+from kiara.utils import log_message
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+"""Span kinds, and their OTLP enum values."""
+
+_CURRENT_SPAN: ContextVar[Union["Span", None]] = ContextVar(
+    "kiara_current_span", default=None
+)
+_TRACER: Union["Tracer", None] = None
+
+
+def _new_id(no_bytes: int) -> str:
+    return os.urandom(no_bytes).hex()
+
+
+def parse_traceparent(
+    traceparent: Union[str, None],
+) -> Union[Tuple[str, str], None]:
+    """Parse a W3C 'traceparent' header value, returns a tuple of (trace_id, parent span id), or None if invalid."""
+
+    if not traceparent:
+        return None
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Span(object):
+    """A single, timed unit of work, linked to its parent via 'parent_span_id'."""
+
+    __slots__ = (
+        "attributes",
+        "end_time",
+        "error",
+        "kind",
+        "name",
+        "parent_span_id",
+        "span_id",
+        "start_time",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Union[str, None],
+        kind: str = "internal",
+        attributes: Union[Mapping[str, Any], None] = None,
+    ):
+        self.trace_id: str = trace_id
+        self.span_id: str = _new_id(8)
+        self.parent_span_id: Union[str, None] = parent_span_id
+        self.name: str = name
+        self.kind: str = kind
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.start_time: int = time.time_ns()
+        self.end_time: Union[int, None] = None
+        self.error: Union[str, None] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C 'traceparent' value to propagate this span as (remote) parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [
+                {"key": k, "value": {"stringValue": str(v)}}
+                for k, v in self.attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": self.error} if self.error else {"code": 1}
+            ),
+        }
+        if self.parent_span_id:
+            result["parentSpanId"] = self.parent_span_id
+        return result
+
+
+class _NoopSpan(object):
+    trace_id = None
+    span_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+class _NoopSpanContext(object):
+    def __enter__(self) -> _NoopSpan:
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_NOOP_SPAN_CONTEXT = _NoopSpanContext()
+
+
+class _SpanContext(object):
+    __slots__ = ("_span", "_token", "_tracer")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+        self._token: Union[Token, None] = None
+
+    def __enter__(self) -> Span:
+        self._token = _CURRENT_SPAN.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._span.end_time = time.time_ns()
+        if exc_val is not None:
+            self._span.error = f"{exc_type.__name__}: {exc_val}"
+        if self._token is not None:
+            _CURRENT_SPAN.reset(self._token)
+        self._tracer._finish(self._span)
+
+
+class SpanExporter(abc.ABC):
+    @abc.abstractmethod
+    def export(self, spans: List[Span]):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    """Append finished spans to a file, one json object per line."""
+
+    def __init__(self, path: Union[str, Path]):
+        self._path: Path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def export(self, spans: List[Span]):
+        with self._path.open("ab") as f:
+            for span in spans:
+                f.write(orjson.dumps(span.to_dict()))
+                f.write(b"\n")
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Post finished spans to an OTLP/HTTP collector, using the json encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "kiara", timeout: int = 5):
+        if not endpoint.rstrip("/").endswith("/v1/traces"):
+            endpoint = f"{endpoint.rstrip('/')}/v1/traces"
+        self._endpoint: str = endpoint
+        self._service_name: str = service_name
+        self._timeout: int = timeout
+
+    def export(self, spans: List[Span]):
+        import urllib.request
+
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self._service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "kiara"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(  # noqa: S310
+            self._endpoint,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout):  # noqa: S310
+            pass
+
+
+class Tracer(object):
+    """Creates spans, and exports them in batches once they are finished.
+
+    Batches are exported by a background thread, so a slow exporter (e.g. a remote collector) never blocks the
+    instrumented code. If more than 'max_queued_batches' batches are waiting to be exported, new ones are dropped.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        batch_size: int = 128,
+        target: Union[str, None] = None,
+        max_queued_batches: int = 64,
+    ):
+        self._exporter: SpanExporter = exporter
+        self._target: Union[str, None] = target
+        self._batch_size: int = batch_size
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+
+        self._queue: queue.Queue[Union[List[Span], None]] = queue.Queue(
+            maxsize=max_queued_batches
+        )
+        self._worker: Union[threading.Thread, None] = None
+        self._dropped_spans: int = 0
+
+    @property
+    def exporter(self) -> SpanExporter:
+        return self._exporter
+
+    @property
+    def target(self) -> Union[str, None]:
+        return self._target
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        traceparent: Union[str, None] = None,
+        attributes: Union[Mapping[str, Any], None] = None,
+    ) -> Span:
+        remote_parent = parse_traceparent(traceparent)
+        if remote_parent is not None:
+            trace_id, parent_span_id = remote_parent
+        else:
+            parent = _CURRENT_SPAN.get()
+            if parent is not None:
+                trace_id, parent_span_id = parent.trace_id, parent.span_id
+            else:
+                trace_id, parent_span_id = _new_id(16), None
+
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            kind=kind,
+            attributes=attributes,
+        )
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self._batch_size:
+                return
+            spans = self._buffer
+            self._buffer = []
+            self._enqueue(spans)
+
+    def _enqueue(self, spans: List[Span]):
+        """Hand a batch over to the export thread, must be called while holding the lock."""
+
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run_worker, name="kiara-span-exporter", daemon=True
+            )
+            self._worker.start()
+
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self._dropped_spans += len(spans)
+            log_message(
+                "ignore.trace_export",
+                reason="export queue full, dropping spans",
+                no_spans=len(spans),
+                dropped_total=self._dropped_spans,
+            )
+
+    def _run_worker(self):
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is None:
+                    return
+                self._export(spans)
+            finally:
+                self._queue.task_done()
+
+    def _export(self, spans: List[Span]):
+        try:
+            self._exporter.export(spans)
+        except Exception as e:
+            log_message(
+                "ignore.trace_export",
+                reason="failed to export spans",
+                no_spans=len(spans),
+                error=e,
+            )
+
+    def flush(self):
+        """Export all finished spans, and wait until the export thread is done with them."""
+
+        with self._lock:
+            spans = self._buffer
+            self._buffer = []
+            if spans:
+                self._enqueue(spans)
+            worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.join()
+
+    def shutdown(self):
+        self.flush()
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join()
+        self._exporter.shutdown()
+
+
+def create_span_exporter(target: str, service_name: str = "kiara") -> SpanExporter:
+    """Create an exporter for the target: a http(s) url is treated as OTLP collector endpoint, anything else as file path."""
+
+    if target.startswith("http://") or target.startswith("https://"):
+        return OtlpHttpSpanExporter(endpoint=target, service_name=service_name)
+    return FileSpanExporter(path=Path(target).expanduser())
+
+
+def enable_tracing(target: Union[str, SpanExporter], batch_size: int = 128) -> Tracer:
+    """Enable tracing for this process, replacing (and flushing) any previously enabled tracer.
+
+    If tracing is already enabled for the same target (string), the existing tracer is returned.
+    """
+
+    global _TRACER
+
+    if isinstance(target, str):
+        if _TRACER is not None and _TRACER.target == target:
+            return _TRACER
+        exporter = create_span_exporter(target)
+    else:
+        exporter = target
+
+    disable_tracing()
+    _TRACER = Tracer(
+        exporter=exporter,
+        batch_size=batch_size,
+        target=target if isinstance(target, str) else None,
+    )
+    return _TRACER
+
+
+def disable_tracing():
+    """Disable tracing, after exporting all spans that are still buffered."""
+
+    global _TRACER
+
+    tracer = _TRACER
+    _TRACER = None
+    if tracer is not None:
+        tracer.shutdown()
+
+
+def get_tracer() -> Union[Tracer, None]:
+    return _TRACER
+
+
+def is_tracing_enabled() -> bool:
+    return _TRACER is not None
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    """Return the currently active span, or a no-op span if tracing is disabled (or no span is active)."""
+
+    if _TRACER is None:
+        return NOOP_SPAN
+    current = _CURRENT_SPAN.get()
+    return NOOP_SPAN if current is None else current
+
+
+def get_current_traceparent() -> Union[str, None]:
+    """Return the W3C 'traceparent' value of the current span, to propagate it to another process."""
+
+    if _TRACER is None:
+        return None
+    current = _CURRENT_SPAN.get()
+    if current is None:
+        return None
+    return current.traceparent
+
+
+def span(
+    name: str,
+    kind: str = "internal",
+    traceparent: Union[str, None] = None,
+    **attributes: Any,
+) -> Any:
+    """Return a context manager that records the wrapped code as span (a no-op if tracing is disabled).
+
+    The span becomes the parent of all spans that are started within it (in the same thread/async context). If a
+    'traceparent' value is provided, the span continues that (remote) trace instead.
+    """
+
+    tracer = _TRACER
+    if tracer is None:
+        return _NOOP_SPAN_CONTEXT
+    return _SpanContext(
+        tracer,
+        tracer.start_span(
+            name, kind=kind, traceparent=traceparent, attributes=attributes
+        ),
+    )
+
+
+def traced(name: Union[str, None] = None) -> Callable:
+    """Decorator to record each call of the decorated function as span (named after the function, if no name is provided)."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name if name else func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _TRACER
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _SpanContext(tracer, tracer.start_span(span_name)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@atexit.register
+def _flush_at_exit():
+    if _TRACER is not None:
+        _TRACER.shutdown()
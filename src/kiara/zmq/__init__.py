@@ -23,6 +23,10 @@ class KiaraZmqServiceDetails(BaseModel):
     stderr: str = Field(description="The stderr handle.")
     host: str = Field(description="The host the service is running on.")
     port: int = Field(description="The port the service is running on.")
+    publish_port: Union[int, None] = Field(
+        description="The port the service publishes job and pipeline step events on.",
+        default=None,
+    )
     newly_started: Union[bool, None] = Field(
         description="If the service was newly started, or already running.",
         default=None,
@@ -119,6 +123,7 @@ def start_zmq_service(
             _stderr: str = context_details["stderr"]
             _host: str = context_details["host"]
             _port: int = context_details["port"]
+            _publish_port: Union[int, None] = context_details.get("publish_port", None)
             # TODO: check if stdout/stderr differ
 
         else:
@@ -138,6 +143,8 @@ def start_zmq_service(
                 with socketserver.TCPServer((host_ip, 0), None) as s:  # type: ignore
                     _port = s.server_address[1]
 
+            _publish_port = None
+
             if stdout is None:
                 _stdout = get_default_stdout_zmq_service_log_path(
                     context_name=api_wrap.kiara_context_name
@@ -178,6 +185,10 @@ def start_zmq_service(
         response = zmq_client.request("ping")
         assert response == "pong"
 
+        if _publish_port is None:
+            subscription_details = zmq_client.request("subscription_details")
+            _publish_port = subscription_details["publish_port"]
+
         return KiaraZmqServiceDetails(
             context_name=api_wrap.kiara_context_name,
             process_id=_process_id,
@@ -186,6 +197,7 @@ def start_zmq_service(
             newly_started=_newly_started,
             host=_host,
             port=_port,
+            publish_port=_publish_port,
         )
 
 
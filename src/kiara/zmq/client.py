@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import sys
-from typing import Any, Union
+from typing import Any, Iterable, Iterator, Mapping, Tuple, Union
 
 from kiara.interfaces import get_console
+from kiara.utils.tracing import span
 
 
 class KiaraZmqClient(object):
@@ -25,6 +26,7 @@ class KiaraZmqClient(object):
         self._msg_builder = KiaraApiMsgBuilder()
         self._socket = self._context.socket(zmq.REQ)
         self._socket.connect(f"tcp://{host}:%s" % self._port)
+        self._sub_socket = None
 
     def close(self):
         self._context.destroy()
@@ -49,10 +51,59 @@ class KiaraZmqClient(object):
             self.request_cli(args=args)
             return
 
-        msg = self._msg_builder.encode_msg(endpoint_name=endpoint_name, args=args)
+        with span("zmq.request", kind="client", endpoint=endpoint_name) as req_span:
+            msg = self._msg_builder.encode_msg(
+                endpoint_name=endpoint_name,
+                args=args,
+                trace_parent=req_span.traceparent,
+            )
 
-        self._socket.send_multipart(msg)
-        response = self._socket.recv_multipart()
-        response_msg = self._msg_builder.decode_msg(response)
+            self._socket.send_multipart(msg)
+            response = self._socket.recv_multipart()
+            response_msg = self._msg_builder.decode_msg(response)
 
         return response_msg.args
+
+    def subscribe(
+        self,
+        topics: Union[None, Iterable[str]] = None,
+        publish_port: Union[None, int] = None,
+        timeout_in_ms: Union[None, int] = None,
+    ) -> Iterator[Tuple[str, Mapping[str, Any]]]:
+        """Subscribe to the job status and pipeline step events the service publishes.
+
+        Yields tuples of topic and event payload. If no topics are specified, all events are received. If no
+        publish port is provided, it is requested from the service. If a timeout is specified, the iterator stops
+        once no event was received within that time frame.
+        """
+        import zmq
+
+        if publish_port is None:
+            details = self.request("subscription_details")
+            publish_port = details["publish_port"]
+
+        if self._sub_socket is None:
+            self._sub_socket = self._context.socket(zmq.SUB)
+            self._sub_socket.connect(f"tcp://{self._host}:{publish_port}")
+
+        if not topics:
+            self._sub_socket.setsockopt(zmq.SUBSCRIBE, b"")
+        else:
+            for topic in topics:
+                self._sub_socket.setsockopt(zmq.SUBSCRIBE, topic.encode())
+
+        poller = zmq.Poller()
+        poller.register(self._sub_socket, zmq.POLLIN)
+
+        while True:
+            if timeout_in_ms:
+                socks = dict(poller.poll(timeout_in_ms))
+            else:
+                socks = dict(poller.poll())
+
+            if not socks:
+                break
+
+            msg = self._sub_socket.recv_multipart()
+            event = self._msg_builder.decode_event(msg)
+            yield event.topic, event.payload
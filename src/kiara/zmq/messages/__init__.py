@@ -1,23 +1,36 @@
 # -*- coding: utf-8 -*-
 from collections import namedtuple
-from typing import Any, List
+from typing import Any, List, Mapping, Union
 
 import orjson
 
 from kiara.utils.json import DEFAULT_ORJSON_OPTIONS
 
-ReqMsg = namedtuple("ReqMsg", ["version", "endpoint", "args"])
+ReqMsg = namedtuple(
+    "ReqMsg", ["version", "endpoint", "args", "trace_parent"], defaults=[None]
+)
+EventMsg = namedtuple("EventMsg", ["version", "topic", "payload"])
+
+TRACE_CONTEXT_MIN_VERSION = 1
+"""The minor message version that added the (optional) trace context frame to requests."""
 
 
 class KiaraApiMsgBuilder(object):
     def __init__(self):
         self._version_nr_mayor = 0
-        self._version_nr_minor = 0
+        self._version_nr_minor = TRACE_CONTEXT_MIN_VERSION
         self._version = int.to_bytes(
             self._version_nr_mayor, length=1, byteorder="big"
         ) + int.to_bytes(self._version_nr_minor, length=1, byteorder="big")
 
-    def encode_msg(self, endpoint_name: str, args: Any) -> List[bytes]:
+    def encode_msg(
+        self, endpoint_name: str, args: Any, trace_parent: Union[str, None] = None
+    ) -> List[bytes]:
+        """Encode a request (or response) message.
+
+        If a (W3C) 'trace_parent' is provided, it is sent as additional frame, so the receiving side can continue the trace
+        (only supported by peers that understand message version 0.1 or later).
+        """
         try:
             if args:
                 if hasattr(args, "model_dump_json"):
@@ -26,9 +39,14 @@ class KiaraApiMsgBuilder(object):
                     _args = args.json()
                 else:
                     _args = orjson.dumps(args, option=DEFAULT_ORJSON_OPTIONS)
-                return [self._version, endpoint_name.encode(), _args]
+                msg = [self._version, endpoint_name.encode(), _args]
             else:
-                return [self._version, endpoint_name.encode()]
+                msg = [self._version, endpoint_name.encode()]
+            if trace_parent:
+                if len(msg) == 2:
+                    msg.append(b"")
+                msg.append(trace_parent.encode())
+            return msg
         except Exception as e:
             return [
                 self._version,
@@ -38,9 +56,27 @@ class KiaraApiMsgBuilder(object):
 
     def decode_msg(self, msg: List[bytes]) -> ReqMsg:
         version, endpoint = msg[0], msg[1]
-        if len(msg) == 3:
+        if len(msg) >= 3 and msg[2]:
             args = orjson.loads(msg[2])
         else:
             args = {}
+        # older message versions never contain a trace context frame
+        minor_version = version[1] if len(version) > 1 else 0
+        if len(msg) == 4 and minor_version >= TRACE_CONTEXT_MIN_VERSION:
+            trace_parent = msg[3].decode()
+        else:
+            trace_parent = None
+
+        return ReqMsg(version, endpoint.decode(), args, trace_parent)
+
+    def encode_event(self, topic: str, payload: Mapping[str, Any]) -> List[bytes]:
+        """Encode an event for the service publish socket, the topic frame comes first so subscribers can filter on it."""
+        return [
+            topic.encode(),
+            self._version,
+            orjson.dumps(payload, option=DEFAULT_ORJSON_OPTIONS),
+        ]
 
-        return ReqMsg(version, endpoint.decode(), args)
+    def decode_event(self, msg: List[bytes]) -> EventMsg:
+        topic, version, payload = msg[0], msg[1], msg[2]
+        return EventMsg(version, topic.decode(), orjson.loads(payload))
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import atexit
 import os
-from threading import Thread
-from typing import Any, Mapping, Union
+import uuid
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Union
 
 import orjson
 import zmq
@@ -13,6 +14,7 @@ from kiara.interfaces import BaseAPIWrap, get_console, get_proxy_console
 from kiara.interfaces.cli.proxy_cli import proxy_cli
 from kiara.interfaces.python_api.base_api import BaseAPI
 from kiara.interfaces.python_api.proxy import ApiEndpoints
+from kiara.utils.tracing import span
 from kiara.zmq import (
     KiaraZmqServiceDetails,
     get_default_stderr_zmq_service_log_path,
@@ -20,9 +22,91 @@ from kiara.zmq import (
 )
 from kiara.zmq.messages import KiaraApiMsgBuilder
 
+if TYPE_CHECKING:
+    from kiara.models.module.jobs import JobStatus
+    from kiara.registries.jobs import JobRegistry
+
 DEFAULT_LISTEN_HOST = "*"
 DEFAULT_PORT = 8000
 
+JOB_STATUS_TOPIC = "job_status"
+PIPELINE_STEP_TOPIC = "pipeline_step"
+
+
+class KiaraZmqEventPublisher(object):
+    """A job status listener that forwards job (and pipeline step) events to a zmq PUB socket.
+
+    Jobs that are part of a pipeline are published under the 'pipeline_step' topic, all others under 'job_status'.
+    Since jobs might be processed in a different thread than the one that owns the socket, sending is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        socket: zmq.Socket,
+        job_registry: "JobRegistry",
+        msg_builder: KiaraApiMsgBuilder,
+    ):
+        self._socket: zmq.Socket = socket
+        self._job_registry: JobRegistry = job_registry
+        self._msg_builder: KiaraApiMsgBuilder = msg_builder
+        self._lock = Lock()
+
+    def create_event_payload(
+        self,
+        job_id: uuid.UUID,
+        old_status: Union["JobStatus", None],
+        new_status: "JobStatus",
+    ) -> Dict[str, Any]:
+        job = self._job_registry.get_job(job_id=job_id)
+
+        payload: Dict[str, Any] = {
+            "job_id": str(job_id),
+            "old_status": old_status.value if old_status is not None else None,
+            "new_status": new_status.value,
+            "module_type": job.job_config.module_type,
+            "percent_finished": job.job_log.percent_finished,
+            "submitted": job.submitted,
+            "started": job.started,
+            "finished": job.finished,
+            "error": job.error,
+        }
+        if job.results:
+            payload["results"] = {k: str(v) for k, v in job.results.items()}
+
+        pipeline_metadata = job.job_config.pipeline_metadata
+        if pipeline_metadata is not None:
+            payload["pipeline_id"] = str(pipeline_metadata.pipeline_id)
+            payload["step_id"] = pipeline_metadata.step_id
+
+        return payload
+
+    def job_status_changed(
+        self,
+        job_id: uuid.UUID,
+        old_status: Union["JobStatus", None],
+        new_status: "JobStatus",
+    ):
+        try:
+            payload = self.create_event_payload(
+                job_id=job_id, old_status=old_status, new_status=new_status
+            )
+        except Exception as e:
+            payload = {
+                "job_id": str(job_id),
+                "old_status": old_status.value if old_status is not None else None,
+                "new_status": new_status.value,
+                "error": str(e),
+            }
+
+        if "step_id" in payload.keys():
+            topic = PIPELINE_STEP_TOPIC
+        else:
+            topic = JOB_STATUS_TOPIC
+
+        msg = self._msg_builder.encode_event(topic=topic, payload=payload)
+        with self._lock:
+            self._socket.send_multipart(msg)
+
 
 class KiaraZmqAPI(object):
     def __init__(
@@ -33,6 +117,8 @@ class KiaraZmqAPI(object):
         host: Union[str, None] = None,
         port: Union[int, None] = None,
         listen_timout_in_ms: Union[int, None] = None,
+        *,
+        publish_port: Union[int, None] = None,
     ):
         if listen_timout_in_ms is None:
             listen_timout_in_ms = 0
@@ -48,11 +134,18 @@ class KiaraZmqAPI(object):
             with socketserver.TCPServer((host_ip, 0), None) as s:  # type: ignore
                 port = s.server_address[1]
 
+        if not publish_port:
+            import socketserver
+
+            with socketserver.TCPServer((host_ip, 0), None) as s:  # type: ignore
+                publish_port = s.server_address[1]
+
         self._api_wrap: BaseAPIWrap = api_wrap
         self._api_wrap.exit_process = False
 
         self._listen_host: str = host_ip
         self._port: int = int(port)
+        self._publish_port: int = int(publish_port)
         self._service_thread = None
         self._msg_builder = KiaraApiMsgBuilder()
         self._api_endpoints: ApiEndpoints = ApiEndpoints(api_cls=BaseAPI)
@@ -103,6 +196,7 @@ class KiaraZmqAPI(object):
             newly_started=None,
             host=host_ip,
             port=port,
+            publish_port=publish_port,
         )
 
         with open(service_info_file, "wb") as f:
@@ -114,6 +208,8 @@ class KiaraZmqAPI(object):
         atexit.register(delete_info_file)
 
     def service_loop(self):
+        event_publisher: Union[KiaraZmqEventPublisher, None] = None
+        api: Union[BaseAPI, None] = None
         try:
             api = self._api_wrap.base_api
 
@@ -123,6 +219,15 @@ class KiaraZmqAPI(object):
             context_rep_socket = context.socket(zmq.REP)
             context_rep_socket.bind(f"tcp://{self._listen_host}:{self._port}")
 
+            context_pub_socket = context.socket(zmq.PUB)
+            context_pub_socket.bind(f"tcp://{self._listen_host}:{self._publish_port}")
+            event_publisher = KiaraZmqEventPublisher(
+                socket=context_pub_socket,
+                job_registry=api.context.job_registry,
+                msg_builder=self._msg_builder,
+            )
+            api.context.job_registry.register_job_status_listener(event_publisher)
+
             poller = zmq.Poller()
             poller.register(context_rep_socket, zmq.POLLIN)
 
@@ -148,36 +253,48 @@ class KiaraZmqAPI(object):
                     print("Received request: ", msg, file=self._stdout)
                     decoded = self._msg_builder.decode_msg(msg)
 
-                    if decoded.endpoint == "ping":
-                        result = "pong"
-                    elif decoded.endpoint in ["shutdown", "stop"]:
-                        print("Shutting down...", file=self._stdout)
-                        result = "ok"
-                        stop = True
-                    elif decoded.endpoint == "service_status":
-                        context_config = (
-                            self._api_wrap.base_api.context.context_config.model_dump()
-                        )
-                        runtime_config = (
-                            self._api_wrap.base_api.context.runtime_config.model_dump()
+                    with span(
+                        "zmq.handle_request",
+                        kind="server",
+                        traceparent=decoded.trace_parent,
+                        endpoint=decoded.endpoint,
+                    ):
+                        if decoded.endpoint == "ping":
+                            result = "pong"
+                        elif decoded.endpoint in ["shutdown", "stop"]:
+                            print("Shutting down...", file=self._stdout)
+                            result = "ok"
+                            stop = True
+                        elif decoded.endpoint == "service_status":
+                            context = self._api_wrap.base_api.context
+                            context_config = context.context_config.model_dump()
+                            runtime_config = context.runtime_config.model_dump()
+
+                            result = {
+                                "state": "running",
+                                "timeout": timeout,
+                                "publish_port": self._publish_port,
+                                "context_config": context_config,
+                                "runtime_config": runtime_config,
+                            }
+                        elif decoded.endpoint == "subscription_details":
+                            result = {
+                                "host": self._listen_host,
+                                "publish_port": self._publish_port,
+                                "topics": [JOB_STATUS_TOPIC, PIPELINE_STEP_TOPIC],
+                            }
+                        elif decoded.endpoint == "cli":
+                            result = self.call_cli(api=api, **decoded.args)
+                        elif decoded.endpoint == "control":
+                            raise NotImplementedError()
+                        else:
+                            result = self.call_endpoint(
+                                api=api, endpoint=decoded.endpoint, **decoded.args
+                            )
+
+                        resp_msg = self._msg_builder.encode_msg(
+                            decoded.endpoint, result
                         )
-
-                        result = {
-                            "state": "running",
-                            "timeout": timeout,
-                            "context_config": context_config,
-                            "runtime_config": runtime_config,
-                        }
-                    elif decoded.endpoint == "cli":
-                        result = self.call_cli(api=api, **decoded.args)
-                    elif decoded.endpoint == "control":
-                        raise NotImplementedError()
-                    else:
-                        result = self.call_endpoint(
-                            api=api, endpoint=decoded.endpoint, **decoded.args
-                        )
-
-                    resp_msg = self._msg_builder.encode_msg(decoded.endpoint, result)
                     context_rep_socket.send_multipart(resp_msg)
 
         except Exception as e:
@@ -186,6 +303,9 @@ class KiaraZmqAPI(object):
             traceback.print_exc()
             print(f"ERROR IN ZMQ SERVICE: {e}", file=self._stderr)
             print("Stopping...", file=self._stderr)
+        finally:
+            if event_publisher is not None and api is not None:
+                api.context.job_registry.unregister_job_status_listener(event_publisher)
 
     def call_cli(self, api: BaseAPI, **kwargs) -> Mapping[str, str]:
         console = get_console()
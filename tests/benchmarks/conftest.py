@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+"""Fixtures for the benchmark suite.
+
+The benchmarks are excluded from the default test run, and need the 'pytest-benchmark' plugin. Run them with
+'make benchmark' (which saves the results as a new baseline), or 'make benchmark-compare' (which compares against the
+latest saved baseline). Results are stored as JSON in the '.benchmarks' folder in the project root.
+"""
+
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+from kiara.context.config import KiaraConfig
+from kiara.interfaces.python_api.base_api import BaseAPI
+
+from .generators import (
+    NO_ALIASES,
+    NO_JOBS,
+    create_date_strings,
+    scaled,
+)
+
+try:
+    import pytest_benchmark  # noqa
+except ImportError:
+    # the 'benchmark' fixture is not available
+    collect_ignore_glob = ["test_*.py"]
+
+
+def create_bench_api() -> BaseAPI:
+    instance_path = Path(tempfile.gettempdir()) / "kiara_benchmarks" / str(uuid.uuid4())
+    kc = KiaraConfig.create_in_folder(instance_path)
+    kc.runtime_config.runtime_profile = "default"
+    return BaseAPI(kc)
+
+
+@pytest.fixture
+def bench_api() -> BaseAPI:
+    """A new, empty kiara context."""
+
+    return create_bench_api()
+
+
+@pytest.fixture(scope="module")
+def populated_api() -> BaseAPI:
+    """A kiara context with a large number of stored job records and aliases.
+
+    The job records are created by actually running jobs, the aliases all point to the same value.
+    """
+
+    api = create_bench_api()
+
+    values = {}
+    for idx, text in enumerate(create_date_strings(scaled(NO_JOBS))):
+        result = api.run_job(
+            operation="date.extract_from_string", inputs={"text": text}
+        )
+        values[f"job_value_{idx}"] = result["date"]
+    api.store_values(values, alias_map=True, store_related_metadata=False)
+
+    value = api.register_data("alias target", data_type="string")
+    api.store_value(value, alias=[f"alias_{idx}" for idx in range(scaled(NO_ALIASES))])
+
+    return api
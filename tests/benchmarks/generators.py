@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+"""Synthetic data for the benchmark suite.
+
+All sizes are multiplied by the (float) value of the 'KIARA_BENCHMARK_SCALE' environment variable (default: 1.0), so the
+suite can be run quickly in CI, or with more realistic data sizes locally. Baselines should only be compared if they
+were created with the same scale.
+"""
+
+import os
+import random
+import string
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCHMARK_SCALE = float(os.environ.get("KIARA_BENCHMARK_SCALE", "1.0"))
+
+SMALL_TEXT_SIZE = 64
+LARGE_TEXT_SIZE = 8 * 1024 * 1024
+NO_BUNDLE_FILES = 400
+BUNDLE_FILE_SIZE = 2048
+PIPELINE_DEPTH = 100
+PIPELINE_WIDTH = 100
+NO_JOBS = 200
+NO_ALIASES = 5000
+
+
+def scaled(size: int) -> int:
+    return max(1, int(size * BENCHMARK_SCALE))
+
+
+def create_text(size: int, seed: int = 0) -> str:
+    """Create a (reproducible) random string of the specified length."""
+
+    rnd = random.Random(seed)  # noqa: S311
+    return "".join(rnd.choices(string.ascii_letters + string.digits + " \n", k=size))
+
+
+def create_file_bundle_folder(
+    path: Path, no_files: int, file_size: int, seed: int = 0
+) -> Path:
+    """Create a folder with 'no_files' text files, spread over a few sub-folders."""
+
+    for idx in range(no_files):
+        file = path / f"sub_{idx % 10}" / f"file_{idx}.txt"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(create_text(file_size, seed=seed + idx))
+    return path
+
+
+def create_date_strings(no_items: int) -> List[str]:
+    """Create distinct inputs for the 'date.extract_from_string' operation, one job per item."""
+
+    return [
+        f"{1000 + idx}-{(idx % 12) + 1:02d}-{(idx % 28) + 1:02d}"
+        for idx in range(no_items)
+    ]
+
+
+def create_deep_pipeline_config(depth: int) -> Dict[str, Any]:
+    """Create a pipeline that consists of a single chain of 'logic.not' steps."""
+
+    steps: List[Dict[str, Any]] = [{"module_type": "logic.not", "step_id": "step_0"}]
+    for idx in range(1, depth):
+        steps.append(
+            {
+                "module_type": "logic.not",
+                "step_id": f"step_{idx}",
+                "input_links": {"a": f"step_{idx - 1}.y"},
+            }
+        )
+    return {"pipeline_name": f"deep_{depth}", "steps": steps}
+
+
+def create_wide_pipeline_config(width: int) -> Dict[str, Any]:
+    """Create a pipeline with 'width' independent 'logic.and' steps, that all share the same pipeline inputs."""
+
+    steps: List[Dict[str, Any]] = [
+        {"module_type": "logic.and", "step_id": f"step_{idx}"} for idx in range(width)
+    ]
+    input_aliases: Dict[str, str] = {}
+    for idx in range(width):
+        input_aliases[f"step_{idx}.a"] = "a"
+        input_aliases[f"step_{idx}.b"] = "b"
+    return {
+        "pipeline_name": f"wide_{width}",
+        "steps": steps,
+        "input_aliases": input_aliases,
+    }
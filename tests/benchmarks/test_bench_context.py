@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import tempfile
+import uuid
+from pathlib import Path
+
+from kiara.context.config import KiaraConfig
+
+
+def test_create_context(benchmark):
+
+    base_path = Path(tempfile.gettempdir()) / "kiara_benchmarks"
+
+    def setup():
+        kc = KiaraConfig.create_in_folder(base_path / str(uuid.uuid4()))
+        kc.runtime_config.runtime_profile = "default"
+        return (kc,), {}
+
+    def create_context(kc: KiaraConfig):
+        return kc.create_context()
+
+    benchmark.pedantic(create_context, setup=setup, rounds=5)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+
+from .generators import NO_ALIASES, NO_JOBS, create_date_strings, scaled
+
+
+def test_execute_job_cache_hit(benchmark, bench_api: BaseAPI):
+
+    kiara = bench_api.context
+    operation = bench_api.get_operation("logic.and")
+    job_config = kiara.job_registry.prepare_job_config(
+        manifest=operation, inputs={"a": True, "b": True}
+    )
+    job_id = kiara.job_registry.execute_job(job_config, wait=True)
+
+    result = benchmark(kiara.job_registry.execute_job, job_config, wait=True)
+    assert result == job_id
+
+
+def test_execute_job_cache_hit_large_job_table(benchmark, populated_api: BaseAPI):
+
+    kiara = populated_api.context
+    operation = populated_api.get_operation("date.extract_from_string")
+    job_config = kiara.job_registry.prepare_job_config(
+        manifest=operation, inputs={"text": create_date_strings(1)[0]}
+    )
+
+    benchmark(kiara.job_registry.execute_job, job_config, wait=True)
+
+
+def test_list_job_records(benchmark, populated_api: BaseAPI):
+
+    def list_records():
+        # a new context, so the records are not cached in memory
+        return BaseAPI(populated_api._kiara_config).list_job_records()
+
+    result = benchmark.pedantic(list_records, rounds=5)
+    assert len(result) >= scaled(NO_JOBS)
+
+
+def test_list_aliases(benchmark, populated_api: BaseAPI):
+
+    result = benchmark(populated_api.list_alias_names)
+    assert len(result) >= scaled(NO_ALIASES)
+
+
+def test_resolve_alias(benchmark, populated_api: BaseAPI):
+
+    alias = f"alias_{scaled(NO_ALIASES) // 2}"
+    value = benchmark(populated_api.get_value, alias)
+    assert value.data == "alias target"
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import itertools
+
+import pytest
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+from kiara.models.module.pipeline.pipeline import Pipeline
+
+from .generators import (
+    PIPELINE_DEPTH,
+    PIPELINE_WIDTH,
+    create_deep_pipeline_config,
+    create_wide_pipeline_config,
+    scaled,
+)
+
+PIPELINES = {
+    "deep": (create_deep_pipeline_config, PIPELINE_DEPTH, "step_0__a"),
+    "wide": (create_wide_pipeline_config, PIPELINE_WIDTH, "a"),
+}
+
+
+@pytest.mark.parametrize("shape", PIPELINES.keys())
+def test_create_pipeline(benchmark, bench_api: BaseAPI, shape: str):
+
+    create_config, size, _ = PIPELINES[shape]
+    config = create_config(scaled(size))
+
+    benchmark(Pipeline.create_pipeline, bench_api.context, config)
+
+
+@pytest.mark.parametrize("shape", PIPELINES.keys())
+def test_set_pipeline_inputs(benchmark, bench_api: BaseAPI, shape: str):
+
+    create_config, size, input_field = PIPELINES[shape]
+    pipeline = Pipeline.create_pipeline(bench_api.context, create_config(scaled(size)))
+    flip = itertools.cycle([True, False])
+
+    def set_inputs():
+        # alternate the input, so every round actually changes the pipeline state
+        return pipeline.set_pipeline_inputs({input_field: next(flip)})
+
+    benchmark(set_inputs)
+
+
+def test_rerun_cached_pipeline(benchmark, bench_api: BaseAPI):
+
+    operation = bench_api.get_operation(create_deep_pipeline_config(scaled(50)))
+    value = bench_api.register_data(True, data_type="boolean")
+    job_id = bench_api.queue_job(operation, inputs={"step_0__a": value})
+
+    result = benchmark(bench_api.queue_job, operation, {"step_0__a": value})
+    assert result == job_id
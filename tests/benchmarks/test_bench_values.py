@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import itertools
+
+import pytest
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+
+from .generators import (
+    BUNDLE_FILE_SIZE,
+    LARGE_TEXT_SIZE,
+    NO_BUNDLE_FILES,
+    SMALL_TEXT_SIZE,
+    create_file_bundle_folder,
+    create_text,
+    scaled,
+)
+
+TEXT_SIZES = {"small": SMALL_TEXT_SIZE, "large": LARGE_TEXT_SIZE}
+
+
+@pytest.mark.parametrize("size", TEXT_SIZES.keys())
+def test_register_data(benchmark, bench_api: BaseAPI, size: str):
+
+    text = create_text(scaled(TEXT_SIZES[size]))
+    registry = bench_api.context.data_registry
+
+    benchmark(registry.register_data, text, schema="string")
+
+
+@pytest.mark.parametrize("size", TEXT_SIZES.keys())
+def test_store_value(benchmark, bench_api: BaseAPI, size: str):
+
+    text = create_text(scaled(TEXT_SIZES[size]))
+    registry = bench_api.context.data_registry
+    counter = itertools.count()
+
+    def setup():
+        # every round needs to store a value with new data, otherwise only the first one would write anything
+        value = registry.register_data(f"{next(counter)}{text}", schema="string")
+        return (value,), {}
+
+    benchmark.pedantic(registry.store_value, setup=setup, rounds=10)
+
+
+def test_retrieve_chunks(benchmark, bench_api: BaseAPI, tmp_path):
+
+    folder = create_file_bundle_folder(
+        tmp_path / "bundle",
+        no_files=scaled(NO_BUNDLE_FILES),
+        file_size=BUNDLE_FILE_SIZE,
+    )
+    value = bench_api.register_data(folder.as_posix(), data_type="file_bundle")
+    persisted_data = bench_api.context.data_registry.store_value(value)
+
+    chunk_ids = []
+    for chunks in persisted_data.chunk_id_map.values():
+        chunk_ids.extend(chunks.chunk_id_list)
+    archive = bench_api.context.data_registry.get_archive()
+
+    def retrieve():
+        return list(archive.retrieve_chunks(chunk_ids, as_files=False))
+
+    result = benchmark(retrieve)
+    assert len(result) == len(chunk_ids)
+
+
+def test_load_file_bundle(benchmark, bench_api: BaseAPI, tmp_path):
+
+    folder = create_file_bundle_folder(
+        tmp_path / "bundle",
+        no_files=scaled(NO_BUNDLE_FILES),
+        file_size=BUNDLE_FILE_SIZE,
+    )
+    value = bench_api.register_data(folder.as_posix(), data_type="file_bundle")
+    bench_api.context.data_registry.store_value(value)
+    value_id = value.value_id
+
+    def load():
+        # a new context, so the data is not cached in memory
+        api = BaseAPI(bench_api._kiara_config)
+        return api.get_value(value_id).data
+
+    result = benchmark.pedantic(load, rounds=5)
+    assert len(result.included_files) == scaled(NO_BUNDLE_FILES)
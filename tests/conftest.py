@@ -106,6 +106,14 @@ def api() -> BaseAPI:
     return api
 
 
+@pytest.fixture
+def other_api(api: BaseAPI) -> BaseAPI:
+
+    # a second api for the context of 'api', to check what a new session can read from its stores,
+    # the context is only created on first use, so it sees everything that was stored before that
+    return BaseAPI(api._kiara_config)
+
+
 @pytest.fixture(scope="function")
 def presseeded_data_store_minimal() -> Kiara:
 
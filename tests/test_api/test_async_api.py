@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2023, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import asyncio
+import threading
+import uuid
+
+from kiara.interfaces.python_api.async_api import AsyncKiaraAPI
+from kiara.interfaces.python_api.base_api import BaseAPI
+from kiara.interfaces.python_api.kiara_api import KiaraAPI
+from kiara.models.module.jobs import JobStatus
+
+
+def test_async_api(api: BaseAPI):
+    async def run():
+        async with AsyncKiaraAPI(
+            kiara_api=KiaraAPI(api._kiara_config), max_workers=4
+        ) as async_api:
+            results = await asyncio.gather(
+                *(
+                    async_api.run_job("logic.and", inputs={"a": True, "b": b})
+                    for b in (True, False)
+                )
+            )
+            assert [r["y"].data for r in results] == [True, False]
+
+            job_id = results[0]["y"].job_id
+            assert await async_api.wait_for_job(job_id) == JobStatus.SUCCESS
+
+            await asyncio.gather(
+                async_api.store_value(results[0]["y"], alias="async_test"),
+                async_api.list_alias_names(),
+            )
+            value = await async_api.get_value("async_test")
+            assert value.value_id == results[0]["y"].value_id
+
+            batch = [
+                r["y"].data
+                async for r in async_api.run_job_batch(
+                    "logic.not", inputs=[{"a": True}, {"a": False}]
+                )
+            ]
+            assert batch == [False, True]
+
+            # jobs that are not finished yet are awaited via job status events
+            loop = asyncio.get_running_loop()
+            pending_id = uuid.uuid4()
+            future = async_api._job_waiters.add(pending_id, loop)
+            threading.Thread(
+                target=async_api._job_waiters.job_status_changed,
+                args=(pending_id, JobStatus.STARTED, JobStatus.FAILED),
+            ).start()
+            assert await asyncio.wait_for(future, timeout=5) == JobStatus.FAILED
+
+    asyncio.run(run())
+
+
+def test_async_api_auto_save(api: BaseAPI):
+
+    kiara_api = KiaraAPI(api._kiara_config)
+    base_api = kiara_api._api
+    base_api.context.update_runtime_config(runtime_profile="dharpa")
+    # all jobs share an input value, which is stored together with the results of each job
+    shared = base_api.register_data(True, data_type="boolean")
+
+    async def run():
+        async with AsyncKiaraAPI(kiara_api=kiara_api, max_workers=8) as async_api:
+            results = await asyncio.gather(
+                *(
+                    async_api.run_job(
+                        "logic.and",
+                        inputs={"a": shared.value_id, "b": idx % 2 == 0},
+                        comment="async",
+                    )
+                    for idx in range(16)
+                ),
+                *(async_api.list_value_ids() for _ in range(4)),
+            )
+            outputs = [r["y"] for r in results[:16]]
+            assert [v.data for v in outputs] == [idx % 2 == 0 for idx in range(16)]
+            assert all(v.is_stored for v in outputs)
+
+            batch = [
+                r["y"]
+                async for r in async_api.run_job_batch(
+                    "logic.not",
+                    inputs=[{"a": True}, {"a": False}],
+                    comment="async",
+                    max_workers=2,
+                )
+            ]
+            assert all(v.is_stored for v in batch)
+
+    asyncio.run(run())
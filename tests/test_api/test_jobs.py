@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2023, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+
+
+def test_job_record_queries(api: BaseAPI, other_api: BaseAPI):
+
+    first = api.run_job(operation="logic.and", inputs={"a": True, "b": True})["y"]
+    second = api.run_job(operation="logic.not", inputs={"a": first})["y"]
+    api.store_value(second, alias="job_query_test")
+
+    all_records = other_api.list_job_records()
+    assert len(all_records) == 2
+    submitted = [r.job_submitted for r in all_records.values()]
+    assert submitted == sorted(submitted, reverse=True)
+
+    records = other_api.list_job_records(operation_inputs=[first.value_id])
+    assert [r.job_id for r in records.values()] == [second.job_id]
+
+    records = other_api.list_job_records(produced_outputs=[first.value_id])
+    assert [r.job_id for r in records.values()] == [first.job_id]
+
+    records = other_api.list_job_records(
+        produced_outputs=[first.value_id, second.value_id], job_ids=[second.job_id]
+    )
+    assert list(records.keys()) == [second.job_id]
+
+    # metadata extraction jobs are internal
+    internal = other_api.list_job_records(allow_internal=True)
+    assert len(internal) > len(all_records)
+    assert all(not r.is_internal for r in all_records.values())
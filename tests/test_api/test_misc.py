@@ -27,3 +27,86 @@ def test_context_names(api: BaseAPI):
 
     # this is specific to the test setup api context, usually there are names in there, at least 'default'
     assert not api.list_context_names()
+
+
+def test_job_tracing(api: BaseAPI, tmp_path):
+
+    import orjson
+
+    from kiara.utils.tracing import disable_tracing, enable_tracing, span
+    from kiara.zmq.messages import KiaraApiMsgBuilder
+
+    trace_file = tmp_path / "traces.jsonl"
+    enable_tracing(trace_file.as_posix())
+    try:
+        result = api.run_job(operation="logic.and", inputs={"a": True, "b": True})
+        api.store_value(result["y"], alias="job_tracing_test")
+
+        builder = KiaraApiMsgBuilder()
+        with span("zmq.request", kind="client") as client_span:
+            msg = builder.encode_msg("ping", None, trace_parent=client_span.traceparent)
+        decoded = builder.decode_msg(msg)
+        assert decoded.args == {}
+        with span("zmq.handle_request", traceparent=decoded.trace_parent):
+            pass
+    finally:
+        disable_tracing()
+
+    spans = [orjson.loads(line) for line in trace_file.read_text().splitlines()]
+    by_id = {s["span_id"]: s for s in spans}
+
+    def parent_names(s):
+        names = []
+        while s["parent_span_id"]:
+            s = by_id[s["parent_span_id"]]
+            names.append(s["name"])
+        return names
+
+    job_span = next(s for s in spans if s["name"] == "api.run_job")
+    assert job_span["parent_span_id"] is None
+    process = [s for s in spans if s["name"] == "job.process"]
+    assert process
+    for s in process:
+        assert s["trace_id"] == job_span["trace_id"]
+        assert "job.execute" in parent_names(s)
+        assert parent_names(s)[-1] == "api.run_job"
+
+    store = next(
+        s
+        for s in spans
+        if s["name"] == "store.value"
+        and s["attributes"]["value_id"] == str(result["y"].value_id)
+    )
+    assert "api.store_value" in parent_names(store)
+
+    server = next(s for s in spans if s["name"] == "zmq.handle_request")
+    client = by_id[server["parent_span_id"]]
+    assert client["name"] == "zmq.request"
+    assert server["trace_id"] == client["trace_id"]
+
+
+def test_span_export_in_background():
+
+    import threading
+
+    from kiara.utils.tracing import SpanExporter, Tracer
+
+    release = threading.Event()
+    exported = []
+
+    class SlowExporter(SpanExporter):
+        def export(self, spans):
+            release.wait(timeout=10)
+            exported.append((threading.current_thread(), [s.name for s in spans]))
+
+    tracer = Tracer(exporter=SlowExporter(), batch_size=2)
+    for name in ("a", "b", "c"):
+        tracer._finish(tracer.start_span(name))
+
+    # the full batch is waiting for the (blocked) exporter, without blocking this thread
+    assert exported == []
+    release.set()
+    tracer.shutdown()
+
+    assert [names for _, names in exported] == [["a", "b"], ["c"]]
+    assert all(thread is not threading.current_thread() for thread, _ in exported)
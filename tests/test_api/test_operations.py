@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import pytest
+
 from kiara.interfaces.python_api.base_api import BaseAPI
 
 #  Copyright (c) 2023, Markus Binsteiner
@@ -36,3 +38,90 @@ def test_get_operation(api: BaseAPI):
     result = op.run(kiara=api.context, inputs={"a": True, "b": True})
 
     assert result.get_value_data("y") is False
+
+
+def test_cached_job_fast_path(api: BaseAPI, other_api: BaseAPI, monkeypatch):
+
+    a = api.register_data(True, data_type="boolean")
+    b = api.register_data(True, data_type="boolean")
+    first = api.run_job(operation="logic.and", inputs={"a": a, "b": b})["y"]
+    api.store_value(first, alias="fast_path_test")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("module should not be created for a cached job")
+
+    with monkeypatch.context() as m:
+        m.setattr(api.context.module_registry, "create_module", fail)
+        second = api.run_job(
+            operation="logic.and", inputs={"a": a.value_id, "b": b.value_id}
+        )["y"]
+    assert second.value_id == first.value_id
+
+    # stored job records are found via the fast path, once the module is known
+    other_api.context.update_runtime_config(job_cache="value_id")
+    other = other_api.run_job(operation="logic.and", inputs={"a": a, "b": False})
+    assert other["y"].job_id != first.job_id
+
+    job_registry = other_api.context.job_registry
+    manifest_hash = api.context.job_registry.get_job_record(first.job_id).manifest_hash
+    with monkeypatch.context() as m:
+        m.setattr(other_api.context.module_registry, "create_module", fail)
+        record = job_registry.find_cached_job_record(
+            manifest=manifest_hash, inputs={"a": a.value_id, "b": b.value_id}
+        )
+    assert record is not None
+    assert record.job_id == first.job_id
+    assert record.outputs["y"] == first.value_id
+
+    # raw (non-value) inputs can't be looked up without registering them first
+    assert job_registry.find_cached_job_record(manifest_hash, {"a": True}) is None
+
+
+def test_run_job_batch(api: BaseAPI, other_api: BaseAPI):
+
+    input_sets = [{"a": a, "b": b} for a in (True, False) for b in (True, False)] + [
+        {"a": True, "b": True}
+    ]
+
+    results = list(
+        api.run_job_batch(operation="logic.and", inputs=input_sets, max_workers=2)
+    )
+    assert [r["y"].data for r in results] == [True, False, False, False, True]
+    # identical input sets are only run once
+    assert results[0]["y"].job_id == results[4]["y"].job_id
+    assert len({r["y"].job_id for r in results}) == 4
+
+    for idx, result in enumerate(results[:4]):
+        api.store_value(result["y"], alias=f"batch_test_{idx}")
+
+    # stored job records are found in bulk
+    other_api.context.update_runtime_config(job_cache="value_id")
+    input_ids = [
+        api.context.job_registry.get_job_record(r["y"].job_id).inputs for r in results
+    ]
+    cached = list(other_api.run_job_batch(operation="logic.and", inputs=input_ids))
+    assert [r["y"].job_id for r in cached] == [r["y"].job_id for r in results]
+
+    # the operation is resolved right away, not when the first result is requested
+    with pytest.raises(Exception, match="Could not parse module or operation"):
+        api.run_job_batch(operation="not.an.operation", inputs=input_sets)
+
+
+def test_run_job_batch_auto_save(api: BaseAPI):
+
+    # all jobs share an input value, which is stored together with the results of each job
+    api.context.update_runtime_config(runtime_profile="dharpa")
+    shared = api.register_data(True, data_type="boolean")
+    input_sets = [
+        {"a": shared.value_id, "b": api.register_data(idx % 2 == 0, "boolean")}
+        for idx in range(16)
+    ]
+
+    results = list(
+        api.run_job_batch(
+            operation="logic.and", inputs=input_sets, max_workers=8, comment="batch"
+        )
+    )
+    assert [r["y"].data for r in results] == [idx % 2 == 0 for idx in range(16)]
+    assert all(r["y"].is_stored for r in results)
+    assert api.get_value(shared.value_id).is_stored
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2023, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+from sqlalchemy import text
+
+from kiara.defaults import TABLE_NAME_WORKFLOW_STATES
+from kiara.interfaces.python_api.base_api import BaseAPI
+from kiara.registries.workflows.sqlite_store import SqliteWorkflowStore
+from kiara.utils.json import apply_json_delta, create_json_delta
+
+
+def test_json_delta():
+
+    import json
+
+    old = {"a": [1, 2, {"b": 3}], "c": "d", "e": {"f": 1}}
+    for new in [
+        {"a": [1, 5, {"b": 4}, 7], "e": {"f": 1, "g": 2}},
+        {"a": [1], "c": None, "e": {}},
+        {"a": "x", "c": "d", "e": {"f": 1}},
+        # '==' considers 'True', '1' and '1.0' equal, deltas must not
+        {"a": [True, 2.0, {"b": 3}], "c": "d", "e": {"f": True}},
+        {"a": [1, 2, {"b": 3.0}], "c": "d", "e": {"f": 1.0}},
+        old,
+    ]:
+        delta = create_json_delta(old, new)
+        result = apply_json_delta(old, delta)
+        assert json.dumps(result, sort_keys=True) == json.dumps(new, sort_keys=True)
+
+    assert create_json_delta(old, dict(old)) is None
+    assert old == {"a": [1, 2, {"b": 3}], "c": "d", "e": {"f": 1}}
+
+
+def test_sqlite_workflow_store(api: BaseAPI, other_api: BaseAPI, monkeypatch):
+
+    from kiara.registries.workflows import sqlite_store
+
+    monkeypatch.setattr(sqlite_store, "WORKFLOW_STATE_CHECKPOINT_INTERVAL", 3)
+
+    store = api.context.workflow_registry.get_archive()
+    assert isinstance(store, SqliteWorkflowStore)
+
+    workflow = api.create_workflow(workflow_alias="delta_test", save=True)
+    workflow.add_step("logic.and", step_id="and_1")
+    workflow.add_step("logic.not", step_id="not_1")
+    workflow.connect_fields("and_1.y", "not_1.a")
+
+    state_ids = []
+    for i in range(5):
+        workflow.set_inputs(and_1__a=bool(i % 2), and_1__b=True)
+        workflow.process_steps()
+        state_ids.append(workflow.snapshot(save=True).instance_id)
+
+    with store.sqlite_engine.connect() as connection:
+        rows = connection.execute(
+            text(
+                f"SELECT base_state_id, delta_depth FROM {TABLE_NAME_WORKFLOW_STATES} ORDER BY rowid"
+            )
+        ).fetchall()
+    assert [row[1] for row in rows] == [0, 1, 2, 0, 1]
+    assert rows[0][0] is None and rows[3][0] is None
+    assert rows[1][0] == state_ids[0]
+
+    workflow_2 = other_api.get_workflow("delta_test")
+    assert workflow_2.workflow_metadata.last_state_id == state_ids[-1]
+    assert workflow_2.all_state_ids == sorted(state_ids)
+
+    state = workflow_2.load_state(state_ids[2])
+    assert (
+        state.inputs
+        == api.context.workflow_registry.get_workflow_state(
+            workflow_state_id=state_ids[2], workflow="delta_test"
+        ).inputs
+    )
+
+    all_states = workflow_2.all_states
+    assert set(all_states.keys()) == set(state_ids)
+    for state_id, _state in all_states.items():
+        assert _state.instance_id == state_id
+
+    assert other_api.context.workflow_registry.unregister_alias("delta_test")
+    assert "delta_test" not in store.retrieve_all_workflow_aliases()
@@ -254,3 +254,101 @@ def test_archive_export_values_alias_multipe_values(api: BaseAPI):
         assert result[1][0] in ["result_1", "result_2"]
         assert uuid.UUID(result[1][1])
         datetime.datetime.fromisoformat(result[1][2])
+
+
+def test_sqlite_performance_profile(tmp_path: Path):
+    from sqlalchemy import text
+
+    from kiara.defaults import SQLITE_PERFORMANCE_PROFILE_MARKER, SQLITE_READ_POOL_SIZE
+    from kiara.registries import SqliteArchiveConfig, SqliteDataStoreConfig
+    from kiara.registries.data.data_store.sqlite_store import (
+        SqliteDataArchive,
+        SqliteDataStore,
+    )
+
+    config = SqliteDataStoreConfig.create_new_store_config(
+        tmp_path.as_posix(), performance_profile="read-mostly"
+    )
+    store = SqliteDataStore(archive_name="test_store", archive_config=config)
+
+    with store.sqlite_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() == 268435456
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+
+    assert (
+        store.get_archive_metadata(SQLITE_PERFORMANCE_PROFILE_MARKER) == "read-mostly"
+    )
+    result = run_sql_query(
+        f"SELECT value FROM {TABLE_NAME_ARCHIVE_METADATA} WHERE key = '{SQLITE_PERFORMANCE_PROFILE_MARKER}'",
+        config.sqlite_db_path,
+    )
+    assert result == [("read-mostly",)]
+
+    archive = SqliteDataArchive(
+        archive_name="test_archive",
+        archive_config=SqliteArchiveConfig(
+            sqlite_db_path=config.sqlite_db_path, performance_profile="durable"
+        ),
+        force_read_only=True,
+    )
+    assert archive.sqlite_engine.pool.size() == SQLITE_READ_POOL_SIZE
+    with archive.sqlite_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 2
+
+    # read-only archives don't record the profile they are opened with
+    assert (
+        archive.get_archive_metadata(SQLITE_PERFORMANCE_PROFILE_MARKER) == "read-mostly"
+    )
+
+    with pytest.raises(Exception):
+        SqliteArchiveConfig(
+            sqlite_db_path=config.sqlite_db_path, performance_profile="fast"
+        )
+
+
+def test_job_metadata_batch_retrieval(api: BaseAPI, tmp_path):
+
+    from kiara.registries.metadata import MetadataMatcher
+
+    results = [
+        api.run_job(operation="logic.and", inputs={"a": True, "b": b})["y"]
+        for b in (True, False)
+    ]
+    registry = api.context.metadata_registry
+    for idx, value in enumerate(results):
+        registry.register_job_metadata_items(
+            job_id=value.job_id, items={"comment": f"comment {idx}"}
+        )
+
+    items = api.retrieve_referenced_metadata_items(
+        [x.job_id for x in results] + [results[0].value_id],
+        reference_item_type="job",
+    )
+    assert set(items.keys()) == {str(x.job_id) for x in results}
+    assert items[str(results[1].job_id)]["comment"].comment == "comment 1"
+    assert (
+        registry.retrieve_job_metadata_items(results[0].job_id)["comment"].comment
+        == "comment 0"
+    )
+
+    matches = list(
+        registry.find_metadata_items(
+            MetadataMatcher.create_matcher(
+                reference_item_ids=[results[0].job_id], reference_item_types="job"
+            )
+        )
+    )
+    assert [x.result_type for x in matches] == ["metadata_item", "metadata_ref_item"]
+    assert matches[1].reference_item_id == str(results[0].job_id)
+
+    target = tmp_path / "export.kiarchive"
+    store_result = api.export_values(target, results, alias_map=False)
+    assert all(x.error is None for x in store_result.values())
+
+    con = sqlite3.connect(target)
+    ref_ids = {
+        row[0]
+        for row in con.execute("SELECT reference_item_id FROM metadata_references")
+    }
+    con.close()
+    assert ref_ids == {str(x.job_id) for x in results}
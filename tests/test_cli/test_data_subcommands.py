@@ -4,6 +4,8 @@
 #  Copyright (c) 2021, Markus Binsteiner
 #
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+import re
+
 from click.testing import CliRunner
 
 from kiara.context import Kiara
@@ -77,3 +79,34 @@ def test_data_load_subcommand_3(preseeded_data_store: Kiara):
     assert result.exit_code == 0
     assert "Id" in result.stdout
     assert "City" in result.stdout
+
+
+def test_data_list_summaries(api):
+
+    for idx, data in enumerate(["yy", "x"]):
+        value = api.register_data(data, data_type="string")
+        api.store_value(value, alias=f"summary_test_{idx}")
+
+    result = _run_command(kiara_ctx=api.context, cmd="data list")
+    assert result.exit_code == 0
+    assert "summary_test_0" in result.stdout
+    assert "summary_test_1" in result.stdout
+    assert "string" in result.stdout
+
+    # values are listed by id by default, with or without full value details
+    by_id = [
+        alias
+        for _, alias in sorted(
+            (api.get_value(f"alias:{a}").value_id, a)
+            for a in ["summary_test_0", "summary_test_1"]
+        )
+    ]
+    assert re.findall(r"summary_test_\d", result.stdout) == by_id
+    result = _run_command(kiara_ctx=api.context, cmd="data list --type-config")
+    assert re.findall(r"summary_test_\d", result.stdout) == by_id
+
+    for cmd in ["data list --sort-by size", "data list --type-config --sort-by size"]:
+        result = _run_command(kiara_ctx=api.context, cmd=cmd)
+        assert result.exit_code == 0
+        listed = re.findall(r"summary_test_\d", result.stdout)
+        assert listed == ["summary_test_1", "summary_test_0"]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import os
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+from kiara.models.filesystem import KiaraFileBundle
+from kiara.models.module.jobs import JobLog
+
+
+def _create_folder(path):
+
+    for idx in range(50):
+        file = path / f"sub_{idx % 5}" / f"nested_{idx % 2}" / f"file_{idx}.txt"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(f"content {idx}")
+    (path / "top.csv").write_text("a,b")
+    (path / ".git").mkdir()
+    (path / ".git" / "ignored.txt").write_text("ignored")
+    return path
+
+
+def test_import_folder(tmp_path):
+
+    folder = _create_folder(tmp_path / "bundle")
+
+    expected = []
+    for root, dirnames, filenames in os.walk(folder, topdown=True):
+        dirnames[:] = [d for d in dirnames if d not in (".git", ".tox", ".cache")]
+        for filename in filenames:
+            expected.append(os.path.relpath(os.path.join(root, filename), folder))
+
+    job_log = JobLog()
+    bundle = KiaraFileBundle.import_folder(
+        folder.as_posix(), max_workers=4, job_log=job_log
+    )
+    assert list(bundle.included_files.keys()) == expected
+    assert bundle.number_of_files == 51
+    assert all(f._file_cid is not None for f in bundle.included_files.values())
+    assert job_log.percent_finished == 100
+
+    serial = KiaraFileBundle.import_folder(folder.as_posix(), max_workers=1)
+    assert serial.file_bundle_hash == bundle.file_bundle_hash
+
+    streamed = KiaraFileBundle.iter_folder(
+        folder.as_posix(),
+        import_config={"include_files": [".csv"]},
+        compute_hashes=False,
+    )
+    assert [rel_path for rel_path, _ in streamed] == ["top.csv"]
+
+
+def test_file_bundle_value(api: BaseAPI, tmp_path):
+
+    folder = _create_folder(tmp_path / "bundle")
+    value = api.register_data(folder.as_posix(), "file_bundle")
+    assert value.data.number_of_files == 51
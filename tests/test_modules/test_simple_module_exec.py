@@ -9,6 +9,7 @@ import pytest
 
 from kiara.context import Kiara
 from kiara.exceptions import InvalidValuesException
+from kiara.interfaces.python_api.base_api import BaseAPI
 
 
 def test_module_processing(kiara: Kiara):
@@ -31,3 +32,50 @@ def test_module_processing(kiara: Kiara):
     inputs = {"a": False, "b": True}
     outputs = kiara.process(manifest=and_mod, inputs=inputs)
     assert outputs.get_value_data("y") is False
+
+
+def test_job_profile(api: BaseAPI, other_api: BaseAPI):
+
+    result = api.run_job(operation="logic.xor", inputs={"a": True, "b": False})["y"]
+    api.store_value(result, alias="job_profile_test")
+
+    records = other_api.list_job_records(min_runtime=0.0)
+    assert result.job_id in records.keys()
+    assert not other_api.list_job_records(min_runtime=3600.0)
+
+    profile = records[result.job_id].runtime_details.profile
+    assert {"load_inputs", "process", "sync_outputs"}.issubset(profile.phases.keys())
+    # the pipeline steps are run as jobs of their own
+    assert profile.phases["nested_jobs"].wall_time > 0
+    assert (
+        profile.get_totals().wall_time
+        <= records[result.job_id].runtime_details.runtime + 1.0
+    )
+
+
+def test_job_profile_concurrent_jobs(kiara: Kiara):
+
+    import threading
+    import uuid
+
+    from kiara.processing.profiling import JobProfiler
+
+    module = kiara.module_registry.create_module("logic.and")
+    profiler = JobProfiler(kiara=kiara, job_id=uuid.uuid4(), module=module)
+
+    def run_other_job():
+        JobProfiler(kiara=kiara, job_id=uuid.uuid4(), module=module).finish()
+
+    with profiler.phase("process"):
+        other = threading.Thread(target=run_other_job)
+        other.start()
+        other.join()
+    with profiler.phase("sync_outputs"):
+        pass
+    profiler.finish()
+
+    # process-wide numbers are not recorded while other jobs run
+    process = profiler.profile.phases["process"]
+    assert process.cache_hits is None and process.bytes_read is None
+    assert process.cpu_time >= 0.0
+    assert profiler.profile.phases["sync_outputs"].cache_hits == 0
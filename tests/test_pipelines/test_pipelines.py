@@ -4,6 +4,11 @@
 #
 #  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
 
+from kiara.context import Kiara
+from kiara.defaults import NOT_SET_VALUE_ID
+from kiara.models.module.pipeline import StepStatus
+from kiara.models.module.pipeline.controller import SinglePipelineBatchController
+from kiara.models.module.pipeline.pipeline import Pipeline
 
 # def test_pipeline_default_controller_invalid_inputs(kiara: Kiara):
 #
@@ -58,3 +63,80 @@
 #
 #     result = pipeline.outputs.get_all_value_data()
 #     assert result == {"logic_nand__y": False}
+
+
+def test_pipeline_value_slots(kiara: Kiara, pipeline_paths):
+
+    pipeline = Pipeline.create_pipeline(kiara, pipeline_paths["logic_3"])
+    assert set(pipeline.get_current_pipeline_outputs().values()) == {NOT_SET_VALUE_ID}
+    assert pipeline.get_pipeline_details().pipeline_status == StepStatus.INPUTS_INVALID
+
+    controller = SinglePipelineBatchController(
+        pipeline=pipeline, job_registry=kiara.job_registry, auto_process=False
+    )
+    pipeline.set_pipeline_inputs(
+        inputs={
+            "and_1_1__a": True,
+            "and_1_1__b": True,
+            "and_1_2__a": True,
+            "and_1_2__b": True,
+        }
+    )
+    assert pipeline.get_step_details("and_2").status == StepStatus.INPUTS_INVALID
+    controller.process_pipeline()
+
+    assert pipeline.get_pipeline_details().pipeline_status == StepStatus.RESULTS_READY
+    outputs = pipeline.get_current_pipeline_outputs()
+    assert kiara.data_registry.get_value(outputs["and_2__y"]).data is True
+    step_outputs = pipeline.get_current_step_outputs("and_1_1")
+    assert pipeline.get_current_step_inputs("and_2")["a"] == step_outputs["y"]
+
+    # changing a pipeline input invalidates everything downstream of it
+    changed = pipeline.set_pipeline_inputs(inputs={"and_1_1__a": False})
+    assert set(changed.keys()) == {"__pipeline__", "and_1_1", "and_2"}
+    assert set(changed["__pipeline__"]["outputs"].keys()) == {
+        "and_1_1__y",
+        "and_2__y",
+    }
+    assert changed["and_2"]["inputs"]["a"].old == step_outputs["y"]
+    assert changed["and_2"]["inputs"]["a"].new == NOT_SET_VALUE_ID
+    assert (
+        pipeline.get_current_step_outputs("and_1_2")
+        == pipeline.get_outputs_for_steps("and_1_2")["and_1_2"]
+    )
+    assert pipeline.get_step_details("and_1_2").status == StepStatus.RESULTS_READY
+    assert pipeline.get_step_details("and_2").status == StepStatus.INPUTS_INVALID
+
+
+def test_structure_derived_data_cache(
+    kiara: Kiara, pipeline_paths, tmp_path, monkeypatch
+):
+
+    from kiara.models.module.pipeline import PipelineConfig, structure
+    from kiara.utils.caching import LRUCache
+
+    monkeypatch.setattr(structure, "PIPELINE_STAGES_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(structure, "DERIVED_STRUCTURE_DATA_CACHE", LRUCache())
+
+    config = PipelineConfig.from_file(pipeline_paths["logic_3"], kiara=kiara)
+    structure = config.structure
+    other = PipelineConfig.from_file(pipeline_paths["logic_3"], kiara=kiara).structure
+
+    assert structure is not other
+    assert structure.instance_cid == other.instance_cid
+    assert structure.execution_graph is other.execution_graph
+    assert structure.processing_stages == [["and_1_1", "and_1_2"], ["and_2"]]
+    assert other.get_processing_stage("and_2") == 2
+    assert other.extract_processing_stages("early") == structure.processing_stages
+    assert (tmp_path / f"{structure.instance_cid}.json").is_file()
+
+    # step details are shared, but bound to the structure they are retrieved from
+    assert structure.get_step_details("and_2")._structure is structure
+    assert other.get_step_details("and_2")._structure is other
+    assert other.get_step_details("and_2").processing_stage == 2
+
+    # the structure hash includes how steps are connected
+    data = structure.pipeline_config.model_dump()
+    data["steps"][2]["input_links"] = {"a": "and_1_2.y", "b": "and_1_1.y"}
+    swapped = PipelineConfig.from_config(data=data, kiara=kiara).structure
+    assert swapped.instance_cid != structure.instance_cid
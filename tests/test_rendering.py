@@ -23,3 +23,46 @@ def test_render_python_script(api: BaseAPI):
     local_vars = {}
     exec(rendered, {}, local_vars)  # noqa
     assert local_vars["pipeline_result_y"].data is True
+
+
+def test_render_cache(api: BaseAPI):
+
+    render_registry = api.context.render_registry
+    render_registry.clear_render_cache()
+
+    value = api.register_data(data="render me", data_type="string")
+
+    first = api.render(value, source_type="value", target_type="string")
+    second = api.render(value, source_type="value", target_type="string")
+
+    assert first == second
+    stats = render_registry.render_cache_stats
+    assert stats.size == 1
+    assert stats.hits == 1
+
+    # a value with the same data is still a different value, and can't share the cached render
+    other = api.register_data(data="render me", data_type="string")
+    render_config = {"include_metadata": True}
+    api.render(
+        value, source_type="value", target_type="string", render_config=render_config
+    )
+    rendered = api.render(
+        other, source_type="value", target_type="string", render_config=render_config
+    )
+    assert rendered.value_id == other.value_id
+    assert render_registry.render_cache_stats.size == 3
+
+    # callers get their own copy of cached results
+    rendered.rendered = "changed"
+    cached = api.render(
+        other, source_type="value", target_type="string", render_config=render_config
+    )
+    assert cached.rendered == "render me"
+
+
+def test_operation_info_cache(api: BaseAPI):
+
+    info_1 = api.retrieve_operation_info("logic.and")
+    info_2 = api.retrieve_operation_info("logic.and")
+
+    assert info_1 is info_2
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2021, University of Luxembourg / DHARPA project
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+from rich.console import Console
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+from kiara.models.values.lineage import ValueLineage
+
+
+def _create_diamond_lineage(api: BaseAPI):
+
+    first = api.run_job(operation="logic.and", inputs={"a": True, "b": True})["y"]
+    # both inputs come from the same job, so that job is a shared ancestor
+    second = api.run_job(operation="logic.or", inputs={"a": first, "b": first})["y"]
+    third = api.run_job(operation="logic.and", inputs={"a": second, "b": first})["y"]
+    return first, second, third
+
+
+def test_lineage_graph_shared_ancestors(api: BaseAPI):
+
+    first, _second, third = _create_diamond_lineage(api)
+
+    graph = third.lineage.full_graph
+
+    value_nodes = [n for n, d in graph.nodes(data=True) if d["node_type"] == "value"]
+    module_nodes = [
+        n for n, d in graph.nodes(data=True) if d["node_type"] == "operation"
+    ]
+
+    # third, second, first, and the two boolean inputs of the first job
+    assert len(value_nodes) == 5
+    assert len(module_nodes) == 3
+    assert f"value:{first.value_id}" in graph.nodes
+
+    module_graph = third.lineage.module_graph
+    module_nodes = [
+        n for n, d in module_graph.nodes(data=True) if d["node_type"] == "operation"
+    ]
+    assert len(module_nodes) == 3
+
+
+def test_lineage_shared_ancestors_only_expanded_once(api: BaseAPI):
+
+    first, second, third = _create_diamond_lineage(api)
+
+    data = third.lineage.as_dict()
+    inputs = data["pedigree"]["inputs"]
+    assert inputs["a"]["id"] == str(second.value_id)
+    assert inputs["b"]["id"] == str(first.value_id)
+    assert inputs["b"]["pedigree"]["module"]["name"] == "logic.and"
+
+    # both inputs of 'second' are 'first', which is already part of the dict
+    second_inputs = inputs["a"]["pedigree"]["inputs"]
+    assert second_inputs["a"]["pedigree"] == {"ref": str(first.value_id)}
+    assert second_inputs["b"]["pedigree"] == {"ref": str(first.value_id)}
+
+    console = Console(record=True, width=300)
+    console.print(third.lineage.create_renderable(include_ids=True))
+    rendered = console.export_text()
+    assert rendered.count(f"see lineage of value {first.value_id} above") == 2
+
+
+def test_lineage_graph_max_depth(api: BaseAPI):
+
+    _first, _second, third = _create_diamond_lineage(api)
+
+    lineage = ValueLineage(kiara=api.context, value=third, max_depth=1)
+    graph = lineage.full_graph
+    module_nodes = [
+        n for n, d in graph.nodes(data=True) if d["node_type"] == "operation"
+    ]
+    assert len(module_nodes) == 1
+
+    data = lineage.as_dict()
+    for input_details in data["pedigree"]["inputs"].values():
+        assert "pedigree" not in input_details.keys()
+
+
+def test_lineage_from_stored_values(api: BaseAPI, other_api: BaseAPI):
+
+    first, _second, third = _create_diamond_lineage(api)
+    api.store_value(third, alias="lineage_test")
+
+    stored = other_api.get_value("alias:lineage_test")
+
+    graph = stored.lineage.full_graph
+    assert graph.number_of_nodes() == 8
+    assert str(first.value_id) in str(stored.lineage.as_dict())
+
+
+def test_lineage_index_queries(api: BaseAPI, other_api: BaseAPI):
+    first, second, third = _create_diamond_lineage(api)
+
+    # not stored yet, so this uses the job records of the current session
+    derived = api.list_derived_value_ids(first)
+    assert derived == {second.value_id: 1, third.value_id: 1}
+
+    api.store_value(third, alias="lineage_index_test")
+
+    derived = other_api.list_derived_value_ids(first.value_id)
+    assert derived == {second.value_id: 1, third.value_id: 1}
+
+    derived = other_api.list_derived_value_ids(first.value_id, max_depth=0)
+    assert derived == {}
+
+    sources = other_api.list_source_value_ids("alias:lineage_index_test")
+    assert sources[second.value_id] == 1
+    assert sources[first.value_id] == 1
+    for value_id in first.pedigree.inputs.values():
+        assert sources[value_id] == 2
+
+    edges = other_api.list_lineage_edges(second, downstream=True)
+    assert [(e.input_value_id, e.output_value_id) for e in edges.keys()] == [
+        (second.value_id, third.value_id)
+    ]
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import pytest
+
 from kiara.api import Kiara, ValueSchema
 from kiara.defaults import SpecialValue
+from kiara.models.filesystem import KiaraFile
 
 #  Copyright (c) 2021, University of Luxembourg / DHARPA project
 #
@@ -31,3 +34,422 @@ def test_registry_values(kiara: Kiara):
 
     v = reg.register_data(data=SpecialValue.NOT_SET, schema=value_schema_1)
     assert v.data is None
+
+
+def test_find_values(api):
+
+    from kiara.models.values.matchers import ValueMatcher
+
+    for idx, data in enumerate(["a", "bbbbbbbbbbbb", "cc", True]):
+        data_type = "boolean" if isinstance(data, bool) else "string"
+        value = api.register_data(data, data_type=data_type)
+        api.store_value(value, alias=f"find_test_{data_type}_{idx}")
+    unaliased = api.register_data("unaliased", data_type="string")
+    api.store_value(unaliased, alias=None)
+
+    all_values = [
+        api.context.data_registry.get_value(v_id)
+        for v_id in api.context.data_registry.retrieve_all_available_value_ids()
+    ]
+
+    for params in [
+        {},
+        {"has_alias": False},
+        {"has_alias": False, "allow_internal": True},
+        {"data_types": ["string"]},
+        {"data_types": ["any"], "allow_sub_types": False},
+        {"data_types": ["any"], "has_alias": False},
+        {"min_size": 2, "max_size": 4},
+        {"alias_matchers": ["boolean"]},
+        {"alias_matchers": ["_1", "_2"]},
+    ]:
+        matcher = ValueMatcher.create_matcher(**params)
+        expected = {v.value_id for v in all_values if matcher.is_match(v, api.context)}
+        assert set(api.list_value_ids(**params)) == expected, params
+
+    registry = api.context.data_registry
+    matcher = ValueMatcher.create_matcher(sort_by="size", sort_descending=True)
+    sizes = [v.value_size for v in registry.find_values(matcher).values()]
+    assert len(sizes) == 4
+    assert sizes == sorted(sizes, reverse=True)
+
+    all_sorted = list(
+        registry.find_values(ValueMatcher.create_matcher(sort_by="size")).keys()
+    )
+    page_1 = registry.find_values(ValueMatcher.create_matcher(sort_by="size", limit=3))
+    page_2 = registry.find_values(
+        ValueMatcher.create_matcher(sort_by="size", limit=3, offset=3)
+    )
+    assert list(page_1.keys()) + list(page_2.keys()) == all_sorted
+    assert len(api.list_values(limit=2)) == 2
+
+
+def test_value_summaries(api):
+
+    for idx, data in enumerate(["a", "bbbbbbbbbbbb", "cc"]):
+        value = api.register_data(data, data_type="string")
+        api.store_value(value, alias=[f"summary_{idx}", f"other_summary_{idx}"])
+
+    summaries = list(api.list_value_summaries(sort_by="size"))
+    assert [s.value_size for s in summaries] == sorted(s.value_size for s in summaries)
+    for summary in summaries:
+        value = api.get_value(summary.value_id)
+        assert summary.data_type_name == value.data_type_name
+        assert summary.value_hash == value.value_hash
+        assert summary.value_created == value.value_created
+        assert set(
+            summary.aliases
+        ) == api.context.alias_registry.find_aliases_for_value_id(summary.value_id)
+
+    page = list(api.list_value_summaries(sort_by="size", limit=1, offset=1))
+    assert page == summaries[1:2]
+
+
+def test_tiered_cache():
+
+    from kiara.utils.caching import TieredCache
+
+    class Item(object):
+        pass
+
+    cache: TieredCache[str, Item] = TieredCache(max_size=1)
+    pinned = Item()
+    cache.put("pinned", pinned, pinned=True)
+    referenced = Item()
+    cache.put("referenced", referenced)
+    cache.put("unreferenced", Item())
+    # evicts 'unreferenced', which is collected since there is no other reference to it
+    cache.put("other", Item())
+
+    assert cache.get("pinned") is pinned
+    assert cache.get("unreferenced") is None
+    assert cache.get("referenced") is referenced
+
+    stats = cache.stats
+    assert stats.size == 1
+    assert stats.pinned == 1
+    assert stats.weak_hits == 1
+    assert stats.misses == 1
+
+    cache.clear()
+    assert "referenced" not in cache
+    assert cache.get("pinned") is pinned
+
+
+def test_bounded_value_caches():
+
+    import tempfile
+
+    from kiara.context.config import KiaraConfig
+
+    kc = KiaraConfig.create_in_folder(f"{tempfile.mkdtemp()}/ctx")
+    kc.runtime_config.runtime_profile = "default"
+    kc.runtime_config.value_cache_size = 1
+    kiara = kc.create_context()
+    registry = kiara.data_registry
+
+    stored_ids = []
+    for data in ["a", "b", "c"]:
+        value = registry.register_data(data=data, schema="string")
+        registry.store_value(value)
+        stored_ids.append(value.value_id)
+    unstored_ids = [
+        registry.register_data(data=data, schema="string").value_id
+        for data in ["d", "e", "f"]
+    ]
+
+    # unstored values are pinned, stored ones are re-loaded after they were evicted
+    for value_id, data in zip(stored_ids + unstored_ids, "abcdef"):
+        assert registry.get_value(value_id).data == data
+
+    stats = registry.cache_stats
+    assert stats["registered_values"].size <= 1
+    assert stats["registered_values"].pinned >= 3
+    assert stats[f"{registry.default_data_store}.values"].size <= 1
+    # only the payloads of the special 'not set' and 'none' values are pinned
+    assert stats["value_data"].size <= 1
+    assert stats["value_data"].pinned == 2
+    # hash index entries are only pinned until their values are stored
+    for value_id in stored_ids:
+        value_hash = registry.get_value(value_id).value_hash
+        assert value_hash not in registry._values_by_hash._pinned
+    for value_id in unstored_ids:
+        value_hash = registry.get_value(value_id).value_hash
+        assert value_hash in registry._values_by_hash._pinned
+
+
+def test_bloom_filter():
+
+    from kiara.utils.bloom import BloomFilter
+
+    items = [f"item_{idx}" for idx in range(1000)]
+    bloom_filter = BloomFilter.from_items(items, capacity=1000, error_rate=0.01)
+    assert all(item in bloom_filter for item in items)
+    false_positives = sum(f"other_{idx}" in bloom_filter for idx in range(1000))
+    assert false_positives < 50
+    assert not bloom_filter.is_saturated
+
+    restored = BloomFilter.from_bytes(bloom_filter.to_bytes())
+    assert restored.capacity == 1000
+    assert len(restored) == 1000
+    assert all(item in restored for item in items)
+
+
+def test_chunk_deduplication(api):
+
+    from io import BytesIO
+
+    from sqlalchemy import text
+
+    from kiara.defaults import TABLE_NAME_DATA_CHUNKS
+    from kiara.registries.data.data_store.sqlite_store import SqliteDataStore
+    from kiara.utils.bloom import BloomFilter
+    from kiara.utils.hashing import compute_cid
+
+    data_registry = api.context.data_registry
+    store = data_registry.get_archive(data_registry.default_data_store)
+    assert isinstance(store, SqliteDataStore)
+
+    chunks = {}
+    for data in [b"chunk_a", b"chunk_b"]:
+        _, cid = compute_cid(data)
+        chunks[cid] = data
+
+    def count_chunks() -> int:
+        with store.sqlite_engine.connect() as conn:
+            sql = text(f"SELECT COUNT(*) FROM {TABLE_NAME_DATA_CHUNKS}")
+            return conn.execute(sql).scalar()
+
+    before = count_chunks()
+    first = next(iter(chunks))
+    store._persist_chunks({first: BytesIO(chunks[first])})
+    assert str(first) in store._chunk_filter
+    store._persist_chunks({cid: BytesIO(data) for cid, data in chunks.items()})
+    assert count_chunks() == before + 2
+
+    # chunks that were added by someone else (so they are missing from the filter) are ignored
+    store._chunk_filter = BloomFilter()
+    store._persist_chunks({cid: BytesIO(data) for cid, data in chunks.items()})
+    assert count_chunks() == before + 2
+
+
+def test_value_id_filter(api, other_api, monkeypatch):
+
+    from kiara.registries.data.data_store import VALUE_ID_FILTER_METADATA_KEY
+    from kiara.utils.bloom import BloomFilter
+
+    data_registry = api.context.data_registry
+    store = data_registry.get_archive(data_registry.default_data_store)
+
+    persisted = []
+    persist_value_id_filter = store._persist_value_id_filter
+
+    def _persist(value_id_filter):
+        persisted.append(value_id_filter.count)
+        persist_value_id_filter(value_id_filter)
+
+    monkeypatch.setattr(store, "_persist_value_id_filter", _persist)
+
+    value = api.register_data("filtered", data_type="string")
+    assert not store.might_contain_value(value.value_id)
+    persisted.clear()
+    api.store_value(value, alias="filtered")
+    assert store.might_contain_value(value.value_id)
+    assert VALUE_ID_FILTER_METADATA_KEY not in store.archive_metadata
+
+    # single writes don't persist the filter, batches do so once at the end
+    assert not persisted
+    batch = [api.register_data(f"filtered_{i}", data_type="string") for i in range(3)]
+    api.store_values(batch)
+    assert len(persisted) == 1
+    assert all(store.might_contain_value(x.value_id) for x in batch)
+
+    # a new context loads the persisted filter
+    other_registry = other_api.context.data_registry
+    other_store = other_registry.get_archive(other_registry.default_data_store)
+    assert other_store.might_contain_value(value.value_id)
+    assert other_registry.find_store_id_for_value(value.value_id) is not None
+
+    # values that are missing from an out-of-date filter are still found
+    other_store._value_id_filter = BloomFilter()
+    other_store._value_id_filter_loaded = True
+    other_registry._registered_values.clear()
+    other_registry._value_archive_lookup_map.clear()
+    assert other_registry.get_value(value.value_id).data == "filtered"
+    assert not other_store._value_id_filter_loaded
+
+
+def test_file_hash_cache(api, tmp_path, monkeypatch):
+
+    import os
+    import time
+
+    from kiara.models.filesystem import KiaraFile
+    from kiara.utils import hashing
+
+    context_config = api.context.context_config
+    cache = hashing.get_process_file_hash_cache()
+    assert cache is not None
+    assert context_config.file_hash_cache_path == cache.db_path.as_posix()
+
+    file = tmp_path / "data.txt"
+    file.write_text("some data")
+    # recently modified files are not cached
+    past = time.time_ns() - 10 * hashing.FILE_HASH_RACY_WINDOW_NS
+    os.utime(file, ns=(past, past))
+
+    cid = KiaraFile.load_file(file.as_posix()).file_cid
+
+    def fail(file: str) -> bytes:
+        raise AssertionError(f"File was re-hashed: {file}")
+
+    with monkeypatch.context() as m:
+        m.setattr(hashing, "_hash_file", fail)
+        assert KiaraFile.load_file(file.as_posix()).file_cid == cid
+
+    file.write_text("other data")
+    os.utime(file, ns=(past + 1000, past + 1000))
+    assert KiaraFile.load_file(file.as_posix()).file_cid != cid
+
+
+def test_file_hash_cache_deleted_with_context(api, tmp_path):
+
+    import os
+
+    from kiara.utils import hashing
+
+    kiara_config = api._kiara_config
+    kiara = kiara_config.create_context("file_hash_cache_test")
+    db_path = kiara.context_config.file_hash_cache_path
+    # the cache of the most recently created context is used process-wide
+    assert hashing.get_process_file_hash_cache().db_path.as_posix() == db_path
+
+    file = tmp_path / "data.txt"
+    file.write_text("some data")
+    past = 1_000_000_000
+    os.utime(file, ns=(past, past))
+    hashing.compute_file_digest(file.as_posix())
+    assert os.path.exists(db_path)
+
+    kiara_config.delete("file_hash_cache_test", dry_run=False)
+    assert not os.path.exists(db_path)
+    assert hashing.get_process_file_hash_cache() is None
+
+
+def test_content_defined_chunking(api, other_api, tmp_path):
+
+    import random
+
+    from sqlalchemy import text
+
+    from kiara.defaults import TABLE_NAME_DATA_CHUNKS
+    from kiara.utils.chunking import CDC_MAX_SIZE, chunk_bytes, chunk_file
+
+    data = random.Random(0).randbytes(4 * CDC_MAX_SIZE)  # noqa: S311
+    parts = list(chunk_bytes(data))
+    assert len(parts) > 1
+    assert b"".join(parts) == data
+    assert max(len(p) for p in parts) <= CDC_MAX_SIZE
+
+    file = tmp_path / "data.bin"
+    file.write_bytes(data)
+    assert list(chunk_file(file.as_posix())) == parts
+
+    api.context.update_runtime_config(content_defined_chunking=True)
+    data_registry = api.context.data_registry
+    store = data_registry.get_archive(data_registry.default_data_store)
+
+    def count_chunks() -> int:
+        with store.sqlite_engine.connect() as conn:
+            sql = text(f"SELECT COUNT(*) FROM {TABLE_NAME_DATA_CHUNKS}")
+            return conn.execute(sql).scalar()
+
+    value = api.register_data(file.as_posix(), data_type="file")
+    api.store_value(value, alias="cdc_file")
+    persisted = data_registry.retrieve_persisted_value_details(value.value_id)
+    scids = persisted.chunk_id_map["data.bin"]
+    assert len(scids.chunk_id_list) == 1
+    assert len(scids.chunk_parts[scids.chunk_id_list[0]]) == len(parts)
+
+    # a modified version only adds the chunks around the change
+    before = count_chunks()
+    modified = tmp_path / "modified.bin"
+    modified.write_bytes(data[:CDC_MAX_SIZE] + b"changed" + data[CDC_MAX_SIZE:])
+    modified_value = api.register_data(modified.as_posix(), data_type="file")
+    api.store_value(modified_value, alias="cdc_file_modified")
+    assert count_chunks() - before < len(parts)
+
+    loaded = other_api.get_value("cdc_file_modified")
+    with open(loaded.data.path, "rb") as f:
+        assert f.read() == modified.read_bytes()
+    loaded_bytes = other_api.context.data_registry.retrieve_chunks(
+        scids.chunk_id_list,
+        as_files=False,
+        archive_id=scids.archive_id,
+        chunk_parts=scids.chunk_parts,
+    )
+    assert list(loaded_bytes) == [data]
+
+    bytes_value = api.register_data(data, data_type="bytes")
+    api.store_value(bytes_value, alias="cdc_bytes")
+    assert other_api.get_value(bytes_value.value_id).data == data
+
+
+def test_value_data_writer(api, tmp_path):
+
+    from kiara.models.values.value import ORPHAN, ValueMapWritable
+
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"c" * 3000)
+
+    schema = {
+        "file": ValueSchema(type="file"),
+        "bytes": ValueSchema(type="bytes"),
+        "string": ValueSchema(type="string", optional=True),
+    }
+    outputs = ValueMapWritable.create_from_schema(
+        kiara=api.context, schema=schema, pedigree=ORPHAN
+    )
+
+    with pytest.raises(Exception):
+        outputs.open_writer("string")
+
+    with outputs.open_writer("file", file_name="result.bin") as writer:
+        writer.write(b"a" * 1000)
+        writer.write(memoryview(b"b" * 1000))
+        writer.write_file(source.as_posix())
+    assert writer.size == 5000
+
+    expected = b"a" * 1000 + b"b" * 1000 + b"c" * 3000
+    file_value = outputs.get_value_obj("file")
+    assert file_value.data.file_name == "result.bin"
+    with open(file_value.data.path, "rb") as f:
+        assert f.read() == expected
+
+    expected_file = tmp_path / "expected.bin"
+    expected_file.write_bytes(expected)
+    loaded = KiaraFile.load_file(expected_file.as_posix(), file_name="result.bin")
+    assert file_value.data.file_cid == loaded.file_cid
+    assert file_value.value_hash == api.register_data(loaded, "file").value_hash
+
+    with pytest.raises(Exception):
+        with outputs.open_writer("bytes") as writer:
+            writer.write(b"discarded")
+            raise Exception("failed")
+    assert not outputs._open_writers
+
+    writer = outputs.open_writer("bytes")
+    writer.write(b"some ")
+    with pytest.raises(Exception):
+        outputs.sync_values()
+    writer.write(b"bytes")
+    bytes_value = writer.close()
+    assert bytes_value.data == b"some bytes"
+
+    outputs.set_value("string", None)
+    outputs.sync_values()
+
+    api.store_value(file_value, alias="value_data_writer_file")
+    stored = api.get_value("value_data_writer_file")
+    with open(stored.data.path, "rb") as f:
+        assert f.read() == expected
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+#  Copyright (c) 2023, Markus Binsteiner
+#
+#  Mozilla Public License, version 2.0 (see LICENSE or https://www.mozilla.org/en-US/MPL/2.0/)
+
+import threading
+import time
+
+import zmq
+
+from kiara.interfaces.python_api.base_api import BaseAPI
+from kiara.models.module.jobs import JobStatus
+from kiara.zmq.client import KiaraZmqClient
+from kiara.zmq.messages import KiaraApiMsgBuilder
+from kiara.zmq.service import JOB_STATUS_TOPIC, KiaraZmqEventPublisher
+
+
+def test_job_status_events(api: BaseAPI):
+
+    context = zmq.Context()
+    pub_socket = context.socket(zmq.PUB)
+    publish_port = pub_socket.bind_to_random_port("tcp://127.0.0.1")
+
+    job_registry = api.context.job_registry
+    publisher = KiaraZmqEventPublisher(
+        socket=pub_socket,
+        job_registry=job_registry,
+        msg_builder=KiaraApiMsgBuilder(),
+    )
+    job_registry.register_job_status_listener(publisher)
+
+    client = KiaraZmqClient(host="127.0.0.1", port=publish_port)
+    events = []
+
+    def collect():
+        for event in client.subscribe(
+            topics=[JOB_STATUS_TOPIC], publish_port=publish_port, timeout_in_ms=2000
+        ):
+            events.append(event)
+
+    thread = threading.Thread(target=collect)
+    try:
+        thread.start()
+        # give the subscriber time to connect, PUB sockets drop events for subscribers that aren't connected yet
+        time.sleep(0.5)
+        result = api.run_job(operation="logic.and", inputs={"a": True, "b": False})
+        thread.join(timeout=10)
+    finally:
+        job_registry.unregister_job_status_listener(publisher)
+        client.close()
+        context.destroy(linger=0)
+
+    assert not thread.is_alive()
+    job_id = str(result["y"].job_id)
+    statuses = [
+        payload["new_status"]
+        for topic, payload in events
+        if topic == JOB_STATUS_TOPIC and payload["job_id"] == job_id
+    ]
+    assert statuses
+    assert statuses[-1] == JobStatus.SUCCESS.value
+    finished = next(
+        payload
+        for _, payload in events
+        if payload["job_id"] == job_id
+        and payload["new_status"] == JobStatus.SUCCESS.value
+    )
+    assert finished["module_type"] == "logic.and"
+    assert finished["results"]["y"] == str(result["y"].value_id)
+
+
+def test_request_msg_trace_parent():
+
+    builder = KiaraApiMsgBuilder()
+    trace_parent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+    msg = builder.encode_msg("ping", None, trace_parent=trace_parent)
+    assert msg[0] == b"\x00\x01"
+    decoded = builder.decode_msg(msg)
+    assert decoded.args == {}
+    assert decoded.trace_parent == trace_parent
+
+    msg = builder.encode_msg("get_value", {"value": "x"}, trace_parent=trace_parent)
+    assert builder.decode_msg(msg).args == {"value": "x"}
+
+    # version 0.0 messages don't know about trace context frames
+    assert builder.decode_msg([b"\x00\x00", b"ping", b"", b"x"]).trace_parent is None